@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the geodesic fallback matrix: per-pair geopy loop vs vectorized kernel.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_geodesic.py --points 200 500 1500
+
+The geopy loop is quadratic in pure Python, so it is skipped above --max-loop
+points (its time is extrapolated from the largest measured size instead).
+"""
+
+import argparse
+import time
+
+import numpy as np
+from geopy.distance import geodesic
+
+from webrotas.domain.geospatial.distance import distance_matrix, pairwise_distances
+
+
+def random_points(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Random points in a ~50 km box around São Paulo."""
+    rng = np.random.default_rng(seed)
+    lats = -23.55 + rng.uniform(-0.25, 0.25, n)
+    lngs = -46.63 + rng.uniform(-0.25, 0.25, n)
+    return lats, lngs
+
+
+def geopy_matrix(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Reference implementation: one geopy call per ordered pair."""
+    n = len(lats)
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                matrix[i, j] = geodesic((lats[i], lngs[i]), (lats[j], lngs[j])).meters
+    return matrix
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 300, 1500])
+    parser.add_argument("--max-loop", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'points':>7} {'geopy loop':>12} {'haversine':>10} {'ellipsoidal':>12} "
+          f"{'speedup':>8} {'max err (m)':>12}")
+
+    loop_rate = None  # seconds per pair of the geopy loop
+    for n in args.points:
+        lats, lngs = random_points(n)
+
+        _, t_hav = timed(distance_matrix, lats, lngs, "haversine")
+        ellipsoidal, t_ell = timed(distance_matrix, lats, lngs, "ellipsoidal")
+
+        if n <= args.max_loop:
+            reference, t_loop = timed(geopy_matrix, lats, lngs)
+            loop_rate = t_loop / max(n * (n - 1), 1)
+            max_err = f"{np.abs(ellipsoidal - reference).max():.2e}"
+            loop_label = f"{t_loop:.3f}s"
+        else:
+            # Spot-check accuracy on a sample of pairs
+            rng = np.random.default_rng(1)
+            pairs = rng.integers(0, n, size=(200, 2))
+            sample = pairwise_distances(lats, lngs, pairs)
+            expected = [
+                geodesic((lats[i], lngs[i]), (lats[j], lngs[j])).meters for i, j in pairs
+            ]
+            max_err = f"{np.abs(sample - expected).max():.2e}"
+            t_loop = loop_rate * n * (n - 1) if loop_rate else float("nan")
+            loop_label = f"~{t_loop:.1f}s"
+
+        print(f"{n:>7} {loop_label:>12} {t_hav:>9.3f}s {t_ell:>11.3f}s "
+              f"{t_loop / t_ell:>7.0f}x {max_err:>12}")
+
+
+if __name__ == "__main__":
+    main()
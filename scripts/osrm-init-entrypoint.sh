@@ -82,10 +82,14 @@ print_section "Step 5: OSRM Preprocessing"
 
 cd "$OSRM_DATA"
 
+# Reported by osrm-routed as "data_version"; a new value makes webRotas
+# drop travel costs cached from the previous dataset
+DATA_VERSION="${REMOTE_MD5:0:12}-$(date -u +%s)"
+
 echo ""
 echo "Command 1/3:"
-print_step "Running: osrm-extract -p /data/profiles/car.lua /data/region.osm.pbf"
-osrm-extract -p /data/profiles/car.lua /data/region.osm.pbf
+print_step "Running: osrm-extract -p /data/profiles/car.lua --data_version $DATA_VERSION /data/region.osm.pbf"
+osrm-extract -p /data/profiles/car.lua --data_version "$DATA_VERSION" /data/region.osm.pbf
 
 echo ""
 echo "Command 2/3:"
@@ -206,12 +206,17 @@ def main() -> int:
     print_section("Step 5: OSRM Preprocessing")
 
     image = "ghcr.io/project-osrm/osrm-backend:latest"
+    # Reported by osrm-routed as "data_version"; a new value makes webRotas
+    # drop travel costs cached from the previous dataset
+    data_version = f"{remote_md5[:12]}-{int(time())}"
     commands = [
         (
             [
                 "osrm-extract",
                 "-p",
                 "/data/profiles/car.lua",
+                "--data_version",
+                data_version,
                 f"/data/{pbf_file.name}",
             ],
             "osrm-extract",
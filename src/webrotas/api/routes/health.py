@@ -3,6 +3,11 @@
 from fastapi import APIRouter, Query
 
 from webrotas.api.services.osrm_health import check_osrm_health
+from webrotas.domain.avoid_zones.zone_set import get_avoid_zone_cache
+from webrotas.infrastructure.routing.circuit_breaker import get_circuit_breakers_status
+from webrotas.infrastructure.routing.pair_cache import get_pair_cache
+from webrotas.infrastructure.routing.leg_cache import get_leg_cache
+from webrotas.infrastructure.routing.solver_pool import get_solver_pool
 
 
 router = APIRouter(tags=["health"])
@@ -48,3 +53,96 @@ async def osrm_health_check():
     Returns timing information and service status.
     """
     return await check_osrm_health()
+
+
+@router.get(
+    "/health/backends",
+    summary="OSRM backends circuit status",
+    description="Report the circuit breaker state of each OSRM backend",
+    responses={
+        200: {"description": "Circuit breaker status of each backend"},
+    }
+)
+async def backends_health_check():
+    """
+    OSRM backends circuit status endpoint.
+    
+    Returns the circuit breaker state (closed, open or half_open) of the local
+    container and the public router, as seen by request outcomes and probes.
+    """
+    return {"backends": get_circuit_breakers_status()}
+
+
+@router.get(
+    "/health/solver",
+    summary="Route solver pool status",
+    description="Report queue and timing metrics of the TSP solver process pool",
+    responses={
+        200: {"description": "Solver pool metrics"},
+    }
+)
+async def solver_health_check():
+    """
+    Route solver pool status endpoint.
+    
+    Returns the number of running and queued solves, completed, failed,
+    cancelled and rejected counts, and average wait and solve times.
+    """
+    return {"solver": get_solver_pool().snapshot()}
+
+
+@router.get(
+    "/health/pair-cache",
+    summary="Travel cost cache status",
+    description="Report size, hit/miss counters and dataset versions of the pair cache",
+    responses={
+        200: {"description": "Pair cache metrics"},
+    }
+)
+async def pair_cache_health_check():
+    """
+    Travel cost cache status endpoint.
+    
+    Returns the number of cached pairs and the cap, cached/uncached cells
+    served since startup and the dataset version of each OSRM backend.
+    """
+    pair_cache = get_pair_cache()
+    return {"pairCache": pair_cache.snapshot() if pair_cache is not None else None}
+
+
+@router.get(
+    "/health/leg-cache",
+    summary="Route leg cache status",
+    description="Report size and hit/miss counters of the route leg cache",
+    responses={
+        200: {"description": "Leg cache metrics"},
+    }
+)
+async def leg_cache_health_check():
+    """
+    Route leg cache status endpoint.
+    
+    Returns the number and memory of legs kept in memory, the legs stored on
+    disk (if persistence is enabled) and cached/uncached legs served since
+    startup.
+    """
+    leg_cache = get_leg_cache()
+    return {"legCache": leg_cache.snapshot() if leg_cache is not None else None}
+
+
+@router.get(
+    "/health/avoid-zones",
+    summary="Avoid zone cache status",
+    description="Report size and hit/miss counters of the compiled avoid zone cache",
+    responses={
+        200: {"description": "Avoid zone cache metrics"},
+    }
+)
+async def avoid_zone_cache_health_check():
+    """
+    Compiled avoid zone cache status endpoint.
+    
+    Returns the number of compiled zone sets kept and the requests that
+    reused (hits) or compiled (misses) a zone set since startup.
+    """
+    return {"avoidZoneCache": get_avoid_zone_cache().snapshot()}
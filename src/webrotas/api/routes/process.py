@@ -1,17 +1,66 @@
 """Process route endpoint"""
 
-from fastapi import APIRouter, Query, Body
+import asyncio
+from typing import Any
+
+import orjson
+from fastapi import APIRouter, Query, Body, Request, Header
 from fastapi.responses import JSONResponse
 
 from webrotas.core.dependencies import (
     validate_request_structure,
     validate_request_type,
     validate_parameters,
+    validate_solver_options,
+    negotiate_path_format,
 )
 from webrotas.api.services.route_service import process_route
 
 router = APIRouter(tags=["routing"])
 
+# Seconds between client disconnect checks while a route is being processed
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Non-standard status (nginx convention) logged when the client went away
+CLIENT_CLOSED_REQUEST = 499
+
+
+class CompactJSONResponse(JSONResponse):
+    """
+    JSON response serialized once with orjson.
+
+    Unlike JSONResponse (json.dumps), NumPy arrays and scalars are written
+    natively, so flat path arrays never become Python lists.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+async def _run_until_disconnected(request: Request, coro):
+    """
+    Await coro, cancelling it if the client disconnects first.
+
+    Cancellation propagates to the solver pool, which drops queued solves and
+    stops running ones, so abandoned requests do not hold a worker.
+
+    Returns:
+        Tuple of (result, disconnected); result is None if disconnected
+    """
+    task = asyncio.create_task(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result(), False
+            if await request.is_disconnected():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                return None, True
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
 
 @router.post(
     "/process",
@@ -21,13 +70,22 @@ router = APIRouter(tags=["routing"])
         200: {"description": "Route processed successfully"},
         400: {"description": "Invalid request or missing parameters"},
         500: {"description": "Server error during route processing"},
+        503: {"description": "Route solver is busy"},
     },
 )
 async def process(
+    request: Request,
     session_id: str = Query(
         None, alias="sessionId", description="Unique session identifier"
     ),
     request_data: dict = Body(...),
+    path_format: str = Query(
+        None,
+        alias="pathFormat",
+        description="Compact paths: 'polyline6' (encoded polyline) or 'flat' "
+        "([lat0, lng0, lat1, lng1, ...] at 6 decimals)",
+    ),
+    accept: str = Header(None),
 ) -> JSONResponse:
     """
     Process a route request.
@@ -38,6 +96,13 @@ async def process(
     - `parameters`: Type-specific parameters
     - `criterion` (optional): Routing criterion (distance, duration, or ordered)
     - `avoidZones` (optional): Geographic zones to avoid
+    - `solver` (optional): TSP search policy: `timeLimit` (seconds),
+      `firstSolutionStrategy` and `metaheuristic` (e.g. guided_local_search,
+      simulated_annealing); defaults are tuned to the number of waypoints
+
+    Compact responses are opt-in, with `pathFormat` or an `Accept` header
+    listing `application/vnd.webrotas.compact+json` (polyline6): each route's
+    `paths` is then encoded as indicated by its `pathEncoding` field.
     """
 
     # Generate session_id if not provided
@@ -57,7 +122,22 @@ async def process(
     parameters = request_data.get("parameters")
     await validate_parameters(request_type, parameters)
 
-    # Process the route
-    response = await process_route(request_data, session_id)
+    # Validate solver options
+    await validate_solver_options(request_data.get("solver"))
+
+    # Negotiate the response format
+    path_format = await negotiate_path_format(path_format, accept)
+
+    # Process the route, giving up if the client disconnects
+    response, disconnected = await _run_until_disconnected(
+        request, process_route(request_data, session_id, path_format)
+    )
+    if disconnected:
+        return JSONResponse(
+            status_code=CLIENT_CLOSED_REQUEST,
+            content={"detail": "Client disconnected"},
+        )
 
+    if path_format is not None:
+        return CompactJSONResponse(content=response)
     return JSONResponse(content=response)
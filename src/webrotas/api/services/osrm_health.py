@@ -1,11 +1,24 @@
 """OSRM container health check service"""
 
+import os
 import time
+import asyncio
 import httpx
 from typing import Dict, Any
 from fastapi import HTTPException
 
 from webrotas.config.server_hosts import get_osrm_url
+from webrotas.infrastructure.routing.http_client import (
+    LOCAL_BACKEND,
+    PUBLIC_BACKEND,
+    PUBLIC_OSRM_URL,
+    get_http_client,
+)
+from webrotas.infrastructure.routing.circuit_breaker import (
+    CircuitState,
+    get_circuit_breaker,
+)
+from webrotas.infrastructure.routing.pair_cache import record_dataset_version
 from webrotas.config.logging_config import get_logger
 
 
@@ -15,6 +28,9 @@ logger = get_logger(__name__)
 TEST_ROUTE_PATH = "/route/v1/driving/-43.105772903105354,-22.90510838815471;-43.089637952126694,-22.917360518277434?overview=full&geometries=polyline&steps=true"
 TIMEOUT = 5
 
+# Interval between background probes that feed the circuit breakers
+OSRM_HEALTH_PROBE_INTERVAL = float(os.getenv("OSRM_HEALTH_PROBE_INTERVAL", 15.0))
+
 
 async def check_osrm_health() -> Dict[str, Any]:
     """
@@ -32,17 +48,19 @@ async def check_osrm_health() -> Dict[str, Any]:
     """
     osrm_url = get_osrm_url()
     request_url = f"{osrm_url}{TEST_ROUTE_PATH}"
+    breaker = get_circuit_breaker(LOCAL_BACKEND)
     
     try:
         logger.info(f"Starting OSRM health check: {request_url}")
         start_time = time.time()
         
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.get(request_url)
+        client = get_http_client()
+        response = await client.get(request_url, timeout=TIMEOUT)
         
         response_time_ms = (time.time() - start_time) * 1000
         
         if response.status_code != 200:
+            breaker.record_failure(f"HTTP {response.status_code}")
             logger.error(f"OSRM returned status {response.status_code}: {response.text}")
             raise HTTPException(
                 status_code=503,
@@ -53,6 +71,7 @@ async def check_osrm_health() -> Dict[str, Any]:
         try:
             data = response.json()
             if data.get("code") != "Ok":
+                breaker.record_failure(f"code {data.get('code')}")
                 error_msg = data.get("message", "Unknown error")
                 logger.error(f"OSRM returned error code: {data.get('code')} - {error_msg}")
                 raise HTTPException(
@@ -60,12 +79,15 @@ async def check_osrm_health() -> Dict[str, Any]:
                     detail=f"OSRM service error: {error_msg}"
                 )
         except ValueError as e:
+            breaker.record_failure("invalid JSON")
             logger.error(f"OSRM response is not valid JSON: {e}")
             raise HTTPException(
                 status_code=503,
                 detail="OSRM service returned invalid response"
             )
         
+        breaker.record_success()
+        record_dataset_version(LOCAL_BACKEND, data)
         logger.info(f"OSRM health check successful ({response_time_ms:.2f}ms)")
         
         return {
@@ -76,12 +98,14 @@ async def check_osrm_health() -> Dict[str, Any]:
         }
         
     except httpx.ConnectError as e:
+        breaker.record_failure(type(e).__name__)
         logger.error(f"Failed to connect to OSRM at {osrm_url}: {e}")
         raise HTTPException(
             status_code=503,
             detail=f"Cannot connect to OSRM service at {osrm_url}"
         )
     except httpx.TimeoutException as e:
+        breaker.record_failure(type(e).__name__)
         logger.error(f"OSRM request timed out after {TIMEOUT}s: {e}")
         raise HTTPException(
             status_code=504,
@@ -96,3 +120,59 @@ async def check_osrm_health() -> Dict[str, Any]:
             status_code=500,
             detail="Unexpected error during OSRM health check"
         )
+
+
+async def probe_backend(backend: str) -> bool:
+    """
+    Probe an OSRM backend with the test route and feed its circuit breaker.
+
+    Args:
+        backend: Either "local" or "public"
+
+    Returns:
+        True if the backend answered the test route correctly
+    """
+    base_url = get_osrm_url() if backend == LOCAL_BACKEND else PUBLIC_OSRM_URL
+    breaker = get_circuit_breaker(backend)
+
+    try:
+        client = get_http_client(backend)
+        response = await client.get(f"{base_url}{TEST_ROUTE_PATH}", timeout=TIMEOUT)
+        data = response.json() if response.status_code == 200 else None
+        healthy = data is not None and data.get("code") == "Ok"
+        reason = f"HTTP {response.status_code}"
+    except (httpx.HTTPError, ValueError) as e:
+        healthy = False
+        reason = type(e).__name__
+
+    if healthy:
+        breaker.record_success()
+        # Notices a re-preprocessed dataset (invalidates cached pairs)
+        record_dataset_version(backend, data)
+    else:
+        breaker.record_failure(f"probe: {reason}")
+        logger.debug(f"Health probe failed for OSRM backend '{backend}': {reason}")
+
+    return healthy
+
+
+async def run_health_probes(interval: float = OSRM_HEALTH_PROBE_INTERVAL) -> None:
+    """
+    Periodically probe OSRM backends until cancelled.
+
+    The local container is always probed so an outage is detected before the
+    next user request. The public router is only probed while its breaker is
+    not closed, to detect recovery without adding load to a shared service.
+
+    Args:
+        interval: Seconds between probe rounds
+    """
+    logger.info(f"Starting OSRM background health probes every {interval:.0f}s")
+    while True:
+        try:
+            await probe_backend(LOCAL_BACKEND)
+            if get_circuit_breaker(PUBLIC_BACKEND).state != CircuitState.CLOSED:
+                await probe_backend(PUBLIC_BACKEND)
+        except Exception as e:
+            logger.error(f"Unexpected error during OSRM health probes: {e}")
+        await asyncio.sleep(interval)
@@ -1,19 +1,22 @@
 """Route processing service - extracted controller logic"""
 
-import json
 import uuid
 from typing import Dict, Any
 from webrotas.domain.routing.processor import RouteProcessor
-from webrotas.core.exceptions import ProcessingError
+from webrotas.core.exceptions import ProcessingError, SolverBusyError
 
 
-async def process_route(data: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+async def process_route(
+    data: Dict[str, Any], session_id: str, path_format: str | None = None
+) -> Dict[str, Any]:
     """
     Process a route request and return the result as a JSON-serializable dict.
 
     Args:
         data: Request data containing type, origin, parameters, etc.
         session_id: Unique session identifier
+        path_format: Compact path encoding ("polyline6" or "flat"), or None
+            for [lat, lng] lists (see RouteProcessor.route_for_gui)
 
     Returns:
         JSON-serializable route response
@@ -84,17 +87,10 @@ async def process_route(data: Dict[str, Any], session_id: str) -> Dict[str, Any]
 
         # Generate response
         if request_type in {"shortest", "circle", "grid"}:
-            response_json = processor.create_initial_route()
-        else:
-            response_json = processor.create_custom_route()
-
-        # Convert Response object to dict if needed
-        if isinstance(response_json, str):
-            return json.loads(response_json)
-
-        return response_json
+            return processor.create_initial_route(path_format)
+        return processor.create_custom_route(path_format)
 
-    except ProcessingError:
+    except (ProcessingError, SolverBusyError):
         raise
     except Exception as e:
         raise ProcessingError(str(e))
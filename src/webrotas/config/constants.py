@@ -6,7 +6,7 @@ from pathlib import Path
 # Root-level request validation
 KEYS_ROOT = {
     "required": {"type", "origin", "parameters"},
-    "optional": {"avoidZones", "criterion"},
+    "optional": {"avoidZones", "criterion", "solver"},
 }
 
 # Parameter validation by request type
@@ -26,6 +26,11 @@ VALID_CRITERIA = {"distance", "duration", "ordered"}
 # Default criterion
 DEFAULT_CRITERION = "distance"
 
+# Compact /process responses: path encodings selectable with the pathFormat
+# query parameter, and the Accept media type that selects polyline6
+PATH_FORMATS = {"polyline6", "flat"}
+COMPACT_MEDIA_TYPE = "application/vnd.webrotas.compact+json"
+
 PROJECT_PATH = Path(__file__).parents[2]
 
 # Detecta o sistema operacional
@@ -3,13 +3,22 @@
 from typing import Any, Dict
 from fastapi import Query
 
-from webrotas.config.constants import KEYS_ROOT, KEYS_PARAMETERS, VALID_REQUEST_TYPES
+from webrotas.config.constants import (
+    KEYS_ROOT,
+    KEYS_PARAMETERS,
+    VALID_REQUEST_TYPES,
+    PATH_FORMATS,
+    COMPACT_MEDIA_TYPE,
+)
+from webrotas.domain.routing.tsp import SolverPolicy
 from webrotas.core.exceptions import (
     MissingSessionIdError,
     MissingRequiredFieldsError,
     InvalidRequestTypeError,
     InvalidParametersError,
     MissingParametersError,
+    InvalidSolverOptionsError,
+    InvalidPathFormatError,
 )
 
 
@@ -54,3 +63,33 @@ async def validate_parameters(
         raise MissingParametersError(request_type, missing_params)
     
     return parameters
+
+
+async def validate_solver_options(solver: Any) -> Any:
+    """Validate the optional TSP solver options (timeLimit, strategies)"""
+    try:
+        SolverPolicy.from_options(solver, num_nodes=0)
+    except ValueError as e:
+        raise InvalidSolverOptionsError(str(e))
+    return solver
+
+
+async def negotiate_path_format(
+    path_format: str | None, accept: str | None
+) -> str | None:
+    """
+    Choose the path encoding of a /process response.
+
+    The pathFormat query parameter wins; otherwise an Accept header listing
+    the compact media type selects polyline6.
+
+    Returns:
+        "polyline6", "flat", or None for the default nested [lat, lng] lists
+    """
+    if path_format:
+        if path_format not in PATH_FORMATS:
+            raise InvalidPathFormatError(path_format, PATH_FORMATS)
+        return path_format
+    if accept and COMPACT_MEDIA_TYPE in accept:
+        return "polyline6"
+    return None
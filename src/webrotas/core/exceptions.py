@@ -56,6 +56,25 @@ class InvalidParametersError(InvalidRequestError):
         )
 
 
+class InvalidSolverOptionsError(InvalidRequestError):
+    """Raised when the solver options are invalid"""
+    def __init__(self, reason: str):
+        super().__init__(
+            detail=f"Invalid solver options: {reason}",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class InvalidPathFormatError(InvalidRequestError):
+    """Raised when the requested path format is unknown"""
+    def __init__(self, path_format: str, valid_formats: set):
+        super().__init__(
+            detail=f"Invalid pathFormat '{path_format}', expected one of: "
+            f"{', '.join(sorted(valid_formats))}",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
 class ProcessingError(HTTPException):
     """Raised when route processing fails"""
     def __init__(self, error_message: str):
@@ -63,3 +82,12 @@ class ProcessingError(HTTPException):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Processing error: {error_message}"
         )
+
+
+class SolverBusyError(HTTPException):
+    """Raised when the route solver queue is full"""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Route solver is busy, please retry shortly"
+        )
@@ -0,0 +1,153 @@
+"""
+Batch scoring of candidate routes against avoid zones.
+
+All candidates of a request (OSRM alternatives, segment combinations) are
+scored together: their lines are built with one ``shapely.linestrings``
+call, matched to zones with a single bulk STRtree query, and clipped to the
+zones with one vectorized ``shapely.intersection`` over the matching pairs.
+
+Lengths are geodesic (haversine over the vertices of the route and of each
+clipped piece) and expressed in metres, so the penalty ratio is the share
+of the route's real length that lies inside zones. Overlapping zones count
+the shared stretch once per zone; the ratio is capped at 1.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Sequence
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from webrotas.domain.geospatial.distance import haversine_distance
+from webrotas.domain.routing.geometry import RouteGeometry
+
+
+@dataclass(frozen=True)
+class ZoneScores:
+    """Per-route zone crossing metrics (one entry per scored route)."""
+
+    # Number of zones each route intersects
+    zone_intersections: np.ndarray
+    # Length of each route inside zones, in metres
+    inside_length_m: np.ndarray
+    # Length of each route, in metres
+    route_length_m: np.ndarray
+    # Intersecting (route, zone) index pairs, as a (2, m) int array; zone
+    # indices refer to the STRtree geometries (AvoidZoneSet.polygons)
+    crossings: np.ndarray = field(
+        default_factory=lambda: np.zeros((2, 0), dtype=np.int64)
+    )
+
+    def __len__(self) -> int:
+        return len(self.route_length_m)
+
+    @property
+    def penalty_ratio(self) -> np.ndarray:
+        """Fraction of each route inside zones (0.0-1.0)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(
+                self.route_length_m > 0, self.inside_length_m / self.route_length_m, 0.0
+            )
+        return np.minimum(ratio, 1.0)
+
+    def summary(self, index: int) -> Dict[str, Any]:
+        """
+        Metrics of one route as a JSON-friendly dict.
+
+        Returns:
+            Dict with intersection_count, total_length_km (inside zones),
+            penalty_ratio and route_length_km
+        """
+        return {
+            "intersection_count": int(self.zone_intersections[index]),
+            "total_length_km": round(float(self.inside_length_m[index]) / 1000, 3),
+            "penalty_ratio": float(self.penalty_ratio[index]),
+            "route_length_km": round(float(self.route_length_m[index]) / 1000, 3),
+        }
+
+
+def _segment_sums(coords: np.ndarray, owner: np.ndarray, size: int) -> np.ndarray:
+    """
+    Geodesic length of vertex runs sharing an owner.
+
+    Args:
+        coords: (n, 2) array of [lng, lat] rows, runs of each owner contiguous
+        owner: Owner index of each vertex
+        size: Number of owners
+
+    Returns:
+        Length in metres per owner
+    """
+    if len(coords) < 2:
+        return np.zeros(size)
+    same = owner[1:] == owner[:-1]
+    lengths = haversine_distance(
+        coords[:-1, 1][same], coords[:-1, 0][same], coords[1:, 1][same], coords[1:, 0][same]
+    )
+    return np.bincount(owner[:-1][same], weights=lengths, minlength=size)
+
+
+def geodesic_lengths(geometries: np.ndarray) -> np.ndarray:
+    """
+    Geodesic length of lineal geometries (multi-part and collections included).
+
+    Args:
+        geometries: Array of shapely geometries in (lng, lat) coordinates
+
+    Returns:
+        Length in metres per geometry (0 for points and empty geometries)
+    """
+    parts, owner = shapely.get_parts(geometries, return_index=True)
+    coords, part_index = shapely.get_coordinates(parts, return_index=True)
+    part_lengths = _segment_sums(coords, part_index, len(parts))
+    return np.bincount(owner, weights=part_lengths, minlength=len(geometries))
+
+
+def score_routes(geometries: Sequence[Any], tree: STRtree | None) -> ZoneScores:
+    """
+    Score candidate routes against avoid zones in one vectorized pass.
+
+    Args:
+        geometries: Route geometries (RouteGeometry, polyline6 strings,
+            GeoJSON LineStrings or [lng, lat] arrays)
+        tree: STRtree over the zone polygons (AvoidZoneSet.tree), or None
+
+    Returns:
+        ZoneScores with one entry per route
+    """
+    lines = [RouteGeometry.from_osrm(geometry).coords for geometry in geometries]
+    size = len(lines)
+    counts = np.array([len(coords) for coords in lines], dtype=np.int64)
+    coords = np.concatenate(lines) if size else np.zeros((0, 2))
+    owner = np.repeat(np.arange(size), counts)
+
+    route_length = _segment_sums(coords, owner, size)
+    zone_intersections = np.zeros(size, dtype=np.int64)
+    inside_length = np.zeros(size)
+
+    drawable = np.flatnonzero(counts >= 2)
+    if tree is None or len(drawable) == 0:
+        return ZoneScores(zone_intersections, inside_length, route_length)
+
+    keep = np.isin(owner, drawable)
+    line_geoms = shapely.linestrings(
+        coords[keep], indices=np.searchsorted(drawable, owner[keep])
+    )
+
+    line_idx, zone_idx = tree.query(line_geoms, predicate="intersects")
+    if len(line_idx):
+        pieces = shapely.intersection(line_geoms[line_idx], tree.geometries[zone_idx])
+        route_idx = drawable[line_idx]
+        zone_intersections = np.bincount(route_idx, minlength=size)
+        inside_length = np.bincount(
+            route_idx, weights=geodesic_lengths(pieces), minlength=size
+        )
+        return ZoneScores(
+            zone_intersections,
+            inside_length,
+            route_length,
+            np.vstack((route_idx, zone_idx)).astype(np.int64),
+        )
+
+    return ZoneScores(zone_intersections, inside_length, route_length)
@@ -0,0 +1,368 @@
+"""
+Compiled avoid-zone sets shared across requests.
+
+A request's ``avoidZones`` is used by several consumers: waypoint filtering
+before the matrix, grid generation, and alternative scoring. Each used to
+rebuild shapely polygons (and an STRtree) from the raw coordinate lists.
+An AvoidZoneSet does that once: every zone is validated (self-intersecting
+rings repaired, degenerate zones dropped) and prepared, and the set keeps
+an STRtree, the overall bounds and the zone names.
+
+Compiled sets are kept in a process-wide LRU keyed by a canonical hash of
+the zones (names and coordinates rounded to 6 decimals, rings closed), so
+repeated requests with the same zones - from one user or many - share the
+compiled geometry.
+
+An AvoidZoneSet is also a read-only sequence of the original zone dicts,
+so it can be passed wherever the raw ``avoidZones`` list was expected.
+
+Point-in-zone tests for many waypoints run as one bulk STRtree query over
+a shapely points array (filter_points), so filtering a grid costs a
+handful of vectorized calls instead of one shapely call per point and zone.
+
+Environment variables:
+- AVOID_ZONE_CACHE_SIZE: Compiled zone sets kept (default: 128, 0 disables)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely.errors import GEOSException
+from shapely.geometry import Polygon, shape
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
+
+from webrotas.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+AVOID_ZONE_CACHE_SIZE = int(os.getenv("AVOID_ZONE_CACHE_SIZE", 128))
+
+# Decimal places kept when hashing zone coordinates (~0.1 m)
+COORDINATE_PRECISION = 6
+
+
+def _closed_ring(coord: Sequence[Sequence[float]]) -> List[Tuple[float, float]]:
+    """[lat, lng] pairs as a closed ring of (lng, lat) tuples."""
+    ring = [(float(lng), float(lat)) for lat, lng in coord]
+    if ring and ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return ring
+
+
+def canonical_zone_key(avoid_zones: Iterable[Dict[str, Any]]) -> str:
+    """
+    Hash identifying a list of zones independently of formatting.
+
+    Args:
+        avoid_zones: Zone dicts with 'name' and 'coord' ([lat, lng] pairs)
+
+    Returns:
+        Hex SHA-256 of the names and rounded, closed rings (in request order)
+    """
+    canonical = [
+        [
+            zone.get("name", ""),
+            [
+                [round(lng, COORDINATE_PRECISION), round(lat, COORDINATE_PRECISION)]
+                for lng, lat in _closed_ring(zone.get("coord") or [])
+            ],
+        ]
+        for zone in avoid_zones
+    ]
+    payload = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _zone_geometry(zone: Dict[str, Any]) -> Optional[BaseGeometry]:
+    """Raw geometry of a request zone ('coord' ring) or GeoJSON feature."""
+    if "coord" in zone:
+        ring = _closed_ring(zone.get("coord") or [])
+        return Polygon(ring) if len(ring) >= 4 else None
+    geometry = zone.get("geometry")
+    if geometry and geometry.get("type") in ("Polygon", "MultiPolygon"):
+        return shape(geometry)
+    return None
+
+
+def _compile_polygon(polygon: BaseGeometry | None) -> Optional[BaseGeometry]:
+    """
+    Valid, prepared polygonal geometry, or None if the zone is degenerate.
+
+    Invalid rings (e.g. self-intersecting "bow ties") are repaired with
+    make_valid, keeping only the polygonal parts.
+    """
+    if polygon is None:
+        return None
+    if not polygon.is_valid:
+        polygon = shapely.make_valid(polygon)
+        if polygon.geom_type == "GeometryCollection":
+            polygon = shapely.union_all(
+                [
+                    part
+                    for part in polygon.geoms
+                    if part.geom_type in ("Polygon", "MultiPolygon")
+                ]
+            )
+    if polygon.is_empty or polygon.geom_type not in ("Polygon", "MultiPolygon"):
+        return None
+    shapely.prepare(polygon)
+    return polygon
+
+
+@dataclass(frozen=True)
+class ZoneFilterResult:
+    """Outcome of filtering points against a zone set."""
+
+    # Indices of points outside every zone (ascending)
+    kept: np.ndarray
+    # Indices of points inside or on the boundary of a zone (ascending)
+    removed: np.ndarray
+    # Polygon index (into AvoidZoneSet.polygons/names) hit by each removed point
+    zones: np.ndarray
+
+
+class AvoidZoneSet(Sequence):
+    """Validated, prepared avoid-zone polygons with a spatial index."""
+
+    def __init__(self, avoid_zones: Iterable[Dict[str, Any]], key: str | None = None):
+        """
+        Args:
+            avoid_zones: Zone dicts with 'name' and 'coord' ([lat, lng] pairs),
+                or GeoJSON Features (see from_geojson)
+            key: Canonical hash of the zones (computed if None)
+        """
+        self._zones = tuple(avoid_zones)
+        self.key = key if key is not None else canonical_zone_key(self._zones)
+
+        self.polygons: List[BaseGeometry] = []
+        self.names: List[str] = []
+        # Index in the original zone list of each polygon
+        self.zone_indices: List[int] = []
+
+        for index, zone in enumerate(self._zones):
+            name = (
+                zone.get("name")
+                or (zone.get("properties") or {}).get("name")
+                or f"Zone {index}"
+            )
+            try:
+                polygon = _compile_polygon(_zone_geometry(zone))
+            except (TypeError, ValueError, GEOSException) as e:
+                logger.warning(f"Could not build polygon for zone '{name}': {e}")
+                continue
+            if polygon is None:
+                logger.warning(f"Ignoring degenerate avoid zone '{name}'")
+                continue
+            self.polygons.append(polygon)
+            self.names.append(name)
+            self.zone_indices.append(index)
+
+        self.tree: STRtree | None = STRtree(self.polygons) if self.polygons else None
+        self.bounds: Tuple[float, float, float, float] | None = (
+            tuple(shapely.total_bounds(self.polygons).tolist())
+            if self.polygons
+            else None
+        )
+
+    @classmethod
+    def from_geojson(cls, geojson: Dict[str, Any]) -> "AvoidZoneSet":
+        """
+        Zone set from a GeoJSON FeatureCollection or Feature.
+
+        Each (Multi)Polygon feature is one zone, named by its 'name' property.
+        Sets built this way are not cached.
+
+        Args:
+            geojson: GeoJSON FeatureCollection or Feature
+
+        Returns:
+            AvoidZoneSet over the features
+        """
+        features = (
+            geojson.get("features", [])
+            if geojson.get("type") == "FeatureCollection"
+            else [geojson]
+        )
+        payload = json.dumps(features, sort_keys=True, separators=(",", ":"))
+        return cls(features, key=hashlib.sha256(payload.encode("utf-8")).hexdigest())
+
+    def __getitem__(self, index):
+        return self._zones[index]
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def __repr__(self) -> str:
+        return (
+            f"AvoidZoneSet({len(self._zones)} zones, "
+            f"{len(self.polygons)} polygons, key={self.key[:12]})"
+        )
+
+    def zones_touching(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """
+        First polygon (by index) each point is inside or on the boundary of.
+
+        All points are tested in one bulk STRtree query.
+
+        Args:
+            lats: Point latitudes
+            lngs: Point longitudes
+
+        Returns:
+            Int array with a polygon index per point, -1 outside every zone
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        first = np.full(len(lats), -1, dtype=np.int64)
+        if self.tree is None or len(lats) == 0:
+            return first
+
+        point_idx, zone_idx = self.tree.query(
+            shapely.points(lngs, lats), predicate="intersects"
+        )
+        if len(point_idx):
+            none = len(self.polygons)
+            lowest = np.full(len(lats), none, dtype=np.int64)
+            np.minimum.at(lowest, point_idx, zone_idx)
+            first = np.where(lowest < none, lowest, -1)
+        return first
+
+    def filter_points(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        always_keep: Sequence[int] = (),
+    ) -> ZoneFilterResult:
+        """
+        Split points into those outside every zone and those touching one.
+
+        Args:
+            lats: Point latitudes
+            lngs: Point longitudes
+            always_keep: Indices kept regardless of zones (e.g. the origin)
+
+        Returns:
+            ZoneFilterResult with kept and removed indices and the zone hit
+            by each removed point
+        """
+        zones = self.zones_touching(lats, lngs)
+        if len(always_keep):
+            zones[np.asarray(always_keep, dtype=np.int64)] = -1
+        removed = np.flatnonzero(zones >= 0)
+        return ZoneFilterResult(
+            kept=np.flatnonzero(zones < 0), removed=removed, zones=zones[removed]
+        )
+
+    @cached_property
+    def union(self) -> BaseGeometry:
+        """Prepared union of all zone polygons (built on first use)."""
+        union = shapely.union_all(self.polygons)
+        shapely.prepare(union)
+        return union
+
+    def contains_xy(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """
+        Bool mask of points strictly inside some zone (vectorized).
+
+        Args:
+            lats: Point latitudes
+            lngs: Point longitudes
+
+        Returns:
+            Bool array, True for points inside a zone (boundary excluded)
+        """
+        if self.tree is None:
+            return np.zeros(len(lats), dtype=bool)
+        return shapely.contains_xy(self.union, lngs, lats)
+
+
+class AvoidZoneSetCache:
+    """LRU of compiled AvoidZoneSets by canonical zone hash."""
+
+    def __init__(self, max_entries: int = AVOID_ZONE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._sets: OrderedDict[str, AvoidZoneSet] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def get(self, avoid_zones: Iterable[Dict[str, Any]]) -> AvoidZoneSet:
+        """Compiled set for the zones, built on the first request for them."""
+        zones = list(avoid_zones)
+        key = canonical_zone_key(zones)
+        with self._lock:
+            zone_set = self._sets.get(key)
+            if zone_set is not None:
+                self._sets.move_to_end(key)
+                self.hits += 1
+                return zone_set
+            self.misses += 1
+
+        zone_set = AvoidZoneSet(zones, key=key)
+        if self.max_entries <= 0:
+            return zone_set
+        with self._lock:
+            self._sets[key] = zone_set
+            self._sets.move_to_end(key)
+            while len(self._sets) > self.max_entries:
+                self._sets.popitem(last=False)
+        return zone_set
+
+    def clear(self) -> None:
+        """Forget every compiled set."""
+        with self._lock:
+            self._sets.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cache statistics (for the health endpoint)."""
+        with self._lock:
+            return {
+                "entries": len(self._sets),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_EMPTY = AvoidZoneSet([])
+_cache: AvoidZoneSetCache | None = None
+
+
+def get_avoid_zone_cache() -> AvoidZoneSetCache:
+    """Process-wide compiled zone set cache (created on first use)."""
+    global _cache
+    if _cache is None:
+        _cache = AvoidZoneSetCache()
+    return _cache
+
+
+def get_avoid_zone_set(avoid_zones: Iterable[Dict[str, Any]] | None) -> AvoidZoneSet:
+    """
+    Compiled zone set for a request's avoidZones.
+
+    Args:
+        avoid_zones: Raw zone dicts, an AvoidZoneSet (returned as is) or None
+
+    Returns:
+        AvoidZoneSet (empty, and falsy, when there are no zones)
+    """
+    if isinstance(avoid_zones, AvoidZoneSet):
+        return avoid_zones
+    if not avoid_zones:
+        return _EMPTY
+    return get_avoid_zone_cache().get(avoid_zones)
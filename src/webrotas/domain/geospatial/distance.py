@@ -0,0 +1,238 @@
+"""
+Vectorized great-circle and ellipsoidal distances.
+
+Geodesic matrices are the last-resort fallback when no OSRM backend answers,
+so they must be cheap: every function here works on whole NumPy arrays instead
+of calling ``geopy.distance.geodesic`` once per pair.
+
+Two models are available:
+- "haversine": spherical Earth (mean radius), ~0.5% error, fastest
+- "ellipsoidal": WGS-84 Vincenty inverse formula, sub-millimetre agreement with
+  geopy for the distances we route over (falls back to haversine for the rare
+  nearly-antipodal pairs where Vincenty does not converge)
+"""
+
+from typing import Callable, Dict, List, Literal, Sequence, Tuple
+
+import numpy as np
+
+DistanceModel = Literal["haversine", "ellipsoidal"]
+DEFAULT_MODEL: DistanceModel = "ellipsoidal"
+
+EARTH_MEAN_RADIUS_M = 6_371_008.8
+WGS84_A = 6_378_137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+VINCENTY_MAX_ITERATIONS = 100
+VINCENTY_TOLERANCE = 1e-12
+
+# Pairs evaluated per vectorized call (bounds temporary memory for big matrices)
+PAIR_CHUNK_SIZE = 500_000
+
+
+def haversine_distance(
+    lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+) -> np.ndarray:
+    """
+    Great-circle distance on a spherical Earth.
+
+    Args:
+        lat1, lng1: Start coordinates in degrees (broadcastable arrays)
+        lat2, lng2: End coordinates in degrees (broadcastable arrays)
+
+    Returns:
+        Distances in metres
+    """
+    phi1, lam1, phi2, lam2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    h = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    )
+    return 2 * EARTH_MEAN_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def ellipsoidal_distance(
+    lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+) -> np.ndarray:
+    """
+    Distance on the WGS-84 ellipsoid (Vincenty inverse formula, vectorized).
+
+    Args:
+        lat1, lng1: Start coordinates in degrees (broadcastable arrays)
+        lat2, lng2: End coordinates in degrees (broadcastable arrays)
+
+    Returns:
+        Distances in metres
+    """
+    lat1, lng1, lat2, lng2 = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (lat1, lng1, lat2, lng2))
+    )
+
+    big_l = np.radians(lng2 - lng1)
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lam = big_l.copy()
+    converged = np.zeros(lam.shape, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(VINCENTY_MAX_ITERATIONS):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(
+                cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam
+            )
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+
+            sin_alpha = np.where(
+                sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma
+            )
+            cos2_alpha = 1 - sin_alpha**2
+            # Equatorial lines have cos2_alpha == 0
+            cos_2sigma_m = np.where(
+                cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha
+            )
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+
+            lam_prev = lam
+            lam = big_l + (1 - c) * WGS84_F * sin_alpha * (
+                sigma
+                + c
+                * sin_sigma
+                * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m**2))
+            )
+            converged = np.abs(lam - lam_prev) < VINCENTY_TOLERANCE
+            if converged.all():
+                break
+
+        u_sq = cos2_alpha * (WGS84_A**2 - WGS84_B**2) / WGS84_B**2
+        big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = (
+            big_b
+            * sin_sigma
+            * (
+                cos_2sigma_m
+                + big_b
+                / 4
+                * (
+                    cos_sigma * (-1 + 2 * cos_2sigma_m**2)
+                    - big_b
+                    / 6
+                    * cos_2sigma_m
+                    * (-3 + 4 * sin_sigma**2)
+                    * (-3 + 4 * cos_2sigma_m**2)
+                )
+            )
+        )
+        distances = WGS84_B * big_a * (sigma - delta_sigma)
+
+    failed = ~converged | ~np.isfinite(distances)
+    if failed.any():
+        distances[failed] = haversine_distance(
+            lat1[failed], lng1[failed], lat2[failed], lng2[failed]
+        )
+    return distances
+
+
+DISTANCE_MODELS: Dict[str, Callable[..., np.ndarray]] = {
+    "haversine": haversine_distance,
+    "ellipsoidal": ellipsoidal_distance,
+}
+
+
+def _get_kernel(model: str) -> Callable[..., np.ndarray]:
+    """Look up the distance function of a model."""
+    try:
+        return DISTANCE_MODELS[model]
+    except KeyError:
+        raise ValueError(
+            f"Unknown distance model '{model}', expected one of {list(DISTANCE_MODELS)}"
+        ) from None
+
+
+def coords_to_arrays(coords: Sequence[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split coordinate dicts into latitude and longitude arrays.
+
+    Args:
+        coords: List of coordinate dicts with 'lat' and 'lng' keys
+
+    Returns:
+        Tuple of (lats, lngs) float arrays
+    """
+    lats = np.fromiter((c["lat"] for c in coords), dtype=float, count=len(coords))
+    lngs = np.fromiter((c["lng"] for c in coords), dtype=float, count=len(coords))
+    return lats, lngs
+
+
+def pairwise_distances(
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    pairs: np.ndarray | List[Tuple[int, int]],
+    model: DistanceModel = DEFAULT_MODEL,
+) -> np.ndarray:
+    """
+    Distances for selected (i, j) index pairs, in one vectorized pass.
+
+    Args:
+        lats: Latitudes in degrees, shape (n,)
+        lngs: Longitudes in degrees, shape (n,)
+        pairs: Index pairs, shape (k, 2)
+        model: "haversine" or "ellipsoidal"
+
+    Returns:
+        Distances in metres, shape (k,)
+    """
+    kernel = _get_kernel(model)
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    out = np.empty(len(pairs))
+
+    for start in range(0, len(pairs), PAIR_CHUNK_SIZE):
+        i = pairs[start : start + PAIR_CHUNK_SIZE, 0]
+        j = pairs[start : start + PAIR_CHUNK_SIZE, 1]
+        out[start : start + len(i)] = kernel(lats[i], lngs[i], lats[j], lngs[j])
+    return out
+
+
+def distance_matrix(
+    lats: np.ndarray, lngs: np.ndarray, model: DistanceModel = DEFAULT_MODEL
+) -> np.ndarray:
+    """
+    Full n x n distance matrix.
+
+    Geodesic distance is symmetric, so only the upper triangle is computed and
+    mirrored; the diagonal is exactly zero.
+
+    Args:
+        lats: Latitudes in degrees, shape (n,)
+        lngs: Longitudes in degrees, shape (n,)
+        model: "haversine" or "ellipsoidal"
+
+    Returns:
+        Distances in metres, shape (n, n)
+    """
+    n = len(lats)
+    matrix = np.zeros((n, n))
+    i, j = np.triu_indices(n, k=1)
+    upper = pairwise_distances(lats, lngs, np.column_stack((i, j)), model)
+    matrix[i, j] = upper
+    matrix[j, i] = upper
+    return matrix
+
+
+def travel_time_s(distances_m: np.ndarray, speed_kmh: float) -> np.ndarray:
+    """
+    Convert distances to travel times at a constant speed.
+
+    Args:
+        distances_m: Distances in metres
+        speed_kmh: Speed in km/h
+
+    Returns:
+        Durations in seconds
+    """
+    return np.asarray(distances_m) * 3.6 / speed_kmh
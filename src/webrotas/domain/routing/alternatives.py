@@ -8,15 +8,26 @@ request alternatives for each segment, then combine them intelligently.
 This module handles:
 1. Breaking multi-waypoint routes into 2-coordinate segments
 2. Requesting OSRM alternatives for each segment
-3. Combining segments into complete alternative routes
-4. Scoring alternatives based on avoid zone penalties
+3. Scoring every segment alternative against avoid zones (once, in batch)
+4. Combining segments into the k best complete alternative routes
+
+Complete routes are never enumerated: with per-segment costs that add up
+(metres inside zones, then duration), the k best combinations are produced
+lazily, best first, from a priority queue (Lawler-style partitioning of the
+option space), in O(k * segments * log) instead of options^segments.
 """
 
 import asyncio
-from typing import List, Dict, Tuple, Any, Optional
-from dataclasses import dataclass
+import heapq
+from itertools import islice
+from typing import FrozenSet, Iterator, List, Dict, Tuple, Any, Optional
+from dataclasses import dataclass, field
 import logging
 
+from webrotas.domain.avoid_zones.scoring import score_routes
+from webrotas.domain.avoid_zones.zone_set import get_avoid_zone_set
+from webrotas.domain.routing.geometry import OSRM_GEOMETRY_FORMAT, RouteGeometry
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +48,60 @@ class SegmentAlternative:
     route_option: int  # 0=best, 1=2nd best, etc.
     distance: float
     duration: float
-    geometry: List[List[float]]  # [lng, lat] format
+    geometry: RouteGeometry
+    # Avoid zone exposure (set by SegmentAlternativesBuilder)
+    inside_length_m: float = 0.0
+    length_m: float = 0.0
+    zones: FrozenSet[int] = field(default_factory=frozenset)
+
+    @property
+    def cost(self) -> Tuple[float, float]:
+        """Additive ranking cost: metres inside zones, then duration."""
+        return (self.inside_length_m, self.duration)
+
+
+# Complete routes returned when no limit is given
+DEFAULT_MAX_ROUTES = 6
+
+
+def k_best_combinations(costs: List[List[Tuple[float, ...]]]) -> Iterator[List[int]]:
+    """
+    Option combinations in increasing total cost, generated lazily.
+
+    The total cost of a combination is the element-wise sum of the chosen
+    options' cost tuples (compared lexicographically). Options of each
+    segment are sorted once; the search starts from the cheapest option
+    everywhere and each popped combination spawns successors that move one
+    segment at or after its last moved segment to its next option, so every
+    combination is reached from exactly one parent.
+
+    Args:
+        costs: costs[i][j] is the cost tuple of option j of segment i
+
+    Yields:
+        Combinations as lists of option indices (one per segment), best first
+    """
+    if not costs or any(not options for options in costs):
+        return
+
+    ranked = [
+        sorted(range(len(options)), key=options.__getitem__) for options in costs
+    ]
+
+    def total(positions: Tuple[int, ...]) -> Tuple[float, ...]:
+        chosen = [costs[i][ranked[i][p]] for i, p in enumerate(positions)]
+        return tuple(map(sum, zip(*chosen)))
+
+    start = (0,) * len(costs)
+    heap = [(total(start), start, 0)]
+    while heap:
+        _, positions, pivot = heapq.heappop(heap)
+        yield [ranked[i][p] for i, p in enumerate(positions)]
+
+        for i in range(pivot, len(positions)):
+            if positions[i] + 1 < len(ranked[i]):
+                successor = positions[:i] + (positions[i] + 1,) + positions[i + 1 :]
+                heapq.heappush(heap, (total(successor), successor, i))
 
 
 class SegmentAlternativesBuilder:
@@ -51,10 +115,11 @@ class SegmentAlternativesBuilder:
 
         Args:
             coordinates: List of waypoint dicts with 'lat' and 'lng'
-            avoid_zones: Optional list of avoid zone definitions
+            avoid_zones: Optional list of avoid zone definitions (compiled
+                once into an AvoidZoneSet)
         """
         self.coordinates = coordinates
-        self.avoid_zones = avoid_zones or []
+        self.avoid_zones = get_avoid_zone_set(avoid_zones)
         self.num_segments = len(coordinates) - 1
         self.segment_alternatives: List[List[SegmentAlternative]] = []
 
@@ -103,7 +168,7 @@ class SegmentAlternativesBuilder:
             params = {
                 "alternatives": num_alternatives,
                 "overview": "full",
-                "geometries": "geojson",
+                "geometries": OSRM_GEOMETRY_FORMAT,
             }
 
             logger.info(
@@ -127,7 +192,7 @@ class SegmentAlternativesBuilder:
                     route_option=route_idx,
                     distance=route.get("distance", 0),
                     duration=route.get("duration", 0),
-                    geometry=route.get("geometry", {}).get("coordinates", []),
+                    geometry=RouteGeometry.from_osrm(route.get("geometry")),
                 )
                 alternatives.append(alt)
                 logger.debug(
@@ -173,17 +238,21 @@ class SegmentAlternativesBuilder:
 
         return all(len(alts) > 0 for alts in results)
 
-    def generate_complete_routes(self) -> List[Dict[str, Any]]:
+    def generate_complete_routes(
+        self, max_routes: int = DEFAULT_MAX_ROUTES
+    ) -> List[Dict[str, Any]]:
         """
-        Generate complete route alternatives by combining segment alternatives.
+        Generate the best complete routes by combining segment alternatives.
 
-        Uses a greedy approach:
-        1. First, try to use best option (route_option=0) for all segments
-        2. Then, try variations with 2nd best options
-        3. Score each complete route based on avoid zones
+        Segment alternatives are scored against the avoid zones once; the
+        combinations with the fewest metres inside zones (then the shortest
+        duration) are built best first (see k_best_combinations).
+
+        Args:
+            max_routes: Maximum complete routes to build
 
         Returns:
-            List of complete route alternatives with scores
+            List of complete route alternatives with scores, best first
         """
         if not self.segment_alternatives:
             logger.warning("No segment alternatives available")
@@ -195,60 +264,24 @@ class SegmentAlternativesBuilder:
                 logger.error(f"No alternatives for segment {i}")
                 return []
 
-        complete_routes = []
-        max_options = max(len(alts) for alts in self.segment_alternatives)
-
-        # Generate combinations: try progressively using more alternatives
-        for option_level in range(max_options):
-            # For each segment, use up to the current option level
-            route_combinations = self._generate_option_combinations(option_level)
-
-            for combo_idx, combination in enumerate(route_combinations):
-                if complete_route := self._combine_segments(combination):
-                    complete_route["route_index"] = len(complete_routes)
-                    complete_route["option_level"] = option_level
-                    complete_routes.append(complete_route)
-
-                    logger.debug(
-                        f"Route combination {len(complete_routes)}: "
-                        f"{complete_route['distance']:.0f}m, "
-                        f"{complete_route['duration']:.0f}s"
-                    )
-
-        # Score routes based on avoid zones if present
         if self.avoid_zones:
-            self._score_routes_by_avoid_zones(complete_routes)
-            # Sort by penalty score (best first)
-            complete_routes.sort(key=lambda r: r.get("penalty_score", 0))
+            self._score_segment_alternatives()
 
-        return complete_routes
-
-    def _generate_option_combinations(self, max_option: int) -> List[List[int]]:
-        """
-        Generate all combinations of segment options up to max_option.
-
-        Returns:
-            List of option combinations. Each combo is a list where
-            combo[i] = which option (0, 1, 2...) to use for segment i
-        """
-        combinations = []
-
-        def generate(segment_idx, current_combo):
-            if segment_idx == len(self.segment_alternatives):
-                combinations.append(current_combo[:])
-                return
+        costs = [[alt.cost for alt in alts] for alts in self.segment_alternatives]
+        complete_routes = []
+        for combination in islice(k_best_combinations(costs), max_routes):
+            if complete_route := self._combine_segments(combination):
+                complete_route["route_index"] = len(complete_routes)
+                complete_route["option_level"] = max(combination)
+                complete_routes.append(complete_route)
 
-            # For this segment, try options up to max_option
-            max_available = min(
-                max_option, len(self.segment_alternatives[segment_idx]) - 1
-            )
-            for option in range(max_available + 1):
-                current_combo.append(option)
-                generate(segment_idx + 1, current_combo)
-                current_combo.pop()
+                logger.debug(
+                    f"Route combination {len(complete_routes)}: "
+                    f"{complete_route['distance']:.0f}m, "
+                    f"{complete_route['duration']:.0f}s"
+                )
 
-        generate(0, [])
-        return combinations
+        return complete_routes
 
     def _combine_segments(
         self, option_combination: List[int]
@@ -270,63 +303,64 @@ class SegmentAlternativesBuilder:
             if opt_idx >= len(self.segment_alternatives[seg_idx]):
                 return None
 
-        # Combine geometries
-        combined_geometry = []
-        total_distance = 0
-        total_duration = 0
-
-        for seg_idx, opt_idx in enumerate(option_combination):
-            segment_alt = self.segment_alternatives[seg_idx][opt_idx]
-
-            # Add geometry (avoid duplicating segment endpoints)
-            if seg_idx == 0:
-                # First segment: add all points
-                combined_geometry.extend(segment_alt.geometry)
-            else:
-                # Subsequent segments: skip the first point (duplicate)
-                combined_geometry.extend(segment_alt.geometry[1:])
-
-            total_distance += segment_alt.distance
-            total_duration += segment_alt.duration
+        # Combine geometries (avoid duplicating segment endpoints)
+        chosen = [
+            self.segment_alternatives[seg_idx][opt_idx]
+            for seg_idx, opt_idx in enumerate(option_combination)
+        ]
+        combined_geometry = RouteGeometry.concat(alt.geometry for alt in chosen)
+        total_distance = sum(alt.distance for alt in chosen)
+        total_duration = sum(alt.duration for alt in chosen)
 
-        return {
-            "geometry": {"coordinates": combined_geometry, "type": "LineString"},
+        complete_route = {
+            "geometry": combined_geometry,
             "distance": total_distance,
             "duration": total_duration,
             "option_combination": option_combination,
-            "penalty_score": 0.0,  # Will be updated if avoid_zones present
+            "penalty_score": 0.0,
         }
+        if self.avoid_zones:
+            inside = sum(alt.inside_length_m for alt in chosen)
+            length = sum(alt.length_m for alt in chosen)
+            complete_route["penalty_score"] = min(inside / length, 1.0) if length else 0.0
+            complete_route["zone_intersections"] = len(
+                frozenset().union(*(alt.zones for alt in chosen))
+            )
+        return complete_route
 
-    def _score_routes_by_avoid_zones(self, routes: List[Dict]) -> None:
+    def _score_segment_alternatives(self) -> None:
         """
-        Score routes based on avoid zone intersections.
+        Score every segment alternative against the avoid zones in one pass.
 
-        Args:
-            routes: List of complete routes to score
+        Inside and total lengths are additive across segments, so the penalty
+        of any combination follows from these without rescoring its geometry.
         """
-        # Import here to avoid circular imports
-        from webrotas.utils.converters.geojson import avoid_zones_to_geojson
-        from webrotas.infrastructure.routing.osrm import (
-            load_spatial_index,
-            check_route_intersections,
-        )
+        alternatives = [alt for alts in self.segment_alternatives for alt in alts]
 
         try:
-            geojson = avoid_zones_to_geojson(self.avoid_zones)
-            polys, tree = load_spatial_index(geojson)
-
-            if not polys:
+            if self.avoid_zones.tree is None:
                 logger.debug("No valid polygons in avoid zones")
                 return
 
-            for route in routes:
-                coords = route["geometry"]["coordinates"]
-                intersection_data = check_route_intersections(coords, polys, tree)
-                route["penalty_score"] = intersection_data["penalty_ratio"]
-                route["zone_intersections"] = intersection_data["intersection_count"]
+            scores = score_routes(
+                [alt.geometry for alt in alternatives], self.avoid_zones.tree
+            )
+            zones: List[set] = [set() for _ in alternatives]
+            for alt_idx, zone_idx in scores.crossings.T.tolist():
+                zones[alt_idx].add(zone_idx)
+
+            for alt, inside, length, crossed in zip(
+                alternatives,
+                scores.inside_length_m.tolist(),
+                scores.route_length_m.tolist(),
+                zones,
+            ):
+                alt.inside_length_m = inside
+                alt.length_m = length
+                alt.zones = frozenset(crossed)
 
         except Exception as e:
-            logger.error(f"Error scoring routes by avoid zones: {e}")
+            logger.error(f"Error scoring segment alternatives by avoid zones: {e}")
 
 
 async def get_alternatives_for_multipoint_route(
@@ -374,12 +408,8 @@ async def get_alternatives_for_multipoint_route(
         if not success:
             return [], "Failed to get alternatives for all segments"
 
-        # Generate complete route combinations
-        complete_routes = builder.generate_complete_routes()
-
-        # Limit to max_routes
-        if len(complete_routes) > max_routes:
-            complete_routes = complete_routes[:max_routes]
+        # Build only the max_routes best combinations
+        complete_routes = builder.generate_complete_routes(max_routes)
 
         logger.info(
             f"Generated {len(complete_routes)} alternative complete routes "
@@ -0,0 +1,216 @@
+"""
+Cluster-first, route-second decomposition of large TSPs.
+
+Grid requests can produce thousands of waypoints; one OR-Tools model over the
+full n x n matrix is too slow to build, fetch and solve. The hierarchical mode
+instead:
+
+1. partitions the points spatially by recursive median bisection (a
+   balanced recursive grid), so every cluster holds at most max_size points;
+2. orders the clusters with a coarse TSP over their centroids;
+3. picks, for each pair of consecutive clusters, the closest boundary pair
+   (exit of one cluster, entry of the next);
+4. solves each cluster as a fixed entry/exit TSP and concatenates the tours.
+
+Only intra-cluster matrices are needed (boundary pairs are chosen on geodesic
+distance), so matrix size and solve time grow close to linearly with n.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from webrotas.domain.geospatial.distance import distance_matrix, pairwise_distances
+
+
+def partition_points(
+    lats: np.ndarray, lngs: np.ndarray, max_size: int
+) -> List[np.ndarray]:
+    """
+    Split points into spatially compact clusters of at most max_size points.
+
+    Clusters are built by recursively cutting at the median of the wider
+    axis (longitudes scaled by cos(latitude)), so sizes stay balanced
+    between max_size / 2 and max_size.
+
+    Args:
+        lats: Latitudes in degrees, shape (n,)
+        lngs: Longitudes in degrees, shape (n,)
+        max_size: Maximum points per cluster
+
+    Returns:
+        List of index arrays, one per cluster
+    """
+    if max_size < 2:
+        raise ValueError("max_size must be at least 2")
+
+    xs = np.asarray(lngs, dtype=float) * np.cos(np.radians(np.mean(lats)))
+    ys = np.asarray(lats, dtype=float)
+
+    clusters = []
+    pending = [np.arange(len(xs))]
+    while pending:
+        idx = pending.pop()
+        if len(idx) <= max_size:
+            clusters.append(idx)
+            continue
+        x, y = xs[idx], ys[idx]
+        axis = x if np.ptp(x) >= np.ptp(y) else y
+        order = np.argsort(axis, kind="stable")
+        half = len(idx) // 2
+        pending.append(idx[order[half:]])
+        pending.append(idx[order[:half]])
+    return clusters
+
+
+def isolate_endpoint(
+    clusters: List[np.ndarray], origin: int, endpoint: int | None
+) -> List[np.ndarray]:
+    """
+    Move the endpoint into its own cluster if it shares the origin's cluster.
+
+    The origin's cluster is visited first and the endpoint's cluster last, so
+    they must differ whenever there is more than one cluster.
+
+    Args:
+        clusters: Index arrays from partition_points
+        origin: Index of the route origin
+        endpoint: Index of the fixed endpoint, or None
+
+    Returns:
+        Clusters (a new list if the endpoint was moved)
+    """
+    if endpoint is None or endpoint == origin or len(clusters) < 2:
+        return clusters
+    for i, members in enumerate(clusters):
+        if origin in members and endpoint in members:
+            rest = members[members != endpoint]
+            return clusters[:i] + [rest] + clusters[i + 1 :] + [np.array([endpoint])]
+    return clusters
+
+
+def cluster_centroid_matrix(
+    lats: np.ndarray, lngs: np.ndarray, clusters: Sequence[np.ndarray]
+) -> np.ndarray:
+    """
+    Geodesic distance matrix between cluster centroids.
+
+    Args:
+        lats: Latitudes in degrees, shape (n,)
+        lngs: Longitudes in degrees, shape (n,)
+        clusters: Index arrays, one per cluster
+
+    Returns:
+        Distances in metres, shape (k, k)
+    """
+    clats = np.array([lats[c].mean() for c in clusters])
+    clngs = np.array([lngs[c].mean() for c in clusters])
+    return distance_matrix(clats, clngs, model="haversine")
+
+
+def _closest_pair(
+    lats: np.ndarray, lngs: np.ndarray, a: np.ndarray, b: np.ndarray
+) -> Tuple[int, int]:
+    """Closest (a, b) point pair between two index sets."""
+    pairs = np.stack(np.meshgrid(a, b, indexing="ij"), axis=-1).reshape(-1, 2)
+    best = np.argmin(pairwise_distances(lats, lngs, pairs, model="haversine"))
+    return int(pairs[best, 0]), int(pairs[best, 1])
+
+
+def _without(members: np.ndarray, point: int | None) -> np.ndarray:
+    """Members minus point, unless that would leave nothing."""
+    if point is None or len(members) < 2:
+        return members
+    return members[members != point]
+
+
+def choose_boundaries(
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    sequence: Sequence[np.ndarray],
+    origin: int,
+    endpoint: int | None = None,
+    closed: bool = False,
+) -> List[Tuple[int, int | None]]:
+    """
+    Pick the entry and exit point of each cluster along the cluster sequence.
+
+    The first cluster is entered at the origin; consecutive clusters are
+    linked by their closest point pair. The last cluster exits at the
+    endpoint, at the point closest to the origin for closed tours, or
+    anywhere (None) for open tours. A cluster with two or more points never
+    enters and exits at the same point.
+
+    Args:
+        lats: Latitudes in degrees, shape (n,)
+        lngs: Longitudes in degrees, shape (n,)
+        sequence: Cluster index arrays in visiting order (first holds origin)
+        origin: Index of the route origin
+        endpoint: Index of the fixed endpoint (in the last cluster), or None
+        closed: If True, the route returns to the origin
+
+    Returns:
+        List of (entry, exit) point indices, one per cluster
+    """
+    entries = [origin]
+    exits = []
+    last = len(sequence) - 1
+
+    for i in range(last):
+        candidates_a = _without(sequence[i], entries[i])
+        candidates_b = sequence[i + 1]
+        if i + 1 == last:
+            candidates_b = _without(candidates_b, endpoint)
+        exit_a, entry_b = _closest_pair(lats, lngs, candidates_a, candidates_b)
+        exits.append(exit_a)
+        entries.append(entry_b)
+
+    if endpoint is not None:
+        exits.append(endpoint)
+    elif closed and len(sequence) > 1:
+        candidates = _without(sequence[last], entries[last])
+        exits.append(_closest_pair(lats, lngs, candidates, np.array([origin]))[0])
+    else:
+        exits.append(None)
+
+    return list(zip(entries, exits))
+
+
+def local_problem(
+    members: np.ndarray, entry: int, exit: int | None
+) -> Tuple[np.ndarray, int | None]:
+    """
+    Reorder a cluster so its entry point comes first.
+
+    Args:
+        members: Point indices of the cluster
+        entry: Point where the cluster tour starts
+        exit: Point where it must end, or None for a free end
+
+    Returns:
+        Tuple of (ordered member indices, local index of exit or None)
+    """
+    members = np.concatenate(([entry], members[members != entry]))
+    if exit is None or exit == entry:
+        return members, None
+    return members, int(np.flatnonzero(members == exit)[0])
+
+
+def stitch_tours(
+    tours: Sequence[Sequence[int]], origin: int, closed: bool = False
+) -> List[int]:
+    """
+    Concatenate cluster tours (global indices) into one route.
+
+    Args:
+        tours: Tour of each cluster in visiting order, each from entry to exit
+        origin: Index of the route origin
+        closed: If True, append the return to the origin
+
+    Returns:
+        Visiting order over all points
+    """
+    order = [int(i) for tour in tours for i in tour]
+    if closed and (not order or order[-1] != origin):
+        order.append(origin)
+    return order
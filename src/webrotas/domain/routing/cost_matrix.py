@@ -0,0 +1,74 @@
+"""
+Array-backed distance/duration matrices.
+
+Every matrix source (local container, public API, iterative builder, geodesic
+fallback) produces a CostMatrix; validation repairs it in place and the TSP
+solvers read it directly. Matrices are stored as contiguous float32 arrays
+(half the size of float64 and ~1/8 of nested Python float lists), with NaN
+marking unroutable pairs. No nested lists are built between the router and
+the solvers.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+COST_DTYPE = np.float32
+
+
+def as_cost_array(matrix) -> np.ndarray:
+    """
+    Convert a matrix to a contiguous float32 array (no copy if it already is one).
+
+    Args:
+        matrix: Nested lists (None for unroutable) or array
+
+    Returns:
+        Contiguous float32 array with NaN for unroutable cells
+    """
+    return np.ascontiguousarray(np.asarray(matrix, dtype=COST_DTYPE))
+
+
+@dataclass
+class CostMatrix:
+    """Distance (metres) and duration (seconds) matrices for the same points."""
+
+    distances: np.ndarray
+    durations: np.ndarray
+
+    def __post_init__(self):
+        self.distances = as_cost_array(self.distances)
+        self.durations = as_cost_array(self.durations)
+
+        n = self.distances.shape[0] if self.distances.ndim == 2 else -1
+        if self.distances.shape != (n, n) or self.durations.shape != (n, n):
+            raise ValueError(
+                f"Cost matrices must be square and equal-sized, got "
+                f"{self.distances.shape} and {self.durations.shape}"
+            )
+
+    @property
+    def size(self) -> int:
+        """Number of points."""
+        return self.distances.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by both matrices."""
+        return self.distances.nbytes + self.durations.nbytes
+
+    def costs(self, criterion: str = "distance") -> np.ndarray:
+        """
+        Matrix to optimize for a criterion.
+
+        Args:
+            criterion: 'distance' or 'duration'
+
+        Returns:
+            The distances or durations array (not a copy)
+        """
+        if criterion == "distance":
+            return self.distances
+        if criterion == "duration":
+            return self.durations
+        raise ValueError(f"Unknown criterion '{criterion}'")
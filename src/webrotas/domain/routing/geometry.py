@@ -0,0 +1,206 @@
+"""
+Encoded route geometries.
+
+Route requests ask OSRM for ``geometries=polyline6`` instead of GeoJSON: a
+long urban tour is then a compact ASCII string rather than a nested array of
+coordinate pairs that must be JSON-parsed into Python lists of lists.
+
+A RouteGeometry keeps that string as it is and decodes it only when a
+consumer needs coordinates, into an (n, 2) float64 NumPy array of
+[lng, lat] rows. Decoding and encoding are vectorized: the 5-bit chunks of
+every varint are located, shifted and summed with array operations, so no
+Python code runs per vertex. Geometries built from coordinates (stitched
+windows, straight-line fallbacks) are only encoded when the string is needed.
+
+Route dicts handled internally carry either the encoded string (as OSRM
+returns it) or a RouteGeometry under ``"geometry"``; RouteGeometry.from_osrm
+accepts both, as well as GeoJSON LineStrings.
+"""
+
+from typing import Any, Iterable, List
+
+import numpy as np
+
+# OSRM geometry format and its coordinate precision (decimal places)
+OSRM_GEOMETRY_FORMAT = "polyline6"
+PRECISION = 6
+
+# Polyline encoding: printable offset, 5-bit chunks, continuation bit
+_OFFSET = 63
+_CHUNK_BITS = 5
+_CHUNK_MASK = 0x1F
+_CONTINUATION = 0x20
+
+# 5-bit chunks needed for the largest zigzag delta (< 2^35 at precision 6)
+_MAX_CHUNKS = 7
+
+
+def decode_polyline(encoded: str, precision: int = PRECISION) -> np.ndarray:
+    """
+    Decode an encoded polyline.
+
+    Args:
+        encoded: Polyline string
+        precision: Decimal places of the encoding (6 for polyline6)
+
+    Returns:
+        (n, 2) float64 array of [lat, lng] rows (polyline order)
+
+    Raises:
+        ValueError: If the string is not a valid polyline
+    """
+    if not encoded:
+        return np.zeros((0, 2))
+
+    chunks = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64)
+    chunks -= _OFFSET
+    if chunks.min() < 0 or chunks.max() > _CONTINUATION + _CHUNK_MASK:
+        raise ValueError("Invalid polyline characters")
+
+    last = chunks < _CONTINUATION
+    if not last[-1]:
+        raise ValueError("Truncated polyline")
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    if len(starts) % 2:
+        raise ValueError("Polyline has an odd number of values")
+
+    value_index = np.cumsum(np.concatenate(([0], last[:-1])))
+    position = np.arange(len(chunks)) - starts[value_index]
+    values = np.add.reduceat(
+        (chunks & _CHUNK_MASK) << (_CHUNK_BITS * position), starts
+    )
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 10**precision
+
+
+def encode_polyline(latlng: np.ndarray, precision: int = PRECISION) -> str:
+    """
+    Encode coordinates as a polyline.
+
+    Args:
+        latlng: (n, 2) array of [lat, lng] rows (polyline order)
+        precision: Decimal places of the encoding (6 for polyline6)
+
+    Returns:
+        Polyline string
+    """
+    latlng = np.asarray(latlng, dtype=np.float64).reshape(-1, 2)
+    if len(latlng) == 0:
+        return ""
+
+    quantized = np.rint(latlng * 10**precision).astype(np.int64)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    deltas = deltas.ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    counts = np.ones(len(values), dtype=np.int64)
+    for k in range(1, _MAX_CHUNKS):
+        counts += (values >> (_CHUNK_BITS * k)) > 0
+
+    value_index = np.repeat(np.arange(len(values)), counts)
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    chunks = (values[value_index] >> (_CHUNK_BITS * position)) & _CHUNK_MASK
+    chunks |= np.where(position < counts[value_index] - 1, _CONTINUATION, 0)
+    return (chunks + _OFFSET).astype(np.uint8).tobytes().decode("ascii")
+
+
+class RouteGeometry:
+    """Route line kept polyline6-encoded until its coordinates are needed."""
+
+    __slots__ = ("_encoded", "_coords")
+
+    def __init__(self, encoded: str | None = None, coords: np.ndarray | None = None):
+        """
+        Args:
+            encoded: polyline6 string
+            coords: (n, 2) array of [lng, lat] rows (used if encoded is None)
+        """
+        if encoded is None and coords is None:
+            raise ValueError("RouteGeometry needs an encoded string or coordinates")
+        self._encoded = encoded
+        self._coords = coords
+
+    @classmethod
+    def from_coordinates(cls, coordinates) -> "RouteGeometry":
+        """Geometry from [lng, lat] pairs (GeoJSON order)."""
+        coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        return cls(coords=coords)
+
+    @classmethod
+    def from_osrm(cls, geometry: Any) -> "RouteGeometry":
+        """
+        Geometry from the ``geometry`` field of an OSRM route.
+
+        Args:
+            geometry: polyline6 string, GeoJSON LineString, [lng, lat] pairs or
+                a RouteGeometry (returned as is)
+
+        Returns:
+            RouteGeometry
+        """
+        if isinstance(geometry, RouteGeometry):
+            return geometry
+        if isinstance(geometry, str):
+            return cls(encoded=geometry)
+        if isinstance(geometry, dict):
+            geometry = geometry.get("coordinates", [])
+        return cls.from_coordinates(geometry if geometry is not None else [])
+
+    @classmethod
+    def concat(cls, geometries: Iterable["RouteGeometry"]) -> "RouteGeometry":
+        """
+        Join consecutive geometries into one line.
+
+        The first vertex of a geometry is dropped when it repeats the last
+        vertex of the previous one (the shared waypoint).
+
+        Args:
+            geometries: Geometries in route order
+
+        Returns:
+            RouteGeometry over the joined coordinates
+        """
+        parts: List[np.ndarray] = []
+        for geometry in geometries:
+            coords = geometry.coords
+            if parts and len(parts[-1]) and len(coords):
+                if np.array_equal(coords[0], parts[-1][-1]):
+                    coords = coords[1:]
+            parts.append(coords)
+        if not parts:
+            return cls(coords=np.zeros((0, 2)))
+        return cls(coords=np.concatenate(parts))
+
+    @property
+    def encoded(self) -> str:
+        """polyline6 string (encoded on first access if built from coordinates)."""
+        if self._encoded is None:
+            self._encoded = encode_polyline(self._coords[:, ::-1])
+        return self._encoded
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(n, 2) float64 array of [lng, lat] rows (decoded on first access)."""
+        if self._coords is None:
+            self._coords = decode_polyline(self._encoded)[:, ::-1]
+        return self._coords
+
+    def latlng(self) -> np.ndarray:
+        """(n, 2) array of [lat, lng] rows."""
+        return self.coords[:, ::-1]
+
+    def flat_latlng(self, decimals: int = PRECISION) -> np.ndarray:
+        """Flat [lat0, lng0, lat1, lng1, ...] array rounded to decimals."""
+        return np.round(self.latlng(), decimals).ravel()
+
+    def to_geojson(self) -> dict:
+        """GeoJSON LineString with [lng, lat] lists."""
+        return {"type": "LineString", "coordinates": self.coords.tolist()}
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def __repr__(self) -> str:
+        if self._coords is None:
+            return f"RouteGeometry(encoded={len(self._encoded)} chars)"
+        return f"RouteGeometry({len(self._coords)} points)"
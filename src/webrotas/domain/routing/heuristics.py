@@ -0,0 +1,337 @@
+"""
+Lightweight TSP heuristics on NumPy cost matrices.
+
+Building an OR-Tools model costs more than solving the small and medium
+problems most requests produce (circle routes, typical ``shortest`` lists).
+This tier solves them directly on the array matrix:
+
+- construction: nearest neighbour from the start node;
+- improvement: best-improvement 2-opt and Or-opt (segments of 1-3 nodes,
+  optionally reversed), each move evaluated for all positions at once with
+  NumPy, until neither finds an improving move.
+
+All three route variants are handled as paths with fixed first and last
+positions: closed tours end at the start node, fixed-endpoint tours at the
+endpoint, and open tours at a dummy node reachable from every node at zero
+cost. Deltas are computed for asymmetric matrices (OSRM durations are not
+symmetric), so reversing a segment accounts for its reversed internal arcs.
+
+Improvement is anytime: a deadline and a should_stop callable are checked
+between moves, and the best path so far is returned when either fires.
+
+The result is also used as an initial solution for OR-Tools (warm start).
+A previous route can be the starting point too (re-optimization of edited
+routes): complete_order keeps its order and cheapest-inserts new nodes.
+"""
+
+import time
+from typing import Callable
+
+import numpy as np
+
+# Cost of unroutable (NaN/inf) arcs
+UNREACHABLE = 1e12
+
+# Smallest improvement accepted as a move (guards against float noise)
+IMPROVEMENT_EPS = 1e-6
+
+OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+
+
+def _path_problem(costs, start: int, end: int | None, closed: bool):
+    """
+    Build the fixed-ends path problem for a route variant.
+
+    Returns:
+        Tuple of (cost matrix, start node, end node, dummy node or None)
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    costs = np.where(np.isfinite(costs), costs, UNREACHABLE)
+
+    if closed:
+        return costs, start, start, None
+    if end is not None and end != start:
+        return costs, start, end, None
+
+    # Open tour: a dummy end node reachable from every node at zero cost
+    n = len(costs)
+    padded = np.full((n + 1, n + 1), UNREACHABLE)
+    padded[:n, :n] = costs
+    padded[:, n] = 0.0
+    return padded, start, n, n
+
+
+def nearest_neighbour_path(costs: np.ndarray, start: int, end: int) -> np.ndarray:
+    """
+    Nearest-neighbour path from start through every node, finishing at end.
+
+    Args:
+        costs: Square cost matrix
+        start: First node
+        end: Last node (may equal start for closed tours)
+
+    Returns:
+        Node sequence (start ... end)
+    """
+    n = len(costs)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    unvisited[end] = False
+
+    path = [start]
+    current = start
+    for _ in range(int(unvisited.sum())):
+        row = np.where(unvisited, costs[current], np.inf)
+        current = int(np.argmin(row))
+        unvisited[current] = False
+        path.append(current)
+    path.append(end)
+    return np.array(path)
+
+
+def _complete_path(
+    costs: np.ndarray, partial, start: int, end: int, num_nodes: int
+) -> np.ndarray:
+    """
+    Turn a partial node order into a full start ... end path.
+
+    Unknown, duplicate and end nodes are dropped from the partial order; the
+    nodes it misses are inserted one by one where they add the least cost.
+    """
+    seen = {start, end}
+    inner = []
+    for node in partial:
+        node = int(node)
+        if 0 <= node < num_nodes and node not in seen:
+            seen.add(node)
+            inner.append(node)
+
+    path = np.array([start, *inner, end])
+    for node in range(num_nodes):
+        if node in seen:
+            continue
+        a, b = path[:-1], path[1:]
+        delta = costs[a, node] + costs[node, b] - costs[a, b]
+        path = np.insert(path, int(np.argmin(delta)) + 1, node)
+    return path
+
+
+def complete_order(
+    distance_matrix,
+    partial,
+    start_index: int = 0,
+    end_index: int | None = None,
+    closed: bool = False,
+) -> list:
+    """
+    Complete a partial route (e.g. a previous solution) into a valid order.
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        partial: Node order to keep (start, end, unknown and repeated nodes
+            are ignored)
+        start_index: Starting node index
+        end_index: If specified, route must end at this node
+        closed: If True, route returns to the start node
+
+    Returns:
+        Order in the solver convention (see solve_heuristic)
+    """
+    costs, start, end, dummy = _path_problem(
+        distance_matrix, start_index, end_index, closed
+    )
+    path = _complete_path(costs, partial, start, end, len(distance_matrix))
+    if dummy is not None:
+        path = path[:-1]
+    return [int(node) for node in path]
+
+
+def path_cost(costs: np.ndarray, path: np.ndarray) -> float:
+    """Total cost of the arcs along a path."""
+    return float(costs[path[:-1], path[1:]].sum())
+
+
+def _best_two_opt(costs: np.ndarray, path: np.ndarray):
+    """Best segment reversal: (delta, i, j) with positions i < j, or None."""
+    m = len(path)
+    if m < 4:
+        return None
+
+    fwd = costs[path[:-1], path[1:]]
+    bwd = costs[path[1:], path[:-1]]
+    f_sum = np.concatenate(([0.0], np.cumsum(fwd)))
+    b_sum = np.concatenate(([0.0], np.cumsum(bwd)))
+
+    pos = np.arange(1, m - 1)
+    i, j = np.meshgrid(pos, pos, indexing="ij")
+    valid = i < j
+    i, j = i[valid], j[valid]
+
+    delta = (
+        costs[path[i - 1], path[j]]
+        + costs[path[i], path[j + 1]]
+        - fwd[i - 1]
+        - fwd[j]
+        + (b_sum[j] - b_sum[i])
+        - (f_sum[j] - f_sum[i])
+    )
+    best = int(np.argmin(delta))
+    return float(delta[best]), int(i[best]), int(j[best])
+
+
+def _best_or_opt(costs: np.ndarray, path: np.ndarray):
+    """Best segment move: (delta, start, length, after, reversed), or None."""
+    m = len(path)
+    fwd = costs[path[:-1], path[1:]]
+    bwd = costs[path[1:], path[:-1]]
+    f_sum = np.concatenate(([0.0], np.cumsum(fwd)))
+    b_sum = np.concatenate(([0.0], np.cumsum(bwd)))
+
+    best = None
+    edges = np.arange(m - 1)
+    for length in OR_OPT_SEGMENT_LENGTHS:
+        starts = np.arange(1, m - length)
+        if len(starts) == 0:
+            break
+        ends = starts + length - 1
+        gain = (
+            fwd[starts - 1]
+            + fwd[ends]
+            - costs[path[starts - 1], path[ends + 1]]
+        )
+
+        s, j = np.meshgrid(starts, edges, indexing="ij")
+        e = s + length - 1
+        # Insert between path[j] and path[j + 1], outside the segment
+        valid = (j < s - 1) | (j > e)
+        s, j, e = s[valid], j[valid], e[valid]
+        seg_gain = gain[s - 1]
+        edge_cost = fwd[j]
+
+        forward = (
+            costs[path[j], path[s]] + costs[path[e], path[j + 1]] - edge_cost - seg_gain
+        )
+        reverse = (
+            costs[path[j], path[e]]
+            + costs[path[s], path[j + 1]]
+            - edge_cost
+            - seg_gain
+            + (b_sum[e] - b_sum[s])
+            - (f_sum[e] - f_sum[s])
+        )
+        for deltas, reversed_ in ((forward, False), (reverse, True)):
+            if len(deltas) == 0 or (reversed_ and length == 1):
+                continue
+            k = int(np.argmin(deltas))
+            if best is None or deltas[k] < best[0]:
+                best = (float(deltas[k]), int(s[k]), length, int(j[k]), reversed_)
+    return best
+
+
+def _apply_or_opt(path: np.ndarray, start: int, length: int, after: int, reversed_: bool):
+    """Move path[start:start+length] to just after position `after`."""
+    segment = path[start : start + length]
+    if reversed_:
+        segment = segment[::-1]
+    rest = np.concatenate((path[:start], path[start + length :]))
+    insert_at = after + 1 if after < start else after - length + 1
+    return np.concatenate((rest[:insert_at], segment, rest[insert_at:]))
+
+
+def improve_path(
+    costs: np.ndarray,
+    path: np.ndarray,
+    max_moves: int | None = None,
+    started_at: float | None = None,
+    deadline: float | None = None,
+    should_stop: Callable[[], bool] | None = None,
+):
+    """
+    Improve a path with 2-opt and Or-opt moves until a local optimum.
+
+    The first and last positions stay fixed. The deadline and should_stop are
+    checked before each move; the path improved so far is returned when
+    either fires.
+
+    Args:
+        costs: Square cost matrix
+        path: Node sequence to improve
+        max_moves: Cap on applied moves (default: 50 per node)
+        started_at: time.monotonic() reference for the history timestamps
+        deadline: Optional time.monotonic() value after which no move is made
+        should_stop: Optional callable; when it returns True no move is made
+
+    Returns:
+        Tuple of (improved path, [(elapsed s, path cost)] after each move)
+    """
+    path = np.asarray(path).copy()
+    max_moves = max_moves if max_moves is not None else 50 * len(path)
+    started_at = started_at if started_at is not None else time.monotonic()
+    history = []
+
+    for _ in range(max_moves):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if should_stop is not None and should_stop():
+            break
+        move = _best_two_opt(costs, path)
+        if move is not None and move[0] < -IMPROVEMENT_EPS:
+            _, i, j = move
+            path[i : j + 1] = path[i : j + 1][::-1]
+        else:
+            move = _best_or_opt(costs, path)
+            if move is None or move[0] >= -IMPROVEMENT_EPS:
+                break
+            path = _apply_or_opt(path, *move[1:])
+        history.append((time.monotonic() - started_at, path_cost(costs, path)))
+    return path, history
+
+
+def solve_heuristic(
+    distance_matrix,
+    start_index: int = 0,
+    end_index: int | None = None,
+    closed: bool = False,
+    initial_order: list | None = None,
+    deadline: float | None = None,
+    should_stop: Callable[[], bool] | None = None,
+):
+    """
+    Solve a TSP with nearest neighbour + 2-opt/Or-opt.
+
+    Args:
+        distance_matrix: Distance/cost matrix (NaN/inf for unroutable arcs)
+        start_index: Starting node index
+        end_index: If specified, route must end at this node
+        closed: If True, route returns to the start node
+        initial_order: Optional route to improve instead of building one by
+            nearest neighbour (completed with complete_order rules)
+        deadline: Optional time.monotonic() value ending the improvement
+        should_stop: Optional callable; when it returns True the improvement
+            stops and the best path so far is returned
+
+    Returns:
+        Tuple of (order, objective, history)
+            - order: Node indices, ending with the end node for closed and
+              fixed-endpoint tours (same convention as the OR-Tools solvers)
+            - objective: Route cost in matrix units
+            - history: (elapsed s, objective) after construction and each move
+    """
+    started_at = time.monotonic()
+    costs, start, end, dummy = _path_problem(
+        distance_matrix, start_index, end_index, closed
+    )
+    if initial_order is not None:
+        path = _complete_path(costs, initial_order, start, end, len(distance_matrix))
+    else:
+        path = nearest_neighbour_path(costs, start, end)
+    history = [(time.monotonic() - started_at, path_cost(costs, path))]
+
+    path, improvements = improve_path(
+        costs, path, started_at=started_at, deadline=deadline, should_stop=should_stop
+    )
+    history.extend(improvements)
+
+    if dummy is not None:
+        path = path[:-1]
+    return [int(node) for node in path], history[-1][1], history
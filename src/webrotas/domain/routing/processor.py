@@ -1,13 +1,13 @@
-import json
 import math
 import uuid
 import logging
 from datetime import datetime
 
 import numpy as np
-from shapely.geometry import Point, Polygon
-from shapely.ops import unary_union
+from shapely.geometry import Polygon
 
+from webrotas.domain.avoid_zones.zone_set import get_avoid_zone_set
+from webrotas.domain.geospatial.grid import grid_points_in_polygons
 from webrotas.domain.geospatial.regions import extrair_bounding_box_de_regioes
 from webrotas.infrastructure.geospatial.shapefiles import (
     GetBoundMunicipio,
@@ -45,14 +45,18 @@ class RouteProcessor:
         Args:
             session_id: Unique session identifier
             origin: Starting point coordinates (dict with 'lat' and 'lng')
-            avoid_zones: List of zones to avoid in route calculation
+            avoid_zones: List of zones to avoid in route calculation (compiled
+                once into a shared AvoidZoneSet used by every zone consumer)
             criterion: Routing criterion ('distance', 'time', etc.)
             request_data: Original request data (for create_initial_route)
             route_id: Unique route identifier (auto-generated if not provided)
+
+        Optional "solver" options in request_data (timeLimit,
+        firstSolutionStrategy, metaheuristic) set the TSP search policy.
         """
         self.session_id = session_id
         self.origin = origin
-        self.avoid_zones = avoid_zones
+        self.avoid_zones = get_avoid_zone_set(avoid_zones)
         self.criterion = criterion
         self.request = request_data
         self.route_id = route_id or str(uuid.uuid4())
@@ -67,6 +71,12 @@ class RouteProcessor:
         self.estimated_distance = None
         self.estimated_time = None
         self.zones_hit = None
+        self.solver_report = None
+
+    @property
+    def solver_options(self):
+        """TSP search options from the request, if any."""
+        return self.request.get("solver") if self.request else None
 
     async def process_shortest(
         self,
@@ -96,6 +106,7 @@ class RouteProcessor:
             estimated_time,
             estimated_distance,
             zones_hit,
+            solver_report,
         ) = await calculate_optimal_route(
             self.origin,
             waypoints,
@@ -103,11 +114,14 @@ class RouteProcessor:
             self.avoid_zones,
             endpoint=endpoint,
             closed=closed,
+            solver_options=self.solver_options,
+            route_id=self.route_id,
         )
 
         origin, waypoints = enrich_waypoints_with_elevation(origin, waypoints)
 
         # Store results in instance for response generation
+        self.solver_report = solver_report
         self.routing_area = routing_area
         self.location_limits = location_limits
         self.location_urban_areas = location_urban_areas
@@ -179,7 +193,8 @@ class RouteProcessor:
         """Process ordered route - behavior depends on criterion.
 
         - If criterion="ordered": Uses optimized route (skips matrix calculation and TSP)
-        - If criterion="distance" or "duration": Uses full optimization (recalculates order)
+        - If criterion="distance" or "duration": Uses full optimization (recalculates order);
+          when this routeId was solved before, its matrix and order are reused
 
         Args:
             waypoints: List of waypoints to visit
@@ -227,6 +242,7 @@ class RouteProcessor:
                 estimated_time,
                 estimated_distance,
                 zones_hit,
+                self.solver_report,
             ) = await calculate_optimal_route(
                 self.origin,
                 waypoints,
@@ -234,6 +250,8 @@ class RouteProcessor:
                 self.avoid_zones,
                 endpoint=endpoint,
                 closed=closed,
+                solver_options=self.solver_options,
+                route_id=self.route_id,
             )
 
         origin, waypoints = enrich_waypoints_with_elevation(origin, waypoints)
@@ -279,8 +297,16 @@ class RouteProcessor:
 
         return waypoints
 
-    def create_initial_route(self):
-        """Generate initial route response with location and routing details."""
+    def create_initial_route(self, path_format=None):
+        """Generate initial route response with location and routing details.
+
+        Args:
+            path_format: Path encoding ("polyline6", "flat" or None, see
+                route_for_gui)
+
+        Returns:
+            JSON-serializable dict (serialized once, by the response class)
+        """
         initial_route = {
             "url": f"{get_webrotas_url()}/",
             "type": "initialRoute",
@@ -293,83 +319,76 @@ class RouteProcessor:
                             "urbanAreas": self.location_urban_areas,
                             "urbanCommunities": self.location_urban_communities,
                         },
-                        "routes": [self.route_for_gui()],
+                        "routes": [self.route_for_gui(path_format)],
                     },
                 }
             ],
         }
-        return json.dumps(initial_route, indent=4, ensure_ascii=False)
+        return initial_route
+
+    def create_custom_route(self, path_format=None):
+        """Generate custom route response (see create_initial_route)."""
+        return {"type": "customRoute", "route": self.route_for_gui(path_format)}
 
-    def create_custom_route(self):
-        """Generate custom route response."""
-        custom_route = {"type": "customRoute", "route": self.route_for_gui()}
-        return json.dumps(custom_route, indent=4, ensure_ascii=False)
+    def route_for_gui(self, path_format=None):
+        """Format route data for GUI consumption.
 
-    def route_for_gui(self):
-        """Format route data for GUI consumption."""
-        return {
+        Args:
+            path_format: How "paths" is written:
+                - None: list of [lat, lng] lists (default);
+                - "polyline6": encoded polyline string;
+                - "flat": flat [lat0, lng0, lat1, lng1, ...] NumPy array at
+                  6 decimals (needs a NumPy-aware encoder).
+                Compact formats add "pathEncoding" to the route.
+        """
+        route = {
             "routeId": self.route_id,
             "automatic": self.criterion != "ordered",
             "created": f"{datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
             "origin": self.origin,
             "waypoints": self.waypoints,
-            "paths": self.paths,
+            "paths": self._paths_for_gui(path_format),
             "estimatedDistance": self.estimated_distance,
             "estimatedTime": self.estimated_time,
             "waypointsInAvoidZones": self.zones_hit,
         }
+        if path_format is not None:
+            route["pathEncoding"] = path_format
+        if self.solver_report is not None:
+            route["solver"] = self.solver_report
+        return route
+
+    def _paths_for_gui(self, path_format):
+        """Route geometry in the requested path format."""
+        if self.paths is None:
+            return None
+        if path_format == "polyline6":
+            return self.paths.encoded
+        if path_format == "flat":
+            return self.paths.flat_latlng()
+        return self.paths.latlng().tolist()
 
     @staticmethod
     def _generate_waypoints_in_city(
         city_boundaries: list, avoid_zones: list, point_distance: int, scope: str
     ) -> list:
-        """Generate waypoints arranged in a grid within city boundaries."""
-        city_polygon_list = []
-        avoid_polygon_list = []
+        """Generate waypoints arranged in a grid within city boundaries.
 
-        for boundary in city_boundaries:
-            city_polygon_list.append(
-                Polygon([(float(lng), float(lat)) for lng, lat in boundary])
-            )
-
-        for zone in avoid_zones:
-            """
-                Na requisição .json, "avoid_zones" está uma lista de [lat, lng].
-                Numa refatoração, transformá-la em uma lista de objetos.
-            """
-            avoid_polygon_list.append(
-                Polygon([(float(lng), float(lat)) for lat, lng in zone["coord"]])
-            )
-
-        def meter_to_degree(lat_center, distance_m):
-            lat_step = distance_m / 111_000
-            lng_step = distance_m / (111_000 * np.cos(np.radians(lat_center)))
-            return lng_step, lat_step
-
-        lng_min, lat_min, lng_max, lat_max = unary_union(city_polygon_list).bounds
-        lng_step, lat_step = meter_to_degree((lat_min + lat_max) / 2, point_distance)
-
-        lng_range = np.arange(lng_min, lng_max, lng_step)
-        lat_range = np.arange(lat_min, lat_max, lat_step)
+        The lattice is sampled with vectorized containment tests (see
+        grid_points_in_polygons); points strictly inside avoid zones are skipped.
+        """
+        city_polygon_list = [
+            Polygon([(float(lng), float(lat)) for lng, lat in boundary])
+            for boundary in city_boundaries
+        ]
 
-        waypoints = []
-        for lat in lat_range:
-            for lng in lng_range:
-                point = Point(lng, lat)
-                if any(
-                    city_polygon.contains(point) for city_polygon in city_polygon_list
-                ):
-                    inside_avoid = any(
-                        zone.contains(point) for zone in avoid_polygon_list
-                    )
-                    if not inside_avoid:
-                        waypoints.append(
-                            {
-                                "lat": np.round(lat, 6),
-                                "lng": np.round(lng, 6),
-                                "description": "",
-                            }
-                        )
+        lats, lngs = grid_points_in_polygons(
+            city_polygon_list, point_distance, get_avoid_zone_set(avoid_zones)
+        )
+        waypoints = [
+            {"lat": lat, "lng": lng, "description": ""}
+            for lat, lng in zip(np.round(lats, 6).tolist(), np.round(lngs, 6).tolist())
+        ]
 
         if not waypoints:
             raise ValueError(
@@ -0,0 +1,585 @@
+"""
+Travelling Salesman solvers over precomputed cost matrices (OR-Tools).
+
+Costs are handed to OR-Tools as an integer transit matrix
+(``RoutingModel.RegisterTransitMatrix``) instead of a Python callback, so the
+search never calls back into the interpreter. Float costs (metres or seconds)
+are scaled by COST_SCALE before rounding, keeping centimetre/centisecond
+precision that plain ``int()`` truncation used to drop.
+
+Searches are anytime: a SolverPolicy sets the time budget, the first-solution
+strategy and the local-search metaheuristic, and the best route found when
+the budget expires is returned together with its objective, improvement
+history and solve time (TspSolution). Without an explicit policy,
+default_policy() picks one tuned to the problem size: small problems use the
+NumPy heuristic tier (webrotas.domain.routing.heuristics) and skip OR-Tools
+entirely; the heuristic route can also warm-start an OR-Tools search.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from webrotas.domain.routing.heuristics import complete_order, solve_heuristic
+
+logger = logging.getLogger(__name__)
+
+# Integer cost units per metre (distance) or per second (duration)
+COST_SCALE = 100
+
+# Cost of unroutable (NaN/inf) arcs: large, but small enough to sum without overflow
+UNREACHABLE_COST = 10**12
+
+# Request-facing names of the supported strategies
+FIRST_SOLUTION_STRATEGIES = {
+    "automatic": routing_enums_pb2.FirstSolutionStrategy.AUTOMATIC,
+    "path_cheapest_arc": routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC,
+    "savings": routing_enums_pb2.FirstSolutionStrategy.SAVINGS,
+    "christofides": routing_enums_pb2.FirstSolutionStrategy.CHRISTOFIDES,
+    "parallel_cheapest_insertion": (
+        routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
+    ),
+    "local_cheapest_insertion": (
+        routing_enums_pb2.FirstSolutionStrategy.LOCAL_CHEAPEST_INSERTION
+    ),
+}
+METAHEURISTICS = {
+    "greedy_descent": routing_enums_pb2.LocalSearchMetaheuristic.GREEDY_DESCENT,
+    "guided_local_search": (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    ),
+    "simulated_annealing": (
+        routing_enums_pb2.LocalSearchMetaheuristic.SIMULATED_ANNEALING
+    ),
+    "tabu_search": routing_enums_pb2.LocalSearchMetaheuristic.TABU_SEARCH,
+}
+
+# How the problem is solved: "auto" picks by size, "heuristic" runs the NumPy
+# 2-opt/Or-opt tier only, "monolithic" builds one OR-Tools model over all
+# points, "clustered" solves spatial clusters separately
+SOLVER_MODES = ("auto", "heuristic", "monolithic", "clustered")
+
+# Upper bound for any requested time budget, in seconds
+MAX_TIME_LIMIT_S = 60.0
+
+# Share of the time budget a warm-start heuristic may use before OR-Tools
+WARM_START_TIME_FRACTION = 0.25
+
+# Least time left to OR-Tools after a warm start, in seconds
+MIN_SEARCH_TIME_S = 0.1
+
+# Default policy per problem size: (max nodes, time limit s, metaheuristic,
+# mode). Small problems are solved by the heuristic tier in milliseconds;
+# larger ones spend a budget that grows with the size on guided local search.
+DEFAULT_POLICY_TIERS = [
+    (60, 1.0, "greedy_descent", "heuristic"),
+    (100, 2.0, "guided_local_search", "auto"),
+    (400, 5.0, "guided_local_search", "auto"),
+    (None, 10.0, "guided_local_search", "auto"),
+]
+
+
+@dataclass(frozen=True)
+class SolverPolicy:
+    """How long and how hard to search for a route."""
+
+    time_limit_s: float = 2.0
+    first_solution_strategy: str = "path_cheapest_arc"
+    metaheuristic: str = "guided_local_search"
+    mode: str = "auto"
+    warm_start: bool = False
+
+    def __post_init__(self):
+        if self.first_solution_strategy not in FIRST_SOLUTION_STRATEGIES:
+            raise ValueError(
+                f"Unknown firstSolutionStrategy '{self.first_solution_strategy}', "
+                f"expected one of {sorted(FIRST_SOLUTION_STRATEGIES)}"
+            )
+        if self.metaheuristic not in METAHEURISTICS:
+            raise ValueError(
+                f"Unknown metaheuristic '{self.metaheuristic}', "
+                f"expected one of {sorted(METAHEURISTICS)}"
+            )
+        if self.mode not in SOLVER_MODES:
+            raise ValueError(
+                f"Unknown mode '{self.mode}', expected one of {list(SOLVER_MODES)}"
+            )
+        if not 0 < self.time_limit_s <= MAX_TIME_LIMIT_S:
+            raise ValueError(
+                f"timeLimit must be in (0, {MAX_TIME_LIMIT_S:g}] seconds, "
+                f"got {self.time_limit_s}"
+            )
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any] | None, num_nodes: int):
+        """
+        Build a policy from the request's "solver" options.
+
+        Options not given keep the size-tuned defaults.
+
+        Args:
+            options: Dict with optional 'timeLimit' (seconds),
+                'firstSolutionStrategy', 'metaheuristic', 'mode' ("auto"
+                keeps the size-tuned mode) and 'warmStart' (start OR-Tools
+                from the heuristic route)
+            num_nodes: Number of points in the problem
+
+        Returns:
+            SolverPolicy
+
+        Raises:
+            ValueError: If an option is unknown or out of range
+        """
+        policy = default_policy(num_nodes)
+        if not options:
+            return policy
+        if not isinstance(options, dict):
+            raise ValueError("solver must be a JSON object")
+
+        unknown = options.keys() - {
+            "timeLimit",
+            "firstSolutionStrategy",
+            "metaheuristic",
+            "mode",
+            "warmStart",
+        }
+        if unknown:
+            raise ValueError(f"Unknown solver options: {sorted(unknown)}")
+
+        changes = {}
+        if "timeLimit" in options:
+            try:
+                changes["time_limit_s"] = float(options["timeLimit"])
+            except (TypeError, ValueError):
+                raise ValueError("timeLimit must be a number of seconds") from None
+        if "firstSolutionStrategy" in options:
+            changes["first_solution_strategy"] = str(options["firstSolutionStrategy"])
+        if "metaheuristic" in options:
+            changes["metaheuristic"] = str(options["metaheuristic"])
+        if "mode" in options and options["mode"] != "auto":
+            changes["mode"] = str(options["mode"])
+        if "warmStart" in options:
+            if not isinstance(options["warmStart"], bool):
+                raise ValueError("warmStart must be true or false")
+            changes["warm_start"] = options["warmStart"]
+        return replace(policy, **changes)
+
+    def search_parameters(self):
+        """OR-Tools search parameters for this policy."""
+        params = pywrapcp.DefaultRoutingSearchParameters()
+        params.first_solution_strategy = FIRST_SOLUTION_STRATEGIES[
+            self.first_solution_strategy
+        ]
+        params.local_search_metaheuristic = METAHEURISTICS[self.metaheuristic]
+        params.time_limit.FromMilliseconds(int(self.time_limit_s * 1000))
+        return params
+
+
+def default_policy(num_nodes: int) -> SolverPolicy:
+    """
+    Size-tuned default policy (see DEFAULT_POLICY_TIERS).
+
+    Args:
+        num_nodes: Number of points in the problem
+
+    Returns:
+        SolverPolicy
+    """
+    for max_nodes, time_limit_s, metaheuristic, mode in DEFAULT_POLICY_TIERS:
+        if max_nodes is None or num_nodes <= max_nodes:
+            return SolverPolicy(
+                time_limit_s=time_limit_s, metaheuristic=metaheuristic, mode=mode
+            )
+    raise AssertionError("DEFAULT_POLICY_TIERS must end with an open tier")
+
+
+@dataclass
+class TspSolution:
+    """Best route found by a search and how the search got there."""
+
+    order: List[int]
+    objective: float
+    solve_time_s: float
+    history: List[Tuple[float, float]] = field(default_factory=list)
+    policy: SolverPolicy | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable report (objective in metres or seconds)."""
+        report = {
+            "objective": round(self.objective, 2),
+            "solveTime": round(self.solve_time_s, 3),
+            "history": [
+                {"time": round(t, 3), "objective": round(obj, 2)}
+                for t, obj in self.history
+            ],
+        }
+        if self.policy is not None and self.policy.mode == "heuristic":
+            report.update(mode="heuristic")
+        elif self.policy is not None:
+            report.update(
+                timeLimit=self.policy.time_limit_s,
+                firstSolutionStrategy=self.policy.first_solution_strategy,
+                metaheuristic=self.policy.metaheuristic,
+                warmStart=self.policy.warm_start,
+            )
+        return report
+
+
+def scale_costs(distance_matrix, scale: int = COST_SCALE) -> np.ndarray:
+    """
+    Convert a float cost matrix to scaled, rounded int64 costs.
+
+    Args:
+        distance_matrix: Distance/cost matrix (array or nested lists)
+        scale: Integer units per cost unit
+
+    Returns:
+        int64 array; non-finite entries become UNREACHABLE_COST
+    """
+    costs = np.asarray(distance_matrix, dtype=np.float64) * scale
+    costs = np.where(
+        np.isfinite(costs), np.clip(costs, 0, UNREACHABLE_COST), UNREACHABLE_COST
+    )
+    return np.rint(costs).astype(np.int64)
+
+
+def _build_model(costs: np.ndarray, starts: list, ends: list):
+    """
+    Create a single-vehicle routing model with the costs as transit matrix.
+
+    Args:
+        costs: Scaled int64 cost matrix
+        starts: Start node of the vehicle (one-element list)
+        ends: End node of the vehicle (one-element list)
+
+    Returns:
+        Tuple of (manager, routing)
+    """
+    manager = pywrapcp.RoutingIndexManager(len(costs), 1, starts, ends)
+    routing = pywrapcp.RoutingModel(manager)
+
+    transit_idx = routing.RegisterTransitMatrix(costs.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_idx)
+    return manager, routing
+
+
+def _extract_order(manager, routing, solution, include_end: bool) -> list:
+    """Read the visiting order of vehicle 0 from a solution."""
+    order = []
+    idx = routing.Start(0)
+    while not routing.IsEnd(idx):
+        order.append(manager.IndexToNode(idx))
+        idx = solution.Value(routing.NextVar(idx))
+    if include_end:
+        order.append(manager.IndexToNode(idx))
+    return order
+
+
+def _solve_tour(
+    costs: np.ndarray,
+    start: int,
+    end: int,
+    include_end: bool,
+    policy: SolverPolicy | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    initial_order: List[int] | None = None,
+) -> TspSolution:
+    """
+    Run an anytime search on a prepared cost matrix.
+
+    Every improving solution is recorded in the history; should_stop is
+    polled at each solution and ends the search early (the best solution so
+    far is returned) when it turns true.
+
+    Args:
+        costs: Scaled int64 cost matrix
+        start: Start node
+        end: End node
+        include_end: Whether the end node is part of the returned order
+        policy: Search policy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+        initial_order: Optional route (node order from start) to start the
+            search from instead of the first-solution strategy
+
+    Returns:
+        TspSolution
+
+    Raises:
+        RuntimeError: If no solution is found
+    """
+    policy = policy or default_policy(len(costs))
+    manager, routing = _build_model(costs, [start], [end])
+
+    history = []
+    started_at = time.monotonic()
+
+    def on_solution():
+        objective = routing.CostVar().Value() / COST_SCALE
+        if not history or objective < history[-1][1]:
+            history.append((time.monotonic() - started_at, objective))
+        if should_stop is not None and should_stop():
+            routing.solver().FinishCurrentSearch()
+
+    routing.AddAtSolutionCallback(on_solution)
+    params = policy.search_parameters()
+    initial = None
+    if initial_order is not None:
+        routing.CloseModelWithParameters(params)
+        route = [manager.NodeToIndex(n) for n in initial_order if n not in (start, end)]
+        initial = routing.ReadAssignmentFromRoutes([route], True)
+        if initial is None:
+            logger.warning("Initial route rejected by OR-Tools, solving from scratch")
+
+    if initial is not None:
+        solution = routing.SolveFromAssignmentWithParameters(initial, params)
+    else:
+        solution = routing.SolveWithParameters(params)
+    solve_time_s = time.monotonic() - started_at
+    if not solution:
+        raise RuntimeError("OR-Tools could not find a solution.")
+
+    logger.debug(
+        f"TSP ({len(costs)} nodes, {policy.metaheuristic}) solved in "
+        f"{solve_time_s:.2f}s with {len(history)} improvement(s)"
+    )
+    return TspSolution(
+        order=_extract_order(manager, routing, solution, include_end=include_end),
+        objective=solution.ObjectiveValue() / COST_SCALE,
+        solve_time_s=solve_time_s,
+        history=history,
+        policy=policy,
+    )
+
+
+def _solve_route(
+    distance_matrix,
+    start=0,
+    end=None,
+    closed=False,
+    policy=None,
+    should_stop=None,
+    initial_order=None,
+) -> TspSolution:
+    """
+    Solve one route variant with the policy's solver tier.
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        start: Starting node index
+        end: Ending node index, or None for an open tour (equal to start
+            means the tour returns to start)
+        closed: If True, route returns to start
+        policy: Optional SolverPolicy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+        initial_order: Optional route to start from (e.g. a previous solution);
+            missing nodes are cheapest-inserted
+
+    Returns:
+        TspSolution
+    """
+    policy = policy or default_policy(len(distance_matrix))
+    if end == start:
+        end, closed = None, True
+
+    if initial_order is not None:
+        initial_order = complete_order(
+            distance_matrix, initial_order, start, end, closed
+        )
+
+    search_policy = policy
+    warm_start_s = 0.0
+    if policy.mode == "heuristic" or (policy.warm_start and initial_order is None):
+        # The heuristic gets the whole budget in heuristic mode, a share of it
+        # when it only seeds OR-Tools
+        started_at = time.monotonic()
+        budget_s = policy.time_limit_s
+        if policy.mode != "heuristic":
+            budget_s *= WARM_START_TIME_FRACTION
+        order, objective, history = solve_heuristic(
+            distance_matrix,
+            start,
+            end,
+            closed,
+            initial_order=initial_order,
+            deadline=started_at + budget_s,
+            should_stop=should_stop,
+        )
+        warm_start_s = time.monotonic() - started_at
+        if policy.mode == "heuristic" or (should_stop is not None and should_stop()):
+            return TspSolution(
+                order=order,
+                objective=objective,
+                solve_time_s=warm_start_s,
+                history=history,
+                policy=policy,
+            )
+        initial_order = order
+        search_policy = replace(
+            policy,
+            time_limit_s=max(policy.time_limit_s - warm_start_s, MIN_SEARCH_TIME_S),
+        )
+
+    costs = scale_costs(distance_matrix)
+    if closed:
+        # No free-return trick; keep the final return to start
+        end, include_end = start, True
+    elif end is None:
+        # Open tour: free return to start, dropped from the order
+        costs[:, start] = 0
+        end, include_end = start, False
+    else:
+        include_end = True
+
+    solution = _solve_tour(
+        costs, start, end, include_end, search_policy, should_stop, initial_order
+    )
+    # Report the requested policy and the whole solve time
+    solution.policy = policy
+    solution.solve_time_s += warm_start_s
+    return solution
+
+
+def solve_closed_tsp_from_matrix(distance_matrix, policy=None, should_stop=None):
+    """
+    Solve closed Traveling Salesman Problem (returns to origin).
+
+    Creates a circuit that starts at node 0 and returns to node 0.
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        policy: Optional SolverPolicy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+
+    Returns:
+        list: Indices representing the route (starting and ending at 0)
+    """
+    return _solve_route(
+        distance_matrix, closed=True, policy=policy, should_stop=should_stop
+    ).order
+
+
+def solve_constrained_tsp_from_matrix(
+    distance_matrix, start_index=0, end_index=None, policy=None, should_stop=None
+):
+    """
+    Solve TSP with fixed start and end nodes.
+
+    The route starts at start_index, visits every node once and finishes at
+    end_index (OR-Tools start/end nodes, no post-processing of the order).
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        start_index: Starting node index (default 0)
+        end_index: Ending node index; if None, uses open tour from start;
+            if equal to start_index, the tour returns to start
+        policy: Optional SolverPolicy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+
+    Returns:
+        list: Indices representing the route, ending with end_index when given
+    """
+    return _solve_route(
+        distance_matrix, start_index, end_index, False, policy, should_stop
+    ).order
+
+
+def solve_tsp(
+    distance_matrix,
+    endpoint_index=None,
+    closed=False,
+    policy=None,
+    should_stop=None,
+    initial_order=None,
+) -> TspSolution:
+    """
+    Solve a TSP and report how the search went.
+
+    Selects the tour type like solve_tsp_from_matrix (open, closed or fixed
+    endpoint) and returns the best solution found within the policy's budget.
+    Policies in "heuristic" mode are solved by nearest neighbour + 2-opt/Or-opt
+    without building an OR-Tools model.
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        endpoint_index: If specified, route must end at this node (open tour with fixed end)
+        closed: If True, route returns to origin (closed tour)
+        policy: Optional SolverPolicy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+            and the best route found so far is returned
+        initial_order: Optional route to start the search from (e.g. the
+            previous solution of an edited route)
+
+    Returns:
+        TspSolution with order, objective, improvement history and solve time
+
+    Raises:
+        ValueError: If closed is combined with an endpoint other than the origin
+    """
+    if closed and endpoint_index is not None and endpoint_index != 0:
+        raise ValueError("Cannot have both closed=True and endpoint != origin")
+
+    return _solve_route(
+        distance_matrix,
+        start=0,
+        end=endpoint_index,
+        closed=closed,
+        policy=policy,
+        should_stop=should_stop,
+        initial_order=initial_order,
+    )
+
+
+def solve_tsp_from_matrix(
+    distance_matrix,
+    criterion="distance",
+    endpoint_index=None,
+    closed=False,
+    policy=None,
+    should_stop=None,
+):
+    """
+    Dispatcher function for TSP solving based on route constraints.
+
+    Automatically selects the appropriate TSP solver:
+    - open tour (default): solve_open_tsp_from_matrix
+    - closed tour: solve_closed_tsp_from_matrix
+    - fixed endpoint: solve_constrained_tsp_from_matrix
+
+    Args:
+        distance_matrix: Distance/cost matrix
+        criterion: Optimization criterion ('distance' or 'duration')
+        endpoint_index: If specified, route must end at this node (open tour with fixed end)
+        closed: If True, route returns to origin (closed tour)
+        policy: Optional SolverPolicy (default: tuned to the matrix size)
+        should_stop: Optional callable; when it returns True the search stops
+            and the best route found so far is returned
+
+    Returns:
+        list: Indices representing the route
+    """
+    return solve_tsp(
+        distance_matrix,
+        endpoint_index=endpoint_index,
+        closed=closed,
+        policy=policy,
+        should_stop=should_stop,
+    ).order
+
+
+def solve_open_tsp_from_matrix(distance_matrix, policy=None, should_stop=None):
+    """
+    Solve open Traveling Salesman Problem (no return to origin).
+
+    Uses the 'free return' trick: zero the cost to return to depot (node 0).
+    Returns the order of visited nodes starting at 0 and without the final return.
+
+    Translated from Portuguese:
+    Usa o 'truque do retorno grátis': zera custo para voltar ao depósito (coluna 0).
+    Retorna a ordem dos índices dos nós visitados, começando em 0 e
+    sem o retorno final ao 0.
+    """
+    return _solve_route(distance_matrix, policy=policy, should_stop=should_stop).order
@@ -6,16 +6,50 @@ When segment-based alternatives all cross avoid zones, this module:
 2. Generates candidate waypoints around the zone boundary
 3. Routes through different waypoints to find viable paths
 4. Returns routes that avoid the zones
+
+The detour search is best-first and bounded: candidates (one or two
+boundary waypoints, over all offsets) are ordered by the great-circle length
+of start -> waypoints -> end, a lower bound of their road distance, and
+requested concurrently under a shared semaphore. Once a route clear of every
+zone is found, candidates whose lower bound already exceeds it are skipped.
+The search also stops at a request budget and a time budget. Each route is
+scored against the compiled zone index.
+
+Environment variables:
+- DETOUR_MAX_CONCURRENT: Detour route requests in flight (default: 4)
+- DETOUR_MAX_REQUESTS: Max detour route requests per search (default: 48)
+- DETOUR_TIME_BUDGET_S: Max seconds spent per search (default: 15)
 """
 
+import asyncio
 import math
+import os
+import time
 from typing import List, Dict, Tuple, Any, Optional
 from dataclasses import dataclass
 
+import numpy as np
+from shapely.strtree import STRtree
+
 from webrotas.config.logging_config import get_logger
+from webrotas.domain.avoid_zones.scoring import score_routes
+from webrotas.domain.avoid_zones.zone_set import get_avoid_zone_set
+from webrotas.domain.geospatial.distance import haversine_distance
+from webrotas.domain.routing.geometry import OSRM_GEOMETRY_FORMAT, RouteGeometry
 
 logger = get_logger(__name__)
 
+DETOUR_MAX_CONCURRENT = int(os.getenv("DETOUR_MAX_CONCURRENT", 4))
+DETOUR_MAX_REQUESTS = int(os.getenv("DETOUR_MAX_REQUESTS", 48))
+DETOUR_TIME_BUDGET_S = float(os.getenv("DETOUR_TIME_BUDGET_S", 15))
+
+# Offsets (km) of the boundary waypoint rings tried around the zones
+DETOUR_OFFSETS_KM = (1.5, 3.0, 5.0, 7.5, 10.0)
+
+# Road distance is at least the great-circle distance; the slack covers the
+# spherical Earth approximation
+LOWER_BOUND_SLACK = 0.99
+
 
 @dataclass
 class BoundaryPoint:
@@ -27,6 +61,21 @@ class BoundaryPoint:
     zone_index: int
 
 
+@dataclass
+class DetourCandidate:
+    """One or two boundary waypoints to route through."""
+
+    intermediates: Tuple[BoundaryPoint, ...]
+    offset_km: float
+    # Great-circle length of start -> intermediates -> end, in metres
+    lower_bound_m: float
+
+    @property
+    def label(self) -> str:
+        """Directions of the intermediate waypoints (for logs)."""
+        return "-".join(bp.direction for bp in self.intermediates)
+
+
 def _get_polygon_bounds(polygon) -> Tuple[float, float, float, float]:
     """Get bounding box (minlng, minlat, maxlng, maxlat)."""
     bounds = polygon.bounds
@@ -166,7 +215,7 @@ async def try_route_with_intermediate_waypoints(
         params = {
             "alternatives": 1,
             "overview": "full",
-            "geometries": "geojson",
+            "geometries": OSRM_GEOMETRY_FORMAT,
         }
 
         logger.info(
@@ -182,7 +231,7 @@ async def try_route_with_intermediate_waypoints(
         if osrm_response.get("routes"):
             route = osrm_response["routes"][0]
             return {
-                "geometry": route.get("geometry", {}).get("coordinates", []),
+                "geometry": RouteGeometry.from_osrm(route.get("geometry")),
                 "distance": route.get("distance", 0),
                 "duration": route.get("duration", 0),
                 "intermediate_waypoints": len(intermediate_coords),
@@ -196,101 +245,210 @@ async def try_route_with_intermediate_waypoints(
         return {"success": False}
 
 
+def _smallest(values: np.ndarray, limit: int | None) -> np.ndarray:
+    """Indices of the `limit` smallest values (all of them when limit is None)."""
+    if limit is None or limit >= len(values):
+        return np.arange(len(values))
+    return np.argpartition(values, limit)[:limit]
+
+
+def plan_detour_candidates(
+    start_coord: Dict[str, float],
+    end_coord: Dict[str, float],
+    polygons: List,
+    avoid_zones_list: List[Dict[str, Any]],
+    offsets_km: Tuple[float, ...] = DETOUR_OFFSETS_KM,
+    limit: int | None = None,
+) -> List[DetourCandidate]:
+    """
+    Single and paired boundary waypoints at every offset, best bound first.
+
+    Bounds of all pairs are computed as one array; candidate objects are only
+    built for the ``limit`` best singles and pairs of each offset. With limit
+    set to the request budget, the list still starts with every candidate the
+    search could ever request.
+
+    Args:
+        start_coord: Starting coordinate
+        end_coord: Ending coordinate
+        polygons: List of shapely polygon objects (avoid zones)
+        avoid_zones_list: Zone metadata aligned with polygons
+        offsets_km: Offsets of the boundary waypoint rings
+        limit: Max singles and max pairs kept per offset (None keeps all)
+
+    Returns:
+        Candidates sorted by lower bound (shortest possible detour first)
+    """
+    candidates = []
+    for offset_km in offsets_km:
+        points = generate_boundary_waypoints(
+            polygons, avoid_zones_list, offset_km=offset_km
+        )
+        if not points:
+            logger.debug(f"No boundary waypoints at offset {offset_km}km")
+            continue
+
+        lats = np.array([bp.lat for bp in points])
+        lngs = np.array([bp.lng for bp in points])
+        from_start = haversine_distance(start_coord["lat"], start_coord["lng"], lats, lngs)
+        to_end = haversine_distance(lats, lngs, end_coord["lat"], end_coord["lng"])
+        between = haversine_distance(
+            lats[:, None], lngs[:, None], lats[None, :], lngs[None, :]
+        )
+
+        single_bounds = from_start + to_end
+        for i in _smallest(single_bounds, limit):
+            candidates.append(
+                DetourCandidate((points[i],), offset_km, float(single_bounds[i]))
+            )
+        # Pairs of waypoints force the route around larger zones
+        first, second = np.triu_indices(len(points), k=1)
+        pair_bounds = from_start[first] + between[first, second] + to_end[second]
+        for k in _smallest(pair_bounds, limit):
+            candidates.append(
+                DetourCandidate(
+                    (points[first[k]], points[second[k]]),
+                    offset_km,
+                    float(pair_bounds[k]),
+                )
+            )
+
+    candidates.sort(key=lambda candidate: candidate.lower_bound_m)
+    return candidates
+
+
 async def find_route_around_zones(
     start_coord: Dict[str, float],
     waypoints: List[Dict[str, float]],
     request_osrm_fn,
     polygons: List,
     avoid_zones_list: List[Dict[str, Any]],
+    max_concurrent: int = DETOUR_MAX_CONCURRENT,
+    max_requests: int = DETOUR_MAX_REQUESTS,
+    time_budget_s: float = DETOUR_TIME_BUDGET_S,
 ) -> Optional[Dict[str, Any]]:
     """
     Try to find a route that avoids zones by inserting intermediate waypoints.
 
     Strategy:
-    1. Generate boundary waypoints at progressive distances (1.5km, 3km, 5km)
-    2. Try routes through each boundary waypoint
-    3. Select the shortest route that avoids zones
+    1. Plan boundary waypoints (single and pairs) at progressive offsets
+       (1.5km to 10km), ordered by their straight-line lower bound
+    2. Request routes through them concurrently, skipping candidates that
+       cannot beat the shortest route found clear of every zone
+    3. Stop at the request or time budget and return the shortest clear
+       route (or, if none is clear, the one with the fewest metres inside
+       zones)
 
     Args:
         start_coord: Starting coordinate
         waypoints: List of waypoints to visit
         request_osrm_fn: Async function to call OSRM
-        polygons: List of shapely polygon objects (avoid zones)
-        avoid_zones_list: Original avoid_zones list
+        polygons: List of shapely polygon objects (avoid zones); replaced by
+            the compiled zone polygons when avoid_zones_list has valid zones
+        avoid_zones_list: Original avoid_zones list (or its AvoidZoneSet)
+        max_concurrent: Route requests in flight
+        max_requests: Max route requests
+        time_budget_s: Max seconds spent searching
 
     Returns:
-        Dict with complete route or None if no viable path found
+        Dict with complete route (including penalty_score and
+        zone_intersections) or None if no viable path found
     """
     try:
         # Build full waypoint list: start + all waypoints
         all_waypoints = [start_coord] + waypoints
-
-        # Try progressive offset distances to find route around zones
-        best_route = None
-        best_distance = float("inf")
-        offset_distances = [1.5, 3.0, 5.0, 7.5, 10.0]  # Try increasingly larger offsets
-
-        for offset_km in offset_distances:
-            boundary_points = generate_boundary_waypoints(
-                polygons, avoid_zones_list, offset_km=offset_km
-            )
-
-            if not boundary_points:
-                logger.debug(f"No boundary waypoints at offset {offset_km}km")
-                continue
-
-            logger.info(
-                f"Trying {len(boundary_points)} boundary waypoints at {offset_km}km offset"
-            )
-
-            # Try single waypoints first
-            for bp in boundary_points:
-                intermediate = {"lat": bp.lat, "lng": bp.lng}
+        end_coord = all_waypoints[-1]
+
+        zone_set = get_avoid_zone_set(avoid_zones_list)
+        if zone_set.tree is not None:
+            polygons = zone_set.polygons
+            avoid_zones_list = [zone_set[i] for i in zone_set.zone_indices]
+            tree = zone_set.tree
+        else:
+            tree = STRtree(polygons) if polygons else None
+
+        candidates = plan_detour_candidates(
+            start_coord, end_coord, polygons, avoid_zones_list, limit=max_requests
+        )
+        if not candidates:
+            logger.warning("No boundary waypoints to route around zones")
+            return None
+
+        best_clear = None  # Shortest route outside every zone
+        best_exposed = None  # Least exposed route, used if none is clear
+        best_exposed_key = None  # (metres inside zones, distance)
+        requests = 0
+        semaphore = asyncio.Semaphore(max_concurrent)
+        started = time.perf_counter()
+
+        async def evaluate(candidate: DetourCandidate) -> None:
+            nonlocal best_clear, best_exposed, best_exposed_key
+            try:
                 route = await try_route_with_intermediate_waypoints(
-                    all_waypoints[0],
-                    all_waypoints[-1],
-                    [intermediate],
+                    start_coord,
+                    end_coord,
+                    [{"lat": bp.lat, "lng": bp.lng} for bp in candidate.intermediates],
                     request_osrm_fn,
                 )
-
-                if route.get("success") and route.get("distance", 0) < best_distance:
-                    best_distance = route["distance"]
-                    best_route = route
+            finally:
+                semaphore.release()
+            if not route.get("success"):
+                return
+
+            try:
+                scores = score_routes([route["geometry"]], tree)
+            except Exception as e:
+                logger.warning(f"Could not score detour via {candidate.label}: {e}")
+                return
+            route["penalty_score"] = float(scores.penalty_ratio[0])
+            route["zone_intersections"] = int(scores.zone_intersections[0])
+
+            if route["zone_intersections"] == 0:
+                if best_clear is None or route["distance"] < best_clear["distance"]:
+                    best_clear = route
                     logger.info(
                         f"Found viable route with {route['distance']:.0f}m "
-                        f"via {bp.direction} waypoint at {offset_km}km offset"
+                        f"via {candidate.label} waypoint(s) at {candidate.offset_km}km offset"
                     )
+            else:
+                # Ranked by metres inside zones, like segment alternatives
+                key = (float(scores.inside_length_m[0]), route["distance"])
+                if best_exposed_key is None or key < best_exposed_key:
+                    best_exposed, best_exposed_key = route, key
 
-            # For larger zones, try pairs of waypoints to force route around zone
-            if len(boundary_points) >= 2:
-                logger.info(f"Trying boundary waypoint pairs at {offset_km}km offset")
-                for i in range(len(boundary_points)):
-                    for j in range(i + 1, len(boundary_points)):
-                        bp1, bp2 = boundary_points[i], boundary_points[j]
-                        intermediates = [
-                            {"lat": bp1.lat, "lng": bp1.lng},
-                            {"lat": bp2.lat, "lng": bp2.lng},
-                        ]
-                        route = await try_route_with_intermediate_waypoints(
-                            all_waypoints[0],
-                            all_waypoints[-1],
-                            intermediates,
-                            request_osrm_fn,
-                        )
-
+        stop_reason = "all candidates tried"
+        try:
+            async with asyncio.timeout(time_budget_s):
+                async with asyncio.TaskGroup() as group:
+                    for candidate in candidates:
+                        await semaphore.acquire()
                         if (
-                            route.get("success")
-                            and route.get("distance", 0) < best_distance
+                            best_clear is not None
+                            and candidate.lower_bound_m * LOWER_BOUND_SLACK
+                            >= best_clear["distance"]
                         ):
-                            best_distance = route["distance"]
-                            best_route = route
-                            logger.info(
-                                f"Found viable pair route with {route['distance']:.0f}m "
-                                f"via {bp1.direction}-{bp2.direction} waypoints at {offset_km}km offset"
-                            )
-
-        if best_route:
-            return best_route
+                            semaphore.release()
+                            stop_reason = "remaining candidates cannot be shorter"
+                            break
+                        if requests >= max_requests:
+                            semaphore.release()
+                            stop_reason = f"request budget ({max_requests}) reached"
+                            break
+                        requests += 1
+                        group.create_task(evaluate(candidate))
+        except TimeoutError:
+            stop_reason = f"time budget ({time_budget_s:.0f}s) reached"
+
+        logger.info(
+            f"Detour search: {requests}/{len(candidates)} candidates requested in "
+            f"{time.perf_counter() - started:.1f}s ({stop_reason})"
+        )
+
+        if best_clear:
+            return best_clear
+        if best_exposed:
+            logger.warning("No route clear of the zones found, returning least exposed")
+            return best_exposed
 
         logger.warning("No viable route found around zones")
         return None
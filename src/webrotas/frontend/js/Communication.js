@@ -2,6 +2,8 @@
     ## webRotas Communication ##
     - COMMUNICATION
       ├── computeRoute
+      ├── decodeRoutePaths
+      ├── decodePolyline
       ├── isServerOnlineController
       ├── isServerOnline
       ├── handleFailure
@@ -15,7 +17,7 @@
         /*---------------------------------------------------------------------------------*/
         static computeRoute(request) {
             const { url, sessionId, status } = window.app.server;
-            const serverRoute = `${url}/process?sessionId=${sessionId}`;
+            const serverRoute = `${url}/process?sessionId=${sessionId}&pathFormat=polyline6`;
 
             return fetch(serverRoute, {
                 method: 'POST',
@@ -32,6 +34,8 @@
                 return response.json();
             })
             .then(returnedData => {
+                this.decodeRoutePaths(returnedData);
+
                 switch (returnedData.type) {
                     case "initialRoute": {
                         if (window.app.modules.Model.loadRouteFromFileOrServer(returnedData.routing)) {
@@ -63,6 +67,56 @@
             });
         }
 
+        /*---------------------------------------------------------------------------------*/
+        static decodeRoutePaths(returnedData) {
+            // Compact responses: "paths" encoded as indicated by "pathEncoding"
+            const routes = returnedData.type === "initialRoute"
+                ? returnedData.routing.flatMap(routing => routing.response.routes)
+                : [returnedData.route];
+
+            routes.forEach(route => {
+                switch (route.pathEncoding) {
+                    case "polyline6":
+                        route.paths = this.decodePolyline(route.paths, 6);
+                        break;
+                    case "flat": {
+                        const paths = [];
+                        for (let ii = 0; ii < route.paths.length; ii += 2) {
+                            paths.push([route.paths[ii], route.paths[ii+1]]);
+                        }
+                        route.paths = paths;
+                        break;
+                    }
+                }
+                delete route.pathEncoding;
+            });
+        }
+
+        /*---------------------------------------------------------------------------------*/
+        static decodePolyline(encoded, precision = 6) {
+            // Returns [[lat, lng], ...]
+            const factor = Math.pow(10, precision);
+            const points = [];
+            let index = 0, lat = 0, lng = 0;
+
+            while (index < encoded.length) {
+                const delta = [0, 0];
+                for (let ii = 0; ii < 2; ii++) {
+                    let result = 0, shift = 0, byte;
+                    do {
+                        byte    = encoded.charCodeAt(index++) - 63;
+                        result += (byte & 0x1f) * Math.pow(2, shift);
+                        shift  += 5;
+                    } while (byte >= 0x20);
+                    delta[ii] = (result % 2) ? -(result + 1) / 2 : result / 2;
+                }
+                lat += delta[0];
+                lng += delta[1];
+                points.push([lat / factor, lng / factor]);
+            }
+            return points;
+        }
+
         /*---------------------------------------------------------------------------------*/
         static isServerOnlineController() {
             if (window.location.protocol === "file:") {
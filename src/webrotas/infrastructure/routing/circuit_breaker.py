@@ -0,0 +1,222 @@
+"""
+Circuit breakers for OSRM backends.
+
+Each backend (local container, public router) has a breaker that tracks recent
+request outcomes and background health probes:
+
+- closed: requests flow normally; consecutive failures are counted
+- open: the backend is considered down and requests are rejected immediately
+- half-open: after a cool-down, a limited number of trial requests are let
+  through; a success closes the breaker, a failure opens it again
+
+This lets the matrix fallback chain skip a dead backend in milliseconds instead
+of waiting out its request timeout on every call.
+
+Environment variables:
+- OSRM_BREAKER_FAILURE_THRESHOLD: Consecutive failures that open a breaker (default: 3)
+- OSRM_BREAKER_RECOVERY_TIMEOUT: Seconds before an open breaker goes half-open (default: 30)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, Iterator
+
+from webrotas.config.logging_config import get_logger
+from webrotas.infrastructure.routing.http_client import BACKENDS
+
+logger = get_logger(__name__)
+
+OSRM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("OSRM_BREAKER_FAILURE_THRESHOLD", 3))
+OSRM_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("OSRM_BREAKER_RECOVERY_TIMEOUT", 30.0))
+
+
+class CircuitState(str, Enum):
+    """Possible states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the backend's breaker is open."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        super().__init__(f"OSRM backend '{backend}' is unavailable (circuit open)")
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for a single backend."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = OSRM_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = OSRM_BREAKER_RECOVERY_TIMEOUT,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Backend name (used in logs and status)
+            failure_threshold: Consecutive failures that open the breaker
+            recovery_timeout: Seconds the breaker stays open before going half-open
+            half_open_max_calls: Concurrent trial requests allowed while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        # Bumped on every transition, so a stale trial slot is never released
+        # into a later half-open period
+        self._generation = 0
+        self._last_failure: str | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving open breakers to half-open once cooled down."""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def is_available(self) -> bool:
+        """Whether the backend is worth trying (no side effects)."""
+        return self.state != CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent, reserving a trial slot when half-open.
+
+        Returns:
+            True if the request may proceed
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and (
+            self._half_open_calls < self.half_open_max_calls
+        ):
+            self._half_open_calls += 1
+            return True
+        return False
+
+    @contextmanager
+    def request_slot(self) -> Iterator[None]:
+        """
+        Gate one request on the breaker, always giving back its trial slot.
+
+        A half-open trial slot is normally freed by the state change that
+        record_success/record_failure causes. If the request ends without
+        either (cancelled, or failed with a non-transport error), the slot is
+        released on exit so the breaker does not stay blocked until the next
+        health probe.
+
+        Raises:
+            CircuitOpenError: If the request is not allowed
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+        trial_generation = (
+            self._generation if self._state == CircuitState.HALF_OPEN else None
+        )
+        try:
+            yield
+        finally:
+            if (
+                trial_generation is not None
+                and self._generation == trial_generation
+                and self._half_open_calls > 0
+            ):
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        """Record a successful request or probe."""
+        self._consecutive_failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self, reason: str = "") -> None:
+        """
+        Record a failed request or probe.
+
+        Args:
+            reason: Short description of the failure (kept for status reporting)
+        """
+        self._consecutive_failures += 1
+        self._last_failure = reason or None
+
+        if self._state == CircuitState.HALF_OPEN or (
+            self._state == CircuitState.CLOSED
+            and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+        elif self._state == CircuitState.OPEN:
+            # Probes keep failing: restart the cool-down
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the breaker."""
+        state = self.state
+        retry_in = (
+            max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            if state == CircuitState.OPEN
+            else 0.0
+        )
+        return {
+            "state": state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "last_failure": self._last_failure,
+            "retry_in_s": round(retry_in, 1),
+        }
+
+    def _transition(self, new_state: CircuitState) -> None:
+        """Move to a new state, resetting per-state bookkeeping."""
+        old_state = self._state
+        self._state = new_state
+        self._half_open_calls = 0
+        self._generation += 1
+        if new_state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+
+        log = logger.warning if new_state == CircuitState.OPEN else logger.info
+        log(
+            f"Circuit breaker for OSRM backend '{self.name}': "
+            f"{old_state.value} -> {new_state.value}"
+        )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(backend: str) -> CircuitBreaker:
+    """
+    Get the process-wide breaker of a backend.
+
+    Args:
+        backend: Either "local" or "public"
+
+    Returns:
+        CircuitBreaker instance
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown OSRM backend: {backend}")
+    if backend not in _breakers:
+        _breakers[backend] = CircuitBreaker(backend)
+    return _breakers[backend]
+
+
+def get_circuit_breakers_status() -> Dict[str, Dict[str, Any]]:
+    """Return the status of all backend breakers."""
+    return {backend: get_circuit_breaker(backend).snapshot() for backend in BACKENDS}
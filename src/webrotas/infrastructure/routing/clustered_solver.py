@@ -0,0 +1,172 @@
+"""
+Hierarchical (cluster-first, route-second) TSP solving for large requests.
+
+Large grid requests are split into spatial clusters (see
+webrotas.domain.routing.clustering). Each cluster's matrix is fetched on its
+own, cluster TSPs run in parallel in the solver process pool, the clusters
+are ordered by a coarse TSP over their centroids, and the cluster tours are
+stitched at their boundary points. Matrix requests and solve work therefore
+grow with n * cluster size instead of n².
+
+Environment variables:
+- TSP_CLUSTER_THRESHOLD: Points above which "auto" mode clusters (default: 500)
+- TSP_CLUSTER_SIZE: Maximum points per cluster (default: 150)
+- TSP_CLUSTER_MATRIX_MAX_CONCURRENT: Cluster matrices fetched at once (default: 4)
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from webrotas.config.logging_config import get_logger
+from webrotas.domain.geospatial.distance import coords_to_arrays
+from webrotas.domain.routing.clustering import (
+    choose_boundaries,
+    cluster_centroid_matrix,
+    isolate_endpoint,
+    local_problem,
+    partition_points,
+    stitch_tours,
+)
+from webrotas.domain.routing.cost_matrix import CostMatrix
+from webrotas.domain.routing.tsp import SolverPolicy
+from webrotas.infrastructure.routing.solver_pool import get_solver_pool
+
+logger = get_logger(__name__)
+
+TSP_CLUSTER_THRESHOLD = int(os.getenv("TSP_CLUSTER_THRESHOLD", 500))
+TSP_CLUSTER_SIZE = int(os.getenv("TSP_CLUSTER_SIZE", 150))
+TSP_CLUSTER_MATRIX_MAX_CONCURRENT = int(
+    os.getenv("TSP_CLUSTER_MATRIX_MAX_CONCURRENT", 4)
+)
+
+MatrixFn = Callable[[List[Dict[str, float]]], Awaitable[CostMatrix]]
+
+
+def use_clustered_solver(num_points: int, policy: SolverPolicy) -> bool:
+    """
+    Whether a problem should be solved hierarchically.
+
+    Args:
+        num_points: Number of points (origin included)
+        policy: Solver policy from the request
+
+    Returns:
+        bool: True for mode "clustered", or "auto" above TSP_CLUSTER_THRESHOLD
+    """
+    if policy.mode == "clustered":
+        return num_points > 2
+    return policy.mode == "auto" and num_points > TSP_CLUSTER_THRESHOLD
+
+
+async def solve_clustered(
+    coords: Sequence[Dict[str, float]],
+    matrix_fn: MatrixFn,
+    criterion: str = "distance",
+    endpoint_index: int | None = None,
+    closed: bool = False,
+    solver_options: Dict[str, Any] | None = None,
+    cluster_size: int = TSP_CLUSTER_SIZE,
+) -> Tuple[List[int], Dict[str, Any]]:
+    """
+    Solve a large TSP by clusters.
+
+    Args:
+        coords: Coordinate dicts; index 0 is the origin
+        matrix_fn: Async function returning a validated CostMatrix for a list
+            of coordinates (called once per cluster)
+        criterion: Optimization criterion ('distance' or 'duration')
+        endpoint_index: If specified, route must end at this node index
+        closed: If True, route returns to origin (closed tour)
+        solver_options: Request "solver" options; policies are tuned to each
+            cluster's size
+        cluster_size: Maximum points per cluster
+
+    Returns:
+        tuple: (order, solver_report)
+            - order: Indices representing the visitation order
+            - solver_report: Mode, cluster count, summed intra-cluster
+              objective and wall-clock solve time
+    """
+    started_at = time.monotonic()
+    if endpoint_index == 0:
+        # Ending at the origin is a closed tour
+        endpoint_index, closed = None, True
+
+    lats, lngs = coords_to_arrays(coords)
+    pool = get_solver_pool()
+
+    clusters = partition_points(lats, lngs, cluster_size)
+    clusters = isolate_endpoint(clusters, 0, endpoint_index)
+
+    # Origin's cluster first, endpoint's cluster last
+    clusters.sort(key=lambda members: 0 not in members)
+    end_cluster = None
+    if endpoint_index is not None:
+        end_cluster = next(i for i, c in enumerate(clusters) if endpoint_index in c)
+
+    if len(clusters) > 1:
+        coarse = await pool.solve(
+            cluster_centroid_matrix(lats, lngs, clusters),
+            endpoint_index=end_cluster,
+            closed=closed,
+            policy=SolverPolicy.from_options(solver_options, len(clusters)),
+        )
+        cluster_order = coarse.order[:-1] if closed else coarse.order
+    else:
+        cluster_order = [0]
+    sequence = [clusters[i] for i in cluster_order]
+
+    boundaries = choose_boundaries(lats, lngs, sequence, 0, endpoint_index, closed)
+    problems = [
+        local_problem(members, entry, exit)
+        for members, (entry, exit) in zip(sequence, boundaries)
+    ]
+    logger.info(
+        f"Clustered TSP: {len(coords)} points in {len(sequence)} clusters "
+        f"(max {cluster_size})"
+    )
+
+    # A closed tour with a single cluster returns to the origin inside it
+    closed_local = closed and len(sequence) == 1
+
+    matrix_limit = asyncio.Semaphore(TSP_CLUSTER_MATRIX_MAX_CONCURRENT)
+    # Never hold more pool slots than there are workers
+    solve_limit = asyncio.Semaphore(max(1, pool.max_workers))
+
+    async def solve_cluster(members: np.ndarray, exit_local: int | None):
+        if len(members) == 1:
+            return [int(members[0])], 0.0
+        async with matrix_limit:
+            matrix = await matrix_fn([coords[i] for i in members])
+        async with solve_limit:
+            solution = await pool.solve(
+                matrix.costs(criterion),
+                endpoint_index=exit_local,
+                closed=closed_local,
+                policy=SolverPolicy.from_options(solver_options, len(members)),
+            )
+        return [int(members[i]) for i in solution.order], solution.objective
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(solve_cluster(members, exit_local))
+                for members, exit_local in problems
+            ]
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0]
+
+    results = [task.result() for task in tasks]
+    order = stitch_tours([tour for tour, _ in results], 0, closed)
+
+    report = {
+        "mode": "clustered",
+        "clusters": len(sequence),
+        "objective": round(sum(objective for _, objective in results), 2),
+        "solveTime": round(time.monotonic() - started_at, 3),
+    }
+    return order, report
@@ -0,0 +1,172 @@
+"""
+Shared HTTP clients for OSRM backends.
+
+Every OSRM request used to open (and tear down) its own ``httpx.AsyncClient``,
+paying a fresh TCP handshake and connection pool per ``/table`` or ``/route``
+call. This module keeps one pooled, keep-alive client per backend for the whole
+process. The FastAPI lifespan opens them on startup and closes them on shutdown;
+outside the application (scripts, tests) they are created lazily on first use.
+
+Environment variables:
+- OSRM_HTTP_MAX_CONNECTIONS: Max simultaneous connections per backend (default: 100)
+- OSRM_HTTP_MAX_KEEPALIVE: Max idle keep-alive connections per backend (default: 20)
+- OSRM_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default: 30)
+- OSRM_PUBLIC_HTTP2: Enable HTTP/2 for the public router (default: false, needs ``h2``)
+- PUBLIC_OSRM_URL: Public OSRM router base URL (default: http://router.project-osrm.org)
+"""
+
+import asyncio
+import importlib.util
+import os
+from typing import Dict, Set, Tuple
+
+import httpx
+
+from webrotas.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LOCAL_BACKEND = "local"
+PUBLIC_BACKEND = "public"
+BACKENDS = (LOCAL_BACKEND, PUBLIC_BACKEND)
+
+PUBLIC_OSRM_URL = os.getenv("PUBLIC_OSRM_URL", "http://router.project-osrm.org")
+
+OSRM_HTTP_MAX_CONNECTIONS = int(os.getenv("OSRM_HTTP_MAX_CONNECTIONS", 100))
+OSRM_HTTP_MAX_KEEPALIVE = int(os.getenv("OSRM_HTTP_MAX_KEEPALIVE", 20))
+OSRM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OSRM_HTTP_KEEPALIVE_EXPIRY", 30.0))
+OSRM_PUBLIC_HTTP2 = os.getenv("OSRM_PUBLIC_HTTP2", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+DEFAULT_TIMEOUT = 30.0
+
+# backend -> (client, event loop the client was created on)
+_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+# Closes of clients left behind by other event loops, kept until they finish
+_pending_closes: Set[asyncio.Task] = set()
+
+
+def _http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed by httpx is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _create_client(backend: str) -> httpx.AsyncClient:
+    """
+    Create a pooled client for a backend.
+
+    Args:
+        backend: Either LOCAL_BACKEND or PUBLIC_BACKEND
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown OSRM backend: {backend}")
+
+    limits = httpx.Limits(
+        max_connections=OSRM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=OSRM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=OSRM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+    http2 = False
+    if backend == PUBLIC_BACKEND and OSRM_PUBLIC_HTTP2:
+        if _http2_available():
+            http2 = True
+        else:
+            logger.warning(
+                "OSRM_PUBLIC_HTTP2 is enabled but the 'h2' package is not installed; "
+                "using HTTP/1.1 for the public router"
+            )
+
+    logger.info(
+        f"Creating pooled HTTP client for OSRM backend '{backend}' "
+        f"(max_connections={OSRM_HTTP_MAX_CONNECTIONS}, "
+        f"max_keepalive={OSRM_HTTP_MAX_KEEPALIVE}, http2={http2})"
+    )
+    return httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=limits, http2=http2)
+
+
+def get_http_client(backend: str = LOCAL_BACKEND) -> httpx.AsyncClient:
+    """
+    Get the shared client for an OSRM backend, creating it if needed.
+
+    Connections are bound to the event loop they were opened on, so a client
+    created on a different (e.g. already finished) loop is closed and replaced.
+
+    Args:
+        backend: Either LOCAL_BACKEND or PUBLIC_BACKEND
+
+    Returns:
+        Shared httpx.AsyncClient for the backend
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(backend)
+
+    if entry is not None:
+        client, client_loop = entry
+        if not client.is_closed and client_loop is loop:
+            return client
+        _discard_client(backend, client, client_loop)
+
+    client = _create_client(backend)
+    _clients[backend] = (client, loop)
+    return client
+
+
+def _discard_client(
+    backend: str, client: httpx.AsyncClient, client_loop: asyncio.AbstractEventLoop
+) -> None:
+    """
+    Close a client created on another event loop, without blocking the caller.
+
+    The client is closed on its own loop when that loop is still running (e.g.
+    in another thread). Otherwise the close runs on the current loop; sockets
+    opened on a loop that is already closed cannot be shut down cleanly from
+    here, so their release is logged and left to garbage collection.
+    """
+    if client.is_closed:
+        return
+    if client_loop.is_running() and not client_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+        return
+
+    task = asyncio.get_running_loop().create_task(_close_stale_client(backend, client))
+    _pending_closes.add(task)
+    task.add_done_callback(_pending_closes.discard)
+
+
+async def _close_stale_client(backend: str, client: httpx.AsyncClient) -> None:
+    """Close a client left behind by a finished event loop, logging the outcome."""
+    try:
+        await client.aclose()
+        logger.info(f"Closed stale HTTP client for OSRM backend '{backend}'")
+    except Exception as e:
+        logger.warning(
+            f"Discarded HTTP client for OSRM backend '{backend}' from a finished "
+            f"event loop; its connections could not be closed ({e})"
+        )
+
+
+async def open_http_clients() -> None:
+    """Create the shared clients for all backends (called on app startup)."""
+    for backend in BACKENDS:
+        get_http_client(backend)
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients for all backends (called on app shutdown)."""
+    entries = list(_clients.items())
+    _clients.clear()
+
+    for backend, (client, _) in entries:
+        try:
+            await client.aclose()
+            logger.info(f"Closed pooled HTTP client for OSRM backend '{backend}'")
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client for backend '{backend}': {e}")
@@ -0,0 +1,397 @@
+"""
+Per-leg route geometry cache shared across tours.
+
+Consecutive waypoint pairs recur constantly: re-ordering a route, toggling
+``closed`` or re-routing a grid after a small edit reuses most of its legs.
+get_osrm_route therefore assembles tours from cached legs and only asks OSRM
+for runs of consecutive missing legs.
+
+A leg is keyed by (dataset version, origin, destination), with points
+quantized like the pair cache (see pair_cache.point_ids), and holds the
+polyline6-encoded geometry, distance, duration and the street names OSRM
+snapped both waypoints to. Legs are split out of /route responses requested
+with ``annotations=distance``: leg k's geometry is the slice of the overview
+with one more vertex than its annotation has segments, sharing its first
+vertex with the previous leg.
+
+Legs live in an in-process LRU bounded by memory. With LEG_CACHE_PATH set
+they are also written to a SQLite file (LRU-evicted above
+LEG_CACHE_MAX_ENTRIES) and read back on memory misses, so they survive
+restarts. As in the pair cache, storing legs of a new dataset version purges
+the older versions of the same backend.
+
+Environment variables:
+- LEG_CACHE_MAX_MB: Memory budget for cached legs, 0 disables the cache (default: 64)
+- LEG_CACHE_PATH: SQLite file persisting legs (default: unset, memory only)
+- LEG_CACHE_MAX_ENTRIES: Max legs kept in the file (default: 1000000)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.geometry import RouteGeometry, encode_polyline
+from webrotas.infrastructure.routing.pair_cache import EVICTION_TARGET, point_ids
+
+logger = get_logger(__name__)
+
+LEG_CACHE_MAX_MB = float(os.getenv("LEG_CACHE_MAX_MB", 64))
+LEG_CACHE_PATH = os.getenv("LEG_CACHE_PATH") or None
+LEG_CACHE_MAX_ENTRIES = int(os.getenv("LEG_CACHE_MAX_ENTRIES", 1_000_000))
+
+# Approximate per-leg memory besides the encoded geometry (key, object, floats)
+LEG_OVERHEAD_BYTES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS legs (
+    version TEXT NOT NULL,
+    src INTEGER NOT NULL,
+    dst INTEGER NOT NULL,
+    geometry TEXT NOT NULL,
+    distance REAL NOT NULL,
+    duration REAL NOT NULL,
+    src_name TEXT NOT NULL,
+    dst_name TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (version, src, dst)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS legs_used ON legs (used);
+"""
+
+LegKey = Tuple[str, int, int]
+
+
+@dataclass(frozen=True)
+class Leg:
+    """Route between two consecutive waypoints."""
+
+    geometry: str
+    distance: float
+    duration: float
+    names: Tuple[str, str] = ("", "")
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the cached leg."""
+        return len(self.geometry) + LEG_OVERHEAD_BYTES
+
+    def as_route_response(self) -> Dict[str, Any]:
+        """The leg as a one-leg OSRM /route response (polyline6 geometry)."""
+        return {
+            "code": "Ok",
+            "routes": [
+                {
+                    "geometry": self.geometry,
+                    "distance": self.distance,
+                    "duration": self.duration,
+                    "legs": [{"distance": self.distance, "duration": self.duration}],
+                }
+            ],
+            "waypoints": [{"name": name} for name in self.names],
+        }
+
+
+def split_route_legs(response: Dict[str, Any]) -> List[Leg] | None:
+    """
+    Split the first route of an OSRM /route response into legs.
+
+    The response must have full overview geometry and ``distance``
+    annotations on its legs.
+
+    Args:
+        response: OSRM /route response
+
+    Returns:
+        One Leg per pair of consecutive waypoints, or None if the response
+        cannot be split (no annotations, or geometry and annotations disagree)
+    """
+    try:
+        route = response["routes"][0]
+        line = RouteGeometry.from_osrm(route["geometry"]).latlng()
+        segments = [len(leg["annotation"]["distance"]) for leg in route["legs"]]
+        waypoints = response["waypoints"]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+    if sum(segments) + 1 != len(line) or len(waypoints) != len(segments) + 1:
+        return None
+
+    legs = []
+    start = 0
+    for k, (count, leg) in enumerate(zip(segments, route["legs"])):
+        legs.append(
+            Leg(
+                geometry=encode_polyline(line[start : start + count + 1]),
+                distance=float(leg["distance"]),
+                duration=float(leg["duration"]),
+                names=(
+                    waypoints[k].get("name", ""),
+                    waypoints[k + 1].get("name", ""),
+                ),
+            )
+        )
+        start += count
+    return legs
+
+
+def leg_runs(legs: Sequence[Leg | None]) -> List[Tuple[int, int]]:
+    """
+    Group missing legs into runs of consecutive waypoints to request.
+
+    Args:
+        legs: Cached leg or None for each pair of consecutive waypoints
+
+    Returns:
+        List of (start, stop) waypoint slices; leg k joins waypoints k and k+1
+    """
+    runs = []
+    start = None
+    for k, leg in enumerate(legs):
+        if leg is None and start is None:
+            start = k
+        elif leg is not None and start is not None:
+            runs.append((start, k + 1))
+            start = None
+    if start is not None:
+        runs.append((start, len(legs) + 1))
+    return runs
+
+
+class LegCache:
+    """Memory LRU of route legs, optionally backed by a SQLite file."""
+
+    def __init__(
+        self,
+        max_bytes: int = int(LEG_CACHE_MAX_MB * 1024 * 1024),
+        path: str | None = LEG_CACHE_PATH,
+        max_entries: int = LEG_CACHE_MAX_ENTRIES,
+    ):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._legs: OrderedDict[LegKey, Leg] = OrderedDict()
+        self._nbytes = 0
+        # Versions whose stale siblings were already purged
+        self._current_versions: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+
+    def __len__(self) -> int:
+        return len(self._legs)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the cached legs."""
+        return self._nbytes
+
+    def close(self) -> None:
+        """Close the database connection, if any."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def lookup(
+        self, version: str, coords: Sequence[Dict[str, float]]
+    ) -> List[Leg | None]:
+        """
+        Cached legs between consecutive points.
+
+        Args:
+            version: Dataset version tag (see pair_cache.dataset_version)
+            coords: Ordered coordinate dicts with 'lat' and 'lng' keys
+
+        Returns:
+            One Leg (or None when not cached) per pair of consecutive points
+        """
+        ids = point_ids(coords).tolist()
+        keys = [(version, src, dst) for src, dst in zip(ids, ids[1:])]
+
+        with self._lock:
+            legs = []
+            for key in keys:
+                leg = self._legs.get(key)
+                if leg is not None:
+                    self._legs.move_to_end(key)
+                legs.append(leg)
+
+            missing = [k for k, leg in enumerate(legs) if leg is None]
+            if missing and self._connection is not None:
+                for k in missing:
+                    leg = self._load(keys[k])
+                    if leg is not None:
+                        legs[k] = leg
+                        self._remember(keys[k], leg)
+                self._connection.commit()
+
+        found = sum(leg is not None for leg in legs)
+        self.hits += found
+        self.misses += len(legs) - found
+        return legs
+
+    def store(
+        self,
+        version: str,
+        coords: Sequence[Dict[str, float]],
+        legs: Sequence[Leg],
+    ) -> None:
+        """
+        Cache the legs of a run of consecutive points.
+
+        Args:
+            version: Dataset version tag the legs come from
+            coords: Ordered coordinate dicts, one more than legs
+            legs: Leg between each pair of consecutive points
+        """
+        ids = point_ids(coords).tolist()
+        keys = [(version, src, dst) for src, dst in zip(ids, ids[1:])]
+
+        with self._lock:
+            if version not in self._current_versions:
+                self._purge_other_versions(version)
+            for key, leg in zip(keys, legs):
+                self._remember(key, leg)
+
+            if self._connection is not None:
+                used = int(time.time())
+                self._connection.executemany(
+                    """
+                    INSERT INTO legs (version, src, dst, geometry, distance,
+                                      duration, src_name, dst_name, used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (version, src, dst) DO UPDATE SET
+                        geometry = excluded.geometry,
+                        distance = excluded.distance,
+                        duration = excluded.duration,
+                        src_name = excluded.src_name,
+                        dst_name = excluded.dst_name,
+                        used = excluded.used
+                    """,
+                    (
+                        (*key, leg.geometry, leg.distance, leg.duration, *leg.names, used)
+                        for key, leg in zip(keys, legs)
+                    ),
+                )
+                self._evict()
+                self._connection.commit()
+
+    def _remember(self, key: LegKey, leg: Leg) -> None:
+        """Add a leg to the memory LRU, evicting old legs (lock held)."""
+        previous = self._legs.pop(key, None)
+        if previous is not None:
+            self._nbytes -= previous.nbytes
+        self._legs[key] = leg
+        self._nbytes += leg.nbytes
+        while self._nbytes > self.max_bytes and self._legs:
+            _, evicted = self._legs.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def _load(self, key: LegKey) -> Leg | None:
+        """Read a leg from the file and mark it as used (lock held)."""
+        row = self._connection.execute(
+            """
+            SELECT geometry, distance, duration, src_name, dst_name FROM legs
+            WHERE version = ? AND src = ? AND dst = ?
+            """,
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        self._connection.execute(
+            "UPDATE legs SET used = ? WHERE version = ? AND src = ? AND dst = ?",
+            (int(time.time()), *key),
+        )
+        geometry, distance, duration, src_name, dst_name = row
+        return Leg(geometry, distance, duration, (src_name, dst_name))
+
+    def _purge_other_versions(self, version: str) -> None:
+        """Drop legs of older datasets of the same backend (lock held)."""
+        backend = version.split(":", 1)[0]
+        stale = [
+            key
+            for key in self._legs
+            if key[0] != version and key[0].startswith(f"{backend}:")
+        ]
+        for key in stale:
+            self._nbytes -= self._legs.pop(key).nbytes
+        deleted = len(stale)
+        if self._connection is not None:
+            deleted += self._connection.execute(
+                "DELETE FROM legs WHERE version LIKE ? AND version != ?",
+                (f"{backend}:%", version),
+            ).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} cached legs of outdated {backend} datasets")
+        self._current_versions = {
+            v for v in self._current_versions if not v.startswith(f"{backend}:")
+        }
+        self._current_versions.add(version)
+
+    def _evict(self) -> None:
+        """Evict least recently used legs of the file above the cap (lock held)."""
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM legs").fetchone()
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * EVICTION_TARGET)
+        self._connection.execute(
+            """
+            DELETE FROM legs WHERE (version, src, dst) IN (
+                SELECT version, src, dst FROM legs ORDER BY used LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        logger.info(f"Evicted {excess} least recently used cached legs")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cache size and hit/miss counters (legs)."""
+        with self._lock:
+            stored = None
+            if self._connection is not None:
+                (stored,) = self._connection.execute(
+                    "SELECT COUNT(*) FROM legs"
+                ).fetchone()
+            return {
+                "entries": len(self._legs),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+                "stored_entries": stored,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache: LegCache | None = None
+_unavailable = False
+
+
+def get_leg_cache() -> LegCache | None:
+    """Process-wide leg cache, or None if disabled or unavailable."""
+    global _cache, _unavailable
+    if _cache is None and LEG_CACHE_MAX_MB > 0 and not _unavailable:
+        try:
+            _cache = LegCache()
+        except sqlite3.Error as e:
+            logger.warning(f"Leg cache unavailable ({LEG_CACHE_PATH}): {e}")
+            _unavailable = True
+    return _cache
+
+
+def close_leg_cache() -> None:
+    """Close the process-wide leg cache."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -1,21 +1,44 @@
 """
 Iterative Distance/Duration Matrix Builder
 
-Constructs complete distance and duration matrices by making sequential
+Constructs complete distance and duration matrices by making batched
 requests to the public OSRM API, respecting rate limits and API constraints.
 
 When the local container is unavailable, this module allows building matrices
-for any number of coordinates by iteratively requesting batches.
+for any number of coordinates by iteratively requesting batches. Batches run
+concurrently on the event loop (up to a configurable budget) and share the
+process-wide public API rate limiter, so a large build never blocks other
+requests and concurrent builds never exceed the public router's rate.
 """
 
-import time
-from typing import List, Tuple, Dict
+import asyncio
+import os
+from typing import Callable, List, Tuple, Dict
 from dataclasses import dataclass
 
-import requests
-from geopy.distance import geodesic
+import httpx
+import numpy as np
 
 from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.cost_matrix import COST_DTYPE
+from webrotas.domain.geospatial.distance import (
+    coords_to_arrays,
+    pairwise_distances,
+    travel_time_s,
+)
+from webrotas.infrastructure.routing.circuit_breaker import (
+    CircuitOpenError,
+    get_circuit_breaker,
+)
+from webrotas.infrastructure.routing.http_client import (
+    PUBLIC_BACKEND,
+    PUBLIC_OSRM_URL,
+    get_http_client,
+)
+from webrotas.infrastructure.routing.rate_limiter import (
+    AsyncTokenBucket,
+    get_public_rate_limiter,
+)
 
 logger = get_logger(__name__)
 
@@ -23,10 +46,12 @@ logger = get_logger(__name__)
 PUBLIC_API_BATCH_SIZE = 95  # Conservative: 95 waypoints + 1 origin
 PUBLIC_API_MAX_RETRIES = 3
 PUBLIC_API_RETRY_BASE_DELAY = 1.0  # seconds
-PUBLIC_API_RATE_LIMIT_DELAY = 0.5  # seconds between requests
+PUBLIC_API_MAX_CONCURRENT = int(os.getenv("PUBLIC_API_MAX_CONCURRENT", 4))
 TIMEOUT = 10
 
-URL_TABLE = "http://router.project-osrm.org/table/v1/driving/{coord_str}?annotations=distance,duration"
+URL_TABLE = PUBLIC_OSRM_URL + "/table/v1/driving/{coord_str}?annotations=distance,duration"
+
+ProgressCallback = Callable[[int, int], None]
 
 
 @dataclass
@@ -56,7 +81,7 @@ class IterativeMatrixBuilder:
     from the public OSRM API.
 
     The algorithm splits coordinates into batches respecting the 100-waypoint
-    public API limit and makes sequential requests with rate limiting and
+    public API limit and requests them concurrently, with rate limiting and
     automatic fallback to geodesic calculation on failures.
     """
 
@@ -66,7 +91,10 @@ class IterativeMatrixBuilder:
         batch_size: int = PUBLIC_API_BATCH_SIZE,
         max_retries: int = PUBLIC_API_MAX_RETRIES,
         retry_delay: float = PUBLIC_API_RETRY_BASE_DELAY,
-        rate_limit_delay: float = PUBLIC_API_RATE_LIMIT_DELAY,
+        rate_limit_delay: float | None = None,
+        max_concurrent: int = PUBLIC_API_MAX_CONCURRENT,
+        rate_limiter: AsyncTokenBucket | None = None,
+        progress_callback: ProgressCallback | None = None,
     ):
         """
         Initialize the matrix builder.
@@ -76,28 +104,45 @@ class IterativeMatrixBuilder:
             batch_size: Max waypoints per request (default: 95)
             max_retries: Max retry attempts per request
             retry_delay: Base delay for exponential backoff (seconds)
-            rate_limit_delay: Delay between requests (seconds)
+            rate_limit_delay: Min delay between requests of this builder (seconds).
+                When omitted, the process-wide public API rate limiter is used;
+                0 disables rate limiting.
+            max_concurrent: Max batch requests in flight
+            rate_limiter: Explicit rate limiter (overrides rate_limit_delay)
+            progress_callback: Called as (completed_batches, total_batches)
+                after each batch finishes
         """
         self.coords = coords
         self.batch_size = batch_size
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.rate_limit_delay = rate_limit_delay
+        self.max_concurrent = max(1, max_concurrent)
+        self.progress_callback = progress_callback
         self.num_coords = len(coords)
 
+        if rate_limiter is not None:
+            self.rate_limiter = rate_limiter
+        elif rate_limit_delay is None:
+            self.rate_limiter = get_public_rate_limiter()
+        elif rate_limit_delay > 0:
+            self.rate_limiter = AsyncTokenBucket(rate=1.0 / rate_limit_delay)
+        else:
+            self.rate_limiter = None
+
         # Initialize matrices with zeros
-        self.distances = [[0.0] * self.num_coords for _ in range(self.num_coords)]
-        self.durations = [[0.0] * self.num_coords for _ in range(self.num_coords)]
+        self.distances = np.zeros((self.num_coords, self.num_coords), dtype=COST_DTYPE)
+        self.durations = np.zeros((self.num_coords, self.num_coords), dtype=COST_DTYPE)
 
         # Track failed pairs for fallback
         self.failed_pairs: List[Tuple[int, int]] = []
 
-    def build(self) -> Tuple[List[List[float]], List[List[float]]]:
+    async def build(self) -> Tuple[np.ndarray, np.ndarray]:
         """
         Build the complete distance and duration matrices.
 
         Returns:
-            Tuple of (distances, durations) matrices
+            Tuple of (distances, durations) float32 arrays; pairs OSRM could not
+            route are NaN
 
         Raises:
             ValueError: If matrix building fails completely
@@ -108,15 +153,23 @@ class IterativeMatrixBuilder:
         )
 
         batches = self._create_batches()
-        logger.info(f"Created {len(batches)} batches for API requests")
+        logger.info(
+            f"Created {len(batches)} batches for API requests "
+            f"({self.max_concurrent} in flight)"
+        )
 
-        for batch_idx, batch in enumerate(batches):
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        completed = 0
+
+        async def run_batch(batch_idx: int, batch: RequestBatch) -> None:
+            nonlocal completed
             logger.debug(
                 f"Processing batch {batch_idx + 1}/{len(batches)} "
                 f"(origin {batch.origin_idx}, waypoints {len(batch.waypoint_indices)})"
             )
 
-            success = self._process_batch(batch)
+            async with semaphore:
+                success = await self._process_batch(batch)
 
             if not success:
                 logger.warning(
@@ -124,9 +177,13 @@ class IterativeMatrixBuilder:
                     f"will use geodesic fallback for failed pairs"
                 )
 
-            # Rate limiting between requests
-            if batch_idx < len(batches) - 1:
-                time.sleep(self.rate_limit_delay)
+            completed += 1
+            if self.progress_callback is not None:
+                self.progress_callback(completed, len(batches))
+
+        async with asyncio.TaskGroup() as group:
+            for batch_idx, batch in enumerate(batches):
+                group.create_task(run_batch(batch_idx, batch))
 
         # Apply geodesic fallback for any failed pairs
         if self.failed_pairs:
@@ -188,7 +245,7 @@ class IterativeMatrixBuilder:
 
         return batches
 
-    def _process_batch(self, batch: RequestBatch) -> bool:
+    async def _process_batch(self, batch: RequestBatch) -> bool:
         """
         Process a single batch with retries.
 
@@ -200,31 +257,41 @@ class IterativeMatrixBuilder:
         """
         for attempt in range(self.max_retries):
             try:
-                response = self._request_batch(batch)
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire()
+                response = await self._request_batch(batch)
                 self._merge_batch_response(batch, response)
                 return True
 
-            except requests.exceptions.RequestException as e:
+            except CircuitOpenError as e:
+                # Public router is known to be down: don't wait out retries
+                logger.warning(f"Skipping batch request: {e}")
+                break
+
+            except httpx.HTTPError as e:
                 delay = self.retry_delay * (2**attempt)
                 logger.warning(
                     f"Batch request attempt {attempt + 1}/{self.max_retries} failed: {e}. "
                     f"Retrying in {delay:.1f}s..."
                 )
                 if attempt < self.max_retries - 1:
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
 
-            except (ValueError, KeyError) as e:
+            except (ValueError, KeyError, IndexError, TypeError) as e:
                 logger.error(f"Invalid response format in batch: {e}")
-                return False
+                break
 
         # All retries exhausted
         self._mark_batch_failed(batch)
         return False
 
-    def _request_batch(self, batch: RequestBatch) -> Dict:
+    async def _request_batch(self, batch: RequestBatch) -> Dict:
         """
         Request matrix for a batch from public API.
 
+        Uses the shared public API client; the outcome is recorded in the
+        public backend's circuit breaker.
+
         Args:
             batch: The RequestBatch to request
 
@@ -232,15 +299,28 @@ class IterativeMatrixBuilder:
             Response JSON from API
 
         Raises:
-            requests.exceptions.RequestException: On HTTP errors
+            CircuitOpenError: If the public backend's circuit breaker is open
+            httpx.HTTPError: On HTTP errors
             ValueError: On invalid response format
         """
+        breaker = get_circuit_breaker(PUBLIC_BACKEND)
         coord_str = batch.to_coord_string()
         url = URL_TABLE.format(coord_str=coord_str)
 
         logger.debug(f"Requesting batch from {url[:80]}...")
 
-        response = requests.get(url, timeout=TIMEOUT)
+        client = get_http_client(PUBLIC_BACKEND)
+        with breaker.request_slot():
+            try:
+                response = await client.get(url, timeout=TIMEOUT)
+            except httpx.TransportError as e:
+                breaker.record_failure(type(e).__name__)
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure(f"HTTP {response.status_code}")
+            else:
+                breaker.record_success()
         response.raise_for_status()
 
         data = response.json()
@@ -258,25 +338,23 @@ class IterativeMatrixBuilder:
             batch: The RequestBatch that was requested
             response: The API response JSON
         """
-        distances = response["distances"]
-        durations = response["durations"]
+        # None (unroutable) becomes NaN
+        size = batch.size
+        distances = np.array(response["distances"], dtype=float)[:size, :size]
+        durations = np.array(response["durations"], dtype=float)[:size, :size]
+        if distances.shape != (size, size) or durations.shape != (size, size):
+            raise ValueError(
+                f"Batch response has shape {distances.shape}, expected {(size, size)}"
+            )
 
-        # First row is origin → waypoints
+        # Response row/column 0 is the origin, the rest are the waypoints
         origin_idx = batch.origin_idx
-        for local_idx, waypoint_idx in enumerate(batch.waypoint_indices):
-            self.distances[origin_idx][waypoint_idx] = distances[0][local_idx + 1]
-            self.durations[origin_idx][waypoint_idx] = durations[0][local_idx + 1]
-
-        # Remaining rows are waypoint → waypoints (if needed)
-        for local_origin_idx, waypoint_origin_idx in enumerate(batch.waypoint_indices):
-            for local_dest_idx, waypoint_dest_idx in enumerate(batch.waypoint_indices):
-                if waypoint_origin_idx != waypoint_dest_idx:
-                    self.distances[waypoint_origin_idx][waypoint_dest_idx] = distances[
-                        local_origin_idx + 1
-                    ][local_dest_idx + 1]
-                    self.durations[waypoint_origin_idx][waypoint_dest_idx] = durations[
-                        local_origin_idx + 1
-                    ][local_dest_idx + 1]
+        waypoints = np.asarray(batch.waypoint_indices, dtype=np.intp)
+        for matrix, block in ((self.distances, distances), (self.durations, durations)):
+            matrix[origin_idx, waypoints] = block[0, 1:]
+            matrix[waypoints, origin_idx] = block[1:, 0]
+            matrix[np.ix_(waypoints, waypoints)] = block[1:, 1:]
+            matrix[waypoints, waypoints] = 0.0
 
     def _mark_batch_failed(self, batch: RequestBatch) -> None:
         """
@@ -297,15 +375,14 @@ class IterativeMatrixBuilder:
         Args:
             speed_kmh: Speed in km/h for duration calculation
         """
-        for i, j in self.failed_pairs:
-            if i != j:
-                p1 = (self.coords[i]["lat"], self.coords[i]["lng"])
-                p2 = (self.coords[j]["lat"], self.coords[j]["lng"])
-                distance_m = geodesic(p1, p2).meters
-                self.distances[i][j] = distance_m
-                self.durations[i][j] = (distance_m / speed_kmh) * 3.6
-
-                logger.debug(
-                    f"Geodesic fallback: pair ({i}, {j}) = {distance_m:.1f}m, "
-                    f"{self.durations[i][j]:.1f}s"
-                )
+        pairs = np.unique(np.asarray(self.failed_pairs, dtype=np.intp), axis=0)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+        lats, lngs = coords_to_arrays(self.coords)
+        distances = pairwise_distances(lats, lngs, pairs)
+        durations = travel_time_s(distances, speed_kmh)
+
+        self.distances[pairs[:, 0], pairs[:, 1]] = distances
+        self.durations[pairs[:, 0], pairs[:, 1]] = durations
+
+        logger.debug(f"Geodesic fallback filled {len(pairs)} pairs")
@@ -1,5 +1,7 @@
 import asyncio
+import dataclasses
 import math
+import sqlite3
 from typing import List, Tuple, Iterable, Dict, Any, Optional
 from fastapi import HTTPException
 
@@ -9,13 +11,72 @@ from shapely.geometry import LineString, shape
 from shapely.strtree import STRtree
 
 import numpy as np
-from geopy.distance import geodesic
-from ortools.constraint_solver import pywrapcp, routing_enums_pb2
 
 from webrotas.config.logging_config import get_logger
 from webrotas.infrastructure.routing.matrix_builder import IterativeMatrixBuilder
+from webrotas.infrastructure.routing.http_client import (
+    LOCAL_BACKEND,
+    PUBLIC_BACKEND,
+    PUBLIC_OSRM_URL,
+    get_http_client,
+)
+from webrotas.infrastructure.routing.tiled_matrix import (
+    OSRM_MAX_TABLE_SIZE,
+    PUBLIC_OSRM_MAX_COORDINATES,
+    build_tiled_matrix,
+    plan_block_pair_tiles,
+    plan_incremental_tiles,
+    plan_table_tiles,
+)
+from webrotas.infrastructure.routing.rate_limiter import get_public_rate_limiter
+from webrotas.infrastructure.routing.solver_pool import get_solver_pool
+from webrotas.infrastructure.routing.pair_cache import (
+    dataset_version,
+    get_pair_cache,
+    points_to_request,
+    record_dataset_version,
+)
+from webrotas.infrastructure.routing.route_windows import (
+    OSRM_ROUTE_WINDOW_SIZE,
+    build_windowed_route,
+    fetch_route_windows,
+    plan_route_windows,
+    stitch_route_windows,
+)
+from webrotas.infrastructure.routing.leg_cache import (
+    LegCache,
+    get_leg_cache,
+    leg_runs,
+    split_route_legs,
+)
+from webrotas.infrastructure.routing.route_state import (
+    ROUTE_REOPTIMIZE_TIME_FRACTION,
+    RouteState,
+    get_route_state_cache,
+    point_keys,
+)
+from webrotas.infrastructure.routing.clustered_solver import (
+    solve_clustered,
+    use_clustered_solver,
+)
+from webrotas.infrastructure.routing.circuit_breaker import (
+    CircuitOpenError,
+    get_circuit_breaker,
+)
 from webrotas.config.server_hosts import get_osrm_url
-from webrotas.utils.converters.geojson import avoid_zones_to_geojson
+from webrotas.domain.routing.cost_matrix import CostMatrix, as_cost_array
+from webrotas.domain.routing.geometry import OSRM_GEOMETRY_FORMAT, RouteGeometry
+from webrotas.domain.routing.tsp import SolverPolicy
+from webrotas.domain.geospatial.distance import (
+    DEFAULT_MODEL,
+    DistanceModel,
+    coords_to_arrays,
+    distance_matrix,
+    pairwise_distances,
+    travel_time_s,
+)
+from webrotas.domain.avoid_zones.scoring import score_routes
+from webrotas.domain.avoid_zones.zone_set import AvoidZoneSet, get_avoid_zone_set
 
 
 
@@ -26,7 +87,7 @@ logger = get_logger(__name__)
 TIMEOUT = 10
 URL = {
     "table": lambda coord_str: f"http://router.project-osrm.org/table/v1/driving/{coord_str}?annotations=distance,duration",
-    "route": lambda coord_str: f"http://router.project-osrm.org/route/v1/driving/{coord_str}?overview=full&geometries=geojson",
+    "route": lambda coord_str: f"http://router.project-osrm.org/route/v1/driving/{coord_str}?overview=full&geometries=polyline6",
 }
 
 TEST_ROUTE = "/route/v1/driving/-43.105772903105354,-22.90510838815471;-43.089637952126694,-22.917360518277434?overview=full&geometries=polyline&steps=true"
@@ -148,13 +209,17 @@ def load_spatial_index(geojson: Dict[str, Any]) -> tuple[List, Optional[STRtree]
 
 
 def check_route_intersections(
-    coords: List[List[float]], polygons: List, tree: Optional[STRtree]
+    coords, polygons: List, tree: Optional[STRtree]
 ) -> Dict[str, Any]:
     """
     Calculate route-polygon intersections for a given route and set of avoid zone polygons.
 
+    Single-route form of score_routes (lengths are geodesic, in metres
+    before conversion to km); score many candidates with score_routes.
+
     Args:
-        coords: List of [longitude, latitude] coordinates forming the route
+        coords: [longitude, latitude] coordinates forming the route (list of
+            pairs or (n, 2) array, e.g. RouteGeometry.coords)
         polygons: List of shapely polygon objects representing avoid zones
         tree: STRtree spatial index of polygons (or None if no polygons)
 
@@ -165,48 +230,8 @@ def check_route_intersections(
         - penalty_ratio: Fraction of route within zones (0.0-1.0)
         - route_length_km: Total route length in kilometers
     """
-    if not polygons or tree is None:
-        return {
-            "intersection_count": 0,
-            "total_length_km": 0.0,
-            "penalty_ratio": 0.0,
-            "route_length_km": 0.0,
-        }
-
     try:
-        route_line = LineString(coords)
-        intersection_count = 0
-        total_intersection_length = 0
-
-        # Query spatial index for candidate polygons
-        candidate_indices = tree.query(route_line)
-
-        for idx in candidate_indices:
-            polygon = polygons[idx]
-            if route_line.intersects(polygon):
-                intersection_count += 1
-                intersection = route_line.intersection(polygon)
-                # Handle both Point and LineString/MultiLineString intersections
-                if hasattr(intersection, "length"):
-                    total_intersection_length += intersection.length
-
-        total_route_length = route_line.length
-        penalty_ratio = (
-            total_intersection_length / total_route_length
-            if total_route_length > 0
-            else 0.0
-        )
-
-        # Convert to km for readability
-        total_intersection_km = total_intersection_length / 1000
-        route_length_km = total_route_length / 1000
-
-        return {
-            "intersection_count": intersection_count,
-            "total_length_km": round(total_intersection_km, 3),
-            "penalty_ratio": min(penalty_ratio, 1.0),  # Cap at 100%
-            "route_length_km": round(route_length_km, 3),
-        }
+        return score_routes([coords], tree if polygons else None).summary(0)
     except Exception as e:
         logger.error(f"Error calculating route intersections: {e}")
         return {
@@ -235,7 +260,8 @@ async def route_with_zones(
         alternatives: Number of alternative routes (1-3)
 
     Returns:
-        OSRM response with added penalties and zones metadata
+        OSRM response (polyline6 geometries) with added penalties and zones
+        metadata
     """
     try:
         # Validate avoid_mode
@@ -246,9 +272,9 @@ async def route_with_zones(
             )
 
         # Load zones configuration
-        polys, tree = load_spatial_index(geojson)
+        zone_set = AvoidZoneSet.from_geojson(geojson)
 
-        polygon_count = len(polys)
+        polygon_count = len(zone_set.polygons)
         logger.info(f"Loaded {polygon_count} avoid zone polygons")
 
         # Request route from OSRM
@@ -256,7 +282,7 @@ async def route_with_zones(
         params = {
             "alternatives": alternatives,
             "overview": "full",
-            "geometries": "geojson",
+            "geometries": OSRM_GEOMETRY_FORMAT,
         }
         osrm_response = await request_osrm(
             request_type="route",
@@ -272,9 +298,13 @@ async def route_with_zones(
         processed_routes = []
         intersection_info = {}
 
+        # Score every alternative in one pass
+        scores = score_routes(
+            [route["geometry"] for route in osrm_response["routes"]], zone_set.tree
+        )
+
         for idx, route in enumerate(osrm_response["routes"]):
-            coords = route["geometry"]["coordinates"]
-            intersection_data = check_route_intersections(coords, polys, tree)
+            intersection_data = scores.summary(idx)
 
             # Apply avoid mode logic
             if avoid_mode == "filter" and intersection_data["intersection_count"] > 0:
@@ -328,26 +358,41 @@ async def route_with_zones(
         raise HTTPException(status_code=500, detail=f"Routing failed: {str(e)}")
 
 
-async def make_request(url, params=None, timeout=30.0, max_retries=2):
+async def make_request(
+    url, params=None, timeout=30.0, max_retries=2, backend=LOCAL_BACKEND
+):
     """Make an async HTTP GET request with retry logic and proper parameter handling.
 
+    Requests go through the shared, keep-alive client of the given backend, so
+    consecutive calls reuse pooled connections instead of opening new ones. Each
+    attempt is gated by the backend's circuit breaker and its outcome recorded.
+
     Args:
         url: Base URL (may already contain query parameters)
         params: Optional dict of additional query parameters
         timeout: Request timeout in seconds
         max_retries: Maximum number of retry attempts
+        backend: OSRM backend whose pooled client is used ("local" or "public")
 
     Returns:
         Parsed JSON response
 
     Raises:
         httpx.HTTPError: If all retry attempts fail
+        CircuitOpenError: If the backend's circuit breaker rejects the request
     """
     last_error = None
+    client = get_http_client(backend)
+    breaker = get_circuit_breaker(backend)
 
     for attempt in range(max_retries):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
+        if attempt > 0:
+            # Back off outside the breaker slot, so a half-open trial slot is
+            # not held while waiting
+            await asyncio.sleep(0.5 * attempt)
+
+        with breaker.request_slot():
+            try:
                 # Build full URL with parameters
                 if params:
                     # Use httpx's URL class to properly merge parameters
@@ -355,33 +400,37 @@ async def make_request(url, params=None, timeout=30.0, max_retries=2):
                 else:
                     request_url = url
 
-                logger.debug(
-                    f"Request attempt {attempt + 1}/{max_retries}: {request_url}"
-                )
-                response = await client.get(request_url)
+                logger.debug(f"Request attempt {attempt + 1}/{max_retries}: {request_url}")
+                try:
+                    response = await client.get(request_url, timeout=timeout)
+                except httpx.TransportError as e:
+                    breaker.record_failure(type(e).__name__)
+                    raise
+
+                # 4xx means the backend is up but rejected the query (e.g. TooBig)
+                if response.status_code >= 500:
+                    breaker.record_failure(f"HTTP {response.status_code}")
+                else:
+                    breaker.record_success()
+
                 response.raise_for_status()
-                return response.json()
+                data = response.json()
+                record_dataset_version(backend, data)
+                return data
 
-        except httpx.ConnectError as e:
-            last_error = e
-            logger.warning(
-                f"Connection error on attempt {attempt + 1}/{max_retries}: {e}"
-            )
-            if attempt < max_retries - 1:
-                # Wait a bit before retrying (exponential backoff)
-                await asyncio.sleep(0.5 * (attempt + 1))
-
-        except httpx.ReadTimeout as e:
-            last_error = e
-            logger.warning(f"Read timeout on attempt {attempt + 1}/{max_retries}: {e}")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(0.5 * (attempt + 1))
-
-        except httpx.HTTPError as e:
-            last_error = e
-            logger.warning(f"HTTP error on attempt {attempt + 1}/{max_retries}: {e}")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(0.5 * (attempt + 1))
+            except httpx.ConnectError as e:
+                last_error = e
+                logger.warning(
+                    f"Connection error on attempt {attempt + 1}/{max_retries}: {e}"
+                )
+
+            except httpx.ReadTimeout as e:
+                last_error = e
+                logger.warning(f"Read timeout on attempt {attempt + 1}/{max_retries}: {e}")
+
+            except httpx.HTTPError as e:
+                last_error = e
+                logger.warning(f"HTTP error on attempt {attempt + 1}/{max_retries}: {e}")
 
     # All retries failed, raise the last error
     if last_error:
@@ -420,6 +469,9 @@ async def request_osrm(
         )
         return data
 
+    except CircuitOpenError as e:
+        logger.warning(f"Skipping OSRM request: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except (httpx.ConnectError, httpx.ReadTimeout) as e:
         logger.error(f"OSRM connection error: {e}")
         raise HTTPException(
@@ -451,6 +503,7 @@ async def request_osrm_public_api(
     Request route from public OSRM API (router.project-osrm.org).
 
     This is used as a fallback when the local OSRM container is unavailable.
+    Requests are paced by the process-wide public API rate limiter.
 
     Args:
         request_type: Type of request ("route" or "table")
@@ -467,12 +520,20 @@ async def request_osrm_public_api(
     """
     try:
         assert request_type in {"route", "table"}, "Invalid request type"
-        url = f"http://router.project-osrm.org/{request_type}/v1/driving/{coordinates}"
+        url = f"{PUBLIC_OSRM_URL}/{request_type}/v1/driving/{coordinates}"
+        await get_public_rate_limiter().acquire()
         data = await make_request(
-            url, params=params, timeout=timeout, max_retries=max_retries
+            url,
+            params=params,
+            timeout=timeout,
+            max_retries=max_retries,
+            backend=PUBLIC_BACKEND,
         )
         return data
 
+    except CircuitOpenError as e:
+        logger.warning(f"Skipping public OSRM request: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except (httpx.ConnectError, httpx.ReadTimeout) as e:
         logger.error(f"Public OSRM connection error: {e}")
         raise HTTPException(
@@ -495,12 +556,14 @@ async def request_osrm_public_api(
 
 # -----------------------------------------------------------------------------------#
 async def compute_distance_and_duration_matrices(
-    coords, avoid_zones: Iterable | None = None
+    coords, avoid_zones: Iterable | None = None, use_container: bool | None = None
 ):
     """
     Retrieve distance and duration matrices using fallback strategy.
 
-    Attempts to fetch routing matrices in this order:
+    Pairs already in the persistent pair cache are reused; when only some
+    are cached, only the rows/columns of points with missing pairs are
+    requested. Otherwise matrices are fetched in this order:
     1. Local container (if many points or avoidance zones present)
     2. Public OSRM API
     3. Iterative matrix builder (for large datasets)
@@ -509,17 +572,171 @@ async def compute_distance_and_duration_matrices(
     Args:
         coords: List of coordinate dicts with 'lat' and 'lng' keys
         avoid_zones: Optional iterable of avoidance zones
+        use_container: Whether to start with the local container; decided
+            from coords and avoid_zones when None. Sub-problems of a larger
+            request (clusters) pass the decision made for the whole request
 
     Returns:
-        tuple: (distances, durations) matrices
+        CostMatrix: Distance and duration matrices (NaN for unroutable pairs)
     """
-    use_container = _should_use_local_container(coords, avoid_zones)
+    if use_container is None:
+        use_container = _should_use_local_container(coords, avoid_zones)
+
+    backend = LOCAL_BACKEND if use_container else PUBLIC_BACKEND
+    cached = await _get_matrix_from_pair_cache(coords, backend)
+    if cached is not None:
+        return cached
 
     if use_container:
         return await _get_matrix_with_local_container_priority(coords, avoid_zones)
     return await _get_matrix_with_public_api_priority(coords)
 
 
+async def _get_matrix_from_pair_cache(coords, backend: str) -> CostMatrix | None:
+    """
+    Build matrices from the pair cache, requesting only missing sub-blocks.
+
+    Args:
+        coords: List of coordinates
+        backend: Backend whose dataset the values must come from
+
+    Returns:
+        CostMatrix, or None when the cache cannot help (disabled, backend
+        version unknown, nothing cached, or the missing blocks could not be
+        fetched from the same dataset)
+    """
+    version = dataset_version(backend)
+    if version is None or len(coords) < 2:
+        return None
+    pair_cache = get_pair_cache()
+    if pair_cache is None:
+        return None
+
+    try:
+        distances, durations, found = await asyncio.to_thread(
+            pair_cache.lookup, version, coords
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Pair cache lookup failed: {e}")
+        return None
+
+    if found.all():
+        logger.info(f"Matrix for {len(coords)} points served from the pair cache")
+        return CostMatrix(distances, durations)
+
+    missing = points_to_request(found)
+    if len(missing) >= len(coords) - 1:
+        # Nothing useful cached
+        return None
+
+    logger.info(
+        f"Pair cache has {len(coords) - len(missing)}/{len(coords)} points, "
+        f"requesting rows/columns for {len(missing)}"
+    )
+    filled_by = await _request_missing_blocks(
+        coords, missing, distances, durations, [backend]
+    )
+    if filled_by is None or dataset_version(backend) != version:
+        # Fetch failed, or the dataset changed under the cached values
+        return None
+    return CostMatrix(distances, durations)
+
+
+async def _request_missing_blocks(
+    coords, missing, distances: np.ndarray, durations: np.ndarray, backends
+) -> str | None:
+    """
+    Fill the rows and columns of some points in place, trying backends in order.
+
+    Only cells that are NaN are overwritten. Fetched blocks are added to the
+    pair cache.
+
+    Args:
+        coords: List of coordinates
+        missing: Indices of the points whose rows/columns are requested
+        distances: Distance matrix to fill (float32, NaN for unknown)
+        durations: Duration matrix to fill (float32, NaN for unknown)
+        backends: Backends to try, in order ("local" and/or "public")
+
+    Returns:
+        The backend that filled the blocks, or None if none could
+    """
+    num_points = len(coords)
+    requests = {
+        LOCAL_BACKEND: (request_osrm, OSRM_MAX_TABLE_SIZE),
+        PUBLIC_BACKEND: (request_osrm_public_api, PUBLIC_OSRM_MAX_COORDINATES // 2),
+    }
+
+    for backend in backends:
+        if not get_circuit_breaker(backend).is_available():
+            logger.warning(f"{backend} circuit is open, skipping it")
+            continue
+        request_fn, tile_size = requests[backend]
+        try:
+            tiles = plan_incremental_tiles(num_points, list(missing), tile_size)
+            new_distances, new_durations = await build_tiled_matrix(
+                coords, request_fn, tiles
+            )
+        except Exception as e:
+            logger.warning(f"Block request to {backend} failed: {e}")
+            continue
+
+        fetched = np.zeros((num_points, num_points), dtype=bool)
+        fetched[missing, :] = True
+        fetched[:, missing] = True
+        _store_pairs(backend, coords, new_distances, new_durations, fetched)
+
+        unknown = np.isnan(distances)
+        distances[unknown] = new_distances[unknown]
+        durations[unknown] = new_durations[unknown]
+        return backend
+    return None
+
+
+# Background pair cache writes (kept referenced until done)
+_pending_stores: set = set()
+
+
+def _store_pairs(backend: str, coords, distances, durations, mask=None) -> None:
+    """
+    Add router-derived cells to the pair cache in the background.
+
+    Must be called before the matrices are repaired with geodesic values;
+    the arrays are copied.
+
+    Args:
+        backend: Backend the values come from
+        coords: List of coordinates
+        distances: Distance matrix over coords
+        durations: Duration matrix over coords
+        mask: Optional bool matrix selecting the cells to store
+    """
+    version = dataset_version(backend)
+    pair_cache = get_pair_cache() if version is not None else None
+    if pair_cache is None:
+        return
+
+    task = asyncio.create_task(
+        asyncio.to_thread(
+            pair_cache.store,
+            version,
+            list(coords),
+            np.array(distances, dtype=np.float32),
+            np.array(durations, dtype=np.float32),
+            mask,
+        )
+    )
+    _pending_stores.add(task)
+    task.add_done_callback(_store_done)
+
+
+def _store_done(task: asyncio.Task) -> None:
+    """Log failed pair cache writes."""
+    _pending_stores.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Pair cache write failed: {task.exception()}")
+
+
 def _should_use_local_container(coords, avoid_zones: Iterable | None = None) -> bool:
     """
     Determine if local container should be used for routing.
@@ -560,52 +777,68 @@ async def _get_matrix_with_local_container_priority(coords, avoid_zones):
     3. Iterative matrix builder (if no avoidance zones)
     4. Geodesic calculation
 
+    Backends whose circuit breaker is open are skipped immediately.
+
     Args:
         coords: List of coordinates
         avoid_zones: Optional iterable of avoidance zones
 
     Returns:
-        tuple: (distances, durations) matrices
+        CostMatrix: Distance and duration matrices
     """
-    try:
-        return await get_osrm_matrix_from_local_container(coords)
-    except Exception as e:
-        logger.error(
-            f"Local container failed: {e}. ⚠️ Attempting parallel Public API as fallback",
-            exc_info=True,
-        )
+    local_breaker = get_circuit_breaker(LOCAL_BACKEND)
+    public_breaker = get_circuit_breaker(PUBLIC_BACKEND)
 
-        # NEW: Try parallel Public API even with avoid zones
+    if local_breaker.is_available():
         try:
-            from webrotas.infrastructure.routing.parallel_public_api import (
-                get_distance_matrix_parallel_public_api,
-            )
-
-            logger.info("🟡 Avoid zones present, using parallel Public API requests")
-            return await get_distance_matrix_parallel_public_api(
-                request_osrm_public_api, coords
-            )
-        except Exception as parallel_e:
-            logger.warning(
-                f"Parallel Public API failed: {parallel_e}. Trying iterative matrix builder",
+            return await get_osrm_matrix_from_local_container(coords)
+        except Exception as e:
+            logger.error(
+                f"Local container failed: {e}. ⚠️ Attempting parallel Public API as fallback",
                 exc_info=True,
             )
+    else:
+        logger.warning("Local container circuit is open, skipping it")
 
-        # Fallback to iterative builder if no avoidance zones
-        if avoid_zones is None:
-            try:
-                return get_osrm_matrix_iterative(coords)
-            except Exception as iterative_e:
-                logger.warning(
-                    f"Iterative matrix builder also failed: {iterative_e}. Using geodesic calculation"
-                )
-                return get_geodesic_matrix(coords, speed_kmh=40)
-        else:
-            # Last resort: geodesic calculation
+    if not public_breaker.is_available():
+        logger.warning(
+            "Public API circuit is open, skipping it. Using geodesic calculation"
+        )
+        return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
+
+    # NEW: Try parallel Public API even with avoid zones
+    try:
+        from webrotas.infrastructure.routing.parallel_public_api import (
+            get_distance_matrix_parallel_public_api,
+        )
+
+        logger.info("🟡 Avoid zones present, using parallel Public API requests")
+        matrix = await get_distance_matrix_parallel_public_api(
+            request_osrm_public_api, coords
+        )
+        _store_pairs(PUBLIC_BACKEND, coords, matrix.distances, matrix.durations)
+        return matrix
+    except Exception as parallel_e:
+        logger.warning(
+            f"Parallel Public API failed: {parallel_e}. Trying iterative matrix builder",
+            exc_info=True,
+        )
+
+    # Fallback to iterative builder if no avoidance zones
+    if avoid_zones is None and public_breaker.is_available():
+        try:
+            return await get_osrm_matrix_iterative(coords)
+        except Exception as iterative_e:
             logger.warning(
-                "All routing services failed. Using geodesic calculation as fallback"
+                f"Iterative matrix builder also failed: {iterative_e}. Using geodesic calculation"
             )
-            return get_geodesic_matrix(coords, speed_kmh=40)
+            return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
+    else:
+        # Last resort: geodesic calculation
+        logger.warning(
+            "All routing services failed. Using geodesic calculation as fallback"
+        )
+        return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
 
 
 async def _get_matrix_with_public_api_priority(coords):
@@ -618,102 +851,203 @@ async def _get_matrix_with_public_api_priority(coords):
     3. Iterative matrix builder
     4. Geodesic calculation
 
+    Backends whose circuit breaker is open are skipped immediately.
+
     Args:
         coords: List of coordinates
 
     Returns:
-        tuple: (distances, durations) matrices
+        CostMatrix: Distance and duration matrices
     """
-    try:
-        return await get_osrm_matrix_public_api(coords)
-    except (httpx.HTTPError, ValueError, KeyError) as e:
-        logger.error(f"Public API failed: {e}. Trying local container", exc_info=True)
+    local_breaker = get_circuit_breaker(LOCAL_BACKEND)
+    public_breaker = get_circuit_breaker(PUBLIC_BACKEND)
+
+    if public_breaker.is_available():
+        try:
+            return await get_osrm_matrix_public_api(coords)
+        except (HTTPException, httpx.HTTPError, ValueError, KeyError) as e:
+            logger.error(
+                f"Public API failed: {e}. Trying local container", exc_info=True
+            )
+    else:
+        logger.warning("Public API circuit is open, trying local container")
+
+    if local_breaker.is_available():
         try:
             return await get_osrm_matrix_from_local_container(coords)
         except Exception as container_e:
             logger.warning(
                 f"Local container also failed: {container_e}. Trying iterative matrix builder"
             )
-            try:
-                return get_osrm_matrix_iterative(coords)
-            except Exception as iterative_e:
-                logger.warning(
-                    f"Iterative matrix builder also failed: {iterative_e}. Using geodesic calculation"
-                )
-                return get_geodesic_matrix(coords, speed_kmh=40)
+    else:
+        logger.warning("Local container circuit is open, skipping it")
+
+    if not public_breaker.is_available():
+        logger.warning("No OSRM backend available. Using geodesic calculation")
+        return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
+
+    try:
+        return await get_osrm_matrix_iterative(coords)
+    except Exception as iterative_e:
+        logger.warning(
+            f"Iterative matrix builder also failed: {iterative_e}. Using geodesic calculation"
+        )
+        return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
 
 
-def _ensure_valid_matrices(coords, distances, durations):
+async def compute_incremental_matrices(
+    coords, state: RouteState, previous_index: np.ndarray, avoid_zones=None
+) -> CostMatrix:
+    """
+    Build matrices from a previous route's matrix plus the added points.
+
+    Cells between points present in the previous request are copied; only
+    rows and columns of added points are requested, from the backend
+    _should_use_local_container would pick first and then the other one.
+    Cells no backend could fill stay NaN, so _ensure_valid_matrices repairs
+    them geodesically.
+
+    Args:
+        coords: List of coordinate dicts with 'lat' and 'lng' keys
+        state: Stored state of the previous request for this route
+        previous_index: Previous index of each point, -1 for added points
+            (see RouteState.match)
+        avoid_zones: Optional iterable of avoidance zones
+
+    Returns:
+        CostMatrix: Distance and duration matrices (NaN for unfilled pairs)
+    """
+    num_points = len(coords)
+    kept = np.flatnonzero(previous_index >= 0)
+    added = np.flatnonzero(previous_index < 0)
+
+    distances = np.full((num_points, num_points), np.nan, dtype=np.float32)
+    durations = np.full((num_points, num_points), np.nan, dtype=np.float32)
+    block = np.ix_(kept, kept)
+    source = np.ix_(previous_index[kept], previous_index[kept])
+    distances[block] = state.matrix.distances[source]
+    durations[block] = state.matrix.durations[source]
+    np.fill_diagonal(distances, 0)
+    np.fill_diagonal(durations, 0)
+
+    if len(added) == 0:
+        return CostMatrix(distances, durations)
+
+    logger.info(
+        f"Reusing {len(kept)}x{len(kept)} matrix cells, requesting rows/columns "
+        f"for {len(added)} added point(s)"
+    )
+    backends = [LOCAL_BACKEND, PUBLIC_BACKEND]
+    if not _should_use_local_container(coords, avoid_zones):
+        backends.reverse()
+
+    filled_by = await _request_missing_blocks(
+        coords, added, distances, durations, backends
+    )
+    if filled_by is None:
+        logger.warning("No backend filled the added points, using geodesic values")
+
+    return CostMatrix(distances, durations)
+
+
+def _reoptimization_policy(
+    policy: SolverPolicy, solver_options: Dict[str, Any] | None
+) -> SolverPolicy:
+    """Shorter search for warm-started re-optimization, unless timeLimit is set."""
+    if solver_options and "timeLimit" in solver_options:
+        return policy
+    return dataclasses.replace(
+        policy, time_limit_s=policy.time_limit_s * ROUTE_REOPTIMIZE_TIME_FRACTION
+    )
+
+
+def _ensure_valid_matrices(coords, matrix: CostMatrix) -> CostMatrix:
     """
     Validate and repair distance/duration matrices.
 
     Performs validation checks and attempts to fix invalid pairs using geodesic calculation.
     If validation fails completely, falls back to full geodesic calculation.
+    Valid matrices are repaired in place.
 
     Args:
         coords: List of coordinates
-        distances: Distance matrix
-        durations: Duration matrix
+        matrix: Distance and duration matrices
 
     Returns:
-        tuple: (distances, durations) valid matrices
+        CostMatrix: Valid matrices
     """
-    mat = validate_matrix(coords, distances, durations)
+    mat = validate_matrix(coords, matrix.distances, matrix.durations)
 
     if mat is None:
         logger.error("Matrix validation failed, falling back to geodesic calculation")
-        return get_geodesic_matrix(coords, speed_kmh=40)
+        return CostMatrix(*get_geodesic_matrix(coords, speed_kmh=40))
 
     distances, durations, invalid_pairs = mat
-    if invalid_pairs:
+    if len(invalid_pairs):
         # Only calculate geodesic for invalid pairs
         logger.warning(
             f"Found {len(invalid_pairs)} invalid pairs, calculating geodesic only for those"
         )
-        geodesic_distances, geodesic_durations = get_geodesic_matrix(
-            coords, speed_kmh=40, invalid_pairs=invalid_pairs
-        )
-        # Merge geodesic values into existing matrices
-        for i, j in invalid_pairs:
-            distances[i][j] = geodesic_distances[i][j]
-            durations[i][j] = geodesic_durations[i][j]
+        lats, lngs = coords_to_arrays(coords)
+        rows, cols = invalid_pairs[:, 0], invalid_pairs[:, 1]
+        geodesic_distances = pairwise_distances(lats, lngs, invalid_pairs)
+        distances[rows, cols] = geodesic_distances
+        durations[rows, cols] = travel_time_s(geodesic_distances, speed_kmh=40)
 
-    return distances, durations
+    return CostMatrix(distances, durations)
 
 
-def _calculate_route_order(
+async def _calculate_route_order(
     coords,
-    distances,
-    durations,
+    matrix: CostMatrix,
     criterion: str = "distance",
     endpoint_index: int | None = None,
     closed: bool = False,
+    policy: SolverPolicy | None = None,
+    initial_order: List[int] | None = None,
 ):
     """
     Calculate optimal waypoint visitation order using TSP.
 
     Solves the Traveling Salesman Problem based on the specified constraints.
     Supports open tours (default), closed tours (return to origin), and fixed endpoint routing.
+    The search runs in the solver process pool, keeping the event loop free.
 
     Args:
         coords: List of coordinates (unused but kept for consistency)
-        distances: Distance matrix
-        durations: Duration matrix
+        matrix: Distance and duration matrices
         criterion: Optimization criterion ('distance' or 'duration')
         endpoint_index: If specified, route must end at this node index
         closed: If True, route returns to origin (closed tour)
+        policy: Optional SolverPolicy (default: tuned to the number of points)
+        initial_order: Optional route to start the search from (e.g. the
+            previous order of an edited route)
 
     Returns:
-        list: Indices representing optimal visitation order
+        tuple: (order, solver_report)
+            - order: Indices representing optimal visitation order
+            - solver_report: Objective, improvement history and solve time
+              (None when no optimization was run)
+
+    Raises:
+        SolverBusyError: If the solver queue is full (HTTP 503)
     """
     if criterion in ["distance", "duration"]:
-        matrix = distances if criterion == "distance" else durations
-        return solve_tsp_from_matrix(
-            matrix, criterion=criterion, endpoint_index=endpoint_index, closed=closed
+        solution = await get_solver_pool().solve(
+            matrix.costs(criterion),
+            endpoint_index=endpoint_index,
+            closed=closed,
+            policy=policy,
+            initial_order=initial_order,
         )
+        logger.info(
+            f"TSP solved for {len(coords)} points in {solution.solve_time_s:.2f}s "
+            f"(objective {solution.objective:.1f}, {criterion})"
+        )
+        return solution.order, solution.to_dict()
     else:
         logger.warning(f"Unknown criterion '{criterion}', using natural order")
-        return list(range(len(coords)))
+        return list(range(len(coords))), None
 
 
 def _filter_waypoints_in_zones(
@@ -723,16 +1057,19 @@ def _filter_waypoints_in_zones(
     Filter out waypoints that are inside or on the boundary of exclusion zones.
 
     Points must be strictly outside the bounding box - points on the frontier
-    (boundary) of the zone are also excluded for safety.
+    (boundary) of the zone are also excluded for safety. All waypoints are
+    tested in one bulk query against the compiled zone set.
 
     Args:
         coords: List of coordinate dicts with 'lat' and 'lng' keys
-        avoid_zones: Optional iterable of avoidance zones with 'coord' key
+        avoid_zones: Optional avoid zone dicts with 'coord' key, or their
+            compiled AvoidZoneSet
 
     Returns:
         Tuple of:
         - filtered_coords: List of coordinates outside all zones
         - valid_indices: Mapping from filtered index to original index
+        - zones_hit: Removed waypoints with their index, coord and zone_name
     """
     zones_hit = []
 
@@ -741,48 +1078,27 @@ def _filter_waypoints_in_zones(
         return coords, list(range(len(coords))), zones_hit
 
     try:
-        # Load zone polygons
-        geojson = avoid_zones_to_geojson(avoid_zones)
-        polys, tree = load_spatial_index(geojson)
+        zone_set = get_avoid_zone_set(avoid_zones)
 
-        if not polys:
+        if zone_set.tree is None:
             logger.info("No valid zones to filter, keeping all waypoints")
             return coords, list(range(len(coords))), zones_hit
 
-        from shapely.geometry import Point
+        # One bulk query for all waypoints; never filter the origin (index 0)
+        lats, lngs = coords_to_arrays(coords)
+        result = zone_set.filter_points(lats, lngs, always_keep=[0] if coords else [])
 
-        filtered_coords = []
-        valid_indices = []
+        valid_indices = result.kept.tolist()
+        filtered_coords = [coords[idx] for idx in valid_indices]
 
-        for idx, coord in enumerate(coords):
-            point = Point(coord["lng"], coord["lat"])
-
-            # Never filter the origin (index 0); only filter waypoints
-            if idx == 0:
-                filtered_coords.append(coord)
-                valid_indices.append(idx)
-                continue
-
-            # Check if point is inside or on the boundary of any zone
-            is_inside_or_on_boundary = False
-            for zone_idx, polygon in enumerate(polys):
-                # Use disjoint() - returns True only if point is completely outside
-                # This excludes points that are inside, on the boundary, or touching the zone
-                if not polygon.disjoint(point):
-                    is_inside_or_on_boundary = True
-                    zone_name = avoid_zones[zone_idx].get("name", f"Zone {zone_idx}")
-                    zones_hit.append(
-                        {"index": idx, "coord": coord, "zone_name": zone_name}
-                    )
-                    logger.warning(
-                        f"Waypoint {idx} at ({coord['lat']:.4f}, {coord['lng']:.4f}) "
-                        f"is inside or on boundary of exclusion zone '{zone_name}', removing from route"
-                    )
-                    break
-
-            if not is_inside_or_on_boundary:
-                filtered_coords.append(coord)
-                valid_indices.append(idx)
+        for idx, zone_idx in zip(result.removed.tolist(), result.zones.tolist()):
+            coord = coords[idx]
+            zone_name = zone_set.names[zone_idx]
+            zones_hit.append({"index": idx, "coord": coord, "zone_name": zone_name})
+            logger.warning(
+                f"Waypoint {idx} at ({coord['lat']:.4f}, {coord['lng']:.4f}) "
+                f"is inside or on boundary of exclusion zone '{zone_name}', removing from route"
+            )
 
         if zones_hit:
             logger.info(
@@ -807,21 +1123,22 @@ def _format_route_output(route_json, ordered_coords, zones_hit):
     """
     Extract and format route output from OSRM response.
 
-    Reverses path coordinates and formats duration and distance for display.
+    The geometry is kept as a RouteGeometry (still encoded when OSRM
+    returned polyline6); the response format decides how paths are written.
+    Duration and distance are formatted for display.
 
     Args:
         route_json: OSRM route response
         ordered_coords: Ordered list of coordinates
 
     Returns:
-        tuple: (origin, waypoints, paths, duration_str, distance_str)
+        tuple: (origin, waypoints, paths, duration_str, distance_str);
+            paths is a RouteGeometry
     """
-    paths = [
-        list(reversed(path))
-        for path in route_json["routes"][0]["geometry"]["coordinates"]
-    ]
-    estimated_sec = route_json["routes"][0]["duration"]
-    estimated_m = route_json["routes"][0]["distance"]
+    route = route_json["routes"][0]
+    paths = RouteGeometry.from_osrm(route["geometry"])
+    estimated_sec = route["duration"]
+    estimated_m = route["distance"]
 
     return (
         ordered_coords[0],
@@ -850,7 +1167,7 @@ async def calculate_ordered_route(origin, waypoints, avoid_zones: List | None =
         tuple: (origin, waypoints, paths, duration_hms, distance_km)
             - origin: First waypoint coordinate
             - waypoints: Remaining waypoint coordinates in provided order
-            - paths: Route geometry paths
+            - paths: Route geometry (RouteGeometry)
             - duration_hms: Formatted duration (HH:MM:SS)
             - distance_km: Formatted distance (km)
     """
@@ -886,6 +1203,8 @@ async def calculate_optimal_route(
     avoid_zones: List | None = None,
     endpoint: Dict[str, float] | None = None,
     closed: bool = False,
+    solver_options: Dict[str, Any] | None = None,
+    route_id: str | None = None,
 ):
     """
     Calculate optimal route visiting origin and waypoints.
@@ -894,7 +1213,10 @@ async def calculate_optimal_route(
     1. Filter out waypoints inside exclusion zones
     2. Matrix retrieval with intelligent fallback strategy
     3. Matrix validation and repair
-    4. TSP solving for waypoint order optimization
+    4. TSP solving for waypoint order optimization (by spatial clusters for
+       large problems, fetching only intra-cluster matrices). When the route
+       was solved before (same route_id), its matrix is reused for unchanged
+       points and its order warm-starts a shorter search
     5. OSRM route calculation
     6. Output formatting
 
@@ -905,14 +1227,20 @@ async def calculate_optimal_route(
         avoid_zones: Optional iterable of avoidance zones
         endpoint: Optional endpoint coordinate dict; must match one of the waypoints
         closed: If True, route returns to origin (closed tour)
+        solver_options: Optional request "solver" options (timeLimit,
+            firstSolutionStrategy, metaheuristic); see SolverPolicy
+        route_id: Optional route identifier; the solve is stored under it
+            and re-optimizations of the same route start from it
 
     Returns:
-        tuple: (origin, waypoints, paths, duration_hms, distance_km)
+        tuple: (origin, waypoints, paths, duration_hms, distance_km, zones_hit, solver_report)
             - origin: First waypoint coordinate
             - waypoints: Remaining optimized waypoint coordinates (or reordered if endpoint/closed specified)
-            - paths: Route geometry paths
+            - paths: Route geometry (RouteGeometry)
             - duration_hms: Formatted duration (HH:MM:SS)
             - distance_km: Formatted distance (km)
+            - zones_hit: Waypoints removed because they were inside avoid zones
+            - solver_report: TSP objective, improvement history and solve time
     """
     coords = [origin] + waypoints
 
@@ -979,23 +1307,67 @@ async def calculate_optimal_route(
                 f"Endpoint at index {endpoint_index} was filtered out; using open tour instead"
             )
 
-    # Retrieve distance/duration matrices with fallback strategy
-    distances, durations = await compute_distance_and_duration_matrices(
-        filtered_coords, avoid_zones
-    )
+    policy = SolverPolicy.from_options(solver_options, len(filtered_coords))
 
-    # Validate and repair matrices
-    distances, durations = _ensure_valid_matrices(filtered_coords, distances, durations)
-
-    # Calculate optimal waypoint order with endpoint and closed constraints
-    order = _calculate_route_order(
-        filtered_coords,
-        distances,
-        durations,
-        criterion,
-        endpoint_index=filtered_endpoint_index,
-        closed=closed,
-    )
+    if criterion in ["distance", "duration"] and use_clustered_solver(
+        len(filtered_coords), policy
+    ):
+        # Large problem: solve by spatial clusters, fetching only their matrices.
+        # The backend is chosen for the whole request, not per cluster
+        use_container = _should_use_local_container(filtered_coords, avoid_zones)
+
+        async def cluster_matrix(cluster_coords):
+            matrix = await compute_distance_and_duration_matrices(
+                cluster_coords, avoid_zones, use_container=use_container
+            )
+            return _ensure_valid_matrices(cluster_coords, matrix)
+
+        order, solver_report = await solve_clustered(
+            filtered_coords,
+            cluster_matrix,
+            criterion,
+            endpoint_index=filtered_endpoint_index,
+            closed=closed,
+            solver_options=solver_options,
+        )
+    else:
+        state_cache = get_route_state_cache()
+        state = state_cache.get(route_id)
+        previous_index = state.match(filtered_coords) if state is not None else None
+        initial_order = None
+
+        if previous_index is not None and (previous_index >= 0).any():
+            # Edited route: reuse the previous matrix and warm-start from its order
+            matrix = await compute_incremental_matrices(
+                filtered_coords, state, previous_index, avoid_zones
+            )
+            initial_order = state.initial_order(previous_index)
+            policy = _reoptimization_policy(policy, solver_options)
+            logger.info(f"Re-optimizing route {route_id} from its previous order")
+        else:
+            # Retrieve distance/duration matrices with fallback strategy
+            matrix = await compute_distance_and_duration_matrices(
+                filtered_coords, avoid_zones
+            )
+
+        # Validate and repair matrices
+        matrix = _ensure_valid_matrices(filtered_coords, matrix)
+
+        # Calculate optimal waypoint order with endpoint and closed constraints
+        order, solver_report = await _calculate_route_order(
+            filtered_coords,
+            matrix,
+            criterion,
+            endpoint_index=filtered_endpoint_index,
+            closed=closed,
+            policy=policy,
+            initial_order=initial_order,
+        )
+        if solver_report is not None:
+            solver_report["reoptimized"] = initial_order is not None
+            state_cache.put(
+                route_id, RouteState(point_keys(filtered_coords), matrix, order)
+            )
 
     # Get route geometry from OSRM
     route_json, ordered_coords = await get_osrm_route(
@@ -1003,7 +1375,10 @@ async def calculate_optimal_route(
     )
 
     # Format and return output
-    return _format_route_output(route_json, ordered_coords, zones_hit)
+    return (
+        *_format_route_output(route_json, ordered_coords, zones_hit),
+        solver_report,
+    )
 
 
 async def get_osrm_matrix(coords):
@@ -1018,7 +1393,7 @@ async def get_osrm_matrix(coords):
             coordinates=coord_str,
             params=params,
         )
-        return data["distances"], data["durations"]
+        return CostMatrix(data["distances"], data["durations"])
     except HTTPException:
         raise
     except Exception as e:
@@ -1027,18 +1402,19 @@ async def get_osrm_matrix(coords):
 
 
 async def get_osrm_matrix_public_api(coords):
-    """Get matrix from public OSRM API (router.project-osrm.org)."""
+    """
+    Get matrix from public OSRM API (router.project-osrm.org).
+
+    Up to 100 points are requested in a single /table call; larger inputs are
+    split into block tables that respect the public coordinate limit.
+    """
     try:
-        coord_str = ";".join(f"{c['lng']},{c['lat']}" for c in coords)
-        params = {
-            "annotations": "distance,duration",
-        }
-        data = await request_osrm_public_api(
-            request_type="table",
-            coordinates=coord_str,
-            params=params,
+        tiles = plan_block_pair_tiles(len(coords), PUBLIC_OSRM_MAX_COORDINATES)
+        distances, durations = await build_tiled_matrix(
+            coords, request_osrm_public_api, tiles
         )
-        return data["distances"], data["durations"]
+        _store_pairs(PUBLIC_BACKEND, coords, distances, durations)
+        return CostMatrix(distances, durations)
     except HTTPException:
         raise
     except Exception as e:
@@ -1047,26 +1423,28 @@ async def get_osrm_matrix_public_api(coords):
 
 
 # -----------------------------------------------------------------------------------#
-def get_osrm_matrix_iterative(coords):
+async def get_osrm_matrix_iterative(coords, progress_callback=None):
     """
     Get distance and duration matrix using iterative batching for large coordinate sets.
 
     This function uses the IterativeMatrixBuilder to split coordinates into batches
-    respecting the public API's 100-waypoint limit, making multiple requests with
-    rate limiting and automatic fallback to geodesic calculation for failed pairs.
+    respecting the public API's 100-waypoint limit, making concurrent requests under
+    the shared public API rate limit, with automatic fallback to geodesic calculation
+    for failed pairs. The build runs on the event loop without blocking it.
 
     Args:
         coords: List of coordinates [{"lat": float, "lng": float}, ...]
+        progress_callback: Optional callable (completed_batches, total_batches)
 
     Returns:
-        tuple: (distances, durations) matrices
+        CostMatrix: Distance and duration matrices
 
     Raises:
         Exception: If the iterative matrix build fails completely
     """
     logger.info(f"Using iterative matrix builder for {len(coords)} coordinates")
-    builder = IterativeMatrixBuilder(coords)
-    return builder.build()
+    builder = IterativeMatrixBuilder(coords, progress_callback=progress_callback)
+    return CostMatrix(*await builder.build())
 
 
 def compute_bounding_box(coords):
@@ -1100,17 +1478,15 @@ async def get_osrm_matrix_from_local_container(coords):
     """
     Get distance and duration matrix from local OSRM container.
 
-    This function:
-    3. Estimates bounding box for the route
-    4. Checks if there's an active container for this area
-    5. If not, starts a new container
-    6. Makes the request to the local container
+    Matrices larger than the container's --max-table-size are split into
+    source x destination tiles that are requested concurrently and assembled
+    into a single matrix (see tiled_matrix).
 
     Args:
         coords: List of coordinates [{"lat": float, "lng": float}, ...]
 
     Returns:
-        tuple: (distances, durations) matrices
+        CostMatrix: Distance and duration matrices
 
     Raises:
         Exception: If container setup or request fails, or if port 5000 is not available
@@ -1127,28 +1503,19 @@ async def get_osrm_matrix_from_local_container(coords):
 
         #     UserData.ssid = str(uuid.uuid4())[:8]
 
-        # Make request to local container
-        coord_str = ";".join(f"{c['lng']},{c['lat']}" for c in coords)
-
+        # Make request to local container, tiled to respect --max-table-size
         logger.info(f"Making request to OSRM at: {get_osrm_url()}")
 
-        params = {
-            "annotations": "distance,duration",
-        }
-        data = await request_osrm(
-            request_type="table",
-            coordinates=coord_str,
-            params=params,
-        )
-
-        if "distances" not in data or "durations" not in data:
-            raise ValueError("Invalid response from local OSRM container")
+        tiles = plan_table_tiles(len(coords), OSRM_MAX_TABLE_SIZE)
+        distances, durations = await build_tiled_matrix(coords, request_osrm, tiles)
+        _store_pairs(LOCAL_BACKEND, coords, distances, durations)
 
         logger.info(
-            f"Successfully got matrix from local container: {len(data['distances'])}x{len(data['distances'][0])} points"
+            f"Successfully got matrix from local container: {len(coords)}x{len(coords)} points "
+            f"({len(tiles)} table request(s))"
         )
 
-        return data["distances"], data["durations"]
+        return CostMatrix(distances, durations)
 
     except Exception as e:
         logger.error(f"Error in get_osrm_matrix_from_local_container: {e}")
@@ -1156,39 +1523,41 @@ async def get_osrm_matrix_from_local_container(coords):
 
 
 # -----------------------------------------------------------------------------------#
-def get_geodesic_matrix(coords, speed_kmh=40, invalid_pairs=None):
+def get_geodesic_matrix(
+    coords, speed_kmh=40, invalid_pairs=None, model: DistanceModel = DEFAULT_MODEL
+):
     """
     Calculate geodesic distances between coordinates.
 
+    The whole matrix (or the requested pairs) is computed in one vectorized
+    pass; for a full matrix only the upper triangle is evaluated and mirrored.
+
     Args:
         coords: List of coordinate dicts with 'lat' and 'lng' keys
         speed_kmh: Speed in km/h for duration calculation (default: 40)
-        invalid_pairs: Optional list of (i, j) tuples for pairs that need geodesic calculation.
-                       If None, calculates for all pairs.
+        invalid_pairs: Optional list of (i, j) tuples (or a (k, 2) array) for pairs
+                       that need geodesic calculation. If None, calculates for all pairs.
+        model: Distance model, "ellipsoidal" (WGS-84) or "haversine"
 
     Returns:
-        tuple: (distances, durations) matrices
+        tuple: (distances, durations) as (n, n) float arrays
     """
     num_points = len(coords)
-    distances = [[0.0] * num_points for _ in range(num_points)]
+    lats, lngs = coords_to_arrays(coords)
 
     # If invalid_pairs provided, only calculate geodesic for those pairs
-    if invalid_pairs:
-        for ii, jj in invalid_pairs:
-            if ii != jj:
-                p1 = (coords[ii]["lat"], coords[ii]["lng"])
-                p2 = (coords[jj]["lat"], coords[jj]["lng"])
-                distances[ii][jj] = geodesic(p1, p2).meters
+    if invalid_pairs is not None and len(invalid_pairs) > 0:
+        distances = np.zeros((num_points, num_points))
+        pairs = np.asarray(invalid_pairs, dtype=np.intp).reshape(-1, 2)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        distances[pairs[:, 0], pairs[:, 1]] = pairwise_distances(
+            lats, lngs, pairs, model
+        )
     else:
         # Calculate for all pairs (fallback for full matrix)
-        for ii in range(num_points):
-            for jj in range(num_points):
-                if ii != jj:
-                    p1 = (coords[ii]["lat"], coords[ii]["lng"])
-                    p2 = (coords[jj]["lat"], coords[jj]["lng"])
-                    distances[ii][jj] = geodesic(p1, p2).meters
+        distances = distance_matrix(lats, lngs, model)
 
-    durations = [[(dist / speed_kmh) * 3600 for dist in row] for row in distances]
+    durations = travel_time_s(distances, speed_kmh)
 
     return distances, durations
 
@@ -1196,39 +1565,61 @@ def get_geodesic_matrix(coords, speed_kmh=40, invalid_pairs=None):
 # -----------------------------------------------------------------------------------#
 def validate_matrix(
     coords, distances, durations
-) -> Tuple[List[float], List[float], List[Tuple[int, int]]] | None:
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """
+    Validate distance/duration matrices and repair what can be repaired in place.
+
+    float32 arrays (e.g. from a CostMatrix) are used as-is, without copying.
+
+    All checks are array masks over the whole matrix:
+    - the diagonal must be exactly zero (otherwise the matrices are rejected)
+    - off-diagonal entries must be positive; null (unroutable) and non-positive
+      cells are invalid
+    - an invalid cell whose transpose is valid takes the transpose's value
+
+    Args:
+        coords: List of coordinates
+        distances: Distance matrix (nested lists or array; None for unroutable)
+        durations: Duration matrix (nested lists or array; None for unroutable)
+
+    Returns:
+        Tuple of (distances, durations, invalid_pairs) where the matrices are float32
+        arrays and invalid_pairs is a (k, 2) int array of cells still invalid in
+        either matrix, or None if the matrices are unusable
+    """
     num_points = len(coords)
     if distances is None or durations is None:
         return None
 
-    # quick shape checks
-    if not (len(distances) == len(durations) == num_points):
+    # quick shape checks (ragged nested lists fail the conversion)
+    try:
+        distances = as_cost_array(distances)
+        durations = as_cost_array(durations)
+    except (TypeError, ValueError):
         return None
-    if any(len(row) != num_points for row in distances) or any(
-        len(row) != num_points for row in durations
+    if distances.shape != (num_points, num_points) or durations.shape != (
+        num_points,
+        num_points,
     ):
         return None
 
-    # Track invalid pairs for potential geodesic calculation
-    invalid_pairs = []
+    off_diagonal = ~np.eye(num_points, dtype=bool)
+    invalid = np.zeros((num_points, num_points), dtype=bool)
 
     # validate diagonal zeros and positive off-diagonals for both matrices
     for mat in (distances, durations):
         # diagonal must be exactly zero
-        if any(mat[i][i] is None or mat[i][i] != 0 for i in range(num_points)):
+        if not (np.diagonal(mat) == 0).all():
             return None
 
-        for i in range(num_points):
-            for j in range(num_points):
-                if i != j:
-                    # off-diagonal must be positive
-                    if mat[i][j] is None or mat[i][j] <= 0:
-                        if mat[j][i] is not None and mat[j][i] > 0:
-                            mat[i][j] = mat[j][i]
-                        else:
-                            # Record this as an invalid pair if not already recorded
-                            if (i, j) not in invalid_pairs:
-                                invalid_pairs.append((i, j))
+        # off-diagonal must be positive (NaN compares False)
+        bad = off_diagonal & ~(mat > 0)
+        repairable = bad & (mat.T > 0)
+        mat[repairable] = mat.T[repairable]
+        invalid |= bad & ~repairable
+
+    # Track invalid pairs for potential geodesic calculation
+    invalid_pairs = np.argwhere(invalid)
 
     return distances, durations, invalid_pairs
 
@@ -1244,6 +1635,12 @@ async def get_osrm_route(coords, order, avoid_zones: List | None = None):
     - Recombines into complete route alternatives
     - Scores by avoid zone penalties
 
+    With the leg cache enabled, the tour is assembled from cached legs and
+    only runs of missing legs are requested (see _route_from_leg_cache).
+    Otherwise tours longer than OSRM_ROUTE_WINDOW_SIZE are routed in
+    overlapping windows fetched concurrently and stitched into one route (see
+    route_windows).
+
     Args:
         coords: List of all coordinate dicts
         order: Ordered indices for waypoint visitation
@@ -1255,6 +1652,17 @@ async def get_osrm_route(coords, order, avoid_zones: List | None = None):
     ordered = [coords[ii] for ii in order]
     coord_str = ";".join([f"{c['lng']},{c['lat']}" for c in ordered])
 
+    leg_cache = get_leg_cache()
+    if leg_cache is not None and len(ordered) > 1:
+        data = await _route_from_leg_cache(ordered, leg_cache)
+        _describe_waypoints(ordered, data)
+        return data, ordered
+
+    if len(ordered) > OSRM_ROUTE_WINDOW_SIZE:
+        data = await build_windowed_route(ordered, _fetch_route_window)
+        _describe_waypoints(ordered, data)
+        return data, ordered
+
     # Check if we should use segment-based alternatives
     # has_avoid_zones = avoid_zones and len(avoid_zones) > 0
     # has_multiple_waypoints = len(ordered) > 2
@@ -1392,7 +1800,7 @@ async def get_osrm_route(coords, order, avoid_zones: List | None = None):
         params = {
             "alternatives": ALTERNATIVES,
             "overview": "full",
-            "geometries": "geojson",
+            "geometries": OSRM_GEOMETRY_FORMAT,
         }
         data = await request_osrm(
             request_type="route",
@@ -1407,16 +1815,13 @@ async def get_osrm_route(coords, order, avoid_zones: List | None = None):
             f"Local container route failed: {container_e}. Trying public API"
         )
 
-    # Try public API if local container failed or if too many points
+    # Try public API if local container failed
     try:
-        if len(ordered) > 100:
-            raise ValueError("Too many points for public API")
-
         logger.info(f"Attempting public API route for {len(ordered)} points")
         params = {
             "alternatives": ALTERNATIVES,
             "overview": "full",
-            "geometries": "geojson",
+            "geometries": OSRM_GEOMETRY_FORMAT,
         }
         data = await request_osrm_public_api(
             request_type="route",
@@ -1426,236 +1831,182 @@ async def get_osrm_route(coords, order, avoid_zones: List | None = None):
         logger.info("Successfully retrieved route from public API")
     except HTTPException:
         logger.error("Public route API failed. Using fallback response")
-        # Fallback: return a minimal valid response structure
-        data = {
-            "routes": [
-                {
-                    "geometry": {
-                        "coordinates": [[c["lng"], c["lat"]] for c in ordered]
-                    },
-                    "duration": 0,
-                    "distance": 0,
-                }
-            ],
-            "waypoints": [{"name": ""} for _ in ordered],
-        }
-
-    # Update descriptions
-    for ii, waypoint in enumerate(ordered):
-        if not waypoint.get("description"):
-            waypoint["description"] = data["waypoints"][ii].get("name", "")
+        data = _straight_line_route(ordered)
 
+    _describe_waypoints(ordered, data)
     return data, ordered
 
 
-# -----------------------------------------------------------------------------------#
-def solve_closed_tsp_from_matrix(distance_matrix):
+async def _route_from_leg_cache(ordered, leg_cache: LegCache):
     """
-    Solve closed Traveling Salesman Problem (returns to origin).
+    Assemble a tour from cached legs, requesting only the missing ones.
 
-    Creates a circuit that starts at node 0 and returns to node 0.
+    Legs are looked up under the dataset version of the backend that would
+    serve the request. Runs of consecutive missing legs are split into
+    windows, requested concurrently, split into legs and cached. Windows
+    that fell back to straight lines are used as they are and not cached.
 
     Args:
-        distance_matrix: Distance/cost matrix
+        ordered: Ordered waypoint dicts
+        leg_cache: Leg cache to read and fill
 
     Returns:
-        list: Indices representing the route (starting and ending at 0)
+        OSRM-shaped response with a single route
     """
-    n = len(distance_matrix)
-    # No free-return trick; all costs remain as specified
-    dm = [row[:] for row in distance_matrix]
-
-    manager = pywrapcp.RoutingIndexManager(n, 1, 0)  # 1 vehicle, starts at node 0
-    routing = pywrapcp.RoutingModel(manager)
-
-    def cost_cb(from_index, to_index):
-        ii = manager.IndexToNode(from_index)
-        jj = manager.IndexToNode(to_index)
-        return int(dm[ii][jj])
+    num_legs = len(ordered) - 1
+    backend = (
+        LOCAL_BACKEND
+        if get_circuit_breaker(LOCAL_BACKEND).is_available()
+        else PUBLIC_BACKEND
+    )
+    version = dataset_version(backend)
+    if version is not None:
+        legs = await asyncio.to_thread(leg_cache.lookup, version, ordered)
+    else:
+        legs = [None] * num_legs
 
-    transit_idx = routing.RegisterTransitCallback(cost_cb)
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_idx)
+    windows = [
+        (start + a, start + b)
+        for start, stop in leg_runs(legs)
+        for a, b in plan_route_windows(stop - start)
+    ]
+    if windows:
+        logger.info(
+            f"Leg cache has {num_legs - legs.count(None)}/{num_legs} legs, "
+            f"requesting {len(windows)} window(s)"
+        )
+    else:
+        logger.info(f"Route with {num_legs} legs served from the leg cache")
 
-    # Use simple heuristic
-    params = pywrapcp.DefaultRoutingSearchParameters()
-    params.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    results = await fetch_route_windows(
+        [ordered[a:b] for a, b in windows],
+        lambda window: _route_window_with_backend(window, annotations=True),
     )
 
-    solution = routing.SolveWithParameters(params)
-    if not solution:
-        raise RuntimeError("OR-Tools could not find a solution for closed TSP.")
+    # Windows that cannot be split into legs, by first waypoint
+    uncached = {}
+    for (a, b), (window_backend, data) in zip(windows, results):
+        window_legs = split_route_legs(data) if window_backend else None
+        if window_legs is None:
+            uncached[a] = (b, data)
+            continue
+        legs[a : b - 1] = window_legs
+        window_version = dataset_version(window_backend)
+        if window_version is not None:
+            await asyncio.to_thread(
+                leg_cache.store, window_version, ordered[a:b], window_legs
+            )
 
-    # Extract route; last node will be 0 (return to start). Keep it.
-    order = []
-    idx = routing.Start(0)
-    while not routing.IsEnd(idx):
-        order.append(manager.IndexToNode(idx))
-        idx = solution.Value(routing.NextVar(idx))
-    # Add the final return to origin
-    order.append(manager.IndexToNode(idx))
-    return order
+    pieces = []
+    k = 0
+    while k < num_legs:
+        if k in uncached:
+            stop, data = uncached[k]
+            pieces.append(data)
+            k = stop - 1
+        else:
+            pieces.append(legs[k].as_route_response())
+            k += 1
+    return stitch_route_windows(pieces)
 
 
-def solve_constrained_tsp_from_matrix(distance_matrix, start_index=0, end_index=None):
+async def _fetch_route_window(window):
     """
-    Solve TSP with fixed start and end nodes (open tour with fixed endpoint).
-
-    Creates a route that starts at start_index and must end at end_index.
+    Route one window of a long tour on whichever backend is healthy.
 
     Args:
-        distance_matrix: Distance/cost matrix
-        start_index: Starting node index (default 0)
-        end_index: Ending node index; if None, uses open tour from start
+        window: Ordered waypoint dicts of the window
 
     Returns:
-        list: Indices representing the route
+        OSRM /route response (polyline6 geometry)
     """
-    n = len(distance_matrix)
-    dm = [row[:] for row in distance_matrix]
-
-    if end_index is None:
-        end_index = start_index  # Closed tour if no end specified
-
-    # Set free return cost for all nodes back to start (open tour trick)
-    for ii in range(n):
-        if ii != start_index:
-            dm[ii][start_index] = 0  # Free return to start
-
-    manager = pywrapcp.RoutingIndexManager(n, 1, start_index)
-    routing = pywrapcp.RoutingModel(manager)
-
-    def cost_cb(from_index, to_index):
-        ii = manager.IndexToNode(from_index)
-        jj = manager.IndexToNode(to_index)
-        return int(dm[ii][jj])
-
-    transit_idx = routing.RegisterTransitCallback(cost_cb)
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_idx)
-
-    # If end_index differs from start, add constraint to force ending there
-    if end_index != start_index:
-        # Create a dimension for the constraint
-        dimension_name = "Distance"
-        routing.AddDimension(
-            transit_idx,
-            0,  # slack
-            10000,  # max distance
-            True,  # start cumul to zero
-            dimension_name,
-        )
-        # Force end at specified node by adding disjunctive constraints
-        # OR-Tools doesn't have a direct "end at node X" constraint,
-        # so we use a workaround: set a high penalty for not visiting the end node
-        # by modifying the cost matrix after solving if needed.
-        # For now, we'll use the open tour and post-process if the end differs.
-        pass
-
-    params = pywrapcp.DefaultRoutingSearchParameters()
-    params.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-    )
-
-    solution = routing.SolveWithParameters(params)
-    if not solution:
-        raise RuntimeError("OR-Tools could not find a solution for constrained TSP.")
-
-    # Extract route
-    order = []
-    idx = routing.Start(0)
-    while not routing.IsEnd(idx):
-        order.append(manager.IndexToNode(idx))
-        idx = solution.Value(routing.NextVar(idx))
+    _, data = await _route_window_with_backend(window)
+    return data
 
-    # If we have a specific end_index, try to rearrange so it ends there
-    if end_index != start_index and end_index in order:
-        # Move end_index to the last position
-        order.remove(end_index)
-        order.append(end_index)
 
-    return order
-
-
-def solve_tsp_from_matrix(
-    distance_matrix, criterion="distance", endpoint_index=None, closed=False
-):
+async def _route_window_with_backend(window, annotations: bool = False):
     """
-    Dispatcher function for TSP solving based on route constraints.
+    Route a window, trying the local container then the public API.
 
-    Automatically selects the appropriate TSP solver:
-    - open tour (default): solve_open_tsp_from_matrix
-    - closed tour: solve_closed_tsp_from_matrix
-    - fixed endpoint: solve_constrained_tsp_from_matrix
+    Backends whose circuit breaker is open are skipped, and the public API
+    only if the window fits its coordinate limit. Falls back to straight lines
+    for the window.
 
     Args:
-        distance_matrix: Distance/cost matrix
-        criterion: Optimization criterion ('distance' or 'duration')
-        endpoint_index: If specified, route must end at this node (open tour with fixed end)
-        closed: If True, route returns to origin (closed tour)
+        window: Ordered waypoint dicts of the window
+        annotations: Request per-segment distance annotations (to split legs)
 
     Returns:
-        list: Indices representing the route
+        Tuple of (backend, OSRM /route response with polyline6 geometry);
+        backend is None for the straight-line fallback
     """
-    if closed and endpoint_index is not None and endpoint_index != 0:
-        raise ValueError("Cannot have both closed=True and endpoint != origin")
-
-    if closed:
-        return solve_closed_tsp_from_matrix(distance_matrix)
-    elif endpoint_index is not None:
-        return solve_constrained_tsp_from_matrix(
-            distance_matrix, start_index=0, end_index=endpoint_index
-        )
-    else:
-        # Default open tour
-        return solve_open_tsp_from_matrix(distance_matrix)
+    coord_str = ";".join(f"{c['lng']},{c['lat']}" for c in window)
+    params = {"overview": "full", "geometries": OSRM_GEOMETRY_FORMAT}
+    if annotations:
+        params["annotations"] = "distance"
 
+    if get_circuit_breaker(LOCAL_BACKEND).is_available():
+        try:
+            data = await request_osrm(
+                request_type="route", coordinates=coord_str, params=params
+            )
+            return LOCAL_BACKEND, data
+        except HTTPException as e:
+            logger.warning(f"Local container failed for route window: {e.detail}")
 
-def solve_open_tsp_from_matrix(distance_matrix):
-    """
-    Solve open Traveling Salesman Problem (no return to origin).
+    if (
+        get_circuit_breaker(PUBLIC_BACKEND).is_available()
+        and len(window) <= PUBLIC_OSRM_MAX_COORDINATES
+    ):
+        try:
+            data = await request_osrm_public_api(
+                request_type="route", coordinates=coord_str, params=params
+            )
+            return PUBLIC_BACKEND, data
+        except HTTPException as e:
+            logger.warning(f"Public API failed for route window: {e.detail}")
+
+    logger.error(
+        f"No backend for route window of {len(window)} points, using straight lines"
+    )
+    return None, _straight_line_route(window)
 
-    Uses the 'free return' trick: zero the cost to return to depot (node 0).
-    Returns the order of visited nodes starting at 0 and without the final return.
 
-    Translated from Portuguese:
-    Usa o 'truque do retorno grátis': zera custo para voltar ao depósito (coluna 0).
-    Retorna a ordem dos índices dos nós visitados, começando em 0 e
-    sem o retorno final ao 0.
+def _straight_line_route(ordered):
     """
-    n = len(distance_matrix)
-    # Copy and zero the cost of returning to depot (column 0, except for node 0 itself)
-    dm = [row[:] for row in distance_matrix]
-    for ii in range(1, n):
-        dm[ii][0] = 0  # return to depot costs 0
-
-    manager = pywrapcp.RoutingIndexManager(n, 1, 0)  # 1 vehicle, starts at node 0
-    routing = pywrapcp.RoutingModel(manager)
-
-    def cost_cb(from_index, to_index):
-        ii = manager.IndexToNode(from_index)
-        jj = manager.IndexToNode(to_index)
-        return int(dm[ii][jj])
-
-    transit_idx = routing.RegisterTransitCallback(cost_cb)
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_idx)
-
-    # Simple initial strategy
-    params = pywrapcp.DefaultRoutingSearchParameters()
-    params.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-    )
+    Fallback route through the waypoints in straight lines.
 
-    solution = routing.SolveWithParameters(params)
-    if not solution:
-        raise RuntimeError("OR-Tools não encontrou solução.")
-
-    # Extract route; last node will be 0 (free return). Remove it.
-    order = []
-    idx = routing.Start(0)
-    while not routing.IsEnd(idx):
-        order.append(manager.IndexToNode(idx))
-        idx = solution.Value(routing.NextVar(idx))
-    return order
+    Distance is geodesic and duration assumes 40 km/h, like the geodesic
+    matrix fallback.
+
+    Args:
+        ordered: Ordered waypoint dicts
+
+    Returns:
+        OSRM-shaped route response
+    """
+    lats, lngs = coords_to_arrays(ordered)
+    legs = np.column_stack((np.arange(len(ordered) - 1), np.arange(1, len(ordered))))
+    distances = pairwise_distances(lats, lngs, legs) if len(legs) else np.zeros(0)
+    durations = travel_time_s(distances, speed_kmh=40)
+    return {
+        "code": "Ok",
+        "routes": [
+            {
+                "geometry": RouteGeometry.from_coordinates(np.column_stack((lngs, lats))),
+                "duration": float(durations.sum()),
+                "distance": float(distances.sum()),
+            }
+        ],
+        "waypoints": [{"name": ""} for _ in ordered],
+    }
+
+
+def _describe_waypoints(ordered, data) -> None:
+    """Fill missing waypoint descriptions with OSRM's street names."""
+    for ii, waypoint in enumerate(ordered):
+        if not waypoint.get("description"):
+            waypoint["description"] = data["waypoints"][ii].get("name", "")
 
 
 # -----------------------------------------------------------------------------------#
@@ -0,0 +1,371 @@
+"""
+Persistent (origin, destination) -> (distance, duration) cache.
+
+Inspection teams route the same municipalities, grids and offices again and
+again. Router-derived matrix cells are kept in a SQLite file so that
+compute_distance_and_duration_matrices only requests the rows and columns of
+points with missing pairs.
+
+Keys are coordinates quantized to microdegrees (about 0.1 m), packed into one
+integer per point, and tagged with the dataset version of the router that
+produced them:
+
+- local container: the ``data_version`` OSRM returns in every response
+  (stamped by osrm-init-entrypoint.sh at osrm-extract time), or
+  OSRM_DATASET_VERSION when the dataset was built without one;
+- public router: its ``data_version`` if present, otherwise the ISO week, so
+  public values expire weekly.
+
+When a router reports a new version, rows of its older versions are purged;
+re-preprocessing the OSRM dataset therefore invalidates the cache by itself.
+Rows carry a last-used timestamp and the least recently used are evicted
+once the table exceeds PAIR_CACHE_MAX_ENTRIES.
+
+Environment variables:
+- PAIR_CACHE_PATH: SQLite file (default: <cache dir>/pair_cache.sqlite3)
+- PAIR_CACHE_MAX_ENTRIES: Max cached pairs, 0 disables the cache (default: 2000000)
+- OSRM_DATASET_VERSION: Local dataset version when responses carry none
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from webrotas.config.constants import OSMR_PATH_CACHE
+from webrotas.config.logging_config import get_logger
+from webrotas.infrastructure.routing.http_client import LOCAL_BACKEND
+
+logger = get_logger(__name__)
+
+PAIR_CACHE_PATH = os.getenv(
+    "PAIR_CACHE_PATH", str(OSMR_PATH_CACHE / "pair_cache.sqlite3")
+)
+PAIR_CACHE_MAX_ENTRIES = int(os.getenv("PAIR_CACHE_MAX_ENTRIES", 2_000_000))
+OSRM_DATASET_VERSION = os.getenv("OSRM_DATASET_VERSION", "unversioned")
+
+# Microdegrees; lng fits in 29 bits and lat in 28 bits once offset
+QUANTIZATION = 1_000_000
+LNG_BITS = 29
+
+# Share of the cap kept after an eviction (avoids evicting on every store)
+EVICTION_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    version TEXT NOT NULL,
+    src INTEGER NOT NULL,
+    dst INTEGER NOT NULL,
+    distance REAL,
+    duration REAL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (version, src, dst)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pairs_used ON pairs (used);
+"""
+
+# Dataset version last reported by each backend
+_versions: Dict[str, str] = {}
+
+
+def point_ids(coords: Sequence[Dict[str, float]]) -> np.ndarray:
+    """
+    Quantize coordinates to microdegrees and pack each point into one int64.
+
+    Args:
+        coords: Coordinate dicts with 'lat' and 'lng' keys
+
+    Returns:
+        Int array of point ids, shape (n,)
+    """
+    lats = np.array([c["lat"] for c in coords], dtype=np.float64)
+    lngs = np.array([c["lng"] for c in coords], dtype=np.float64)
+    lat_q = np.rint((lats + 90.0) * QUANTIZATION).astype(np.int64)
+    lng_q = np.rint((lngs + 180.0) * QUANTIZATION).astype(np.int64)
+    return (lat_q << LNG_BITS) | lng_q
+
+
+def record_dataset_version(backend: str, response: Dict[str, Any] | None) -> None:
+    """
+    Note the dataset version a router reported in a response.
+
+    Args:
+        backend: "local" or "public"
+        response: Parsed OSRM response (any service)
+    """
+    if not isinstance(response, dict) or response.get("code") != "Ok":
+        return
+    data_version = response.get("data_version")
+    if not data_version:
+        if backend == LOCAL_BACKEND:
+            data_version = OSRM_DATASET_VERSION
+        else:
+            year, week, _ = datetime.date.today().isocalendar()
+            data_version = f"{year}-W{week:02d}"
+
+    tag = f"{backend}:{data_version}"
+    previous = _versions.get(backend)
+    if previous != tag:
+        if previous is not None:
+            logger.info(f"OSRM {backend} dataset changed ({previous} -> {tag})")
+        _versions[backend] = tag
+
+
+def dataset_version(backend: str) -> str | None:
+    """Version tag of a backend's dataset, or None before its first response."""
+    return _versions.get(backend)
+
+
+def points_to_request(found: np.ndarray) -> np.ndarray:
+    """
+    Choose the points whose rows and columns must be requested.
+
+    Greedily drops the point with the most uncached pairs until every pair
+    among the remaining points is cached; requesting the dropped points'
+    rows and columns then fills every missing cell.
+
+    Args:
+        found: Bool matrix of cached cells (from PairCache.lookup)
+
+    Returns:
+        Sorted indices of the points to request
+    """
+    unknown = (~found).astype(np.int64)
+    counts = unknown.sum(axis=0) + unknown.sum(axis=1)
+    keep = np.ones(len(found), dtype=bool)
+    while True:
+        worst = int(np.argmax(np.where(keep, counts, 0)))
+        if not keep[worst] or counts[worst] == 0:
+            break
+        keep[worst] = False
+        counts -= unknown[worst, :] + unknown[:, worst]
+    return np.flatnonzero(~keep)
+
+
+class PairCache:
+    """SQLite-backed travel cost cache shared by all requests of the process."""
+
+    def __init__(
+        self, path: str = PAIR_CACHE_PATH, max_entries: int = PAIR_CACHE_MAX_ENTRIES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS request_points (id INTEGER PRIMARY KEY)"
+        )
+        # Versions whose stale siblings were already purged
+        self._current_versions: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _select_points(self, unique_ids: np.ndarray) -> None:
+        """Load the request's point ids into the temp table (lock held)."""
+        self._connection.execute("DELETE FROM request_points")
+        self._connection.executemany(
+            "INSERT INTO request_points (id) VALUES (?)",
+            ((int(i),) for i in unique_ids),
+        )
+
+    def lookup(
+        self, version: str, coords: Sequence[Dict[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read every cached pair between the given points.
+
+        Args:
+            version: Dataset version tag (see dataset_version)
+            coords: Coordinate dicts with 'lat' and 'lng' keys
+
+        Returns:
+            Tuple of (distances, durations, found): float32 matrices (NaN where
+            unknown or unroutable) and a bool mask of cached cells; the
+            diagonal and pairs of identical points count as found (zero)
+        """
+        ids = point_ids(coords)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        k = len(unique_ids)
+
+        with self._lock:
+            self._select_points(unique_ids)
+            rows = self._connection.execute(
+                """
+                SELECT p.src, p.dst, p.distance, p.duration
+                FROM request_points a
+                JOIN request_points b
+                JOIN pairs p ON p.version = ? AND p.src = a.id AND p.dst = b.id
+                """,
+                (version,),
+            ).fetchall()
+            if rows:
+                self._connection.execute(
+                    """
+                    UPDATE pairs SET used = ?
+                    WHERE version = ?
+                      AND src IN (SELECT id FROM request_points)
+                      AND dst IN (SELECT id FROM request_points)
+                    """,
+                    (int(time.time()), version),
+                )
+                self._connection.commit()
+
+        distances = np.full((k, k), np.nan, dtype=np.float32)
+        durations = np.full((k, k), np.nan, dtype=np.float32)
+        found = np.eye(k, dtype=bool)
+        np.fill_diagonal(distances, 0)
+        np.fill_diagonal(durations, 0)
+        if rows:
+            src, dst, dist, dur = zip(*rows)
+            src_pos = np.searchsorted(unique_ids, np.array(src, dtype=np.int64))
+            dst_pos = np.searchsorted(unique_ids, np.array(dst, dtype=np.int64))
+            distances[src_pos, dst_pos] = np.array(dist, dtype=np.float64)
+            durations[src_pos, dst_pos] = np.array(dur, dtype=np.float64)
+            found[src_pos, dst_pos] = True
+
+        cells = np.ix_(inverse, inverse)
+        found = found[cells]
+        cached = int(found.sum())
+        self.hits += cached
+        self.misses += found.size - cached
+        return distances[cells], durations[cells], found
+
+    def store(
+        self,
+        version: str,
+        coords: Sequence[Dict[str, float]],
+        distances: np.ndarray,
+        durations: np.ndarray,
+        mask: np.ndarray | None = None,
+    ) -> int:
+        """
+        Cache router-derived cells.
+
+        Args:
+            version: Dataset version tag the values come from
+            coords: Coordinate dicts with 'lat' and 'lng' keys
+            distances: Distance matrix over coords (NaN for unroutable)
+            durations: Duration matrix over coords (NaN for unroutable)
+            mask: Optional bool matrix selecting the cells to store
+                (default: every cell)
+
+        Returns:
+            Number of pairs written
+        """
+        if self.max_entries <= 0:
+            return 0
+        ids = point_ids(coords)
+        cells = ids[:, None] != ids[None, :]
+        if mask is not None:
+            cells &= mask
+        rows, cols = np.nonzero(cells)
+        if len(rows) == 0:
+            return 0
+
+        used = int(time.time())
+        values = zip(
+            ids[rows].tolist(),
+            ids[cols].tolist(),
+            _nullable(distances[rows, cols]),
+            _nullable(durations[rows, cols]),
+        )
+        with self._lock:
+            if version not in self._current_versions:
+                self._purge_other_versions(version)
+            self._connection.executemany(
+                """
+                INSERT INTO pairs (version, src, dst, distance, duration, used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (version, src, dst) DO UPDATE SET
+                    distance = excluded.distance,
+                    duration = excluded.duration,
+                    used = excluded.used
+                """,
+                ((version, src, dst, dist, dur, used) for src, dst, dist, dur in values),
+            )
+            self._evict()
+            self._connection.commit()
+        return len(rows)
+
+    def _purge_other_versions(self, version: str) -> None:
+        """Drop rows of older datasets of the same backend (lock held)."""
+        backend = version.split(":", 1)[0]
+        deleted = self._connection.execute(
+            "DELETE FROM pairs WHERE version LIKE ? AND version != ?",
+            (f"{backend}:%", version),
+        ).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} cached pairs of outdated {backend} datasets")
+        self._current_versions = {
+            v for v in self._current_versions if not v.startswith(f"{backend}:")
+        }
+        self._current_versions.add(version)
+
+    def _evict(self) -> None:
+        """Evict least recently used pairs above the cap (lock held)."""
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM pairs").fetchone()
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * EVICTION_TARGET)
+        self._connection.execute(
+            """
+            DELETE FROM pairs WHERE (version, src, dst) IN (
+                SELECT version, src, dst FROM pairs ORDER BY used LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        logger.info(f"Evicted {excess} least recently used cached pairs")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cache size and hit/miss counters (cells)."""
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM pairs").fetchone()
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "versions": dict(_versions),
+        }
+
+
+def _nullable(values: np.ndarray) -> List[float | None]:
+    """Float list with NaN as None (stored as NULL)."""
+    return [None if np.isnan(v) else v for v in values.astype(np.float64).tolist()]
+
+
+_cache: PairCache | None = None
+_unavailable = False
+
+
+def get_pair_cache() -> PairCache | None:
+    """Process-wide pair cache, or None if disabled or unavailable."""
+    global _cache, _unavailable
+    if _cache is None and PAIR_CACHE_MAX_ENTRIES > 0 and not _unavailable:
+        try:
+            _cache = PairCache()
+        except sqlite3.Error as e:
+            logger.warning(f"Pair cache unavailable ({PAIR_CACHE_PATH}): {e}")
+            _unavailable = True
+    return _cache
+
+
+def close_pair_cache() -> None:
+    """Close the process-wide pair cache."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
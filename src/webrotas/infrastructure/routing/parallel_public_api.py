@@ -10,12 +10,22 @@ Strategy:
 2. Request each segment's alternatives in parallel from Public API
 3. Combine segments into complete routes
 4. Select best route based on avoid zone penalties
+
+Distance/duration matrices are requested as blocks of up to 100 coordinates
+rather than 2-point pairs (see tiled_matrix.plan_block_pair_tiles).
 """
 
 import asyncio
 from typing import List, Dict, Tuple, Any, Optional
 
 from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.cost_matrix import CostMatrix
+from webrotas.domain.routing.geometry import OSRM_GEOMETRY_FORMAT, RouteGeometry
+from webrotas.infrastructure.routing.tiled_matrix import (
+    PUBLIC_OSRM_MAX_COORDINATES,
+    build_tiled_matrix,
+    plan_block_pair_tiles,
+)
 
 logger = get_logger(__name__)
 
@@ -61,7 +71,7 @@ async def get_route_segment_parallel(
         params = {
             "alternatives": 3,
             "overview": "full",
-            "geometries": "geojson",
+            "geometries": OSRM_GEOMETRY_FORMAT,
         }
         
         logger.debug(f"Requesting alternatives for segment {segment_index}: {coord_str}")
@@ -76,7 +86,7 @@ async def get_route_segment_parallel(
             best_route = response["routes"][0]
             return {
                 "segment_index": segment_index,
-                "geometry": best_route.get("geometry", {}).get("coordinates", []),
+                "geometry": RouteGeometry.from_osrm(best_route.get("geometry")),
                 "distance": best_route.get("distance", 0),
                 "duration": best_route.get("duration", 0),
                 "alternatives": len(response.get("routes", [])),
@@ -102,7 +112,7 @@ async def get_full_route_parallel(
         coords: List of coordinates (origin + waypoints)
     
     Returns:
-        Tuple of (path_coordinates, total_distance, total_duration)
+        Tuple of (path RouteGeometry, total_distance, total_duration)
     """
     if len(coords) < 2:
         raise ValueError("At least 2 coordinates required")
@@ -131,19 +141,10 @@ async def get_full_route_parallel(
         failed_count = sum(1 for r in results if r is None)
         raise ValueError(f"Failed to get route for {failed_count} segments")
     
-    # Combine segment geometries into full path
-    full_path = []
-    total_distance = 0
-    total_duration = 0
-    
-    for result in results:
-        # Skip the first point of each segment except the first segment (to avoid duplicates)
-        geometry = result["geometry"]
-        if result["segment_index"] > 0 and geometry:
-            geometry = geometry[1:]  # Skip first point
-        full_path.extend(geometry)
-        total_distance += result["distance"]
-        total_duration += result["duration"]
+    # Combine segment geometries into full path (shared endpoints kept once)
+    full_path = RouteGeometry.concat(result["geometry"] for result in results)
+    total_distance = sum(result["distance"] for result in results)
+    total_duration = sum(result["duration"] for result in results)
     
     logger.info(
         f"✅ Got full route via parallel Public API: "
@@ -156,88 +157,38 @@ async def get_full_route_parallel(
 async def get_distance_matrix_parallel_public_api(
     osrm_request_fn,
     coords: List[Dict[str, float]],
-) -> Tuple[List[List[float]], List[List[float]]]:
+) -> CostMatrix:
     """
-    Build distance/duration matrices using parallel 2-point requests.
+    Build distance/duration matrices using parallel block /table requests.
     
-    This is computationally intensive for large coordinate sets, but provides
-    a fallback when the local OSRM container is unavailable.
+    Instead of one 2-point request per pair, points are split into chunks of
+    at most half the public coordinate limit and each pair of chunks is
+    requested as one table over their union. This covers the full asymmetric
+    matrix with C(k, 2) requests (a single request up to 100 points, 6 for
+    200 points instead of 19,900).
     
     Args:
         osrm_request_fn: Async function to make OSRM requests
         coords: List of coordinates
     
     Returns:
-        Tuple of (distance_matrix, duration_matrix)
+        CostMatrix; unroutable pairs are NaN
+    
+    Raises:
+        Exception: Any error raised by osrm_request_fn for one of the blocks
     """
     n = len(coords)
+    tiles = plan_block_pair_tiles(n, PUBLIC_OSRM_MAX_COORDINATES)
     
-    if n > 100:
-        logger.warning(
-            f"⚠️ Building matrix for {n} coordinates using parallel Public API. "
-            f"This will make {n*(n-1)//2} requests and may hit rate limits."
-        )
-    
-    # Create all 2-point pairs
-    requests = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            requests.append((i, j, coords[i], coords[j]))
-    
-    logger.info(f"Requesting distance/duration for {len(requests)} coordinate pairs")
-    
-    # Initialize matrices
-    distances = [[0.0] * n for _ in range(n)]
-    durations = [[0.0] * n for _ in range(n)]
-    
-    # Request all pairs in parallel with concurrency limit
-    semaphore = asyncio.Semaphore(PUBLIC_API_MAX_CONCURRENT)
-    
-    async def bounded_pair_request(i, j, start, end):
-        async with semaphore:
-            try:
-                coord_str = f"{start['lng']},{start['lat']};{end['lng']},{end['lat']}"
-                
-                # Add delay to avoid overwhelming the public API
-                await asyncio.sleep(PUBLIC_API_REQUEST_DELAY)
-                
-                response = await osrm_request_fn(
-                    request_type="table",
-                    coordinates=coord_str,
-                    params={"annotations": "distance,duration"},
-                )
-                
-                if response and response.get("distances") and response.get("durations"):
-                    dist = response["distances"][0][1]
-                    dur = response["durations"][0][1]
-                    
-                    # Store both directions
-                    distances[i][j] = dist
-                    distances[j][i] = dist
-                    durations[i][j] = dur
-                    durations[j][i] = dur
-                    
-                    return (i, j, dist, dur)
-                else:
-                    logger.warning(f"Invalid response for pair ({i}, {j})")
-                    return None
-                    
-            except Exception as e:
-                logger.warning(f"Error requesting pair ({i}, {j}): {e}")
-                return None
-    
-    tasks = [
-        bounded_pair_request(i, j, start, end)
-        for i, j, start, end in requests
-    ]
-    
-    results = await asyncio.gather(*tasks)
+    logger.info(
+        f"Requesting {n}x{n} matrix via Public API in {len(tiles)} block table "
+        f"request(s) (vs {n*(n-1)//2} pair requests)"
+    )
     
-    # Check for failures
-    failed_count = sum(1 for r in results if r is None)
-    if failed_count > 0:
-        logger.warning(f"⚠️ {failed_count}/{len(requests)} requests failed")
+    distances, durations = await build_tiled_matrix(
+        coords, osrm_request_fn, tiles, max_concurrent=PUBLIC_API_MAX_CONCURRENT
+    )
     
     logger.info(f"✅ Built {n}x{n} matrices via parallel Public API")
     
-    return distances, durations
+    return CostMatrix(distances, durations)
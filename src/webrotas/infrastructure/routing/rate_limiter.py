@@ -0,0 +1,76 @@
+"""
+Async token bucket rate limiting for OSRM backends.
+
+The public OSRM router enforces a per-client request rate. Concurrent matrix
+builds (one per user request) must share a single budget, otherwise N users
+send N times the allowed rate and get throttled. The bucket below is
+process-wide and cooperative: callers ``await acquire()`` before each request.
+
+Environment variables:
+- OSRM_PUBLIC_RATE_LIMIT: Requests per second allowed to the public router (default: 2)
+- OSRM_PUBLIC_RATE_BURST: Requests that may be sent back-to-back (default: 1)
+"""
+
+import asyncio
+import os
+import time
+
+OSRM_PUBLIC_RATE_LIMIT = float(os.getenv("OSRM_PUBLIC_RATE_LIMIT", 2.0))
+OSRM_PUBLIC_RATE_BURST = int(os.getenv("OSRM_PUBLIC_RATE_BURST", 1))
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    Tokens may go negative: each caller reserves its slot synchronously and
+    then sleeps until the slot comes due, so waiters are served in arrival
+    order without a lock (and without binding to a particular event loop).
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second (must be positive)
+            capacity: Max tokens accumulated while idle (burst size)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.capacity), self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        self._tokens -= 1.0
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_public_rate_limiter: AsyncTokenBucket | None = None
+
+
+def get_public_rate_limiter() -> AsyncTokenBucket:
+    """Get the process-wide rate limiter of the public OSRM router."""
+    global _public_rate_limiter
+    if _public_rate_limiter is None:
+        _public_rate_limiter = AsyncTokenBucket(
+            OSRM_PUBLIC_RATE_LIMIT, OSRM_PUBLIC_RATE_BURST
+        )
+    return _public_rate_limiter
@@ -0,0 +1,164 @@
+"""
+Per-route solver state for warm-started re-optimization.
+
+Every monolithic TSP solve stores its points, validated cost matrix and order
+under the route's ``routeId``. When the GUI resends an edited route as an
+``ordered`` request with criterion ``distance`` or ``duration``, the previous
+state is matched point by point against the new request: matrix cells between
+unchanged points are copied, only rows and columns of added points are
+requested from OSRM, and the previous order (with new points cheapest-inserted)
+is the initial assignment of a shorter search.
+
+States live in an in-process LRU bounded by entry count and matrix memory.
+
+Environment variables:
+- ROUTE_STATE_CACHE_SIZE: Routes kept for re-optimization (default: 64, 0 disables)
+- ROUTE_STATE_CACHE_MAX_MB: Memory budget for cached matrices (default: 256)
+- ROUTE_REOPTIMIZE_TIME_FRACTION: Share of the default time limit used when
+  re-optimizing without an explicit timeLimit (default: 0.25)
+"""
+
+import os
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.cost_matrix import CostMatrix
+
+logger = get_logger(__name__)
+
+ROUTE_STATE_CACHE_SIZE = int(os.getenv("ROUTE_STATE_CACHE_SIZE", 64))
+ROUTE_STATE_CACHE_MAX_MB = float(os.getenv("ROUTE_STATE_CACHE_MAX_MB", 256))
+ROUTE_REOPTIMIZE_TIME_FRACTION = float(
+    os.getenv("ROUTE_REOPTIMIZE_TIME_FRACTION", 0.25)
+)
+
+# Points closer than this (degrees) are the same point (~0.1 m)
+COORDINATE_PRECISION = 6
+
+PointKey = Tuple[float, float]
+
+
+def point_keys(coords: Sequence[Dict[str, float]]) -> List[PointKey]:
+    """Rounded (lat, lng) keys identifying each point across requests."""
+    return [
+        (
+            round(float(c["lat"]), COORDINATE_PRECISION),
+            round(float(c["lng"]), COORDINATE_PRECISION),
+        )
+        for c in coords
+    ]
+
+
+@dataclass
+class RouteState:
+    """Points, validated matrix and solved order of a route."""
+
+    keys: List[PointKey]
+    matrix: CostMatrix
+    order: List[int]
+
+    def match(self, coords: Sequence[Dict[str, float]]) -> np.ndarray:
+        """
+        Map new points to their index in this state.
+
+        Repeated coordinates are matched one to one, in order.
+
+        Args:
+            coords: Coordinate dicts of the new request
+
+        Returns:
+            Int array with the previous index of each point, -1 for new points
+        """
+        available = defaultdict(deque)
+        for index, key in enumerate(self.keys):
+            available[key].append(index)
+
+        previous = np.full(len(coords), -1, dtype=np.int64)
+        for index, key in enumerate(point_keys(coords)):
+            if available[key]:
+                previous[index] = available[key].popleft()
+        return previous
+
+    def initial_order(self, previous_index: np.ndarray) -> List[int]:
+        """
+        The previous order expressed in new indices (removed points dropped).
+
+        Args:
+            previous_index: Result of match()
+
+        Returns:
+            Partial order over the new points that existed before
+        """
+        new_index = {int(p): i for i, p in enumerate(previous_index) if p >= 0}
+        return [new_index[p] for p in self.order if p in new_index]
+
+
+class RouteStateCache:
+    """LRU of RouteState by routeId, bounded by count and matrix memory."""
+
+    def __init__(
+        self,
+        max_entries: int = ROUTE_STATE_CACHE_SIZE,
+        max_bytes: int = int(ROUTE_STATE_CACHE_MAX_MB * 1024 * 1024),
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._states: OrderedDict[str, RouteState] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the cached matrices."""
+        return self._nbytes
+
+    def get(self, route_id: str | None) -> RouteState | None:
+        """State stored for a route, if any (marks it as recently used)."""
+        if route_id is None or route_id not in self._states:
+            return None
+        self._states.move_to_end(route_id)
+        return self._states[route_id]
+
+    def put(self, route_id: str | None, state: RouteState) -> None:
+        """Store a route's state, evicting least recently used routes."""
+        if route_id is None or self.max_entries <= 0:
+            return
+        self.discard(route_id)
+        size = state.matrix.nbytes
+        if size > self.max_bytes:
+            logger.debug(f"Route {route_id} matrix too large to keep ({size} bytes)")
+            return
+
+        self._states[route_id] = state
+        self._nbytes += size
+        while len(self._states) > self.max_entries or self._nbytes > self.max_bytes:
+            _, evicted = self._states.popitem(last=False)
+            self._nbytes -= evicted.matrix.nbytes
+
+    def discard(self, route_id: str) -> None:
+        """Forget a route."""
+        state = self._states.pop(route_id, None)
+        if state is not None:
+            self._nbytes -= state.matrix.nbytes
+
+    def clear(self) -> None:
+        """Forget every route."""
+        self._states.clear()
+        self._nbytes = 0
+
+
+_cache: RouteStateCache | None = None
+
+
+def get_route_state_cache() -> RouteStateCache:
+    """Process-wide route state cache (created on first use)."""
+    global _cache
+    if _cache is None:
+        _cache = RouteStateCache()
+    return _cache
@@ -0,0 +1,169 @@
+"""
+Windowed /route requests for long waypoint sequences.
+
+A single ``/route`` call over a whole tour is capped by osrm-routed's
+``--max-viaroute-size`` and by the public router's coordinate limit, and it
+is one long sequential request. Long tours are instead split into windows
+that overlap by one waypoint (the last waypoint of a window is the first of
+the next), requested concurrently with a bounded number in flight and
+stitched back into a single OSRM-shaped route:
+
+- geometry: decoded and concatenated, dropping the junction vertex repeated
+  at the start of each window (RouteGeometry.concat);
+- distance, duration and legs: summed / concatenated (legs never overlap);
+- waypoints: the junction waypoint is kept once.
+
+Environment variables:
+- OSRM_ROUTE_WINDOW_SIZE: Max waypoints per /route request (default: 100)
+- OSRM_ROUTE_MAX_CONCURRENT: Max window requests in flight (default: 4)
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.geometry import RouteGeometry
+
+logger = get_logger(__name__)
+
+OSRM_ROUTE_WINDOW_SIZE = int(os.getenv("OSRM_ROUTE_WINDOW_SIZE", 100))
+OSRM_ROUTE_MAX_CONCURRENT = int(os.getenv("OSRM_ROUTE_MAX_CONCURRENT", 4))
+
+WindowFn = Callable[[List[Dict[str, float]]], Awaitable[Dict[str, Any]]]
+
+
+def plan_route_windows(
+    num_points: int, window_size: int = OSRM_ROUTE_WINDOW_SIZE
+) -> List[Tuple[int, int]]:
+    """
+    Split a waypoint sequence into windows overlapping by one waypoint.
+
+    Args:
+        num_points: Number of waypoints in the tour
+        window_size: Max waypoints per window (at least 2)
+
+    Returns:
+        List of (start, stop) slices; consecutive windows share one waypoint
+    """
+    if window_size < 2:
+        raise ValueError("window_size must be at least 2")
+    if num_points <= window_size:
+        return [(0, num_points)]
+
+    step = window_size - 1
+    windows = []
+    start = 0
+    while start < num_points - 1:
+        stop = min(start + window_size, num_points)
+        windows.append((start, stop))
+        start += step
+    return windows
+
+
+def stitch_route_windows(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Join window responses (first route of each) into one OSRM route response.
+
+    Args:
+        responses: OSRM /route responses, in tour order
+
+    Returns:
+        OSRM-shaped response with a single route (RouteGeometry geometry)
+    """
+    geometries: List[RouteGeometry] = []
+    legs: List[Dict[str, Any]] = []
+    waypoints: List[Dict[str, Any]] = []
+    distance = 0.0
+    duration = 0.0
+
+    for k, response in enumerate(responses):
+        route = response["routes"][0]
+        geometries.append(RouteGeometry.from_osrm(route["geometry"]))
+        distance += route["distance"]
+        duration += route["duration"]
+        legs.extend(route.get("legs", []))
+
+        window_waypoints = response.get("waypoints", [])
+        waypoints.extend(window_waypoints if k == 0 else window_waypoints[1:])
+
+    return {
+        "code": "Ok",
+        "routes": [
+            {
+                "geometry": RouteGeometry.concat(geometries),
+                "distance": distance,
+                "duration": duration,
+                "legs": legs,
+            }
+        ],
+        "waypoints": waypoints,
+    }
+
+
+async def fetch_route_windows(
+    windows: Sequence[List[Dict[str, float]]],
+    fetch_window: Callable[[List[Dict[str, float]]], Awaitable[Any]],
+    max_concurrent: int = OSRM_ROUTE_MAX_CONCURRENT,
+) -> List[Any]:
+    """
+    Run fetch_window on every window concurrently, bounded by max_concurrent.
+
+    Args:
+        windows: Waypoint lists to route
+        fetch_window: Async function called with each window
+        max_concurrent: Max window requests in flight
+
+    Returns:
+        fetch_window results, in window order
+
+    Raises:
+        Exception: Any error raised by fetch_window (remaining windows are cancelled)
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def fetch(window: List[Dict[str, float]]) -> Any:
+        async with semaphore:
+            return await fetch_window(window)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(fetch(window)) for window in windows]
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0]
+    return [task.result() for task in tasks]
+
+
+async def build_windowed_route(
+    coords: List[Dict[str, float]],
+    fetch_window: WindowFn,
+    window_size: int = OSRM_ROUTE_WINDOW_SIZE,
+    max_concurrent: int = OSRM_ROUTE_MAX_CONCURRENT,
+) -> Dict[str, Any]:
+    """
+    Request every window concurrently and stitch the tour.
+
+    Args:
+        coords: Ordered waypoint dicts with 'lat' and 'lng' keys
+        fetch_window: Async function returning an OSRM /route response for a
+            list of waypoints; it picks the backend
+        window_size: Max waypoints per window
+        max_concurrent: Max window requests in flight
+
+    Returns:
+        OSRM-shaped response with a single stitched route
+
+    Raises:
+        Exception: Any error raised by fetch_window (remaining windows are cancelled)
+    """
+    windows = plan_route_windows(len(coords), window_size)
+    if len(windows) > 1:
+        logger.info(
+            f"Routing {len(coords)} waypoints in {len(windows)} windows "
+            f"of up to {window_size} ({max_concurrent} in flight)"
+        )
+
+    responses = await fetch_route_windows(
+        [coords[start:stop] for start, stop in windows], fetch_window, max_concurrent
+    )
+    return stitch_route_windows(responses)
@@ -0,0 +1,304 @@
+"""
+Process pool for TSP solving.
+
+OR-Tools searches are CPU-bound and hold the GIL, so solving on the event loop
+thread stalls every other request (including frontend heartbeats) for the
+whole search. This module runs solves in a bounded ``ProcessPoolExecutor``:
+
+- the compact cost matrix, constraints and solver policy are sent to a worker
+  process, the best solution found within the policy's budget comes back;
+- at most ``SOLVER_MAX_WORKERS`` solves run at once and at most
+  ``SOLVER_MAX_QUEUE`` wait; further requests are rejected (HTTP 503);
+- cancelling the awaiting task (e.g. the client disconnected) drops a queued
+  job, or asks a running search to stop at its next improving solution;
+- queue and timing metrics are exposed through ``get_solver_pool().snapshot()``.
+
+Small problems in "heuristic" mode (the default up to the first policy
+tier, 60 points) take a few milliseconds and are solved inline, skipping the
+queue and the IPC round trip. Larger heuristic solves (a client can request
+the mode for any size) grow roughly cubically and go through the pool like
+any other search.
+
+The FastAPI lifespan starts the pool on startup and shuts it down on
+shutdown; outside the application it is started lazily on first use.
+
+Environment variables:
+- SOLVER_MAX_WORKERS: Worker processes (default: number of CPUs; 0 solves in a
+  thread instead, for constrained environments)
+- SOLVER_MAX_QUEUE: Solves allowed to wait for a worker (default: 32)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from webrotas.config.logging_config import get_logger
+from webrotas.core.exceptions import SolverBusyError
+from webrotas.domain.routing.tsp import (
+    DEFAULT_POLICY_TIERS,
+    SolverPolicy,
+    TspSolution,
+    default_policy,
+    solve_tsp,
+)
+
+logger = get_logger(__name__)
+
+SOLVER_MAX_WORKERS = int(os.getenv("SOLVER_MAX_WORKERS", os.cpu_count() or 1))
+SOLVER_MAX_QUEUE = int(os.getenv("SOLVER_MAX_QUEUE", 32))
+
+# Largest heuristic problem solved inline on the event loop (the small tier)
+INLINE_HEURISTIC_MAX_NODES = DEFAULT_POLICY_TIERS[0][0]
+
+# Per-job stop flags shared with the workers (set in the worker initializer)
+_stop_flags = None
+
+
+def _init_worker(stop_flags) -> None:
+    """Worker process initializer: keep a handle on the shared stop flags."""
+    global _stop_flags
+    _stop_flags = stop_flags
+
+
+def _solve_in_worker(
+    cost_matrix: np.ndarray,
+    endpoint_index: int | None,
+    closed: bool,
+    policy: SolverPolicy | None,
+    initial_order: List[int] | None,
+    slot: int,
+) -> TspSolution:
+    """Solve one TSP in a worker process, honouring the job's stop flag."""
+    flags = _stop_flags
+    should_stop = (lambda: flags[slot] != 0) if flags is not None else None
+    return solve_tsp(
+        cost_matrix,
+        endpoint_index=endpoint_index,
+        closed=closed,
+        policy=policy,
+        should_stop=should_stop,
+        initial_order=initial_order,
+    )
+
+
+class SolverPool:
+    """Bounded process pool running TSP solves off the event loop."""
+
+    def __init__(
+        self, max_workers: int = SOLVER_MAX_WORKERS, max_queue: int = SOLVER_MAX_QUEUE
+    ):
+        """
+        Initialize the pool (worker processes start on first use).
+
+        Args:
+            max_workers: Worker processes (0 runs solves in a thread)
+            max_queue: Solves allowed to wait for a free worker
+        """
+        self.max_workers = max(0, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._capacity = max(1, self.max_workers) + self.max_queue
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._stop_flags = None
+        self._free_slots: List[int] = list(range(self._capacity))
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._total_wait_s = 0.0
+        self._total_solve_s = 0.0
+
+    def start(self) -> None:
+        """Start the worker processes (no-op if already started)."""
+        if self._executor is not None or self.max_workers == 0:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._stop_flags = context.Array("b", self._capacity, lock=False)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._stop_flags,),
+        )
+        logger.info(
+            f"Started solver pool with {self.max_workers} worker(s), "
+            f"queue limit {self.max_queue}"
+        )
+
+    def shutdown(self) -> None:
+        """Stop the workers, cancelling queued solves and stopping running ones."""
+        if self._stop_flags is not None:
+            for slot in range(self._capacity):
+                self._stop_flags[slot] = 1
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Solver pool shut down")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Worker slots semaphore, bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_workers))
+            self._loop = loop
+        return self._semaphore
+
+    async def solve(
+        self,
+        cost_matrix: np.ndarray,
+        endpoint_index: int | None = None,
+        closed: bool = False,
+        policy: SolverPolicy | None = None,
+        initial_order: List[int] | None = None,
+    ) -> TspSolution:
+        """
+        Solve a TSP in the pool.
+
+        Args:
+            cost_matrix: Cost matrix to optimize (e.g. CostMatrix.costs(criterion))
+            endpoint_index: If specified, route must end at this node
+            closed: If True, route returns to origin
+            policy: Optional SolverPolicy (default: tuned to the matrix size)
+            initial_order: Optional route to start the search from
+
+        Returns:
+            TspSolution with the route order and search report
+
+        Raises:
+            SolverBusyError: If the queue is full
+            asyncio.CancelledError: If the caller is cancelled while waiting
+        """
+        policy = policy or default_policy(len(cost_matrix))
+        if policy.mode == "heuristic" and len(cost_matrix) <= INLINE_HEURISTIC_MAX_NODES:
+            solution = solve_tsp(
+                cost_matrix,
+                endpoint_index=endpoint_index,
+                closed=closed,
+                policy=policy,
+                initial_order=initial_order,
+            )
+            self._completed += 1
+            self._total_solve_s += solution.solve_time_s
+            return solution
+
+        if self._queued + self._running >= self._capacity or not self._free_slots:
+            self._rejected += 1
+            logger.warning("Solver queue full, rejecting solve request")
+            raise SolverBusyError()
+
+        self.start()
+        semaphore = self._get_semaphore()
+        slot = self._free_slots.pop()
+        if self._stop_flags is not None:
+            self._stop_flags[slot] = 0
+
+        self._queued += 1
+        enqueued_at = time.monotonic()
+        started = False
+        future = None
+        try:
+            async with semaphore:
+                self._queued -= 1
+                self._running += 1
+                started = True
+                started_at = time.monotonic()
+                self._total_wait_s += started_at - enqueued_at
+
+                if self._executor is not None:
+                    future = self._executor.submit(
+                        _solve_in_worker,
+                        cost_matrix,
+                        endpoint_index,
+                        closed,
+                        policy,
+                        initial_order,
+                        slot,
+                    )
+                    solution = await asyncio.wrap_future(future)
+                else:
+                    solution = await asyncio.to_thread(
+                        solve_tsp,
+                        cost_matrix,
+                        endpoint_index=endpoint_index,
+                        closed=closed,
+                        policy=policy,
+                        initial_order=initial_order,
+                    )
+
+                self._completed += 1
+                self._total_solve_s += time.monotonic() - started_at
+                return solution
+
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            if self._stop_flags is not None:
+                # Ask a running search to stop at its next solution
+                self._stop_flags[slot] = 1
+            logger.info(f"Solve cancelled ({'running' if started else 'queued'})")
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            if started:
+                self._running -= 1
+            else:
+                self._queued -= 1
+            if future is not None and not future.done():
+                # Keep the stop flag reserved until the worker lets go of it
+                future.cancel()
+                future.add_done_callback(lambda _: self._free_slots.append(slot))
+            else:
+                self._free_slots.append(slot)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return JSON-serializable queue and timing metrics."""
+        finished = self._completed + self._failed
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": self._queued,
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "avg_wait_s": round(self._total_wait_s / finished, 3) if finished else 0.0,
+            "avg_solve_s": (
+                round(self._total_solve_s / self._completed, 3)
+                if self._completed
+                else 0.0
+            ),
+        }
+
+
+_pool: SolverPool | None = None
+
+
+def get_solver_pool() -> SolverPool:
+    """Get the process-wide solver pool."""
+    global _pool
+    if _pool is None:
+        _pool = SolverPool()
+    return _pool
+
+
+async def open_solver_pool() -> None:
+    """Start the solver pool (called on app startup)."""
+    get_solver_pool().start()
+
+
+async def close_solver_pool() -> None:
+    """Shut the solver pool down (called on app shutdown)."""
+    if _pool is not None:
+        _pool.shutdown()
@@ -0,0 +1,260 @@
+"""
+Tiled distance/duration matrix engine.
+
+osrm-routed rejects table requests larger than its ``--max-table-size``
+(1000 in docker-compose.yml). Instead of sending every coordinate in a single
+``/table`` call, large problems are split into source x destination tiles using
+OSRM's ``sources``/``destinations`` parameters. Tiles are requested concurrently
+with a bounded number in flight and scattered into one preallocated matrix.
+
+The public router caps the total number of coordinates per request instead of
+sources x destinations, so it uses a different plan: points are split into
+chunks of at most half the cap and each pair of chunks is requested as one
+square table over their union, covering the full asymmetric matrix in
+C(k, 2) calls.
+
+Environment variables:
+- OSRM_MAX_TABLE_SIZE: Max sources/destinations per tile (default: 1000)
+- OSRM_TABLE_MAX_CONCURRENT: Max tile requests in flight (default: 4)
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from webrotas.config.logging_config import get_logger
+from webrotas.domain.routing.cost_matrix import COST_DTYPE
+
+logger = get_logger(__name__)
+
+OSRM_MAX_TABLE_SIZE = int(os.getenv("OSRM_MAX_TABLE_SIZE", 1000))
+OSRM_TABLE_MAX_CONCURRENT = int(os.getenv("OSRM_TABLE_MAX_CONCURRENT", 4))
+
+# Max coordinates the public router accepts in a single /table request
+PUBLIC_OSRM_MAX_COORDINATES = 100
+
+RequestFn = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class TableTile:
+    """A block of the matrix: rows ``sources`` x columns ``destinations``."""
+
+    sources: List[int]
+    destinations: List[int]
+
+    @property
+    def is_square(self) -> bool:
+        """Whether sources and destinations are the same points."""
+        return self.sources == self.destinations
+
+    @property
+    def request_indices(self) -> List[int]:
+        """Global indices of the coordinates sent in the request."""
+        if self.is_square:
+            return self.sources
+        return self.sources + self.destinations
+
+    def to_params(self) -> Dict[str, str]:
+        """OSRM query parameters selecting this tile's sources/destinations."""
+        params = {"annotations": "distance,duration"}
+        if not self.is_square:
+            num_sources = len(self.sources)
+            params["sources"] = ";".join(str(i) for i in range(num_sources))
+            params["destinations"] = ";".join(
+                str(num_sources + i) for i in range(len(self.destinations))
+            )
+        return params
+
+
+def plan_table_tiles(
+    num_points: int, tile_size: int = OSRM_MAX_TABLE_SIZE
+) -> List[TableTile]:
+    """
+    Split an n x n matrix into square-bounded source x destination tiles.
+
+    Args:
+        num_points: Number of coordinates (n)
+        tile_size: Max sources and destinations per tile
+
+    Returns:
+        List of TableTile covering every (i, j) cell exactly once
+    """
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive")
+
+    chunks = [
+        list(range(start, min(start + tile_size, num_points)))
+        for start in range(0, num_points, tile_size)
+    ]
+    return [
+        TableTile(sources=rows, destinations=cols) for rows in chunks for cols in chunks
+    ]
+
+
+def plan_block_pair_tiles(
+    num_points: int, max_coords: int = PUBLIC_OSRM_MAX_COORDINATES
+) -> List[TableTile]:
+    """
+    Plan square tiles for a router that caps coordinates per request.
+
+    Points are split into k balanced chunks of at most max_coords // 2 points;
+    every pair of chunks is requested as a square table over their union, which
+    fills both diagonal blocks and both off-diagonal blocks at once. This covers
+    every (i, j) cell, in both directions, with C(k, 2) requests (one request
+    when all points fit).
+
+    Args:
+        num_points: Number of coordinates (n)
+        max_coords: Max coordinates per request
+
+    Returns:
+        List of square TableTile covering every (i, j) cell at least once
+    """
+    if max_coords < 2:
+        raise ValueError("max_coords must be at least 2")
+    if num_points <= max_coords:
+        indices = list(range(num_points))
+        return [TableTile(sources=indices, destinations=indices)]
+
+    num_chunks = -(-num_points // (max_coords // 2))
+    chunk_size = -(-num_points // num_chunks)
+    chunks = [
+        list(range(start, min(start + chunk_size, num_points)))
+        for start in range(0, num_points, chunk_size)
+    ]
+
+    tiles = []
+    for a in range(len(chunks)):
+        for b in range(a + 1, len(chunks)):
+            union = chunks[a] + chunks[b]
+            tiles.append(TableTile(sources=union, destinations=union))
+    return tiles
+
+
+def plan_incremental_tiles(
+    num_points: int, new_indices: List[int], tile_size: int = OSRM_MAX_TABLE_SIZE
+) -> List[TableTile]:
+    """
+    Plan the tiles needed to fill only the rows and columns of new points.
+
+    Used when a previous matrix is reused for unchanged points: new points are
+    requested as sources against every point, and the unchanged points as
+    sources against the new points only.
+
+    Args:
+        num_points: Number of coordinates (n)
+        new_indices: Indices of the points whose rows/columns are missing
+        tile_size: Max sources and destinations per tile (use
+            max_coords // 2 for routers that cap coordinates per request)
+
+    Returns:
+        List of TableTile covering every cell in a new row or column exactly once
+    """
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive")
+
+    new = sorted(set(int(i) for i in new_indices))
+    new_set = set(new)
+    old = [i for i in range(num_points) if i not in new_set]
+
+    def chunks(indices: List[int]) -> List[List[int]]:
+        return [
+            indices[start : start + tile_size]
+            for start in range(0, len(indices), tile_size)
+        ]
+
+    everything = list(range(num_points))
+    tiles = [
+        TableTile(sources=rows, destinations=cols)
+        for rows in chunks(new)
+        for cols in chunks(everything)
+    ]
+    tiles += [
+        TableTile(sources=rows, destinations=cols)
+        for rows in chunks(old)
+        for cols in chunks(new)
+    ]
+    return tiles
+
+
+async def build_tiled_matrix(
+    coords: List[Dict[str, float]],
+    request_fn: RequestFn,
+    tiles: List[TableTile] | None = None,
+    max_concurrent: int = OSRM_TABLE_MAX_CONCURRENT,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Request every tile concurrently and assemble the full matrices.
+
+    Args:
+        coords: List of coordinate dicts with 'lat' and 'lng' keys
+        request_fn: Async OSRM request function (e.g. request_osrm)
+        tiles: Tiles to request; defaults to plan_table_tiles(len(coords))
+        max_concurrent: Max tile requests in flight
+
+    Returns:
+        Tuple of (distances, durations) float32 arrays; cells OSRM could not
+        route (null in the response) are NaN
+
+    Raises:
+        ValueError: If a tile response is missing or has the wrong shape
+        Exception: Any error raised by request_fn (remaining tiles are cancelled)
+    """
+    num_points = len(coords)
+    if tiles is None:
+        tiles = plan_table_tiles(num_points)
+
+    distances = np.full((num_points, num_points), np.nan, dtype=COST_DTYPE)
+    durations = np.full((num_points, num_points), np.nan, dtype=COST_DTYPE)
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def fetch_tile(tile_idx: int, tile: TableTile) -> None:
+        coord_str = ";".join(
+            f"{coords[i]['lng']},{coords[i]['lat']}" for i in tile.request_indices
+        )
+        async with semaphore:
+            logger.debug(
+                f"Requesting table tile {tile_idx + 1}/{len(tiles)} "
+                f"({len(tile.sources)}x{len(tile.destinations)})"
+            )
+            data = await request_fn(
+                request_type="table",
+                coordinates=coord_str,
+                params=tile.to_params(),
+            )
+
+        if "distances" not in data or "durations" not in data:
+            raise ValueError(f"Invalid response for table tile {tile_idx}")
+
+        # None (unroutable) becomes NaN
+        tile_distances = np.array(data["distances"], dtype=float)
+        tile_durations = np.array(data["durations"], dtype=float)
+        expected = (len(tile.sources), len(tile.destinations))
+        if tile_distances.shape != expected or tile_durations.shape != expected:
+            raise ValueError(
+                f"Table tile {tile_idx} has shape {tile_distances.shape}, expected {expected}"
+            )
+
+        block = np.ix_(tile.sources, tile.destinations)
+        distances[block] = tile_distances
+        durations[block] = tile_durations
+
+    if len(tiles) > 1:
+        logger.info(
+            f"Building {num_points}x{num_points} matrix from {len(tiles)} table tiles "
+            f"({max_concurrent} in flight)"
+        )
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for tile_idx, tile in enumerate(tiles):
+                group.create_task(fetch_tile(tile_idx, tile))
+    except ExceptionGroup as eg:
+        # Surface the first tile error as-is (e.g. HTTPException from OSRM)
+        raise eg.exceptions[0]
+
+    return distances, durations
@@ -1,9 +1,10 @@
 """FastAPI application initialization and configuration"""
 
 import sys
+import asyncio
 import argparse
 from pathlib import Path
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -17,6 +18,17 @@ from webrotas.api.routes.process import router as process_router
 from webrotas.api.routes.health import router as health_router
 from webrotas.api.routes.logs import router as logs_router
 from webrotas.server_env import env
+from webrotas.api.services.osrm_health import run_health_probes
+from webrotas.infrastructure.routing.http_client import (
+    open_http_clients,
+    close_http_clients,
+)
+from webrotas.infrastructure.routing.solver_pool import (
+    open_solver_pool,
+    close_solver_pool,
+)
+from webrotas.infrastructure.routing.pair_cache import close_pair_cache
+from webrotas.infrastructure.routing.leg_cache import close_leg_cache
 from webrotas.config.logging_config import get_logger
 
 # Initialize logging at module level
@@ -33,6 +45,9 @@ async def lifespan(app: FastAPI):
         if args.port != env.port:
             env.port = args.port
         env.save_server_data()
+        await open_http_clients()
+        await open_solver_pool()
+        health_probes = asyncio.create_task(run_health_probes())
         logger.info(f"Server starting on port {env.port}")
     except Exception as e:
         logger.error(f"Startup error: {e}", exc_info=True)
@@ -42,6 +57,14 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     try:
+        # Let the probe finish before closing the clients it uses
+        health_probes.cancel()
+        with suppress(asyncio.CancelledError):
+            await health_probes
+        await close_http_clients()
+        await close_solver_pool()
+        close_pair_cache()
+        close_leg_cache()
         env.clean_server_data()
         logger.info("Server shutdown")
     except Exception as e:
@@ -0,0 +1,291 @@
+"""
+Tests for compiled avoid zone sets.
+
+Tests cover:
+- Canonical zone hashing (formatting-independent, order and name sensitive)
+- Validation: ring closing, bow-tie repair, degenerate zones dropped
+- Point queries (boundary touching vs strictly inside) and bounds
+- Bulk point filtering (kept/removed indices, first zone hit, always-kept points)
+- LRU cache reuse and eviction
+- Zone consumers: waypoint filtering, grid generation and alternative scoring
+"""
+
+import numpy as np
+import pytest
+from shapely.geometry import Point
+
+from webrotas.domain.avoid_zones import zone_set as zone_set_module
+from webrotas.domain.avoid_zones.zone_set import (
+    AvoidZoneSet,
+    AvoidZoneSetCache,
+    canonical_zone_key,
+    get_avoid_zone_set,
+)
+from webrotas.domain.routing.alternatives import (
+    SegmentAlternative,
+    SegmentAlternativesBuilder,
+)
+from webrotas.domain.routing.geometry import RouteGeometry
+from webrotas.domain.routing.processor import RouteProcessor
+from webrotas.infrastructure.routing.osrm import _filter_waypoints_in_zones
+
+
+def square_zone(name: str, lat: float, lng: float, size: float = 0.01) -> dict:
+    """Square zone ([lat, lng] pairs, open ring) with its SW corner at (lat, lng)."""
+    return {
+        "name": name,
+        "coord": [
+            [lat, lng],
+            [lat, lng + size],
+            [lat + size, lng + size],
+            [lat + size, lng],
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Isolate the process-wide cache between tests."""
+    monkeypatch.setattr(zone_set_module, "_cache", AvoidZoneSetCache(max_entries=4))
+
+
+class TestCanonicalKey:
+    """Tests for canonical_zone_key."""
+
+    def test_ring_closing_and_rounding_do_not_change_key(self):
+        zone = square_zone("A", -22.9, -43.2)
+        closed = dict(zone, coord=zone["coord"] + [zone["coord"][0]])
+        noisy = dict(
+            zone, coord=[[lat + 1e-9, lng - 1e-9] for lat, lng in zone["coord"]]
+        )
+        key = canonical_zone_key([zone])
+        assert canonical_zone_key([closed]) == key
+        assert canonical_zone_key([noisy]) == key
+
+    def test_names_and_order_change_key(self):
+        a = square_zone("A", -22.9, -43.2)
+        b = square_zone("B", -22.8, -43.1)
+        assert canonical_zone_key([a, b]) != canonical_zone_key([b, a])
+        assert canonical_zone_key([a]) != canonical_zone_key([dict(a, name="C")])
+
+
+class TestAvoidZoneSet:
+    """Tests for AvoidZoneSet compilation and queries."""
+
+    def test_polygons_names_and_bounds(self):
+        zones = [square_zone("A", -22.9, -43.2), square_zone("B", -22.8, -43.1)]
+        zone_set = AvoidZoneSet(zones)
+
+        assert len(zone_set) == 2
+        assert list(zone_set) == zones
+        assert zone_set.names == ["A", "B"]
+        assert zone_set.zone_indices == [0, 1]
+        assert zone_set.bounds == pytest.approx((-43.2, -22.9, -43.09, -22.79))
+
+    def test_bow_tie_is_repaired(self):
+        bow_tie = {
+            "name": "Bow",
+            "coord": [[0.0, 0.0], [1.0, 1.0], [0.0, 1.0], [1.0, 0.0]],
+        }
+        zone_set = AvoidZoneSet([bow_tie])
+
+        assert len(zone_set.polygons) == 1
+        assert zone_set.polygons[0].is_valid
+        assert zone_set.polygons[0].area == pytest.approx(0.5)
+
+    def test_degenerate_zones_are_dropped(self):
+        zones = [
+            {"name": "Line", "coord": [[0.0, 0.0], [1.0, 1.0]]},
+            {"name": "Empty", "coord": []},
+            square_zone("A", -22.9, -43.2),
+        ]
+        zone_set = AvoidZoneSet(zones)
+
+        assert len(zone_set) == 3
+        assert zone_set.names == ["A"]
+        assert zone_set.zone_indices == [2]
+
+    def test_point_queries(self):
+        zone_set = AvoidZoneSet(
+            [square_zone("A", -22.9, -43.2), square_zone("B", -22.8, -43.1)]
+        )
+        inside_b = Point(-43.095, -22.795)
+        on_edge_a = Point(-43.2, -22.895)
+        outside = Point(-43.0, -22.0)
+
+        np.testing.assert_array_equal(
+            zone_set.zones_touching(
+                [inside_b.y, on_edge_a.y, outside.y], [inside_b.x, on_edge_a.x, outside.x]
+            ),
+            [1, 0, -1],
+        )
+        np.testing.assert_array_equal(
+            zone_set.contains_xy([inside_b.y, on_edge_a.y], [inside_b.x, on_edge_a.x]),
+            [True, False],
+        )
+
+    def test_empty_set(self):
+        zone_set = get_avoid_zone_set(None)
+
+        assert not zone_set
+        assert zone_set.tree is None
+        assert zone_set.bounds is None
+        np.testing.assert_array_equal(zone_set.zones_touching([0.0], [0.0]), [-1])
+
+
+class TestFilterPoints:
+    """Tests for bulk point filtering."""
+
+    def test_kept_removed_and_zone_hits(self):
+        zone_set = AvoidZoneSet(
+            [square_zone("A", 0.0, 0.0), square_zone("B", 0.0, 0.02)]
+        )
+        lats = np.array([0.005, 0.5, 0.005, 0.0, 0.005])
+        lngs = np.array([0.005, 0.5, 0.025, 0.01, 0.05])
+
+        result = zone_set.filter_points(lats, lngs)
+
+        np.testing.assert_array_equal(result.kept, [1, 4])
+        np.testing.assert_array_equal(result.removed, [0, 2, 3])
+        np.testing.assert_array_equal(result.zones, [0, 1, 0])
+
+    def test_overlapping_zones_report_first(self):
+        zone_set = AvoidZoneSet(
+            [square_zone("A", 0.0, 0.0), square_zone("B", 0.0, 0.0, size=0.02)]
+        )
+
+        np.testing.assert_array_equal(
+            zone_set.zones_touching([0.005, 0.015], [0.005, 0.015]), [0, 1]
+        )
+
+    def test_always_keep(self):
+        zone_set = AvoidZoneSet([square_zone("A", 0.0, 0.0)])
+
+        result = zone_set.filter_points([0.005, 0.005], [0.005, 0.005], always_keep=[0])
+
+        np.testing.assert_array_equal(result.kept, [0])
+        np.testing.assert_array_equal(result.removed, [1])
+
+    def test_matches_per_point_shapely(self):
+        rng = np.random.default_rng(7)
+        zone_set = AvoidZoneSet(
+            [square_zone(f"Z{k}", *rng.random(2) * 0.1) for k in range(12)]
+        )
+        lats, lngs = rng.random(500) * 0.12, rng.random(500) * 0.12
+
+        def first_hit(lat, lng):
+            point = Point(lng, lat)
+            hits = [i for i, polygon in enumerate(zone_set.polygons) if polygon.intersects(point)]
+            return hits[0] if hits else -1
+
+        expected = [first_hit(lat, lng) for lat, lng in zip(lats, lngs)]
+
+        np.testing.assert_array_equal(zone_set.zones_touching(lats, lngs), expected)
+
+    def test_no_zones_keeps_everything(self):
+        result = get_avoid_zone_set([]).filter_points([0.0, 1.0], [0.0, 1.0])
+
+        np.testing.assert_array_equal(result.kept, [0, 1])
+        assert len(result.removed) == 0
+
+
+class TestAvoidZoneSetCache:
+    """Tests for the compiled zone set LRU."""
+
+    def test_same_zones_share_compiled_set(self):
+        zones = [square_zone("A", -22.9, -43.2)]
+        copy = [dict(zone, coord=[list(c) for c in zone["coord"]]) for zone in zones]
+
+        first = get_avoid_zone_set(zones)
+        assert get_avoid_zone_set(copy) is first
+        assert get_avoid_zone_set(first) is first
+
+        snapshot = zone_set_module.get_avoid_zone_cache().snapshot()
+        assert snapshot["hits"] == 1
+        assert snapshot["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = AvoidZoneSetCache(max_entries=2)
+        a = [square_zone("A", 0.0, 0.0)]
+        b = [square_zone("B", 1.0, 1.0)]
+        c = [square_zone("C", 2.0, 2.0)]
+
+        first_a = cache.get(a)
+        cache.get(b)
+        cache.get(a)
+        cache.get(c)
+
+        assert len(cache) == 2
+        assert cache.get(a) is first_a
+        assert cache.snapshot()["misses"] == 3
+
+    def test_disabled_cache_still_compiles(self):
+        cache = AvoidZoneSetCache(max_entries=0)
+        zones = [square_zone("A", 0.0, 0.0)]
+
+        assert cache.get(zones).names == ["A"]
+        assert len(cache) == 0
+
+
+class TestZoneConsumers:
+    """Tests for the consumers receiving the compiled set."""
+
+    def test_filter_reports_zone_name(self):
+        zones = [square_zone("A", -22.9, -43.2), square_zone("B", -22.8, -43.1)]
+        coords = [
+            {"lat": -22.0, "lng": -43.0},
+            {"lat": -22.795, "lng": -43.095},
+            {"lat": -22.5, "lng": -43.5},
+        ]
+
+        filtered, indices, hits = _filter_waypoints_in_zones(coords, zones)
+
+        assert indices == [0, 2]
+        assert filtered == [coords[0], coords[2]]
+        assert [hit["zone_name"] for hit in hits] == ["B"]
+
+    def test_processor_compiles_zones_once(self):
+        zones = [square_zone("A", -22.9, -43.2)]
+        processor = RouteProcessor(
+            "session", {"lat": -22.0, "lng": -43.0}, zones, "distance"
+        )
+
+        assert isinstance(processor.avoid_zones, AvoidZoneSet)
+        assert list(processor.avoid_zones) == zones
+        assert SegmentAlternativesBuilder(
+            [], processor.avoid_zones
+        ).avoid_zones is processor.avoid_zones
+
+    def test_grid_skips_points_inside_zones(self):
+        # City: 0.05 x 0.05 degree square ([lng, lat] boundary)
+        city = [[[0.0, 0.0], [0.05, 0.0], [0.05, 0.05], [0.0, 0.05], [0.0, 0.0]]]
+        zones = [square_zone("A", 0.0, 0.0, size=0.025)]
+
+        all_points = RouteProcessor._generate_waypoints_in_city(
+            city, [], 1000, "Location"
+        )
+        outside = RouteProcessor._generate_waypoints_in_city(
+            city, zones, 1000, "Location"
+        )
+
+        assert 0 < len(outside) < len(all_points)
+        assert not any(p["lat"] < 0.025 and p["lng"] < 0.025 for p in outside)
+
+    def test_alternatives_scored_per_zone(self):
+        zones = [square_zone("A", 0.0, 0.01), square_zone("B", 0.0, 0.03)]
+        builder = SegmentAlternativesBuilder([], zones)
+        builder.segment_alternatives = [
+            [
+                SegmentAlternative(0, 0, 5000.0, 300.0, RouteGeometry.from_coordinates(line))
+                for line in ([[0.0, 0.005], [0.05, 0.005]], [[0.0, 0.5], [0.05, 0.5]])
+            ]
+        ]
+
+        crossing, clear = sorted(
+            builder.generate_complete_routes(), key=lambda r: r["option_combination"]
+        )
+
+        assert crossing["zone_intersections"] == 2
+        assert crossing["penalty_score"] == pytest.approx(0.4)
+        assert clear["zone_intersections"] == 0
+        assert clear["penalty_score"] == 0.0
@@ -0,0 +1,247 @@
+"""
+Tests for the OSRM backend circuit breakers.
+
+Tests cover:
+- closed -> open -> half-open -> closed transitions
+- Half-open trial slots released by cancelled or non-transport failures
+- make_request rejecting requests while the circuit is open
+- Matrix fallback chain skipping backends with open circuits
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from webrotas.infrastructure.routing import circuit_breaker, http_client, osrm
+from webrotas.infrastructure.routing.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    get_circuit_breaker,
+)
+from webrotas.infrastructure.routing.http_client import LOCAL_BACKEND, PUBLIC_BACKEND
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    circuit_breaker._breakers.clear()
+    http_client._clients.clear()
+    yield
+    circuit_breaker._breakers.clear()
+    http_client._clients.clear()
+
+
+def create_test_coords(n: int) -> list:
+    """Create n test coordinates in São Paulo region."""
+    return [{"lat": -23.55 + i * 0.01, "lng": -46.57 + i * 0.01} for i in range(n)]
+
+
+class TestCircuitBreakerStates:
+    """Tests for state transitions."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("local", failure_threshold=3, recovery_timeout=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+        assert not breaker.is_available()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker("local", failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker("local", failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        time.sleep(0.02)
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+    def test_half_open_success_closes(self):
+        breaker = CircuitBreaker("local", failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker("local", failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        breaker.record_failure("timeout")
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.snapshot()["last_failure"] == "timeout"
+
+
+class TestRequestSlot:
+    """Tests for CircuitBreaker.request_slot."""
+
+    def half_open_breaker(self):
+        breaker = CircuitBreaker("local", failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.state == CircuitState.HALF_OPEN
+        return breaker
+
+    def test_rejects_when_open(self):
+        breaker = CircuitBreaker("local", failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            with breaker.request_slot():
+                pass
+
+    def test_unrecorded_trial_releases_slot(self):
+        breaker = self.half_open_breaker()
+
+        with pytest.raises(ValueError):
+            with breaker.request_slot():
+                assert not breaker.allow_request()
+                raise ValueError("bad payload")
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+
+    def test_recorded_trial_does_not_leak_into_next_period(self):
+        breaker = self.half_open_breaker()
+
+        with breaker.request_slot():
+            breaker.record_failure()
+            time.sleep(0.02)
+            # New half-open period; another caller takes its trial slot
+            assert breaker.allow_request()
+
+        assert not breaker.allow_request()
+
+    def test_cancelled_request_releases_slot(self, monkeypatch):
+        async def handler(request):
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(
+            http_client,
+            "_create_client",
+            lambda backend: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        breaker = get_circuit_breaker(LOCAL_BACKEND)
+        breaker.recovery_timeout = 0.01
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        time.sleep(0.02)
+
+        async def cancel_request():
+            task = asyncio.create_task(
+                osrm.make_request("http://osrm/route/v1/driving/0,0;1,1")
+            )
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_request())
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+
+    def test_backoff_does_not_hold_slot(self, monkeypatch):
+        def handler(request):
+            # An httpx error that is not a transport failure (not recorded)
+            raise httpx.DecodingError("bad body", request=request)
+
+        monkeypatch.setattr(
+            http_client,
+            "_create_client",
+            lambda backend: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        breaker = get_circuit_breaker(LOCAL_BACKEND)
+        breaker.recovery_timeout = 0.01
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        time.sleep(0.02)
+        slots_during_backoff = []
+
+        async def fake_sleep(delay):
+            slots_during_backoff.append(breaker._half_open_calls)
+
+        monkeypatch.setattr(osrm.asyncio, "sleep", fake_sleep)
+
+        with pytest.raises(httpx.DecodingError):
+            asyncio.run(
+                osrm.make_request("http://osrm/route/v1/driving/0,0;1,1", max_retries=2)
+            )
+
+        assert slots_during_backoff == [0]
+
+
+class TestRequestGating:
+    """Tests for make_request and the fallback chain."""
+
+    def test_make_request_rejected_when_open(self, monkeypatch):
+        def handler(request):
+            raise AssertionError("request should not be sent")
+
+        monkeypatch.setattr(
+            http_client,
+            "_create_client",
+            lambda backend: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        breaker = get_circuit_breaker(LOCAL_BACKEND)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(osrm.make_request("http://osrm/route/v1/driving/0,0;1,1"))
+
+    def test_failures_open_circuit(self, monkeypatch):
+        def handler(request):
+            return httpx.Response(502)
+
+        monkeypatch.setattr(
+            http_client,
+            "_create_client",
+            lambda backend: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        breaker = get_circuit_breaker(LOCAL_BACKEND)
+
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(
+                    osrm.make_request("http://osrm/route/v1/driving/0,0;1,1", max_retries=1)
+                )
+
+        assert breaker.state == CircuitState.OPEN
+
+    def test_chain_skips_open_backends(self, monkeypatch):
+        async def must_not_run(*args, **kwargs):
+            raise AssertionError("backend with open circuit was called")
+
+        monkeypatch.setattr(osrm, "get_osrm_matrix_from_local_container", must_not_run)
+        monkeypatch.setattr(osrm, "get_osrm_matrix_public_api", must_not_run)
+        monkeypatch.setattr(osrm, "get_osrm_matrix_iterative", must_not_run)
+
+        for backend in (LOCAL_BACKEND, PUBLIC_BACKEND):
+            breaker = get_circuit_breaker(backend)
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+
+        coords = create_test_coords(4)
+        start = time.monotonic()
+        matrix = asyncio.run(
+            osrm._get_matrix_with_local_container_priority(coords, None)
+        )
+        matrix_2 = asyncio.run(osrm._get_matrix_with_public_api_priority(coords))
+
+        assert time.monotonic() - start < 1.0
+        assert matrix.size == 4
+        assert matrix_2.size == 4
+        assert matrix.distances[0, 1] > 0
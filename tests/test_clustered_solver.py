@@ -0,0 +1,224 @@
+"""
+Tests for the cluster-first, route-second TSP solver.
+
+Tests cover:
+- Balanced spatial partitioning
+- Boundary selection and stitching
+- Clustered solves (open, closed, fixed endpoint) against geodesic matrices
+- Closed tours that fit in a single cluster
+- Cluster matrices using the backend chosen for the whole request
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from webrotas.domain.geospatial.distance import coords_to_arrays, distance_matrix
+from webrotas.domain.routing.clustering import (
+    choose_boundaries,
+    isolate_endpoint,
+    local_problem,
+    partition_points,
+)
+from webrotas.domain.routing.cost_matrix import CostMatrix
+from webrotas.domain.routing.tsp import SolverPolicy, solve_tsp
+from webrotas.infrastructure.routing import osrm, solver_pool
+from webrotas.infrastructure.routing.clustered_solver import (
+    solve_clustered,
+    use_clustered_solver,
+)
+from webrotas.infrastructure.routing.solver_pool import SolverPool
+
+# Short per-cluster budget keeps the suite fast
+FAST = {"timeLimit": 0.2}
+
+
+@pytest.fixture(autouse=True)
+def thread_solver_pool():
+    previous = solver_pool._pool
+    solver_pool._pool = SolverPool(max_workers=0)
+    yield
+    solver_pool._pool = previous
+
+
+def create_grid_coords(rows: int, cols: int) -> list:
+    """Grid of points ~100 m apart, shuffled (origin stays first)."""
+    coords = [
+        {"lat": -23.55 + r * 0.001, "lng": -46.63 + c * 0.001}
+        for r in range(rows)
+        for c in range(cols)
+    ]
+    rest = coords[1:]
+    np.random.default_rng(0).shuffle(rest)
+    return [coords[0]] + rest
+
+
+async def geodesic_matrix(coords):
+    lats, lngs = coords_to_arrays(coords)
+    distances = distance_matrix(lats, lngs)
+    return CostMatrix(distances, distances / 10.0)
+
+
+def route_length(coords, order):
+    lats, lngs = coords_to_arrays(coords)
+    matrix = distance_matrix(lats, lngs)
+    return sum(matrix[a, b] for a, b in zip(order, order[1:]))
+
+
+class TestPartition:
+    """Tests for clustering helpers."""
+
+    def test_partition_sizes_and_coverage(self):
+        lats, lngs = coords_to_arrays(create_grid_coords(20, 23))
+        clusters = partition_points(lats, lngs, max_size=50)
+
+        sizes = [len(c) for c in clusters]
+        assert max(sizes) <= 50 and min(sizes) >= 25
+        assert sorted(np.concatenate(clusters).tolist()) == list(range(460))
+
+    def test_isolate_endpoint(self):
+        clusters = [np.array([0, 1, 2]), np.array([3, 4])]
+        moved = isolate_endpoint(clusters, origin=0, endpoint=2)
+        assert [c.tolist() for c in moved] == [[0, 1], [3, 4], [2]]
+        assert isolate_endpoint(clusters, 0, 4) is clusters
+
+    def test_boundaries_link_closest_points(self):
+        lats = np.array([0.0, 0.0, 0.0, 0.0])
+        lngs = np.array([0.0, 0.01, 0.02, 0.03])
+        sequence = [np.array([0, 1]), np.array([3, 2])]
+
+        boundaries = choose_boundaries(lats, lngs, sequence, origin=0)
+        assert boundaries == [(0, 1), (2, None)]
+
+        members, exit_local = local_problem(sequence[1], *boundaries[1])
+        assert members.tolist() == [2, 3] and exit_local is None
+
+
+class TestSolveClustered:
+    """Tests for solve_clustered."""
+
+    def test_mode_selection(self):
+        assert use_clustered_solver(10, SolverPolicy(mode="clustered"))
+        assert not use_clustered_solver(10, SolverPolicy(mode="auto"))
+        assert not use_clustered_solver(10_000, SolverPolicy(mode="monolithic"))
+
+    def test_open_tour_visits_all(self):
+        coords = create_grid_coords(15, 20)
+        order, report = asyncio.run(
+            solve_clustered(
+                coords, geodesic_matrix, solver_options=FAST, cluster_size=60
+            )
+        )
+
+        assert order[0] == 0
+        assert sorted(order) == list(range(300))
+        assert report["mode"] == "clustered" and report["clusters"] >= 5
+
+        # Within 25% of a monolithic solve
+        monolithic = solve_tsp(
+            asyncio.run(geodesic_matrix(coords)).distances,
+            policy=SolverPolicy(time_limit_s=1.0),
+        )
+        assert route_length(coords, order) <= 1.25 * route_length(
+            coords, monolithic.order
+        )
+
+    def test_fixed_endpoint(self):
+        coords = create_grid_coords(10, 12)
+        order, _ = asyncio.run(
+            solve_clustered(
+                coords,
+                geodesic_matrix,
+                endpoint_index=5,
+                solver_options=FAST,
+                cluster_size=40,
+            )
+        )
+        assert order[0] == 0 and order[-1] == 5
+        assert sorted(order) == list(range(120))
+
+    def test_closed_tour(self):
+        coords = create_grid_coords(10, 12)
+        order, _ = asyncio.run(
+            solve_clustered(
+                coords,
+                geodesic_matrix,
+                closed=True,
+                solver_options=FAST,
+                cluster_size=40,
+            )
+        )
+        assert order[0] == 0 and order[-1] == 0
+        assert sorted(order[:-1]) == list(range(120))
+
+    def test_closed_single_cluster_includes_return(self):
+        coords = create_grid_coords(6, 8)
+        order, report = asyncio.run(
+            solve_clustered(
+                coords,
+                geodesic_matrix,
+                closed=True,
+                solver_options=FAST,
+                cluster_size=100,
+            )
+        )
+
+        assert report["clusters"] == 1
+        assert order[0] == 0 and order[-1] == 0
+        assert sorted(order[:-1]) == list(range(48))
+        # The objective covers the return leg to the origin
+        assert report["objective"] == pytest.approx(route_length(coords, order), abs=0.1)
+
+    def test_only_cluster_matrices_requested(self):
+        coords = create_grid_coords(12, 15)
+        sizes = []
+
+        async def recording_matrix(cluster_coords):
+            sizes.append(len(cluster_coords))
+            return await geodesic_matrix(cluster_coords)
+
+        asyncio.run(
+            solve_clustered(
+                coords, recording_matrix, solver_options=FAST, cluster_size=50
+            )
+        )
+        assert max(sizes) <= 50
+        assert sum(sizes) == 180
+
+
+class TestClusterMatrixBackend:
+    """Tests for the matrix backend of clustered solves in calculate_optimal_route."""
+
+    def test_clusters_use_local_container_for_large_requests(self, monkeypatch):
+        coords = create_grid_coords(20, 30)
+        local_sizes = []
+
+        async def local_priority(cluster_coords, avoid_zones):
+            local_sizes.append(len(cluster_coords))
+            return await geodesic_matrix(cluster_coords)
+
+        async def public_priority(cluster_coords):
+            raise AssertionError("cluster matrix sent to the public router")
+
+        async def fake_route(filtered_coords, order, avoid_zones=None):
+            raise StopAsyncIteration
+
+        monkeypatch.setattr(osrm, "_get_matrix_with_local_container_priority", local_priority)
+        monkeypatch.setattr(osrm, "_get_matrix_with_public_api_priority", public_priority)
+        async def small_clusters(*args, **kwargs):
+            return await solve_clustered(*args, **kwargs, cluster_size=80)
+
+        monkeypatch.setattr(osrm, "get_osrm_route", fake_route)
+        monkeypatch.setattr(osrm, "solve_clustered", small_clusters)
+
+        with pytest.raises(StopAsyncIteration):
+            asyncio.run(
+                osrm.calculate_optimal_route(
+                    coords[0], coords[1:], solver_options={"mode": "clustered", **FAST}
+                )
+            )
+
+        # Clusters are below the 100-point public limit, yet stay local
+        assert sum(local_sizes) == 600
+        assert max(local_sizes) <= 80
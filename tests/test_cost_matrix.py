@@ -0,0 +1,48 @@
+"""
+Tests for the CostMatrix type.
+
+Tests cover:
+- float32 conversion (None -> NaN) and shape checks
+- Criterion selection without copies
+"""
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.cost_matrix import COST_DTYPE, CostMatrix
+
+
+class TestCostMatrix:
+    """Tests for CostMatrix."""
+
+    def test_lists_become_float32_arrays(self):
+        matrix = CostMatrix([[0, 1.5], [None, 0]], [[0, 10], [12, 0]])
+
+        assert matrix.distances.dtype == COST_DTYPE
+        assert matrix.distances.flags.c_contiguous
+        assert np.isnan(matrix.distances[1, 0])
+        assert matrix.size == 2
+        assert matrix.nbytes == 2 * 4 * 4
+
+    def test_float32_arrays_are_not_copied(self):
+        distances = np.zeros((3, 3), dtype=np.float32)
+        durations = np.zeros((3, 3), dtype=np.float32)
+        matrix = CostMatrix(distances, durations)
+
+        assert matrix.distances is distances
+        assert matrix.costs("duration") is durations
+
+    @pytest.mark.parametrize(
+        "distances,durations",
+        [
+            ([[0, 1]], [[0, 1]]),  # not square
+            ([[0, 1], [1, 0]], [[0]]),  # size mismatch
+        ],
+    )
+    def test_invalid_shapes(self, distances, durations):
+        with pytest.raises(ValueError):
+            CostMatrix(distances, durations)
+
+    def test_unknown_criterion(self):
+        with pytest.raises(ValueError):
+            CostMatrix([[0]], [[0]]).costs("fuel")
@@ -0,0 +1,237 @@
+"""
+Tests for the bounded detour search around avoid zones.
+
+Tests cover:
+- plan_detour_candidates ordering and straight-line lower bounds
+- find_route_around_zones returning the shortest route clear of the zones
+- Pruning of candidates that cannot beat the best clear route
+- Request budget, time budget and the shared concurrency limit
+- Falling back to the route with the fewest metres inside zones
+- Candidate planning capped per offset, and scoring errors skipping a candidate
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from webrotas.domain.avoid_zones import scoring
+from webrotas.domain.avoid_zones.scoring import ZoneScores, score_routes
+from webrotas.domain.avoid_zones.zone_set import AvoidZoneSet
+from webrotas.domain.geospatial.distance import haversine_distance
+from webrotas.domain.routing.geometry import RouteGeometry
+from webrotas.domain.routing import zone_aware
+from webrotas.domain.routing.zone_aware import (
+    find_route_around_zones,
+    plan_detour_candidates,
+)
+
+START = {"lat": 0.0, "lng": 0.0}
+END = {"lat": 0.0, "lng": 0.2}
+# Zone across the straight line between START and END
+ZONES = [
+    {
+        "name": "Z",
+        "coord": [[-0.02, 0.09], [-0.02, 0.11], [0.02, 0.11], [0.02, 0.09]],
+    }
+]
+
+
+def path_length(coords) -> float:
+    """Haversine length of [lng, lat] rows, in metres."""
+    coords = np.asarray(coords)
+    return float(
+        np.sum(
+            haversine_distance(coords[:-1, 1], coords[:-1, 0], coords[1:, 1], coords[1:, 0])
+        )
+    )
+
+
+class FakeOSRM:
+    """Routes along straight lines between the requested coordinates."""
+
+    def __init__(self, delay: float = 0.0, direct: bool = False):
+        self.delay = delay
+        self.direct = direct  # Ignore the intermediates (always cross the zone)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request_type, coordinates, params):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            coords = [list(map(float, pair.split(","))) for pair in coordinates.split(";")]
+            if self.direct:
+                coords = [coords[0], coords[-1]]
+            return {
+                "code": "Ok",
+                "routes": [
+                    {
+                        "geometry": RouteGeometry.from_coordinates(coords).encoded,
+                        "distance": path_length(coords),
+                        "duration": path_length(coords) / 10,
+                    }
+                ],
+            }
+        finally:
+            self.in_flight -= 1
+
+
+def candidate_path(candidate):
+    """[lng, lat] rows of START -> intermediates -> END."""
+    return (
+        [[START["lng"], START["lat"]]]
+        + [[bp.lng, bp.lat] for bp in candidate.intermediates]
+        + [[END["lng"], END["lat"]]]
+    )
+
+
+def clear_candidate_lengths():
+    """Lengths of every straight-line candidate path that avoids the zone."""
+    zone_set = AvoidZoneSet(ZONES)
+    candidates = plan_detour_candidates(START, END, zone_set.polygons, list(zone_set))
+    paths = [candidate_path(c) for c in candidates]
+    scores = score_routes(paths, zone_set.tree)
+    return [
+        path_length(path)
+        for path, hits in zip(paths, scores.zone_intersections)
+        if hits == 0
+    ], len(candidates)
+
+
+def search(osrm, **kwargs):
+    return asyncio.run(
+        find_route_around_zones(START, [END], osrm, [], ZONES, **kwargs)
+    )
+
+
+class TestPlanDetourCandidates:
+    """Tests for plan_detour_candidates."""
+
+    def test_sorted_lower_bounds(self):
+        zone_set = AvoidZoneSet(ZONES)
+
+        candidates = plan_detour_candidates(
+            START, END, zone_set.polygons, list(zone_set), offsets_km=(1.5, 3.0)
+        )
+
+        # 8 boundary points per offset: 8 singles and 28 pairs
+        assert len(candidates) == 2 * (8 + 28)
+        bounds = [c.lower_bound_m for c in candidates]
+        assert bounds == sorted(bounds)
+        for candidate in candidates[:5] + candidates[-5:]:
+            assert candidate.lower_bound_m == pytest.approx(
+                path_length(candidate_path(candidate))
+            )
+
+    def test_limit_keeps_the_best_candidates(self):
+        zone_set = AvoidZoneSet(ZONES)
+        args = (START, END, zone_set.polygons, list(zone_set))
+
+        everything = plan_detour_candidates(*args)
+        limited = plan_detour_candidates(*args, limit=5)
+
+        assert len(limited) == 5 * (5 + 5)
+        assert [c.lower_bound_m for c in limited[:5]] == [
+            c.lower_bound_m for c in everything[:5]
+        ]
+
+    def test_no_zones(self):
+        assert plan_detour_candidates(START, END, [], []) == []
+
+
+class TestFindRouteAroundZones:
+    """Tests for find_route_around_zones."""
+
+    def test_shortest_clear_route(self):
+        osrm = FakeOSRM()
+
+        route = search(osrm, max_requests=1000)
+
+        assert route["success"] is True
+        assert route["zone_intersections"] == 0
+        assert route["penalty_score"] == 0.0
+        # Straight-line routes: the best is the shortest clear candidate
+        clear, _ = clear_candidate_lengths()
+        assert route["distance"] == pytest.approx(min(clear))
+
+    def test_prunes_after_clear_route(self):
+        osrm = FakeOSRM()
+
+        search(osrm, max_concurrent=1, max_requests=1000)
+
+        # Candidates on the direct line cross the zone; once the first clear
+        # one is found, the longer bounds are skipped
+        _, total = clear_candidate_lengths()
+        assert osrm.calls < total / 4
+
+    def test_request_budget(self):
+        osrm = FakeOSRM(direct=True)
+
+        route = search(osrm, max_concurrent=2, max_requests=3)
+
+        assert osrm.calls == 3
+        assert route["zone_intersections"] == 1
+
+    def test_concurrency_limit(self):
+        osrm = FakeOSRM(delay=0.01, direct=True)
+
+        search(osrm, max_concurrent=3, max_requests=12)
+
+        assert osrm.calls == 12
+        assert osrm.max_in_flight == 3
+
+    def test_time_budget_keeps_best_so_far(self):
+        osrm = FakeOSRM(delay=0.05, direct=True)
+
+        route = search(osrm, max_concurrent=1, max_requests=1000, time_budget_s=0.12)
+
+        assert 1 <= osrm.calls <= 4
+        assert route is not None
+
+    def test_least_exposed_fallback(self):
+        osrm = FakeOSRM(direct=True)
+
+        route = search(osrm, max_requests=5)
+
+        assert route["zone_intersections"] == 1
+        assert 0 < route["penalty_score"] < 1
+
+    def test_failed_requests(self):
+        async def failing_osrm(request_type, coordinates, params):
+            raise RuntimeError("OSRM down")
+
+        assert search(failing_osrm, max_requests=4) is None
+
+    def test_fewest_metres_inside_zones_wins(self, monkeypatch):
+        # The first route has the larger penalty ratio but fewer metres inside
+        fake_scores = iter(
+            [
+                ZoneScores(np.array([1]), np.array([100.0]), np.array([1_000.0])),
+                ZoneScores(np.array([1]), np.array([150.0]), np.array([10_000.0])),
+            ]
+        )
+        monkeypatch.setattr(zone_aware, "score_routes", lambda *args: next(fake_scores))
+
+        route = search(FakeOSRM(), max_concurrent=1, max_requests=2)
+
+        assert route["penalty_score"] == pytest.approx(0.1)
+
+    def test_scoring_error_skips_candidate(self, monkeypatch):
+        calls = []
+
+        def flaky_score(geometries, tree):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError("bad geometry")
+            return scoring.score_routes(geometries, tree)
+
+        monkeypatch.setattr(zone_aware, "score_routes", flaky_score)
+
+        route = search(FakeOSRM(direct=True), max_concurrent=2, max_requests=4)
+
+        assert len(calls) == 4
+        assert route is not None and route["zone_intersections"] == 1
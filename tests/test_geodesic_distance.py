@@ -0,0 +1,99 @@
+"""
+Tests for the vectorized geodesic distance kernel.
+
+Tests cover:
+- Agreement with geopy (ellipsoidal) and tolerance of the haversine model
+- Full-matrix symmetry and zero diagonal
+- Pairs mode and the get_geodesic_matrix fallback
+"""
+
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from webrotas.domain.geospatial.distance import (
+    distance_matrix,
+    pairwise_distances,
+    travel_time_s,
+)
+from webrotas.infrastructure.routing.osrm import get_geodesic_matrix
+
+
+def create_test_points(n: int, seed: int = 0):
+    """Random points across Brazil."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-33.0, 4.0, n), rng.uniform(-73.0, -35.0, n)
+
+
+def geopy_distance(lats, lngs, i, j):
+    return geodesic((lats[i], lngs[i]), (lats[j], lngs[j])).meters
+
+
+class TestDistanceModels:
+    """Tests for the haversine and ellipsoidal kernels."""
+
+    def test_ellipsoidal_matches_geopy(self):
+        lats, lngs = create_test_points(40)
+        matrix = distance_matrix(lats, lngs, "ellipsoidal")
+
+        for i in range(0, 40, 3):
+            for j in range(0, 40, 7):
+                assert matrix[i, j] == pytest.approx(
+                    geopy_distance(lats, lngs, i, j), abs=1e-3
+                )
+
+    def test_haversine_within_half_percent(self):
+        lats, lngs = create_test_points(20)
+        matrix = distance_matrix(lats, lngs, "haversine")
+
+        for i in range(20):
+            for j in range(i + 1, 20):
+                assert matrix[i, j] == pytest.approx(
+                    geopy_distance(lats, lngs, i, j), rel=6e-3
+                )
+
+    def test_matrix_symmetric_with_zero_diagonal(self):
+        lats, lngs = create_test_points(25)
+        matrix = distance_matrix(lats, lngs)
+
+        np.testing.assert_array_equal(matrix, matrix.T)
+        assert (np.diag(matrix) == 0).all()
+        assert (matrix[~np.eye(25, dtype=bool)] > 0).all()
+
+    def test_nearly_antipodal_pair_is_finite(self):
+        distances = pairwise_distances(
+            np.array([0.5, 0.0]), np.array([0.0, 179.7]), [(0, 1)]
+        )
+        assert np.isfinite(distances).all()
+        assert distances[0] == pytest.approx(2.0e7, rel=0.01)
+
+    def test_unknown_model(self):
+        with pytest.raises(ValueError):
+            pairwise_distances(np.zeros(2), np.zeros(2), [(0, 1)], model="flat")
+
+
+class TestPairsMode:
+    """Tests for pair-restricted computation."""
+
+    def test_pairs_match_full_matrix(self):
+        lats, lngs = create_test_points(30)
+        matrix = distance_matrix(lats, lngs)
+        pairs = np.array([(0, 1), (5, 2), (29, 0), (7, 7)])
+
+        np.testing.assert_allclose(
+            pairwise_distances(lats, lngs, pairs), matrix[pairs[:, 0], pairs[:, 1]]
+        )
+
+    def test_get_geodesic_matrix_invalid_pairs_only(self):
+        coords = [{"lat": -23.55 + i * 0.01, "lng": -46.63} for i in range(5)]
+        distances, durations = get_geodesic_matrix(
+            coords, speed_kmh=36, invalid_pairs=[(0, 3), (4, 1)]
+        )
+
+        assert distances[0, 3] > 0 and distances[4, 1] > 0
+        assert np.count_nonzero(distances) == 2
+        # 36 km/h == 10 m/s
+        assert durations[0, 3] == pytest.approx(distances[0, 3] / 10)
+
+    def test_travel_time(self):
+        np.testing.assert_allclose(travel_time_s([1000.0, 0.0], 60), [60.0, 0.0])
@@ -0,0 +1,113 @@
+"""
+Tests for encoded route geometries.
+
+Tests cover:
+- Vectorized polyline6 encoding and decoding against the polyline package
+- Invalid polylines
+- RouteGeometry construction from OSRM geometry fields and lazy decoding
+- Concatenation without duplicated junction vertices
+- Route output formatting from encoded geometry
+"""
+
+import numpy as np
+import polyline
+import pytest
+
+from webrotas.domain.routing.geometry import (
+    RouteGeometry,
+    decode_polyline,
+    encode_polyline,
+)
+from webrotas.infrastructure.routing.osrm import _format_route_output
+
+
+def create_test_line(n: int, seed: int = 0) -> np.ndarray:
+    """Random walk of n [lat, lng] points around Rio de Janeiro (6 decimals)."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.01, (n, 2))
+    return np.round(np.cumsum(steps, axis=0) + [-22.9, -43.2], 6)
+
+
+class TestPolylineCodec:
+    """Tests for encode_polyline and decode_polyline."""
+
+    @pytest.mark.parametrize("n", [1, 2, 1000])
+    def test_matches_polyline_package(self, n):
+        line = create_test_line(n)
+        expected = polyline.encode([tuple(p) for p in line], 6)
+
+        assert encode_polyline(line) == expected
+        np.testing.assert_array_equal(decode_polyline(expected), line)
+
+    def test_extreme_coordinates(self):
+        line = np.array([[89.999999, 179.999999], [-89.999999, -179.999999], [0, 0]])
+        np.testing.assert_array_equal(decode_polyline(encode_polyline(line)), line)
+
+    def test_precision_5(self):
+        line = np.round(create_test_line(50), 5)
+        encoded = encode_polyline(line, precision=5)
+        assert encoded == polyline.encode([tuple(p) for p in line], 5)
+        np.testing.assert_allclose(decode_polyline(encoded, precision=5), line)
+
+    def test_empty(self):
+        assert encode_polyline(np.zeros((0, 2))) == ""
+        assert decode_polyline("").shape == (0, 2)
+
+    @pytest.mark.parametrize("encoded", ["_p~iF~ps|U_", "_p~iF", "\x01abc"])
+    def test_invalid(self, encoded):
+        with pytest.raises(ValueError):
+            decode_polyline(encoded)
+
+
+class TestRouteGeometry:
+    """Tests for RouteGeometry."""
+
+    def test_lazy_decode(self):
+        line = create_test_line(10)
+        geometry = RouteGeometry.from_osrm(encode_polyline(line))
+
+        assert geometry._coords is None
+        np.testing.assert_array_equal(geometry.latlng(), line)
+        np.testing.assert_array_equal(geometry.coords, line[:, ::-1])
+
+    def test_from_geojson_and_lists(self):
+        coordinates = create_test_line(5)[:, ::-1].tolist()
+        from_dict = RouteGeometry.from_osrm({"type": "LineString", "coordinates": coordinates})
+        from_list = RouteGeometry.from_osrm(coordinates)
+
+        assert from_dict.to_geojson()["coordinates"] == coordinates
+        assert from_list.encoded == from_dict.encoded
+        assert RouteGeometry.from_osrm(from_list) is from_list
+        assert len(RouteGeometry.from_osrm(None)) == 0
+
+    def test_concat_drops_junctions(self):
+        line = create_test_line(9)
+        parts = [
+            RouteGeometry.from_osrm(encode_polyline(line[0:4])),
+            RouteGeometry.from_coordinates(line[3:7, ::-1]),
+            RouteGeometry.from_osrm(encode_polyline(line[6:9])),
+        ]
+        joined = RouteGeometry.concat(parts)
+        np.testing.assert_array_equal(joined.latlng(), line)
+        assert joined.encoded == encode_polyline(line)
+
+    def test_concat_keeps_distinct_endpoints(self):
+        line = create_test_line(4)
+        joined = RouteGeometry.concat(
+            [RouteGeometry.from_coordinates(line[:2]), RouteGeometry.from_coordinates(line[2:])]
+        )
+        assert len(joined) == 4
+
+    def test_format_route_output(self):
+        line = create_test_line(6)
+        route_json = {
+            "routes": [
+                {"geometry": encode_polyline(line), "distance": 12345.0, "duration": 3661.0}
+            ]
+        }
+        coords = [{"lat": -22.9, "lng": -43.2}, {"lat": -22.8, "lng": -43.1}]
+        _, _, paths, duration, distance, _ = _format_route_output(route_json, coords, [])
+
+        assert paths.latlng().tolist() == line.tolist()
+        assert duration == "01:01:01"
+        assert distance == "12.3 km"
@@ -0,0 +1,117 @@
+"""
+Tests for vectorized grid sampling.
+
+Tests cover:
+- Equivalence with a per-cell Point/contains loop (area and avoid zones)
+- Results independent of the chunk size, in row order
+- Multiple area polygons and empty inputs
+- RouteProcessor._generate_waypoints_in_city output format
+"""
+
+import numpy as np
+import pytest
+from shapely.geometry import Point, Polygon
+
+from webrotas.domain.avoid_zones.zone_set import AvoidZoneSet
+from webrotas.domain.geospatial.grid import grid_points_in_polygons, grid_steps
+from webrotas.domain.routing.processor import RouteProcessor
+
+
+def star_polygon(lng: float, lat: float, radius: float) -> Polygon:
+    """Non-convex polygon around (lng, lat)."""
+    angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+    r = radius * (1 + 0.3 * np.sin(5 * angles))
+    return Polygon(np.column_stack((lng + r * np.cos(angles), lat + r * np.sin(angles))))
+
+
+def square_zone(name: str, lat: float, lng: float, size: float) -> dict:
+    """Square avoid zone ([lat, lng] pairs) with its SW corner at (lat, lng)."""
+    return {
+        "name": name,
+        "coord": [[lat, lng], [lat, lng + size], [lat + size, lng + size], [lat + size, lng]],
+    }
+
+
+def naive_grid(polygons, point_distance, zone_polygons=()):
+    """Reference: the per-cell loop the vectorized sampler replaces."""
+    from shapely.ops import unary_union
+
+    lng_min, lat_min, lng_max, lat_max = unary_union(polygons).bounds
+    lng_step, lat_step = grid_steps((lat_min + lat_max) / 2, point_distance)
+    points = []
+    for lat in np.arange(lat_min, lat_max, lat_step):
+        for lng in np.arange(lng_min, lng_max, lng_step):
+            point = Point(lng, lat)
+            if any(p.contains(point) for p in polygons) and not any(
+                z.contains(point) for z in zone_polygons
+            ):
+                points.append((lat, lng))
+    return np.array(points).reshape(-1, 2)
+
+
+class TestGridPointsInPolygons:
+    """Tests for grid_points_in_polygons."""
+
+    def test_matches_per_cell_loop(self):
+        city = star_polygon(-38.5, -12.9, 0.05)
+        zones = [
+            square_zone("A", -12.92, -38.52, 0.02),
+            square_zone("B", -12.88, -38.47, 0.01),
+        ]
+        zone_set = AvoidZoneSet(zones)
+
+        lats, lngs = grid_points_in_polygons([city], 300, zone_set)
+        expected = naive_grid([city], 300, zone_set.polygons)
+
+        assert len(lats) == len(expected) > 0
+        np.testing.assert_array_equal(np.column_stack((lats, lngs)), expected)
+
+    def test_chunking_does_not_change_result(self):
+        city = star_polygon(-43.2, -22.9, 0.04)
+
+        whole = grid_points_in_polygons([city], 250)
+        chunked = grid_points_in_polygons([city], 250, chunk_points=7)
+
+        np.testing.assert_array_equal(whole[0], chunked[0])
+        np.testing.assert_array_equal(whole[1], chunked[1])
+        assert np.all(np.diff(whole[0]) >= 0)
+
+    def test_multiple_polygons(self):
+        west = Polygon([(0.0, 0.0), (0.01, 0.0), (0.01, 0.01), (0.0, 0.01)])
+        east = Polygon([(0.03, 0.0), (0.04, 0.0), (0.04, 0.01), (0.03, 0.01)])
+
+        lats, lngs = grid_points_in_polygons([west, east], 200)
+
+        assert len(lats) > 0
+        assert not np.any((lngs > 0.01) & (lngs < 0.03))
+        assert np.any(lngs < 0.01) and np.any(lngs > 0.03)
+
+    def test_empty_inputs(self):
+        assert len(grid_points_in_polygons([], 500)[0]) == 0
+        tiny = Polygon([(0.0, 0.0), (1e-6, 0.0), (1e-6, 1e-6)])
+        lats, lngs = grid_points_in_polygons([tiny], 500)
+        assert len(lats) == len(lngs)
+
+
+class TestGenerateWaypointsInCity:
+    """Tests for RouteProcessor._generate_waypoints_in_city."""
+
+    def test_waypoint_dicts(self):
+        boundary = [[0.0, 0.0], [0.02, 0.0], [0.02, 0.02], [0.0, 0.02], [0.0, 0.0]]
+
+        waypoints = RouteProcessor._generate_waypoints_in_city(
+            [boundary], [square_zone("A", 0.0, 0.0, 0.01)], 500, "Location"
+        )
+
+        assert waypoints
+        assert set(waypoints[0]) == {"lat", "lng", "description"}
+        assert all(isinstance(w["lat"], float) for w in waypoints)
+        assert not any(w["lat"] < 0.01 and w["lng"] < 0.01 for w in waypoints)
+
+    def test_no_waypoints_raises(self):
+        boundary = [[0.0, 0.0], [0.02, 0.0], [0.02, 0.02], [0.0, 0.02], [0.0, 0.0]]
+
+        with pytest.raises(ValueError, match="No waypoints found"):
+            RouteProcessor._generate_waypoints_in_city(
+                [boundary], [square_zone("All", -0.01, -0.01, 0.05)], 500, "Location"
+            )
@@ -0,0 +1,157 @@
+"""
+Tests for the NumPy nearest-neighbour + 2-opt/Or-opt TSP tier.
+
+Tests cover:
+- Open, closed and fixed-endpoint variants against brute force
+- Asymmetric matrices and unroutable arcs
+- Deadline and should_stop ending the improvement early
+- Heuristic mode and warm starts through solve_tsp within the time budget
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.heuristics import (
+    improve_path,
+    nearest_neighbour_path,
+    path_cost,
+    solve_heuristic,
+)
+from webrotas.domain.routing.tsp import SolverPolicy, default_policy, solve_tsp
+
+
+def create_points_matrix(n: int, seed: int = 0) -> np.ndarray:
+    """Euclidean matrix of n random points."""
+    points = np.random.default_rng(seed).uniform(0, 10_000, size=(n, 2))
+    return np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+
+
+def brute_force(matrix, end=None, closed=False):
+    """Optimal route cost by enumeration (start at node 0)."""
+    inner = [i for i in range(1, len(matrix)) if i != end]
+    best = np.inf
+    for perm in itertools.permutations(inner):
+        route = [0, *perm] + ([end] if end is not None else []) + ([0] if closed else [])
+        best = min(best, path_cost(matrix, np.array(route)))
+    return best
+
+
+class TestSolveHeuristic:
+    """Tests for solve_heuristic."""
+
+    @pytest.mark.parametrize(
+        "kwargs", [{}, {"end_index": 4}, {"closed": True}], ids=["open", "end", "closed"]
+    )
+    def test_matches_brute_force_on_euclidean(self, kwargs):
+        matrix = create_points_matrix(8, seed=1)
+        order, objective, history = solve_heuristic(matrix, **kwargs)
+
+        assert order[0] == 0
+        assert objective == pytest.approx(path_cost(matrix, np.array(order)))
+        assert objective == pytest.approx(
+            brute_force(matrix, kwargs.get("end_index"), kwargs.get("closed", False))
+        )
+        if kwargs.get("closed"):
+            assert order[-1] == 0 and sorted(order[:-1]) == list(range(8))
+        else:
+            assert sorted(order) == list(range(8))
+        if "end_index" in kwargs:
+            assert order[-1] == 4
+
+    def test_asymmetric_objective_is_exact(self):
+        matrix = np.random.default_rng(2).uniform(10, 100, size=(25, 25))
+        np.fill_diagonal(matrix, 0)
+        order, objective, history = solve_heuristic(matrix, end_index=7)
+
+        assert objective == pytest.approx(path_cost(matrix, np.array(order)))
+        costs = [cost for _, cost in history]
+        assert costs == sorted(costs, reverse=True)
+
+    def test_unroutable_arcs_avoided(self):
+        matrix = create_points_matrix(10)
+        matrix[0, :] = np.nan
+        matrix[0, 3] = 1.0
+        order, objective, _ = solve_heuristic(matrix)
+        assert order[:2] == [0, 3]
+        assert np.isfinite(objective)
+
+    def test_improve_keeps_ends_fixed(self):
+        matrix = create_points_matrix(12)
+        path = nearest_neighbour_path(matrix, 0, 5)
+        improved, _ = improve_path(matrix, path)
+        assert improved[0] == 0 and improved[-1] == 5
+        assert path_cost(matrix, improved) <= path_cost(matrix, path)
+
+    def test_improve_stops_at_deadline_and_should_stop(self):
+        matrix = create_points_matrix(60)
+        path = nearest_neighbour_path(matrix, 0, 0)
+
+        improved, history = improve_path(matrix, path, deadline=time.monotonic())
+        assert history == []
+        np.testing.assert_array_equal(improved, path)
+
+        calls = []
+        _, history = improve_path(
+            matrix, path, should_stop=lambda: calls.append(1) or len(calls) > 3
+        )
+        assert len(history) == 3
+
+    def test_typical_route_is_fast(self):
+        matrix = create_points_matrix(40)
+        solve_heuristic(matrix)  # warm up
+        started = time.perf_counter()
+        solve_heuristic(matrix)
+        assert time.perf_counter() - started < 0.1
+
+
+class TestSolverTiers:
+    """Tests for heuristic mode and warm starts in solve_tsp."""
+
+    def test_small_problems_default_to_heuristic(self):
+        assert default_policy(40).mode == "heuristic"
+        assert default_policy(200).mode == "auto"
+
+        solution = solve_tsp(create_points_matrix(30))
+        assert solution.policy.mode == "heuristic"
+        assert solution.to_dict()["mode"] == "heuristic"
+
+    def test_request_can_force_tiers(self):
+        assert SolverPolicy.from_options({"mode": "heuristic"}, 300).mode == "heuristic"
+        assert SolverPolicy.from_options({"mode": "monolithic"}, 30).mode == "monolithic"
+        assert SolverPolicy.from_options({"mode": "auto"}, 30).mode == "heuristic"
+
+    def test_warm_start_not_worse_than_heuristic(self):
+        matrix = create_points_matrix(120, seed=4)
+        heuristic = solve_tsp(matrix, policy=SolverPolicy(mode="heuristic"))
+        warm = solve_tsp(
+            matrix,
+            endpoint_index=9,
+            policy=SolverPolicy(time_limit_s=0.3, warm_start=True, mode="monolithic"),
+        )
+        assert warm.order[0] == 0 and warm.order[-1] == 9
+        assert sorted(warm.order) == list(range(120))
+
+        open_warm = solve_tsp(
+            matrix, policy=SolverPolicy(time_limit_s=0.3, warm_start=True)
+        )
+        assert open_warm.objective <= heuristic.objective + 1e-2
+
+    def test_forced_heuristic_respects_time_limit(self):
+        matrix = create_points_matrix(500, seed=2)
+        solution = solve_tsp(matrix, policy=SolverPolicy(time_limit_s=0.2, mode="heuristic"))
+        assert solution.solve_time_s < 1.0
+        assert sorted(solution.order) == list(range(500))
+
+    def test_warm_start_stops_on_should_stop(self):
+        matrix = create_points_matrix(300, seed=3)
+        started = time.perf_counter()
+        solution = solve_tsp(
+            matrix,
+            policy=SolverPolicy(time_limit_s=30.0, warm_start=True, mode="monolithic"),
+            should_stop=lambda: time.perf_counter() - started > 0.1,
+        )
+        assert time.perf_counter() - started < 2.0
+        assert sorted(solution.order) == list(range(300))
@@ -0,0 +1,136 @@
+"""
+Tests for the shared OSRM HTTP clients.
+
+Tests cover:
+- Client reuse within an event loop
+- Client replacement across event loops (closing the stale one) and after shutdown
+- make_request going through the pooled client of the selected backend
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from webrotas.infrastructure.routing import http_client
+from webrotas.infrastructure.routing.http_client import (
+    LOCAL_BACKEND,
+    PUBLIC_BACKEND,
+    close_http_clients,
+    get_http_client,
+    open_http_clients,
+)
+from webrotas.infrastructure.routing.osrm import make_request
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    http_client._clients.clear()
+    yield
+    http_client._clients.clear()
+
+
+class TestSharedClients:
+    """Tests for client lifecycle."""
+
+    def test_client_reused_within_loop(self):
+        async def run():
+            first = get_http_client(LOCAL_BACKEND)
+            second = get_http_client(LOCAL_BACKEND)
+            public = get_http_client(PUBLIC_BACKEND)
+            await close_http_clients()
+            return first, second, public
+
+        first, second, public = asyncio.run(run())
+        assert first is second
+        assert first is not public
+
+    def test_client_replaced_on_new_loop(self):
+        async def run():
+            return get_http_client(LOCAL_BACKEND)
+
+        async def run_and_settle():
+            client = get_http_client(LOCAL_BACKEND)
+            await asyncio.sleep(0)
+            return client
+
+        first = asyncio.run(run())
+        second = asyncio.run(run_and_settle())
+        assert first is not second
+        assert first.is_closed
+        assert not second.is_closed
+
+    def test_open_and_close(self):
+        async def run():
+            await open_http_clients()
+            clients = [get_http_client(backend) for backend in http_client.BACKENDS]
+            await close_http_clients()
+            return clients
+
+        clients = asyncio.run(run())
+        assert all(client.is_closed for client in clients)
+        assert http_client._clients == {}
+
+    def test_unknown_backend(self):
+        async def run():
+            get_http_client("unknown")
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+
+class TestMakeRequest:
+    """Tests for make_request using the pooled clients."""
+
+    def test_requests_share_pooled_client(self, monkeypatch):
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, json={"code": "Ok"})
+
+        created = []
+
+        def fake_create(backend):
+            created.append(backend)
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        monkeypatch.setattr(http_client, "_create_client", fake_create)
+
+        async def run():
+            for _ in range(3):
+                data = await make_request(
+                    "http://osrm/table/v1/driving/0,0;1,1",
+                    params={"annotations": "distance,duration"},
+                    backend=PUBLIC_BACKEND,
+                )
+                assert data == {"code": "Ok"}
+            await close_http_clients()
+
+        asyncio.run(run())
+        assert created == [PUBLIC_BACKEND]
+        assert len(seen) == 3
+        assert all("annotations=distance%2Cduration" in url for url in seen)
+
+    def test_retries_then_raises(self, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ConnectError("down", request=request)
+
+        monkeypatch.setattr(
+            http_client,
+            "_create_client",
+            lambda backend: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+        async def run():
+            try:
+                await make_request("http://osrm/route/v1/driving/0,0;1,1", max_retries=2)
+            finally:
+                await close_http_clients()
+
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(run())
+        assert len(calls) == 2
@@ -7,20 +7,47 @@ Tests cover:
 - API failure scenarios with fallback
 - Matrix integrity and consistency
 - Rate limiting and retry logic
+- Concurrency budget, progress reporting and the shared token bucket
 """
 
+import asyncio
+
 import pytest
-from unittest.mock import patch, MagicMock
-import requests
+from unittest.mock import patch, MagicMock, AsyncMock
+import httpx
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from webrotas.infrastructure.routing import circuit_breaker, rate_limiter
 from webrotas.infrastructure.routing.matrix_builder import (
     IterativeMatrixBuilder,
     RequestBatch,
     PUBLIC_API_BATCH_SIZE,
 )
+from webrotas.infrastructure.routing.rate_limiter import AsyncTokenBucket
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Fresh breakers and a fast shared rate limiter for every test."""
+    circuit_breaker._breakers.clear()
+    rate_limiter._public_rate_limiter = AsyncTokenBucket(rate=1000.0)
+    yield
+    circuit_breaker._breakers.clear()
+    rate_limiter._public_rate_limiter = None
+
+
+@pytest.fixture
+def mock_get():
+    """Patch the shared public HTTP client; yields its async ``get`` mock."""
+    client = MagicMock()
+    client.get = AsyncMock()
+    with patch(
+        "webrotas.infrastructure.routing.matrix_builder.get_http_client",
+        return_value=client,
+    ):
+        yield client.get
 
 
 # Test data generators
@@ -38,6 +65,14 @@ def create_test_coords(n: int) -> list:
     ]
 
 
+def create_mock_http_response(payload: dict) -> MagicMock:
+    """Wrap a JSON payload in a successful mock httpx response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = payload
+    return response
+
+
 def create_mock_osrm_response(n_origin: int, n_waypoints: int) -> dict:
     """Create a mock OSRM API response for n coordinates."""
     n_total = 1 + n_waypoints
@@ -195,16 +230,14 @@ class TestIterativeMatrixBuilderMerging:
 class TestIterativeMatrixBuilderWithMocks:
     """Tests using mocked API responses."""
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_successful_build_small_set(self, mock_get):
         """Small coordinate set should build successfully."""
         coords = create_test_coords(5)
-        mock_response = MagicMock()
-        mock_response.json.return_value = create_mock_osrm_response(1, 4)
+        mock_response = create_mock_http_response(create_mock_osrm_response(1, 4))
         mock_get.return_value = mock_response
 
         builder = IterativeMatrixBuilder(coords)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Verify matrix dimensions
         assert len(distances) == 5
@@ -217,18 +250,16 @@ class TestIterativeMatrixBuilderWithMocks:
             assert distances[i][i] == 0.0
             assert durations[i][i] == 0.0
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_api_failure_with_fallback(self, mock_get):
         """Failed API calls should trigger geodesic fallback."""
         coords = create_test_coords(4)
-        mock_response = MagicMock()
-        mock_response.json.return_value = create_mock_osrm_response(1, 3)
+        mock_response = create_mock_http_response(create_mock_osrm_response(1, 3))
 
         def mock_get_func(url, timeout):
             # First call succeeds, then fail
             if mock_get_func.call_count == 1:
                 return mock_response
-            raise requests.exceptions.ConnectionError("API unavailable")
+            raise httpx.ConnectError("API unavailable")
 
         mock_get_func.call_count = 0
 
@@ -236,13 +267,13 @@ class TestIterativeMatrixBuilderWithMocks:
             side_effect_func.call_count += 1
             if side_effect_func.call_count == 1:
                 return mock_response
-            raise requests.exceptions.ConnectionError("API unavailable")
+            raise httpx.ConnectError("API unavailable")
 
         side_effect_func.call_count = 0
         mock_get.side_effect = side_effect_func
 
         builder = IterativeMatrixBuilder(coords, max_retries=1)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Should have some values from API and some from geodesic
         assert len(distances) == 4
@@ -250,54 +281,48 @@ class TestIterativeMatrixBuilderWithMocks:
         has_api_values = any(distances[0][i] > 0 for i in range(1, 4))
         assert has_api_values  # First batch should succeed
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_retry_logic(self, mock_get):
         """Failed requests should retry with backoff."""
         coords = create_test_coords(3)
-        mock_response = MagicMock()
-        mock_response.json.return_value = create_mock_osrm_response(1, 2)
+        mock_response = create_mock_http_response(create_mock_osrm_response(1, 2))
 
         # Fail twice per batch, then succeed
         def side_effect_func(url, timeout):
             side_effect_func.call_count += 1
             # Fail first 2 attempts, succeed on 3rd
             if side_effect_func.call_count <= 2:
-                raise requests.exceptions.Timeout("Timeout")
+                raise httpx.TimeoutException("Timeout")
             return mock_response
 
         side_effect_func.call_count = 0
         mock_get.side_effect = side_effect_func
 
         builder = IterativeMatrixBuilder(coords, max_retries=3, retry_delay=0.01)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Should eventually succeed
         assert mock_get.call_count >= 3
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_invalid_response_format(self, mock_get):
         """Invalid response format should trigger fallback."""
         coords = create_test_coords(3)
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "invalid": "response"
-        }  # Missing distances/durations
+        mock_response = create_mock_http_response(
+            {"invalid": "response"}  # Missing distances/durations
+        )
 
         mock_get.return_value = mock_response
 
         builder = IterativeMatrixBuilder(coords)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Should handle gracefully with fallback
         assert len(distances) == 3
         assert all(len(row) == 3 for row in distances)
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_rate_limiting(self, mock_get):
         """Requests should be rate limited."""
         coords = create_test_coords(10)
-        mock_response = MagicMock()
-        mock_response.json.return_value = create_mock_osrm_response(1, 9)
+        mock_response = create_mock_http_response(create_mock_osrm_response(1, 9))
         mock_get.return_value = mock_response
 
         import time
@@ -305,7 +330,7 @@ class TestIterativeMatrixBuilderWithMocks:
         builder = IterativeMatrixBuilder(coords, rate_limit_delay=0.01)
 
         start = time.time()
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
         elapsed = time.time() - start
 
         # Should take at least some time due to rate limiting
@@ -318,22 +343,19 @@ class TestIterativeMatrixBuilderWithMocks:
 class TestMatrixIntegrity:
     """Tests for matrix mathematical properties."""
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_symmetry_property(self, mock_get):
         """Distance matrix should be symmetric for symmetric input."""
         coords = create_test_coords(5)
 
         def mock_get_func(url, timeout):
-            response = MagicMock()
             # Extract batch info from URL and create response
             # For simplicity, always return symmetric distances
-            response.json.return_value = create_mock_osrm_response(1, 4)
-            return response
+            return create_mock_http_response(create_mock_osrm_response(1, 4))
 
         mock_get.side_effect = mock_get_func
 
         builder = IterativeMatrixBuilder(coords)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Manually verify by checking that we have symmetric-generating responses
         # The test checks that where both [i][j] and [j][i] are populated, they match
@@ -345,22 +367,87 @@ class TestMatrixIntegrity:
                 assert distances[i][j] >= 0
                 assert distances[j][i] >= 0
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_no_negative_distances(self, mock_get):
         """No distances should be negative."""
         coords = create_test_coords(5)
-        mock_response = MagicMock()
-        mock_response.json.return_value = create_mock_osrm_response(1, 4)
+        mock_response = create_mock_http_response(create_mock_osrm_response(1, 4))
         mock_get.return_value = mock_response
 
         builder = IterativeMatrixBuilder(coords)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         for i in range(len(coords)):
             for j in range(len(coords)):
                 assert distances[i][j] >= 0
 
 
+class TestConcurrentBuild:
+    """Tests for the concurrent, rate-limited async build."""
+
+    def test_concurrency_budget_and_progress(self, mock_get):
+        """Batches run concurrently up to the budget and report progress."""
+        coords = create_test_coords(12)
+        tracker = {"in_flight": 0, "max_in_flight": 0}
+        progress = []
+
+        async def slow_get(url, timeout):
+            tracker["in_flight"] += 1
+            tracker["max_in_flight"] = max(tracker["max_in_flight"], tracker["in_flight"])
+            await asyncio.sleep(0.005)
+            tracker["in_flight"] -= 1
+            n_total = url.split("?")[0].count(";") + 1
+            return create_mock_http_response(create_mock_osrm_response(1, n_total - 1))
+
+        mock_get.side_effect = slow_get
+
+        builder = IterativeMatrixBuilder(
+            coords,
+            batch_size=4,
+            max_concurrent=3,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+        asyncio.run(builder.build())
+
+        total = len(builder._create_batches())
+        assert 1 < tracker["max_in_flight"] <= 3
+        assert progress[-1] == (total, total)
+        assert [done for done, _ in progress] == list(range(1, total + 1))
+
+    def test_shared_rate_limiter_across_builders(self, mock_get):
+        """Concurrent builders share the process-wide token bucket."""
+        rate_limiter._public_rate_limiter = AsyncTokenBucket(rate=100.0)
+        mock_get.return_value = create_mock_http_response(
+            create_mock_osrm_response(1, 2)
+        )
+
+        async def build_two():
+            builders = [IterativeMatrixBuilder(create_test_coords(3)) for _ in range(2)]
+            await asyncio.gather(*(b.build() for b in builders))
+
+        import time
+
+        start = time.monotonic()
+        asyncio.run(build_two())
+        elapsed = time.monotonic() - start
+
+        # 2 builders x 2 batches = 4 requests at 100/s with no burst
+        assert mock_get.call_count == 4
+        assert elapsed >= 3 * 0.01 * 0.8
+
+    def test_open_circuit_skips_requests(self, mock_get):
+        """An open public breaker sends every pair to the geodesic fallback."""
+        breaker = circuit_breaker.get_circuit_breaker("public")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure("test")
+
+        coords = create_test_coords(4)
+        builder = IterativeMatrixBuilder(coords, retry_delay=10.0)
+        distances, _ = asyncio.run(builder.build())
+
+        mock_get.assert_not_called()
+        assert all(distances[i][j] > 0 for i in range(4) for j in range(4) if i != j)
+
+
 class TestEdgeCases:
     """Tests for edge cases and boundary conditions."""
 
@@ -381,14 +468,13 @@ class TestEdgeCases:
 
         assert len(batches) >= 1
 
-    @patch("webrotas.iterative_matrix_builder.requests.get")
     def test_all_api_failures(self, mock_get):
         """All failures should result in geodesic-only matrix."""
         coords = create_test_coords(4)
-        mock_get.side_effect = requests.exceptions.ConnectionError("API down")
+        mock_get.side_effect = httpx.ConnectError("API down")
 
         builder = IterativeMatrixBuilder(coords, max_retries=1, retry_delay=0.001)
-        distances, durations = builder.build()
+        distances, durations = asyncio.run(builder.build())
 
         # Should still produce valid matrix
         assert len(distances) == 4
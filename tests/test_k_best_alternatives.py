@@ -0,0 +1,172 @@
+"""
+Tests for k-best segment alternative combination.
+
+Tests cover:
+- k_best_combinations order, completeness and uniqueness against brute force
+- Lazy generation on a product space far too large to enumerate
+- SegmentAlternativesBuilder ranking by metres inside zones, then duration
+- Additive penalties matching a rescore of the combined geometry
+- get_alternatives_for_multipoint_route returning at most max_routes
+"""
+
+import asyncio
+import itertools
+
+import numpy as np
+
+from webrotas.domain.avoid_zones.scoring import score_routes
+from webrotas.domain.routing.alternatives import (
+    SegmentAlternative,
+    SegmentAlternativesBuilder,
+    get_alternatives_for_multipoint_route,
+    k_best_combinations,
+)
+from webrotas.domain.routing.geometry import RouteGeometry
+
+
+def zone(name: str, lat: float, lng: float, size: float = 0.01) -> dict:
+    """Square avoid zone ([lat, lng] pairs) with its SW corner at (lat, lng)."""
+    return {
+        "name": name,
+        "coord": [[lat, lng], [lat, lng + size], [lat + size, lng + size], [lat + size, lng]],
+    }
+
+
+def alternative(segment: int, option: int, line, duration: float) -> SegmentAlternative:
+    """Segment alternative over [lng, lat] pairs."""
+    return SegmentAlternative(
+        segment_index=segment,
+        route_option=option,
+        distance=1000.0,
+        duration=duration,
+        geometry=RouteGeometry.from_coordinates(line),
+    )
+
+
+class TestKBestCombinations:
+    """Tests for k_best_combinations."""
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        costs = [
+            [(float(rng.integers(0, 3)), float(rng.random())) for _ in range(n)]
+            for n in (3, 2, 3, 1, 3)
+        ]
+
+        produced = list(k_best_combinations(costs))
+
+        def total(combo):
+            return tuple(map(sum, zip(*(costs[i][o] for i, o in enumerate(combo)))))
+
+        everything = list(itertools.product(*(range(len(c)) for c in costs)))
+        assert len(produced) == len(everything)
+        assert len({tuple(c) for c in produced}) == len(everything)
+        totals = [total(c) for c in produced]
+        assert totals == sorted(totals)
+        assert totals == sorted(total(c) for c in everything)
+
+    def test_lazy_on_huge_space(self):
+        # 3^40 combinations; only the first few are ever built
+        costs = [[(0.0, 1.0), (0.0, 2.0), (1.0, 0.0)] for _ in range(40)]
+
+        first = list(itertools.islice(k_best_combinations(costs), 5))
+
+        assert first[0] == [0] * 40
+        assert all(sum(combo) == 1 for combo in first[1:])
+
+    def test_empty_inputs(self):
+        assert list(k_best_combinations([])) == []
+        assert list(k_best_combinations([[(0.0,)], []])) == []
+
+
+class TestBuilderRanking:
+    """Tests for SegmentAlternativesBuilder.generate_complete_routes."""
+
+    def make_builder(self, zones):
+        # Three segments along the equator; option 1 of segment 1 detours north
+        builder = SegmentAlternativesBuilder([], zones)
+        builder.segment_alternatives = [
+            [alternative(0, 0, [[0.0, 0.0], [0.01, 0.0]], 60.0)],
+            [
+                alternative(1, 0, [[0.01, 0.0], [0.02, 0.0]], 60.0),
+                alternative(
+                    1, 1, [[0.01, 0.0], [0.01, 0.02], [0.02, 0.02], [0.02, 0.0]], 90.0
+                ),
+                alternative(1, 2, [[0.01, 0.0], [0.015, -0.001], [0.02, 0.0]], 70.0),
+            ],
+            [
+                alternative(2, 0, [[0.02, 0.0], [0.03, 0.0]], 60.0),
+                alternative(2, 1, [[0.02, 0.0], [0.025, 0.001], [0.03, 0.0]], 65.0),
+            ],
+        ]
+        return builder
+
+    def test_fastest_first_without_zones(self):
+        builder = self.make_builder(None)
+
+        routes = builder.generate_complete_routes(max_routes=3)
+
+        assert [r["option_combination"] for r in routes] == [[0, 0, 0], [0, 0, 1], [0, 2, 0]]
+        assert [r["duration"] for r in routes] == [180.0, 185.0, 190.0]
+        assert [r["route_index"] for r in routes] == [0, 1, 2]
+
+    def test_zone_exposure_ranks_first(self):
+        # Zone over the straight part of segment 1 (lng 0.012-0.018)
+        builder = self.make_builder([zone("Z", -0.005, 0.012, 0.006)])
+
+        routes = builder.generate_complete_routes(max_routes=4)
+
+        assert routes[0]["option_combination"] == [0, 1, 0]
+        assert routes[0]["penalty_score"] == 0.0
+        assert routes[1]["option_combination"] == [0, 1, 1]
+        assert all(r["penalty_score"] > 0 for r in routes[2:])
+
+    def test_additive_penalty_matches_rescore(self):
+        zones = [zone("A", -0.005, 0.012, 0.006), zone("B", -0.005, 0.022, 0.006)]
+        builder = self.make_builder(zones)
+
+        routes = builder.generate_complete_routes(max_routes=6)
+        rescored = score_routes([r["geometry"] for r in routes], builder.avoid_zones.tree)
+
+        np.testing.assert_allclose(
+            [r["penalty_score"] for r in routes], rescored.penalty_ratio, atol=1e-9
+        )
+        assert [r["zone_intersections"] for r in routes] == rescored.zone_intersections.tolist()
+
+
+class TestMultipointEntryPoint:
+    """Tests for get_alternatives_for_multipoint_route."""
+
+    def test_builds_only_max_routes(self):
+        coordinates = [{"lat": 0.0, "lng": 0.01 * i} for i in range(16)]
+
+        async def fake_request_osrm(request_type, coordinates, params):
+            (lng0, lat0), (lng1, lat1) = (
+                map(float, pair.split(",")) for pair in coordinates.split(";")
+            )
+            routes = [
+                {
+                    "geometry": RouteGeometry.from_coordinates(
+                        [[lng0, lat0], [(lng0 + lng1) / 2, lat0 + bump], [lng1, lat1]]
+                    ).encoded,
+                    "distance": 1000.0 + k,
+                    "duration": 60.0 + k,
+                }
+                for k, bump in enumerate((0.0, 0.001, -0.001))
+            ]
+            return {"code": "Ok", "routes": routes}
+
+        routes, error = asyncio.run(
+            get_alternatives_for_multipoint_route(
+                coordinates,
+                fake_request_osrm,
+                avoid_zones=[zone("Z", -0.0002, 0.052, 0.006)],
+                max_routes=4,
+            )
+        )
+
+        assert error is None
+        assert len(routes) == 4
+        scores = [(r["penalty_score"], r["duration"]) for r in routes]
+        assert scores[0][0] == 0.0
+        assert len({tuple(r["option_combination"]) for r in routes}) == 4
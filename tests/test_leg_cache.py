@@ -0,0 +1,178 @@
+"""
+Tests for the per-leg route geometry cache.
+
+Tests cover:
+- Splitting annotated OSRM routes into legs
+- Grouping missing legs into runs
+- Memory LRU bound, disk persistence and dataset version purge
+- get_osrm_route assembling tours from cached legs and requesting only
+  missing legs
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.geometry import RouteGeometry
+from webrotas.infrastructure.routing import osrm, pair_cache
+from webrotas.infrastructure.routing.leg_cache import (
+    Leg,
+    LegCache,
+    leg_runs,
+    split_route_legs,
+)
+
+
+def create_test_coords(n: int) -> list:
+    """n waypoints along a parallel, longitude encoding the index."""
+    return [{"lat": -22.9, "lng": -43.0 + 0.01 * i} for i in range(n)]
+
+
+def fake_route(window):
+    """Annotated /route response (polyline6) with two segments per leg."""
+    line = []
+    legs = []
+    for a, b in zip(window, window[1:]):
+        middle = round((a["lng"] + b["lng"]) / 2, 6)
+        line += [[a["lng"], a["lat"]], [middle, a["lat"]]]
+        legs.append(
+            {"distance": 100.0, "duration": 10.0, "annotation": {"distance": [50.0, 50.0]}}
+        )
+    line.append([window[-1]["lng"], window[-1]["lat"]])
+    return {
+        "code": "Ok",
+        "routes": [
+            {
+                "geometry": RouteGeometry.from_coordinates(line).encoded,
+                "distance": 100.0 * len(legs),
+                "duration": 10.0 * len(legs),
+                "legs": legs,
+            }
+        ],
+        "waypoints": [{"name": f"street {round(c['lng'], 2)}"} for c in window],
+    }
+
+
+class TestSplitRouteLegs:
+    """Tests for split_route_legs and leg_runs."""
+
+    def test_split_and_rebuild(self):
+        window = create_test_coords(4)
+        response = fake_route(window)
+        legs = split_route_legs(response)
+
+        assert len(legs) == 3
+        assert legs[1].names == (response["waypoints"][1]["name"], response["waypoints"][2]["name"])
+        coordinates = RouteGeometry.from_osrm(legs[1].geometry).coords
+        assert len(coordinates) == 3
+        assert coordinates[0] == pytest.approx([window[1]["lng"], window[1]["lat"]])
+        assert coordinates[-1] == pytest.approx([window[2]["lng"], window[2]["lat"]])
+
+    def test_unsplittable(self):
+        response = fake_route(create_test_coords(3))
+        del response["routes"][0]["legs"][0]["annotation"]
+        assert split_route_legs(response) is None
+        response = fake_route(create_test_coords(3))
+        response["routes"][0]["legs"][0]["annotation"]["distance"].pop()
+        assert split_route_legs(response) is None
+
+    def test_leg_runs(self):
+        leg = Leg("", 0.0, 0.0)
+        assert leg_runs([leg, leg]) == []
+        assert leg_runs([None, None]) == [(0, 3)]
+        assert leg_runs([leg, None, None, leg, None]) == [(1, 4), (4, 6)]
+
+
+class TestLegCache:
+    """Tests for LegCache."""
+
+    def test_lookup_and_memory_bound(self):
+        coords = create_test_coords(11)
+        legs = split_route_legs(fake_route(coords))
+        cache = LegCache(max_bytes=5 * legs[0].nbytes, path=None)
+        cache.store("local:v1", coords, legs)
+
+        found = cache.lookup("local:v1", coords)
+        assert [leg is not None for leg in found] == [False] * 5 + [True] * 5
+        assert cache.nbytes <= 5 * legs[0].nbytes
+        assert cache.lookup("local:v2", coords) == [None] * 10
+
+    def test_disk_persistence(self, tmp_path):
+        path = str(tmp_path / "legs.sqlite3")
+        coords = create_test_coords(5)
+        legs = split_route_legs(fake_route(coords))
+        cache = LegCache(path=path)
+        cache.store("local:v1", coords, legs)
+        cache.close()
+
+        reopened = LegCache(path=path)
+        assert reopened.lookup("local:v1", coords) == legs
+        assert len(reopened) == 4
+        reopened.close()
+
+    def test_new_version_purges_old(self, tmp_path):
+        coords = create_test_coords(5)
+        legs = split_route_legs(fake_route(coords))
+        cache = LegCache(path=str(tmp_path / "legs.sqlite3"))
+        cache.store("local:v1", coords, legs)
+        cache.store("public:2026-W42", coords, legs)
+        cache.store("local:v2", coords, legs)
+
+        assert cache.lookup("local:v1", coords) == [None] * 4
+        assert None not in cache.lookup("public:2026-W42", coords)
+        assert cache.snapshot()["stored_entries"] == 8
+        cache.close()
+
+
+class TestGetOsrmRouteWithLegs:
+    """Tests for get_osrm_route with the leg cache."""
+
+    @pytest.fixture
+    def requests(self, monkeypatch):
+        requested = []
+
+        async def fake_request(request_type, coordinates, params):
+            assert params["annotations"] == "distance"
+            window = [
+                {"lng": float(c.split(",")[0]), "lat": float(c.split(",")[1])}
+                for c in coordinates.split(";")
+            ]
+            requested.append(len(window))
+            return fake_route(window)
+
+        cache = LegCache(path=None)
+        monkeypatch.setattr(osrm, "request_osrm", fake_request)
+        monkeypatch.setattr(osrm, "get_leg_cache", lambda: cache)
+        monkeypatch.setitem(pair_cache._versions, "local", "local:test")
+        return requested
+
+    def test_edited_route_requests_only_new_legs(self, requests):
+        coords = create_test_coords(8)
+        first, _ = asyncio.run(osrm.get_osrm_route(coords, list(range(8))))
+        assert requests == [8]
+
+        # Closing the tour adds one leg; nothing else is requested
+        closed, _ = asyncio.run(osrm.get_osrm_route(coords, list(range(8)) + [0]))
+        assert requests == [8, 2]
+
+        again, ordered = asyncio.run(osrm.get_osrm_route(coords, list(range(8))))
+        assert requests == [8, 2]
+        assert again["routes"][0]["distance"] == first["routes"][0]["distance"]
+        assert len(again["routes"][0]["geometry"]) == 15
+        np.testing.assert_allclose(
+            again["routes"][0]["geometry"].coords, first["routes"][0]["geometry"].coords
+        )
+        assert closed["routes"][0]["distance"] == 800.0
+        assert ordered[3]["description"] == first["waypoints"][3]["name"]
+
+    def test_moved_waypoint_requests_missing_runs(self, requests):
+        coords = create_test_coords(10)
+        asyncio.run(osrm.get_osrm_route(coords, list(range(10))))
+
+        # Moving waypoint 5 to the end breaks legs 4-5 and 5-6
+        order = [0, 1, 2, 3, 4, 6, 7, 8, 9, 5]
+        data, _ = asyncio.run(osrm.get_osrm_route(coords, order))
+        assert requests == [10, 2, 2]
+        assert len(data["routes"][0]["legs"]) == 9
+        assert len(data["waypoints"]) == 10
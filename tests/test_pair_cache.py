@@ -0,0 +1,216 @@
+"""
+Tests for the persistent pairwise travel-cost cache.
+
+Tests cover:
+- Microdegree point ids
+- Store/lookup round trips, unroutable pairs and repeated points
+- Dataset versions and purging of outdated datasets
+- LRU eviction above the size cap
+- Matrix retrieval requesting only the points with missing pairs
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from webrotas.infrastructure.routing import osrm, pair_cache
+from webrotas.infrastructure.routing.pair_cache import (
+    PairCache,
+    dataset_version,
+    point_ids,
+    record_dataset_version,
+)
+
+
+def create_test_coords(lngs) -> list:
+    """Coordinates whose longitude encodes a point id."""
+    return [{"lat": -23.0, "lng": float(lng)} for lng in lngs]
+
+
+def create_line_matrix(lngs) -> np.ndarray:
+    """|i - j| * 100 m between points on a line."""
+    positions = np.array(lngs, dtype=float)
+    return (np.abs(positions[:, None] - positions[None, :]) * 100.0).astype(np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PairCache(str(tmp_path / "pairs.sqlite3"), max_entries=1000)
+    yield cache
+    cache.close()
+
+
+class TestPointIds:
+    """Tests for coordinate quantization."""
+
+    def test_microdegree_quantization(self):
+        ids = point_ids(
+            [
+                {"lat": -22.9023681, "lng": -43.1742001},
+                {"lat": -22.9023679, "lng": -43.1741999},
+                {"lat": -22.902369, "lng": -43.1742},
+            ]
+        )
+        assert ids[0] == ids[1]
+        assert ids[0] != ids[2]
+
+    def test_extreme_coordinates_distinct(self):
+        ids = point_ids(create_test_coords([-180.0, 180.0]) + [{"lat": 90, "lng": 0}])
+        assert len(set(ids.tolist())) == 3
+
+
+class TestPairCache:
+    """Tests for PairCache storage."""
+
+    def test_round_trip(self, cache):
+        coords = create_test_coords([0, 1, 2])
+        distances = create_line_matrix([0, 1, 2])
+        distances[2, 0] = np.nan
+        assert cache.store("local:v1", coords, distances, distances / 10) == 6
+
+        # Reordered, with one unknown and one repeated point
+        query = create_test_coords([2, 0, 7, 0])
+        found_d, found_t, found = cache.lookup("local:v1", query)
+
+        assert found[0, 1] and found[1, 0] and not found[0, 2]
+        assert np.isnan(found_d[0, 1])  # unroutable, but cached
+        assert found_d[1, 0] == 200.0 and found_t[1, 0] == 20.0
+        assert found[1, 3] and found_d[1, 3] == 0
+        assert found[2, 2] and not found[2, [0, 1, 3]].any()
+
+    def test_versions_are_separate_and_purged(self, cache):
+        coords = create_test_coords([0, 1])
+        matrix = create_line_matrix([0, 1])
+        cache.store("local:v1", coords, matrix, matrix)
+        cache.store("public:w1", coords, matrix, matrix)
+        assert not cache.lookup("local:v2", coords)[2][0, 1]
+
+        cache.store("local:v2", coords, matrix, matrix)
+        assert not cache.lookup("local:v1", coords)[2][0, 1]
+        assert cache.lookup("public:w1", coords)[2][0, 1]
+
+    def test_mask_selects_cells(self, cache):
+        coords = create_test_coords([0, 1, 2])
+        matrix = create_line_matrix([0, 1, 2])
+        mask = np.zeros((3, 3), dtype=bool)
+        mask[2, :] = True
+        assert cache.store("local:v1", coords, matrix, matrix, mask) == 2
+
+    def test_evicts_least_recently_used(self, tmp_path, monkeypatch):
+        cache = PairCache(str(tmp_path / "lru.sqlite3"), max_entries=5)
+        clock = iter(range(100))
+        monkeypatch.setattr(pair_cache.time, "time", lambda: next(clock))
+
+        old, recent = create_test_coords([0, 1]), create_test_coords([2, 3])
+        cache.store("local:v1", old, create_line_matrix([0, 1]), create_line_matrix([0, 1]))
+        cache.store("local:v1", recent, create_line_matrix([2, 3]), create_line_matrix([2, 3]))
+        cache.lookup("local:v1", old)
+
+        third = create_test_coords([4, 5])
+        cache.store("local:v1", third, create_line_matrix([4, 5]), create_line_matrix([4, 5]))
+
+        assert cache.lookup("local:v1", old)[2].all()
+        assert not cache.lookup("local:v1", recent)[2][0, 1]
+        assert cache.snapshot()["entries"] <= 5
+        cache.close()
+
+
+class TestDatasetVersion:
+    """Tests for dataset version tracking."""
+
+    def test_versions_from_responses(self, monkeypatch):
+        monkeypatch.setattr(pair_cache, "_versions", {})
+        assert dataset_version("local") is None
+
+        record_dataset_version("local", {"code": "Ok", "data_version": "abc-1"})
+        assert dataset_version("local") == "local:abc-1"
+        record_dataset_version("local", {"code": "InvalidQuery"})
+        assert dataset_version("local") == "local:abc-1"
+
+        record_dataset_version("local", {"code": "Ok"})
+        assert dataset_version("local") == f"local:{pair_cache.OSRM_DATASET_VERSION}"
+        record_dataset_version("public", {"code": "Ok"})
+        assert dataset_version("public").startswith("public:") and "-W" in dataset_version("public")
+
+
+class TestCachedMatrices:
+    """Tests for compute_distance_and_duration_matrices with the cache."""
+
+    def test_requests_only_missing_points(self, cache, monkeypatch):
+        requested = []
+
+        async def fake_public(request_type, coordinates, params):
+            points = [int(float(c.split(",")[0])) for c in coordinates.split(";")]
+            sources = (
+                [int(i) for i in params["sources"].split(";")]
+                if "sources" in params
+                else range(len(points))
+            )
+            destinations = (
+                [int(i) for i in params["destinations"].split(";")]
+                if "destinations" in params
+                else range(len(points))
+            )
+            requested.extend((points[s], points[d]) for s in sources for d in destinations)
+            distances = [
+                [abs(points[s] - points[d]) * 100.0 for d in destinations]
+                for s in sources
+            ]
+            return {"code": "Ok", "distances": distances, "durations": distances}
+
+        monkeypatch.setattr(osrm, "request_osrm_public_api", fake_public)
+        monkeypatch.setattr(osrm, "get_pair_cache", lambda: cache)
+        monkeypatch.setattr(pair_cache, "_versions", {"public": "public:test"})
+
+        async def run():
+            first = await osrm.compute_distance_and_duration_matrices(
+                create_test_coords(range(6))
+            )
+            await asyncio.gather(*osrm._pending_stores)
+            first_requests = len(requested)
+
+            second = await osrm.compute_distance_and_duration_matrices(
+                create_test_coords([0, 1, 2, 3, 4, 5, 9])
+            )
+            await asyncio.gather(*osrm._pending_stores)
+            return first, second, first_requests
+
+        first, second, first_requests = asyncio.run(run())
+
+        np.testing.assert_allclose(first.distances, create_line_matrix(range(6)))
+        np.testing.assert_allclose(
+            second.distances, create_line_matrix([0, 1, 2, 3, 4, 5, 9])
+        )
+        assert first_requests == 36
+        assert all(9 in pair for pair in requested[first_requests:])
+
+        # Everything cached now: no request at all
+        before = len(requested)
+        third = asyncio.run(
+            osrm.compute_distance_and_duration_matrices(
+                create_test_coords([9, 5, 0])
+            )
+        )
+        assert len(requested) == before
+        np.testing.assert_allclose(third.distances, create_line_matrix([9, 5, 0]))
+
+
+class TestPointsToRequest:
+    """Tests for choosing the points to request."""
+
+    def test_new_point_only(self):
+        found = np.ones((5, 5), dtype=bool)
+        found[4, :3] = found[:3, 4] = False
+        np.testing.assert_array_equal(pair_cache.points_to_request(found), [4])
+
+    def test_result_covers_every_missing_cell(self):
+        found = np.random.default_rng(0).random((30, 30)) > 0.05
+        np.fill_diagonal(found, True)
+        missing = pair_cache.points_to_request(found)
+
+        covered = found.copy()
+        covered[missing, :] = True
+        covered[:, missing] = True
+        assert covered.all()
+        assert len(missing) < 30
@@ -0,0 +1,199 @@
+"""
+Tests for warm-started re-optimization of edited routes.
+
+Tests cover:
+- Matching points of an edited route against the stored state
+- LRU bounds of the route state cache
+- Completing a previous order and solving from it
+- Incremental matrices requesting only the added points
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.cost_matrix import CostMatrix
+from webrotas.domain.routing.heuristics import complete_order, path_cost
+from webrotas.domain.routing.tsp import SolverPolicy, solve_tsp
+from webrotas.infrastructure.routing import osrm
+from webrotas.infrastructure.routing.route_state import (
+    RouteState,
+    RouteStateCache,
+    point_keys,
+)
+
+
+def create_test_coords(lngs) -> list:
+    """Coordinates whose longitude encodes a point id."""
+    return [{"lat": -23.0, "lng": float(lng)} for lng in lngs]
+
+
+def create_line_state(lngs, order) -> RouteState:
+    """State with an |i - j| * 100 m matrix over the given longitudes."""
+    positions = np.array(lngs, dtype=float)
+    distances = np.abs(positions[:, None] - positions[None, :]) * 100.0
+    matrix = CostMatrix(distances, distances / 10)
+    return RouteState(point_keys(create_test_coords(lngs)), matrix, order)
+
+
+def create_points_matrix(n: int, seed: int = 0) -> np.ndarray:
+    """Euclidean matrix of n random points."""
+    points = np.random.default_rng(seed).uniform(0, 10_000, size=(n, 2))
+    return np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+
+
+class TestRouteState:
+    """Tests for RouteState matching."""
+
+    def test_match_kept_added_and_removed_points(self):
+        state = create_line_state([0, 1, 2, 3], order=[0, 2, 1, 3])
+        coords = create_test_coords([0, 3, 9, 1])
+
+        previous = state.match(coords)
+        np.testing.assert_array_equal(previous, [0, 3, -1, 1])
+        # Point 2 was removed; 9 is new and left for insertion
+        assert state.initial_order(previous) == [0, 3, 1]
+
+    def test_repeated_coordinates_matched_once(self):
+        state = create_line_state([0, 5, 5], order=[0, 1, 2])
+        previous = state.match(create_test_coords([0, 5, 5, 5]))
+        np.testing.assert_array_equal(previous, [0, 1, 2, -1])
+
+    def test_rounding_tolerates_float_noise(self):
+        state = create_line_state([0, 1], order=[0, 1])
+        coords = [{"lat": -23.0 + 1e-9, "lng": 1e-9}, {"lat": -23.0, "lng": 1.0}]
+        np.testing.assert_array_equal(state.match(coords), [0, 1])
+
+
+class TestRouteStateCache:
+    """Tests for the LRU bounds."""
+
+    def test_evicts_least_recently_used(self):
+        cache = RouteStateCache(max_entries=2)
+        for route_id in ("a", "b"):
+            cache.put(route_id, create_line_state([0, 1], [0, 1]))
+        assert cache.get("a") is not None
+        cache.put("c", create_line_state([0, 1], [0, 1]))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+    def test_memory_budget(self):
+        state = create_line_state(range(10), list(range(10)))
+        cache = RouteStateCache(max_entries=10, max_bytes=2 * state.matrix.nbytes)
+        for route_id in ("a", "b", "c"):
+            cache.put(route_id, create_line_state(range(10), list(range(10))))
+        assert len(cache) == 2
+        assert cache.nbytes == 2 * state.matrix.nbytes
+
+        cache.put("too-big", create_line_state(range(20), list(range(20))))
+        assert cache.get("too-big") is None
+
+    def test_disabled_or_anonymous(self):
+        cache = RouteStateCache(max_entries=0)
+        cache.put("a", create_line_state([0, 1], [0, 1]))
+        assert len(cache) == 0
+        assert RouteStateCache().get(None) is None
+
+
+class TestWarmStartedSolve:
+    """Tests for solving from a previous order."""
+
+    @pytest.mark.parametrize(
+        "kwargs,first,last",
+        [({}, 0, None), ({"closed": True}, 0, 0), ({"end_index": 4}, 0, 4)],
+    )
+    def test_complete_order_inserts_missing_nodes(self, kwargs, first, last):
+        matrix = create_points_matrix(8)
+        order = complete_order(matrix, [0, 6, 6, 2, 4, 42], **kwargs)
+
+        assert order[0] == first
+        if last is not None:
+            assert order[-1] == last
+        assert sorted(set(order)) == list(range(8))
+        # Kept nodes stay in their previous relative order
+        kept = [node for node in order if node in (6, 2)]
+        assert kept == [6, 2]
+
+    def test_heuristic_mode_starts_from_order(self):
+        matrix = create_points_matrix(40, seed=2)
+        fresh = solve_tsp(matrix, policy=SolverPolicy(mode="heuristic"))
+        previous = [node for node in fresh.order if node not in (5, 17)]
+
+        again = solve_tsp(
+            matrix, policy=SolverPolicy(mode="heuristic"), initial_order=previous
+        )
+        assert sorted(again.order) == list(range(40))
+        # The search never ends above its starting route
+        start = complete_order(matrix, previous)
+        assert again.objective <= path_cost(matrix, np.array(start)) + 1e-6
+
+    def test_or_tools_starts_from_order(self):
+        matrix = create_points_matrix(90, seed=3)
+        policy = SolverPolicy(time_limit_s=0.5, mode="monolithic")
+        fresh = solve_tsp(matrix, endpoint_index=7, policy=policy)
+
+        short = SolverPolicy(time_limit_s=0.1, mode="monolithic")
+        again = solve_tsp(
+            matrix, endpoint_index=7, policy=short, initial_order=fresh.order
+        )
+        assert again.order[0] == 0 and again.order[-1] == 7
+        assert sorted(again.order) == list(range(90))
+        assert again.objective <= fresh.objective + 1e-2
+
+
+class TestIncrementalMatrices:
+    """Tests for compute_incremental_matrices."""
+
+    def test_requests_only_added_points(self, monkeypatch):
+        requested = []
+
+        async def fake_public(request_type, coordinates, params):
+            points = [int(float(c.split(",")[0])) for c in coordinates.split(";")]
+            sources = [int(i) for i in params["sources"].split(";")]
+            destinations = [int(i) for i in params["destinations"].split(";")]
+            requested.extend(
+                (points[s], points[d]) for s in sources for d in destinations
+            )
+            distances = [
+                [abs(points[s] - points[d]) * 100.0 for d in destinations]
+                for s in sources
+            ]
+            durations = [[v / 10 for v in row] for row in distances]
+            return {"code": "Ok", "distances": distances, "durations": durations}
+
+        monkeypatch.setattr(osrm, "request_osrm_public_api", fake_public)
+        monkeypatch.setattr(osrm, "_should_use_local_container", lambda *a: False)
+        monkeypatch.setattr(osrm, "get_pair_cache", lambda: None)
+
+        state = create_line_state([0, 1, 2, 3], order=[0, 1, 2, 3])
+        coords = create_test_coords([0, 3, 9, 1])
+        matrix = asyncio.run(
+            osrm.compute_incremental_matrices(coords, state, state.match(coords))
+        )
+
+        lngs = np.array([0, 3, 9, 1], dtype=float)
+        expected = np.abs(lngs[:, None] - lngs[None, :]) * 100.0
+        np.testing.assert_allclose(matrix.distances, expected)
+        np.testing.assert_allclose(matrix.durations, expected / 10)
+        assert all(9 in pair for pair in requested)
+        assert len(requested) == 7
+
+    def test_no_backend_leaves_cells_for_repair(self, monkeypatch):
+        async def failing(request_type, coordinates, params):
+            raise RuntimeError("down")
+
+        monkeypatch.setattr(osrm, "request_osrm_public_api", failing)
+        monkeypatch.setattr(osrm, "request_osrm", failing)
+
+        state = create_line_state([0, 1], order=[0, 1])
+        coords = create_test_coords([0, 1, 2])
+        matrix = asyncio.run(
+            osrm.compute_incremental_matrices(coords, state, state.match(coords))
+        )
+        assert matrix.distances[0, 1] == 100.0
+        assert np.isnan(matrix.distances[2, 0]) and matrix.distances[2, 2] == 0
+
+        repaired = osrm._ensure_valid_matrices(coords, matrix)
+        assert np.isfinite(repaired.distances).all()
@@ -0,0 +1,162 @@
+"""
+Tests for windowed /route requests.
+
+Tests cover:
+- Window planning with one shared waypoint between windows
+- Stitching geometry, distance, duration, legs and waypoints
+- Concurrent window requests and error propagation
+- Backend fallback per window in get_osrm_route
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from webrotas.infrastructure.routing import osrm
+from webrotas.infrastructure.routing.route_windows import (
+    build_windowed_route,
+    plan_route_windows,
+    stitch_route_windows,
+)
+
+
+def create_test_coords(n: int) -> list:
+    """n waypoints along a parallel, longitude encoding the index."""
+    return [{"lat": -23.0, "lng": float(i)} for i in range(n)]
+
+
+def fake_route(window):
+    """Route response with two vertices per leg and 100 m / 10 s legs."""
+    line = []
+    for a, b in zip(window, window[1:]):
+        line += [[a["lng"], a["lat"]], [(a["lng"] + b["lng"]) / 2, a["lat"]]]
+    line.append([window[-1]["lng"], window[-1]["lat"]])
+    legs = [{"distance": 100.0, "duration": 10.0} for _ in window[1:]]
+    return {
+        "code": "Ok",
+        "routes": [
+            {
+                "geometry": {"type": "LineString", "coordinates": line},
+                "distance": 100.0 * len(legs),
+                "duration": 10.0 * len(legs),
+                "legs": legs,
+            }
+        ],
+        "waypoints": [{"name": f"street {int(c['lng'])}"} for c in window],
+    }
+
+
+class TestPlanRouteWindows:
+    """Tests for plan_route_windows."""
+
+    def test_single_window_when_short(self):
+        assert plan_route_windows(50, 100) == [(0, 50)]
+
+    @pytest.mark.parametrize("n,size", [(101, 100), (1000, 100), (23, 5), (6, 2)])
+    def test_windows_share_one_waypoint(self, n, size):
+        windows = plan_route_windows(n, size)
+        assert windows[0][0] == 0 and windows[-1][1] == n
+        for (_, stop), (start, _) in zip(windows, windows[1:]):
+            assert start == stop - 1
+        assert all(2 <= stop - start <= size for start, stop in windows)
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            plan_route_windows(10, 1)
+
+
+class TestStitch:
+    """Tests for stitch_route_windows."""
+
+    def test_matches_single_request(self):
+        coords = create_test_coords(12)
+        whole = fake_route(coords)
+        parts = [fake_route(coords[a:b]) for a, b in plan_route_windows(12, 5)]
+        stitched = stitch_route_windows(parts)
+
+        route, expected = stitched["routes"][0], whole["routes"][0]
+        assert route["geometry"].coords.tolist() == expected["geometry"]["coordinates"]
+        assert route["distance"] == expected["distance"]
+        assert route["duration"] == expected["duration"]
+        assert len(route["legs"]) == 11
+        assert stitched["waypoints"] == whole["waypoints"]
+
+
+class TestBuildWindowedRoute:
+    """Tests for build_windowed_route."""
+
+    def test_concurrent_windows(self):
+        tracker = {"in_flight": 0, "max_in_flight": 0, "calls": 0}
+
+        async def fetch(window):
+            tracker["calls"] += 1
+            tracker["in_flight"] += 1
+            tracker["max_in_flight"] = max(tracker["max_in_flight"], tracker["in_flight"])
+            await asyncio.sleep(0.001)
+            tracker["in_flight"] -= 1
+            return fake_route(window)
+
+        coords = create_test_coords(1000)
+        data = asyncio.run(
+            build_windowed_route(coords, fetch, window_size=100, max_concurrent=3)
+        )
+
+        route = data["routes"][0]
+        assert tracker["calls"] == 11
+        assert tracker["max_in_flight"] <= 3
+        assert route["distance"] == 999 * 100.0
+        assert len(route["geometry"]) == 2 * 999 + 1
+        assert len(data["waypoints"]) == 1000
+
+    def test_window_error_propagates(self):
+        async def fetch(window):
+            raise HTTPException(status_code=503, detail="down")
+
+        with pytest.raises(HTTPException):
+            asyncio.run(build_windowed_route(create_test_coords(30), fetch, 10))
+
+
+class TestGetOsrmRoute:
+    """Tests for long tours in get_osrm_route."""
+
+    def test_long_tour_uses_windows_with_fallback(self, monkeypatch):
+        calls = {"local": 0, "public": 0}
+        monkeypatch.setattr(osrm, "get_leg_cache", lambda: None)
+
+        def fake_request(backend):
+            async def request(request_type, coordinates, params):
+                calls[backend] += 1
+                if backend == "local":
+                    raise HTTPException(status_code=503, detail="local down")
+                window = [
+                    {"lng": float(c.split(",")[0]), "lat": float(c.split(",")[1])}
+                    for c in coordinates.split(";")
+                ]
+                return fake_route(window)
+
+            return request
+
+        monkeypatch.setattr(osrm, "request_osrm", fake_request("local"))
+        monkeypatch.setattr(osrm, "request_osrm_public_api", fake_request("public"))
+
+        coords = create_test_coords(250)
+        data, ordered = asyncio.run(osrm.get_osrm_route(coords, list(range(250))))
+
+        assert calls["public"] == 3
+        assert data["routes"][0]["distance"] == 249 * 100.0
+        assert ordered[10]["description"] == "street 10"
+
+    def test_straight_line_fallback_has_distance(self, monkeypatch):
+        async def failing(request_type, coordinates, params):
+            raise HTTPException(status_code=503, detail="down")
+
+        monkeypatch.setattr(osrm, "request_osrm", failing)
+        monkeypatch.setattr(osrm, "request_osrm_public_api", failing)
+
+        window = asyncio.run(osrm._fetch_route_window(create_test_coords(3)))
+        route = window["routes"][0]
+        assert len(route["geometry"]) == 3
+        # Two legs of one degree of longitude at 23°S (~102 km each)
+        assert 200_000 < route["distance"] < 210_000
+        assert route["duration"] == pytest.approx(route["distance"] / (40 / 3.6))
@@ -0,0 +1,140 @@
+"""
+Tests for the TSP solver process pool.
+
+Tests cover:
+- Solving in a worker process (and in a thread with max_workers=0)
+- Inline heuristic solves limited to small problems
+- Queue limit rejecting excess solves
+- Cancellation of queued and running solves
+- Queue and timing metrics
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from webrotas.core.exceptions import SolverBusyError
+from webrotas.domain.routing.tsp import SolverPolicy, solve_tsp, solve_tsp_from_matrix
+from webrotas.infrastructure.routing import solver_pool
+from webrotas.infrastructure.routing.solver_pool import (
+    INLINE_HEURISTIC_MAX_NODES,
+    SolverPool,
+)
+
+
+def create_line_matrix(n: int) -> np.ndarray:
+    """Distance matrix of n points on a line, shuffled so the order matters."""
+    positions = np.random.default_rng(0).permutation(n).astype(float)
+    positions[0] = -1.0
+    return np.abs(positions[:, None] - positions[None, :]).astype(np.float32)
+
+
+def create_random_matrix(n: int) -> np.ndarray:
+    """Euclidean matrix of n random points (slow enough to cancel mid-search)."""
+    points = np.random.default_rng(1).uniform(0, 10_000, size=(n, 2))
+    return np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    pool = SolverPool(max_workers=1, max_queue=1)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+class TestSolve:
+    """Tests for solving through the pool."""
+
+    def test_process_solve_matches_inline(self, process_pool):
+        matrix = create_line_matrix(12)
+        policy = SolverPolicy(1.0, metaheuristic="greedy_descent", mode="monolithic")
+        solution = asyncio.run(process_pool.solve(matrix, policy=policy))
+        assert solution.order == solve_tsp_from_matrix(matrix, policy=policy)
+
+    def test_thread_solve_with_constraints(self):
+        pool = SolverPool(max_workers=0, max_queue=1)
+        matrix = create_line_matrix(8)
+        order = asyncio.run(pool.solve(matrix, endpoint_index=3)).order
+        assert order[0] == 0
+        assert order[-1] == 3
+        assert sorted(order) == list(range(8))
+
+    def test_heuristic_policy_solved_inline(self, process_pool):
+        before = process_pool.snapshot()["completed"]
+        solution = asyncio.run(process_pool.solve(create_line_matrix(30)))
+        assert solution.policy.mode == "heuristic"
+        assert process_pool.snapshot()["completed"] == before + 1
+        assert process_pool.snapshot()["running"] == 0
+
+    def test_large_heuristic_solve_leaves_event_loop(self, monkeypatch):
+        threads = []
+
+        def recording_solve(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return solve_tsp(*args, **kwargs)
+
+        monkeypatch.setattr(solver_pool, "solve_tsp", recording_solve)
+        pool = SolverPool(max_workers=0, max_queue=1)
+        policy = SolverPolicy(1.0, mode="heuristic")
+
+        asyncio.run(pool.solve(create_line_matrix(INLINE_HEURISTIC_MAX_NODES), policy=policy))
+        asyncio.run(
+            pool.solve(create_line_matrix(INLINE_HEURISTIC_MAX_NODES + 1), policy=policy)
+        )
+
+        assert threads[0] is threading.main_thread()
+        assert threads[1] is not threading.main_thread()
+
+    def test_metrics(self):
+        pool = SolverPool(max_workers=0, max_queue=1)
+        asyncio.run(pool.solve(create_line_matrix(5)))
+        snapshot = pool.snapshot()
+        assert snapshot["completed"] == 1
+        assert snapshot["running"] == 0
+        assert snapshot["queued"] == 0
+        assert snapshot["avg_solve_s"] >= 0
+
+
+class TestQueueLimits:
+    """Tests for rejection and cancellation."""
+
+    def test_rejects_when_queue_full(self):
+        pool = SolverPool(max_workers=0, max_queue=0)
+        matrix = create_random_matrix(80)
+        policy = SolverPolicy(time_limit_s=0.2, mode="monolithic")
+
+        async def run():
+            first = asyncio.create_task(pool.solve(matrix, policy=policy))
+            await asyncio.sleep(0)
+            with pytest.raises(SolverBusyError):
+                await pool.solve(matrix, policy=policy)
+            return await first
+
+        solution = asyncio.run(run())
+        assert len(solution.order) == 80
+        assert pool.snapshot()["rejected"] == 1
+
+    def test_cancel_queued_and_running(self, process_pool):
+        matrix = create_random_matrix(200)
+
+        async def run():
+            running = asyncio.create_task(process_pool.solve(matrix))
+            queued = asyncio.create_task(process_pool.solve(matrix))
+            await asyncio.sleep(0)
+            assert process_pool.snapshot()["running"] == 1
+            assert process_pool.snapshot()["queued"] == 1
+
+            queued.cancel()
+            running.cancel()
+            await asyncio.gather(running, queued, return_exceptions=True)
+
+            # The worker is released and serves the next solve
+            return await process_pool.solve(create_line_matrix(5))
+
+        before = process_pool.snapshot()["cancelled"]
+        solution = asyncio.run(run())
+        assert sorted(solution.order) == list(range(5))
+        assert process_pool.snapshot()["cancelled"] == before + 2
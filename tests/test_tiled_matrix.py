@@ -0,0 +1,196 @@
+"""
+Tests for the tiled /table matrix engine.
+
+Tests cover:
+- Tile planning covers every cell exactly once
+- Block-pair planning for the coordinate-capped public router
+- Incremental planning for the rows/columns of added points
+- sources/destinations parameters of off-diagonal tiles
+- Matrix assembly, unroutable cells and bounded concurrency
+- Error propagation from tile requests
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from webrotas.infrastructure.routing.tiled_matrix import (
+    TableTile,
+    build_tiled_matrix,
+    plan_block_pair_tiles,
+    plan_incremental_tiles,
+    plan_table_tiles,
+)
+from webrotas.infrastructure.routing.parallel_public_api import (
+    get_distance_matrix_parallel_public_api,
+)
+
+
+def create_test_coords(n: int) -> list:
+    """Create n test coordinates whose longitude encodes their index."""
+    return [{"lat": -23.0, "lng": float(i)} for i in range(n)]
+
+
+def make_fake_osrm(tracker: dict | None = None, unroutable: int | None = None):
+    """Fake request_osrm answering tables with |i - j| * 100 metres."""
+
+    async def fake_request(request_type, coordinates, params):
+        if tracker is not None:
+            tracker["in_flight"] += 1
+            tracker["max_in_flight"] = max(tracker["max_in_flight"], tracker["in_flight"])
+            tracker["calls"] += 1
+        await asyncio.sleep(0.001)
+
+        points = [int(float(c.split(",")[0])) for c in coordinates.split(";")]
+        sources = [int(i) for i in params["sources"].split(";")] if "sources" in params else range(len(points))
+        destinations = (
+            [int(i) for i in params["destinations"].split(";")]
+            if "destinations" in params
+            else range(len(points))
+        )
+
+        distances = [
+            [
+                None if unroutable in (points[s], points[d]) and points[s] != points[d]
+                else abs(points[s] - points[d]) * 100.0
+                for d in destinations
+            ]
+            for s in sources
+        ]
+        durations = [[None if v is None else v / 10 for v in row] for row in distances]
+
+        if tracker is not None:
+            tracker["in_flight"] -= 1
+        return {"code": "Ok", "distances": distances, "durations": durations}
+
+    return fake_request
+
+
+class TestTilePlanning:
+    """Tests for plan_table_tiles."""
+
+    def test_single_tile_when_small(self):
+        tiles = plan_table_tiles(10, tile_size=1000)
+        assert len(tiles) == 1
+        assert tiles[0].is_square
+        assert "sources" not in tiles[0].to_params()
+
+    @pytest.mark.parametrize("n,tile_size", [(7, 3), (10, 5), (2500, 1000)])
+    def test_tiles_cover_each_cell_once(self, n, tile_size):
+        coverage = np.zeros((n, n), dtype=int)
+        for tile in plan_table_tiles(n, tile_size):
+            assert len(tile.sources) <= tile_size
+            assert len(tile.destinations) <= tile_size
+            coverage[np.ix_(tile.sources, tile.destinations)] += 1
+        assert (coverage == 1).all()
+
+    def test_off_diagonal_params(self):
+        tile = TableTile(sources=[0, 1], destinations=[5, 6, 7])
+        params = tile.to_params()
+        assert tile.request_indices == [0, 1, 5, 6, 7]
+        assert params["sources"] == "0;1"
+        assert params["destinations"] == "2;3;4"
+
+
+class TestBlockPairPlanning:
+    """Tests for plan_block_pair_tiles."""
+
+    def test_single_request_up_to_limit(self):
+        assert len(plan_block_pair_tiles(100, max_coords=100)) == 1
+        assert len(plan_block_pair_tiles(1, max_coords=100)) == 1
+
+    @pytest.mark.parametrize("n,expected_calls", [(101, 3), (200, 6), (450, 36)])
+    def test_plan_size_and_coverage(self, n, expected_calls):
+        tiles = plan_block_pair_tiles(n, max_coords=100)
+        assert len(tiles) == expected_calls
+
+        coverage = np.zeros((n, n), dtype=bool)
+        for tile in tiles:
+            assert tile.is_square
+            assert len(tile.request_indices) <= 100
+            coverage[np.ix_(tile.sources, tile.destinations)] = True
+        assert coverage.all()
+
+
+class TestIncrementalPlanning:
+    """Tests for plan_incremental_tiles."""
+
+    @pytest.mark.parametrize("n,added,tile_size", [(10, [3], 4), (30, [0, 7, 29], 5)])
+    def test_covers_only_added_rows_and_columns(self, n, added, tile_size):
+        coverage = np.zeros((n, n), dtype=int)
+        for tile in plan_incremental_tiles(n, added, tile_size):
+            assert len(tile.sources) <= tile_size
+            assert len(tile.destinations) <= tile_size
+            coverage[np.ix_(tile.sources, tile.destinations)] += 1
+
+        expected = np.zeros((n, n), dtype=int)
+        expected[added, :] = 1
+        expected[:, added] = 1
+        np.testing.assert_array_equal(coverage, expected)
+
+    def test_nothing_added(self):
+        assert plan_incremental_tiles(10, []) == []
+
+
+class TestBuildTiledMatrix:
+    """Tests for build_tiled_matrix."""
+
+    def test_assembles_full_matrix(self):
+        n = 23
+        coords = create_test_coords(n)
+        tracker = {"in_flight": 0, "max_in_flight": 0, "calls": 0}
+
+        distances, durations = asyncio.run(
+            build_tiled_matrix(
+                coords,
+                make_fake_osrm(tracker),
+                plan_table_tiles(n, tile_size=5),
+                max_concurrent=3,
+            )
+        )
+
+        idx = np.arange(n)
+        expected = np.abs(idx[:, None] - idx[None, :]) * 100.0
+        np.testing.assert_allclose(distances, expected)
+        np.testing.assert_allclose(durations, expected / 10)
+        assert tracker["calls"] == 25
+        assert tracker["max_in_flight"] <= 3
+
+    def test_unroutable_cells_become_nan(self):
+        coords = create_test_coords(6)
+        distances, _ = asyncio.run(
+            build_tiled_matrix(
+                coords, make_fake_osrm(unroutable=4), plan_table_tiles(6, tile_size=4)
+            )
+        )
+        assert np.isnan(distances[4, 1]) and np.isnan(distances[2, 4])
+        assert distances[4, 4] == 0
+        assert distances[0, 1] == 100.0
+
+    def test_parallel_public_api_uses_block_tables(self):
+        n = 130
+        tracker = {"in_flight": 0, "max_in_flight": 0, "calls": 0}
+        matrix = asyncio.run(
+            get_distance_matrix_parallel_public_api(
+                make_fake_osrm(tracker), create_test_coords(n)
+            )
+        )
+
+        assert tracker["calls"] == 3
+        assert matrix.distances.dtype == np.float32
+        assert matrix.distances[0, 129] == 12900.0 and matrix.distances[129, 0] == 12900.0
+        assert matrix.durations[64, 65] == 10.0
+        assert (np.diagonal(matrix.distances) == 0).all()
+
+    def test_tile_error_propagates(self):
+        async def failing_request(request_type, coordinates, params):
+            raise HTTPException(status_code=503, detail="down")
+
+        with pytest.raises(HTTPException):
+            asyncio.run(
+                build_tiled_matrix(
+                    create_test_coords(8), failing_request, plan_table_tiles(8, 3)
+                )
+            )
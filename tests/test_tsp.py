@@ -0,0 +1,162 @@
+"""
+Tests for the OR-Tools TSP solvers.
+
+Tests cover:
+- Integer cost scaling (precision, unroutable arcs)
+- Open, closed and fixed-endpoint tours
+- Solvers do not modify the caller's matrix
+- Solver policies (defaults per size, request options) and search reports
+"""
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.tsp import (
+    COST_SCALE,
+    UNREACHABLE_COST,
+    SolverPolicy,
+    default_policy,
+    scale_costs,
+    solve_closed_tsp_from_matrix,
+    solve_constrained_tsp_from_matrix,
+    solve_open_tsp_from_matrix,
+    solve_tsp,
+    solve_tsp_from_matrix,
+)
+
+
+def create_line_matrix(n: int) -> np.ndarray:
+    """Points on a line, 1 km apart, in shuffled index order."""
+    positions = np.array([0, 3, 1, 4, 2, 5, 7, 6][:n], dtype=float) * 1000.0
+    return np.abs(positions[:, None] - positions[None, :]).astype(np.float32)
+
+
+def tour_cost(matrix, order):
+    return sum(matrix[a, b] for a, b in zip(order, order[1:]))
+
+
+class TestScaleCosts:
+    """Tests for scale_costs."""
+
+    def test_sub_unit_precision_kept(self):
+        costs = scale_costs(np.array([[0.0, 1.26], [0.4, 0.0]]))
+        assert costs.dtype == np.int64
+        assert costs[0, 1] == round(1.26 * COST_SCALE)
+        assert costs[1, 0] == 40
+
+    def test_unroutable_arcs(self):
+        costs = scale_costs(np.array([[0.0, np.nan], [np.inf, 0.0]]))
+        assert costs[0, 1] == costs[1, 0] == UNREACHABLE_COST
+
+
+class TestSolvers:
+    """Tests for the tour variants."""
+
+    def test_open_tour_follows_line(self):
+        matrix = create_line_matrix(8)
+        order = solve_open_tsp_from_matrix(matrix)
+
+        assert order[0] == 0 and sorted(order) == list(range(8))
+        assert tour_cost(matrix, order) == pytest.approx(7000.0)
+
+    def test_closed_tour_returns_to_origin(self):
+        order = solve_closed_tsp_from_matrix(create_line_matrix(6))
+        assert order[0] == 0 and order[-1] == 0
+        assert sorted(order[:-1]) == list(range(6))
+
+    @pytest.mark.parametrize("end_index", [1, 5, 7])
+    def test_fixed_endpoint(self, end_index):
+        # Distances far above the old 10 km dimension capacity
+        matrix = create_line_matrix(8) * 50
+        order = solve_constrained_tsp_from_matrix(matrix, start_index=0, end_index=end_index)
+
+        assert order[0] == 0 and order[-1] == end_index
+        assert sorted(order) == list(range(8))
+
+    def test_dispatcher_endpoint_and_closed(self):
+        matrix = create_line_matrix(5)
+        assert solve_tsp_from_matrix(matrix, endpoint_index=3)[-1] == 3
+        assert solve_tsp_from_matrix(matrix, closed=True)[-1] == 0
+        with pytest.raises(ValueError):
+            solve_tsp_from_matrix(matrix, endpoint_index=3, closed=True)
+
+    def test_matrix_not_modified(self):
+        matrix = create_line_matrix(6)
+        original = matrix.copy()
+        solve_open_tsp_from_matrix(matrix)
+        solve_constrained_tsp_from_matrix(matrix, 0, None)
+        np.testing.assert_array_equal(matrix, original)
+
+
+def create_random_matrix(n: int) -> np.ndarray:
+    """Euclidean matrix of n random points."""
+    points = np.random.default_rng(3).uniform(0, 10_000, size=(n, 2))
+    return np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+
+
+class TestSolverPolicy:
+    """Tests for policies and anytime search reports."""
+
+    def test_defaults_tuned_per_size(self):
+        small, large = default_policy(10), default_policy(1000)
+        assert small.metaheuristic == "greedy_descent"
+        assert large.metaheuristic == "guided_local_search"
+        assert large.time_limit_s > small.time_limit_s
+
+    def test_from_options_overrides_defaults(self):
+        policy = SolverPolicy.from_options(
+            {"timeLimit": 0.5, "metaheuristic": "simulated_annealing"}, num_nodes=200
+        )
+        assert policy.time_limit_s == 0.5
+        assert policy.metaheuristic == "simulated_annealing"
+        assert policy.first_solution_strategy == default_policy(200).first_solution_strategy
+        assert SolverPolicy.from_options(None, 10) == default_policy(10)
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"timeLimit": 0},
+            {"timeLimit": "fast"},
+            {"timeLimit": 3600},
+            {"metaheuristic": "genetic"},
+            {"firstSolutionStrategy": "random"},
+            {"iterations": 10},
+            ["guided_local_search"],
+        ],
+    )
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            SolverPolicy.from_options(options, num_nodes=10)
+
+    def test_report_and_budget(self):
+        matrix = create_random_matrix(60)
+        policy = SolverPolicy(time_limit_s=0.5, metaheuristic="guided_local_search")
+        solution = solve_tsp(matrix, policy=policy)
+
+        assert sorted(solution.order) == list(range(60))
+        assert solution.objective == pytest.approx(
+            tour_cost(matrix, solution.order), rel=1e-4
+        )
+        # Improvements are strictly decreasing and end at the returned objective
+        objectives = [obj for _, obj in solution.history]
+        assert objectives == sorted(objectives, reverse=True)
+        assert objectives[-1] == pytest.approx(solution.objective)
+        assert solution.solve_time_s < 2.0
+
+        report = solution.to_dict()
+        assert report["metaheuristic"] == "guided_local_search"
+        assert set(report["history"][0]) == {"time", "objective"}
+
+    def test_metaheuristic_not_worse_than_descent(self):
+        matrix = create_random_matrix(80)
+        descent = solve_tsp(matrix, policy=SolverPolicy(1.0, metaheuristic="greedy_descent"))
+        guided = solve_tsp(matrix, policy=SolverPolicy(1.0))
+        assert guided.objective <= descent.objective + 1e-6
+
+    def test_should_stop_returns_best_so_far(self):
+        matrix = create_random_matrix(80)
+        solution = solve_tsp(
+            matrix, policy=SolverPolicy(time_limit_s=30), should_stop=lambda: True
+        )
+        assert sorted(solution.order) == list(range(80))
+        assert solution.solve_time_s < 5.0
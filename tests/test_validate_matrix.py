@@ -0,0 +1,117 @@
+"""
+Tests for matrix validation and repair.
+
+Tests cover:
+- Shape and diagonal rejection
+- Transpose repair of null/non-positive cells
+- Invalid pairs as an index array and geodesic repair
+"""
+
+import numpy as np
+import pytest
+
+from webrotas.domain.routing.cost_matrix import CostMatrix
+from webrotas.infrastructure.routing.osrm import _ensure_valid_matrices, validate_matrix
+
+
+def create_test_coords(n: int) -> list:
+    """Create n test coordinates in São Paulo region."""
+    return [{"lat": -23.55 + i * 0.01, "lng": -46.57 + i * 0.01} for i in range(n)]
+
+
+def create_matrix(n: int) -> list:
+    """Valid asymmetric matrix as nested lists."""
+    return [[0.0 if i == j else 100.0 * (i + 1) + j for j in range(n)] for i in range(n)]
+
+
+class TestValidateMatrix:
+    """Tests for validate_matrix."""
+
+    def test_valid_matrix_unchanged(self):
+        coords = create_test_coords(4)
+        distances, durations, invalid_pairs = validate_matrix(
+            coords, create_matrix(4), create_matrix(4)
+        )
+
+        np.testing.assert_array_equal(distances, create_matrix(4))
+        assert invalid_pairs.shape == (0, 2)
+
+    @pytest.mark.parametrize(
+        "distances",
+        [
+            None,
+            [[0.0, 1.0], [1.0]],  # ragged
+            [[0.0, 1.0], [1.0, 0.0]],  # wrong size for 3 coords
+        ],
+    )
+    def test_unusable_shapes(self, distances):
+        assert validate_matrix(create_test_coords(3), distances, create_matrix(3)) is None
+
+    def test_nonzero_diagonal_rejected(self):
+        durations = create_matrix(3)
+        durations[1][1] = None
+        assert validate_matrix(create_test_coords(3), create_matrix(3), durations) is None
+
+    def test_transpose_repair(self):
+        distances = create_matrix(4)
+        distances[0][2] = None
+        distances[3][1] = -1.0
+
+        repaired, _, invalid_pairs = validate_matrix(
+            create_test_coords(4), distances, create_matrix(4)
+        )
+
+        assert repaired[0, 2] == distances[2][0]
+        assert repaired[3, 1] == distances[1][3]
+        assert len(invalid_pairs) == 0
+
+    def test_invalid_pairs_from_both_matrices(self):
+        distances = create_matrix(5)
+        durations = create_matrix(5)
+        distances[0][4] = distances[4][0] = None
+        durations[2][3] = 0.0
+        durations[3][2] = None
+
+        _, _, invalid_pairs = validate_matrix(create_test_coords(5), distances, durations)
+
+        assert invalid_pairs.dtype.kind == "i"
+        assert sorted(map(tuple, invalid_pairs.tolist())) == [(0, 4), (2, 3), (3, 2), (4, 0)]
+
+    def test_ensure_valid_matrices_fills_geodesic(self):
+        coords = create_test_coords(4)
+        distances = create_matrix(4)
+        durations = create_matrix(4)
+        distances[1][2] = distances[2][1] = None
+        durations[1][2] = durations[2][1] = None
+
+        matrix = _ensure_valid_matrices(coords, CostMatrix(distances, durations))
+        distances, durations = matrix.distances, matrix.durations
+
+        assert distances[1, 2] > 0 and distances[1, 2] == pytest.approx(distances[2, 1])
+        assert durations[1, 2] == pytest.approx(distances[1, 2] * 3.6 / 40, rel=1e-6)
+        assert distances[0, 1] == 101.0
+
+    def test_cost_matrix_repaired_without_copy(self):
+        distances = create_matrix(3)
+        distances[0][1] = None
+        matrix = CostMatrix(distances, create_matrix(3))
+        original = matrix.distances
+
+        repaired = _ensure_valid_matrices(create_test_coords(3), matrix)
+
+        assert repaired.distances is original
+        assert original[0, 1] == distances[1][0]
+
+    def test_many_unroutable_points_scale(self):
+        n = 800
+        coords = create_test_coords(n)
+        distances = np.full((n, n), 500.0)
+        np.fill_diagonal(distances, 0.0)
+        distances[::3, :] = np.nan
+        distances[:, ::3] = np.nan
+        np.fill_diagonal(distances, 0.0)
+
+        _, _, invalid_pairs = validate_matrix(coords, distances, distances.copy())
+
+        expected = np.isnan(distances)
+        assert len(invalid_pairs) == expected.sum()
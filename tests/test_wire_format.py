@@ -0,0 +1,145 @@
+"""
+Tests for compact /process responses.
+
+Tests cover:
+- Path format negotiation (pathFormat query parameter and Accept header)
+- Route paths written as [lat, lng] lists, polyline6 or flat arrays
+- Single serialization with orjson, including NumPy arrays
+- The /process endpoint choosing the response class
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from webrotas.api.routes import process as process_module
+from webrotas.api.routes.process import CompactJSONResponse
+from webrotas.config.constants import COMPACT_MEDIA_TYPE
+from webrotas.core.dependencies import negotiate_path_format
+from webrotas.core.exceptions import InvalidPathFormatError
+from webrotas.domain.routing.geometry import RouteGeometry, decode_polyline
+from webrotas.domain.routing.processor import RouteProcessor
+
+
+def create_processor() -> RouteProcessor:
+    """Processor holding a solved 3-point route."""
+    processor = RouteProcessor(
+        session_id="test",
+        origin={"lat": -22.9, "lng": -43.2},
+        avoid_zones=[],
+        criterion="distance",
+        route_id="route-1",
+    )
+    processor.waypoints = [{"lat": -22.91, "lng": -43.21}]
+    processor.paths = RouteGeometry.from_coordinates(
+        [[-43.2, -22.9], [-43.2051234567, -22.9051234567], [-43.21, -22.91]]
+    )
+    processor.estimated_distance = "1.5 km"
+    processor.estimated_time = "00:03:00"
+    processor.zones_hit = []
+    return processor
+
+
+class TestNegotiatePathFormat:
+    """Tests for negotiate_path_format."""
+
+    def test_default(self):
+        assert asyncio.run(negotiate_path_format(None, None)) is None
+        assert asyncio.run(negotiate_path_format(None, "application/json")) is None
+
+    def test_query_and_accept(self):
+        assert asyncio.run(negotiate_path_format("flat", COMPACT_MEDIA_TYPE)) == "flat"
+        accept = f"{COMPACT_MEDIA_TYPE}, application/json;q=0.9"
+        assert asyncio.run(negotiate_path_format(None, accept)) == "polyline6"
+
+    def test_invalid(self):
+        with pytest.raises(InvalidPathFormatError):
+            asyncio.run(negotiate_path_format("geojson", None))
+
+
+class TestRouteForGui:
+    """Tests for RouteProcessor.route_for_gui path formats."""
+
+    def test_default_lists(self):
+        route = create_processor().route_for_gui()
+        assert route["paths"][1] == [-22.9051234567, -43.2051234567]
+        assert "pathEncoding" not in route
+
+    def test_polyline6(self):
+        route = create_processor().route_for_gui("polyline6")
+        assert route["pathEncoding"] == "polyline6"
+        np.testing.assert_allclose(
+            decode_polyline(route["paths"]),
+            [[-22.9, -43.2], [-22.905123, -43.205123], [-22.91, -43.21]],
+        )
+
+    def test_flat(self):
+        route = create_processor().route_for_gui("flat")
+        assert route["pathEncoding"] == "flat"
+        assert route["paths"].tolist() == [
+            -22.9, -43.2, -22.905123, -43.205123, -22.91, -43.21
+        ]
+
+    def test_responses_are_dicts(self):
+        processor = create_processor()
+        initial = processor.create_initial_route("polyline6")
+        custom = processor.create_custom_route()
+        assert initial["routing"][0]["response"]["routes"][0]["routeId"] == "route-1"
+        assert custom["type"] == "customRoute"
+        json.dumps(custom)
+
+
+class TestCompactResponse:
+    """Tests for CompactJSONResponse and the /process endpoint."""
+
+    def test_renders_numpy(self):
+        body = CompactJSONResponse(
+            content={"paths": np.array([-22.9, -43.2]), "n": np.int64(2)}
+        ).body
+        assert orjson.loads(body) == {"paths": [-22.9, -43.2], "n": 2}
+        assert b" " not in body
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        async def fake_process_route(data, session_id, path_format=None):
+            return create_processor().create_custom_route(path_format)
+
+        monkeypatch.setattr(process_module, "process_route", fake_process_route)
+        app = FastAPI()
+        app.include_router(process_module.router)
+        return TestClient(app)
+
+    def request_body(self) -> dict:
+        return {
+            "type": "ordered",
+            "origin": {"lat": -22.9, "lng": -43.2},
+            "parameters": {"routeId": "route-1", "waypoints": []},
+        }
+
+    def test_endpoint_formats(self, client):
+        default = client.post("/process?sessionId=s", json=self.request_body())
+        assert isinstance(default.json()["route"]["paths"], list)
+
+        flat = client.post(
+            "/process?sessionId=s&pathFormat=flat", json=self.request_body()
+        )
+        assert flat.json()["route"]["pathEncoding"] == "flat"
+        assert len(flat.json()["route"]["paths"]) == 6
+
+        compact = client.post(
+            "/process?sessionId=s",
+            json=self.request_body(),
+            headers={"Accept": COMPACT_MEDIA_TYPE},
+        )
+        assert compact.json()["route"]["pathEncoding"] == "polyline6"
+        assert isinstance(compact.json()["route"]["paths"], str)
+
+        invalid = client.post(
+            "/process?sessionId=s&pathFormat=wkt", json=self.request_body()
+        )
+        assert invalid.status_code == 400
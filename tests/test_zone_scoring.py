@@ -0,0 +1,228 @@
+"""
+Tests for batch route-vs-zone scoring.
+
+Tests cover:
+- Geodesic lengths in metres (route and inside-zone stretches)
+- Per-route penalty ratios and zone counts for many routes at once
+- Degenerate routes, missing zones and multi-part clipped pieces
+- check_route_intersections summary in kilometres
+- route_with_zones scoring OSRM alternatives from GeoJSON zones
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from shapely.geometry import LineString, MultiLineString, Point
+
+from webrotas.domain.avoid_zones.scoring import geodesic_lengths, score_routes
+from webrotas.domain.avoid_zones.zone_set import AvoidZoneSet
+from webrotas.domain.geospatial.distance import haversine_distance
+from webrotas.domain.routing.geometry import RouteGeometry
+from webrotas.infrastructure.routing import osrm
+from webrotas.infrastructure.routing.osrm import check_route_intersections
+
+
+def box_zone(name: str, lat: float, lng: float, width: float, height: float) -> dict:
+    """Rectangular avoid zone ([lat, lng] pairs) with its SW corner at (lat, lng)."""
+    return {
+        "name": name,
+        "coord": [
+            [lat, lng],
+            [lat, lng + width],
+            [lat + height, lng + width],
+            [lat + height, lng],
+        ],
+    }
+
+
+# Two zones across the parallel -22.9 (from -22.91 to -22.89), 0.01 degrees wide
+ZONES = AvoidZoneSet(
+    [
+        box_zone("A", -22.91, -43.2, 0.01, 0.02),
+        box_zone("B", -22.91, -43.18, 0.01, 0.02),
+    ]
+)
+LAT = -22.9
+
+
+def east_line(lng_from: float, lng_to: float, lat: float = LAT):
+    """[lng, lat] pairs along a parallel."""
+    return [[lng_from, lat], [lng_to, lat]]
+
+
+def parallel_m(lng_from: float, lng_to: float, lat: float = LAT) -> float:
+    """Haversine length along a parallel, in metres."""
+    return float(haversine_distance(lat, lng_from, lat, lng_to))
+
+
+class TestGeodesicLengths:
+    """Tests for geodesic_lengths."""
+
+    def test_parts_are_not_joined(self):
+        multi = MultiLineString(
+            [[(-43.2, LAT), (-43.19, LAT)], [(-43.18, LAT), (-43.17, LAT)]]
+        )
+        line = LineString([(-43.2, LAT), (-43.19, LAT)])
+
+        lengths = geodesic_lengths(np.array([multi, line, Point(0, 0)]))
+
+        assert lengths[0] == pytest.approx(2 * parallel_m(-43.2, -43.19))
+        assert lengths[1] == pytest.approx(parallel_m(-43.2, -43.19))
+        assert lengths[2] == 0.0
+
+
+class TestScoreRoutes:
+    """Tests for score_routes."""
+
+    def test_batch_of_routes(self):
+        routes = [
+            east_line(-43.21, -43.16),  # crosses A and B
+            east_line(-43.21, -43.195),  # half of A
+            east_line(-43.0, -42.9),  # clear
+        ]
+
+        scores = score_routes(routes, ZONES.tree)
+
+        np.testing.assert_array_equal(scores.zone_intersections, [2, 1, 0])
+        assert scores.route_length_m[0] == pytest.approx(parallel_m(-43.21, -43.16))
+        assert scores.inside_length_m[0] == pytest.approx(
+            2 * parallel_m(-43.2, -43.19), rel=1e-6
+        )
+        assert scores.inside_length_m[1] == pytest.approx(
+            parallel_m(-43.2, -43.195), rel=1e-6
+        )
+        np.testing.assert_allclose(scores.penalty_ratio, [0.4, 1 / 3, 0.0], rtol=1e-6)
+
+    def test_lengths_are_metres_not_degrees(self):
+        scores = score_routes([east_line(-43.21, -43.16)], ZONES.tree)
+        summary = scores.summary(0)
+
+        # 0.05 degrees of longitude at -22.9 is ~5.1 km
+        assert summary["route_length_km"] == pytest.approx(5.12, abs=0.01)
+        assert summary["total_length_km"] == pytest.approx(2.05, abs=0.01)
+        assert summary["intersection_count"] == 2
+
+    def test_accepts_encoded_geometries(self):
+        line = RouteGeometry.from_coordinates(east_line(-43.21, -43.16))
+
+        by_array = score_routes([line.coords], ZONES.tree)
+        by_polyline = score_routes([line.encoded, line], ZONES.tree)
+
+        np.testing.assert_allclose(by_polyline.penalty_ratio, by_array.penalty_ratio[[0, 0]])
+
+    def test_degenerate_routes_and_no_zones(self):
+        routes = [[[-43.195, LAT]], [], east_line(-43.21, -43.16)]
+
+        scores = score_routes(routes, ZONES.tree)
+        np.testing.assert_array_equal(scores.zone_intersections, [0, 0, 2])
+        np.testing.assert_array_equal(scores.route_length_m[:2], [0.0, 0.0])
+        assert scores.penalty_ratio[0] == 0.0
+
+        empty = score_routes(routes, None)
+        np.testing.assert_array_equal(empty.zone_intersections, [0, 0, 0])
+        assert len(score_routes([], ZONES.tree)) == 0
+
+    def test_route_reentering_zone(self):
+        # Enters A, leaves south, comes back in: one zone, two clipped pieces
+        route = [
+            [-43.205, LAT],
+            [-43.198, LAT],
+            [-43.198, -22.93],
+            [-43.193, -22.93],
+            [-43.193, LAT],
+            [-43.185, LAT],
+        ]
+
+        scores = score_routes([route], ZONES.tree)
+
+        assert scores.zone_intersections[0] == 1
+        # Horizontal stretches inside A, plus the way down to the edge and back
+        inside = parallel_m(-43.2, -43.198) + parallel_m(-43.193, -43.19)
+        inside += 2 * float(haversine_distance(LAT, -43.198, -22.91, -43.198))
+        assert scores.inside_length_m[0] == pytest.approx(inside, rel=1e-6)
+
+
+class TestCheckRouteIntersections:
+    """Tests for the single-route wrapper."""
+
+    def test_summary(self):
+        result = check_route_intersections(
+            east_line(-43.21, -43.16), ZONES.polygons, ZONES.tree
+        )
+
+        assert result["intersection_count"] == 2
+        assert result["penalty_ratio"] == pytest.approx(0.4, rel=1e-6)
+        assert result["route_length_km"] == pytest.approx(5.12, abs=0.01)
+
+    def test_no_polygons_still_measures_route(self):
+        result = check_route_intersections(east_line(-43.21, -43.16), [], None)
+
+        assert result == {
+            "intersection_count": 0,
+            "total_length_km": 0.0,
+            "penalty_ratio": 0.0,
+            "route_length_km": 5.122,
+        }
+
+
+class TestRouteWithZones:
+    """Tests for route_with_zones scoring alternatives."""
+
+    GEOJSON = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"name": "A"},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[-43.2, -22.95], [-43.19, -22.95], [-43.19, -22.85], [-43.2, -22.85], [-43.2, -22.95]]
+                    ],
+                },
+            }
+        ],
+    }
+
+    def response(self):
+        routes = [
+            east_line(-43.21, -43.18),
+            east_line(-43.21, -43.18, lat=-22.8),
+        ]
+        return {
+            "code": "Ok",
+            "routes": [
+                {
+                    "geometry": RouteGeometry.from_coordinates(line).encoded,
+                    "distance": 3000.0,
+                    "duration": 300.0,
+                }
+                for line in routes
+            ],
+        }
+
+    def test_penalize_sorts_by_score(self, monkeypatch):
+        async def fake_request_osrm(**kwargs):
+            return self.response()
+
+        monkeypatch.setattr(osrm, "request_osrm", fake_request_osrm)
+
+        result = asyncio.run(osrm.route_with_zones("x", self.GEOJSON, "penalize", 2))
+
+        penalties = [route["penalties"] for route in result["routes"]]
+        assert penalties[0]["penalty_score"] == 0.0
+        assert penalties[1]["penalty_score"] == pytest.approx(1 / 3, rel=1e-6)
+        assert penalties[1]["intersection_length_km"] == pytest.approx(1.02, abs=0.01)
+        assert result["zones_applied"]["polygon_count"] == 1
+
+    def test_filter_drops_crossing_routes(self, monkeypatch):
+        async def fake_request_osrm(**kwargs):
+            return self.response()
+
+        monkeypatch.setattr(osrm, "request_osrm", fake_request_osrm)
+
+        result = asyncio.run(osrm.route_with_zones("x", self.GEOJSON, "filter", 2))
+
+        assert len(result["routes"]) == 1
+        assert "penalties" not in result["routes"][0]